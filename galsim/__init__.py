@@ -114,7 +114,7 @@ from .errors import GalSimWarning, GalSimDeprecationWarning
 from .image import Image, ImageS, ImageI, ImageF, ImageD, ImageCF, ImageCD, ImageUS, ImageUI, _Image
 
 # PhotonArray
-from .photon_array import PhotonArray, WavelengthSampler, FRatioAngles, PhotonDCR
+from .photon_array import PhotonArray, WavelengthSampler, FRatioAngles, PhotonDCR, PhotonOpList
 
 # Noise
 from .random import BaseDeviate, UniformDeviate, GaussianDeviate, PoissonDeviate, DistDeviate
@@ -124,7 +124,7 @@ from .noise import DeviateNoise, VariableGaussianNoise
 from .correlatednoise import CorrelatedNoise, getCOSMOSNoise, UncorrelatedNoise, CovarianceSpectrum
 
 # GSObject
-from .gsobject import GSObject
+from .gsobject import GSObject, drawImages
 from .gsparams import GSParams
 from .gaussian import Gaussian
 from .moffat import Moffat
@@ -147,6 +147,7 @@ from .interpolatedimage import InterpolatedKImage, _InterpolatedKImage
 from .sum import Add, Sum
 from .convolve import Convolve, Convolution, Deconvolve, Deconvolution
 from .convolve import AutoConvolve, AutoConvolution, AutoCorrelate, AutoCorrelation
+from .convolve import set_convolve_cache_size, get_convolve_cache_size
 from .fouriersqrt import FourierSqrt, FourierSqrtProfile
 from .randwalk import RandomWalk
 from .transform import Transform, Transformation, _Transform
@@ -191,6 +192,8 @@ from . import dcr
 from . import meta_data
 from . import cdmodel
 from . import utilities
+from .utilities import set_num_threads, get_num_threads
+from .utilities import set_table_cache_dir, get_table_cache_dir
 from . import fft
 from . import download_cosmos
 from . import zernike
@@ -20,7 +20,7 @@ import numpy as np
 import math
 
 from . import _galsim
-from .gsobject import GSObject
+from .gsobject import GSObject, _sbp_kValues
 from .gsparams import GSParams
 from .utilities import lazy_property, doc_inherit
 from .position import PositionD
@@ -124,10 +124,19 @@ class Box(GSObject):
         else:
             return 0.
 
+    @doc_inherit
+    def _xValueArray(self, x, y):
+        inside = (2.*np.abs(x) < self._width) & (2.*np.abs(y) < self._height)
+        return np.where(inside, self._norm, 0.)
+
     @doc_inherit
     def _kValue(self, kpos):
         return self._sbp.kValue(kpos._p)
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        return _sbp_kValues(self._sbp, kx, ky)
+
     @doc_inherit
     def _drawReal(self, image):
         self._sbp.draw(image._image, image.scale)
@@ -281,10 +290,19 @@ class TopHat(GSObject):
         else:
             return 0.
 
+    @doc_inherit
+    def _xValueArray(self, x, y):
+        rsq = x**2 + y**2
+        return np.where(rsq < self._rsq, self._norm, 0.)
+
     @doc_inherit
     def _kValue(self, kpos):
         return self._sbp.kValue(kpos._p)
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        return _sbp_kValues(self._sbp, kx, ky)
+
     @doc_inherit
     def _drawReal(self, image):
         self._sbp.draw(image._image, image.scale)
@@ -19,6 +19,7 @@
 
 # These have the basic config functionality that gets imported into galsim.config scope
 from .process import *
+from .stats import *
 from .input import *
 from .output import *
 from .extra import *
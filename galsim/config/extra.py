@@ -244,7 +244,7 @@ def WriteExtraOutputs(config, main_data, logger=None):
         # Call the write function, possibly multiple times to account for IO failures.
         write_func = builder.writeFile
         args = (file_name,field,config,logger)
-        galsim.config.RetryIO(write_func, args, ntries, file_name, logger)
+        galsim.config.AtomicRetryIO(write_func, args, ntries, file_name, logger)
         config['extra_last_file'][key] = file_name
         logger.debug('file %d: Wrote %s to %r',config['file_num'],key,file_name)
 
@@ -108,28 +108,6 @@ def BuildGSObject(config, key, base=None, gsparams={}, logger=None):
 
             return cobj, csafe
 
-    # Set up the initial default list of attributes to ignore while building the object:
-    ignore = [
-        'dilate', 'dilation', 'ellip', 'rotate', 'rotation', 'scale_flux',
-        'magnify', 'magnification', 'shear', 'shift',
-        'gsparams', 'skip',
-        'current', 'index_key', 'repeat'
-    ]
-    # There are a few more that are specific to which key we have.
-    if key == 'gal':
-        ignore += [ 'resolution', 'signal_to_noise', 'redshift', 're_from_res' ]
-    elif key == 'psf':
-        ignore += [ 'saved_re' ]
-    else:
-        # As long as key isn't psf, allow resolution.
-        # Ideally, we'd like to check that it's something within the gal hierarchy, but
-        # I don't know an easy way to do that.
-        ignore += [ 'resolution' , 're_from_res' ]
-
-    # Allow signal_to_noise for PSFs only if there is not also a galaxy.
-    if 'gal' not in base and key == 'psf':
-        ignore += [ 'signal_to_noise']
-
     # If we are specifying the size according to a resolution, then we
     # need to get the PSF's half_light_radius.
     if 'resolution' in param:
@@ -156,15 +134,14 @@ def BuildGSObject(config, key, base=None, gsparams={}, logger=None):
     if 'gsparams' in param:
         gsparams = UpdateGSParams(gsparams, param['gsparams'], base)
 
-    # See if this type is registered as a valid type.
-    if type_name in valid_gsobject_types:
-        build_func = valid_gsobject_types[type_name]
-    elif type_name in galsim.__dict__:
-        build_func = eval("galsim."+type_name)
-    else:
-        raise galsim.GalSimConfigValueError("Unrecognised gsobject type", type_name)
+    # The build function and the list of attributes to ignore only depend on the type and
+    # where this object is in the config dict, so we work them out once and save them.
+    build_key = (type_name, key, 'gal' in base)
+    if '_build' not in param or param['_build'][0] != build_key:
+        param['_build'] = (build_key,) + _GetBuildFunc(type_name, key, base)
+    build_func, ignore, is_simple = param['_build'][1:]
 
-    if inspect.isclass(build_func) and issubclass(build_func, galsim.GSObject):
+    if is_simple:
         gsobject, safe = _BuildSimple(build_func, param, base, ignore, gsparams, logger)
     else:
         gsobject, safe = build_func(param, base, ignore, gsparams, logger)
@@ -185,6 +162,47 @@ def BuildGSObject(config, key, base=None, gsparams={}, logger=None):
     return gsobject, safe
 
 
+def _GetBuildFunc(type_name, key, base):
+    """@brief Get the function to use for building an object of the given type, along with
+    the list of attributes to ignore when checking its parameters.
+
+    @returns the tuple (build_func, ignore, is_simple), where is_simple indicates whether
+             build_func is a GSObject class to be built with _BuildSimple.
+    """
+    # Set up the initial default list of attributes to ignore while building the object:
+    ignore = [
+        'dilate', 'dilation', 'ellip', 'rotate', 'rotation', 'scale_flux',
+        'magnify', 'magnification', 'shear', 'shift',
+        'gsparams', 'skip',
+        'current', 'index_key', 'repeat'
+    ]
+    # There are a few more that are specific to which key we have.
+    if key == 'gal':
+        ignore += [ 'resolution', 'signal_to_noise', 'redshift', 're_from_res' ]
+    elif key == 'psf':
+        ignore += [ 'saved_re' ]
+    else:
+        # As long as key isn't psf, allow resolution.
+        # Ideally, we'd like to check that it's something within the gal hierarchy, but
+        # I don't know an easy way to do that.
+        ignore += [ 'resolution' , 're_from_res' ]
+
+    # Allow signal_to_noise for PSFs only if there is not also a galaxy.
+    if 'gal' not in base and key == 'psf':
+        ignore += [ 'signal_to_noise']
+
+    # See if this type is registered as a valid type.
+    if type_name in valid_gsobject_types:
+        build_func = valid_gsobject_types[type_name]
+    elif type_name in galsim.__dict__:
+        build_func = eval("galsim."+type_name)
+    else:
+        raise galsim.GalSimConfigValueError("Unrecognised gsobject type", type_name)
+
+    is_simple = inspect.isclass(build_func) and issubclass(build_func, galsim.GSObject)
+    return build_func, ignore, is_simple
+
+
 def UpdateGSParams(gsparams, config, base):
     """@brief Add additional items to the `gsparams` dict based on config['gsparams'].
     """
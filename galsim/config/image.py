@@ -19,6 +19,7 @@
 import galsim
 import logging
 import numpy as np
+import time
 
 # This file handles the building of an image by parsing config['image'].
 # This file includes the basic functionality, but it calls out to helper functions
@@ -58,6 +59,7 @@ def BuildImages(nimages, config, image_num=0, obj_num=0, logger=None):
         nproc = galsim.config.UpdateNProc(nproc, nimages, config, logger)
     else:
         nproc = 1
+    use_shared_memory = galsim.config.GetSharedMemory(config, nproc, logger)
 
     jobs = []
     for k in range(nimages):
@@ -88,7 +90,8 @@ def BuildImages(nimages, config, image_num=0, obj_num=0, logger=None):
 
     images = galsim.config.MultiProcess(nproc, config, BuildImage, tasks, 'image', logger,
                                         done_func = done_func,
-                                        except_func = except_func)
+                                        except_func = except_func,
+                                        use_shared_memory = use_shared_memory)
 
     logger.debug('file %d: Done making images',config.get('file_num',0))
     if len(images) == 0:
@@ -202,7 +205,8 @@ def SetupConfigImageSize(config, xsize, ysize, logger=None):
 # Ignore these when parsing the parameters for specific Image types:
 from .stamp import stamp_image_keys
 image_ignore = [ 'random_seed', 'noise', 'pixel_scale', 'wcs', 'sky_level', 'sky_level_pixel',
-                 'world_center', 'index_convention', 'nproc'] + stamp_image_keys
+                 'world_center', 'index_convention', 'nproc', 'shared_memory',
+                 'sort_by_cost', 'batch_values', 'stream_stamps'] + stamp_image_keys
 
 def BuildImage(config, image_num=0, obj_num=0, logger=None):
     """
@@ -217,6 +221,7 @@ def BuildImage(config, image_num=0, obj_num=0, logger=None):
     """
     logger = galsim.config.LoggerWrapper(logger)
     logger.debug('image %d: BuildImage: image, obj = %d,%d',image_num,image_num,obj_num)
+    t1 = time.time()
 
     # Setup basic things in the top-level config dict that we will need.
     SetupConfigImageNum(config, image_num, obj_num, logger)
@@ -266,10 +271,13 @@ def BuildImage(config, image_num=0, obj_num=0, logger=None):
     config['index_key'] = 'image_num'
 
     # Do whatever processing is required for the extra output items.
-    galsim.config.ProcessExtraOutputsForImage(config,logger)
+    with galsim.config.TimeStage(config, 'extra'):
+        galsim.config.ProcessExtraOutputsForImage(config,logger)
 
-    builder.addNoise(image, cfg_image, config, image_num, obj_num, current_var, logger)
+    with galsim.config.TimeStage(config, 'noise'):
+        builder.addNoise(image, cfg_image, config, image_num, obj_num, current_var, logger)
 
+    galsim.config.RecordTime(config, 'image', time.time() - t1)
     return image
 
 
@@ -307,7 +315,6 @@ def FlattenNoiseVariance(config, full_image, stamps, current_vars, logger):
     @returns the final variance in the image
     """
     logger = galsim.config.LoggerWrapper(logger)
-    rng = config['image_num_rng']
     nobjects = len(stamps)
     max_current_var = max(current_vars)
     if max_current_var > 0:
@@ -321,18 +328,40 @@ def FlattenNoiseVariance(config, full_image, stamps, current_vars, logger):
             if stamps[k] is None: continue
             b = stamps[k].bounds & full_image.bounds
             if b.isDefined(): noise_image[b] += current_vars[k]
-        # Update this, since overlapping postage stamps may have led to a larger
-        # value in some pixels.
-        max_current_var = np.max(noise_image.array)
-        logger.debug('image %d: maximum noise varance in any pixel is %f',
-                     config['image_num'], max_current_var)
-        # Figure out how much noise we need to add to each pixel.
-        noise_image = max_current_var - noise_image
-        # Add it.
-        full_image.addNoise(galsim.VariableGaussianNoise(rng,noise_image))
+        max_current_var = FlattenNoiseImage(config, full_image, noise_image, logger)
     # Now max_current_var is how much noise is in each pixel.
     return max_current_var
 
+def FlattenNoiseImage(config, full_image, noise_image, logger):
+    """This is the second half of FlattenNoiseVariance, for when the current variance in each
+    pixel has already been accumulated into an image.  It adds noise to bring every pixel up to
+    the maximum variance in noise_image.
+
+    This is useful when the stamps are not all kept in memory, in which case noise_image can be
+    accumulated as each stamp is added to the full image.
+
+    @param config           The configuration dict.
+    @param full_image       The full image onto which the noise should be added.
+    @param noise_image      An image with the current variance in each pixel of full_image.
+                            Note: this image is modified by this function.
+    @param logger           If given, a logger object to log progress.
+
+    @returns the final variance in the image
+    """
+    logger = galsim.config.LoggerWrapper(logger)
+    rng = config['image_num_rng']
+    # Update this, since overlapping postage stamps may have led to a larger
+    # value in some pixels.
+    max_current_var = np.max(noise_image.array)
+    logger.debug('image %d: maximum noise varance in any pixel is %f',
+                 config['image_num'], max_current_var)
+    # Figure out how much noise we need to add to each pixel.
+    noise_image *= -1
+    noise_image += max_current_var
+    # Add it.
+    full_image.addNoise(galsim.VariableGaussianNoise(rng,noise_image))
+    return max_current_var
+
 
 def MakeImageTasks(config, jobs, logger):
     """Turn a list of jobs into a list of tasks.
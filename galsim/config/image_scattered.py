@@ -48,7 +48,7 @@ class ScatteredImageBuilder(ImageBuilder):
 
         # These are allowed for Scattered, but we don't use them here.
         extra_ignore = [ 'image_pos', 'world_pos', 'stamp_size', 'stamp_xsize', 'stamp_ysize',
-                         'nobjects' ]
+                         'nobjects', 'tile_size', 'tile_margin' ]
         opt = { 'size' : int , 'xsize' : int , 'ysize' : int }
         params = galsim.config.GetAllParams(config, base, opt=opt, ignore=ignore+extra_ignore)[0]
 
@@ -107,34 +107,201 @@ class ScatteredImageBuilder(ImageBuilder):
                 'y' : { 'type' : 'Random' , 'min' : ymin , 'max' : ymax }
             }
 
-        stamps, current_vars = galsim.config.BuildStamps(
-                self.nobjects, base, logger=logger, obj_num=obj_num, do_noise=False)
+        if 'stream_stamps' in config:
+            stream = galsim.config.ParseValue(config, 'stream_stamps', base, bool)[0]
+        else:
+            stream = False
 
-        base['index_key'] = 'image_num'
+        ntiles, nproc = self._getTiles(config, base, full_image, logger)
+
+        if ntiles > 1:
+            # Each process draws all the objects that overlap one tile of the full image.
+            noise_image = self._buildTiles(full_image, config, base, image_num, obj_num,
+                                           ntiles, nproc, logger)
+
+            base['index_key'] = 'image_num'
 
-        for k in range(self.nobjects):
-            # This is our signal that the object was skipped.
-            if stamps[k] is None: continue
-            bounds = stamps[k].bounds & full_image.bounds
-            logger.debug('image %d: full bounds = %s',image_num,str(full_image.bounds))
-            logger.debug('image %d: stamp %d bounds = %s',image_num,k,str(stamps[k].bounds))
-            logger.debug('image %d: Overlap = %s',image_num,str(bounds))
-            if bounds.isDefined():
-                full_image[bounds] += stamps[k][bounds]
+            # Bring the image so far up to a flat noise variance
+            if noise_image is not None:
+                current_var = galsim.config.FlattenNoiseImage(
+                        base, full_image, noise_image, logger)
             else:
-                logger.info(
-                    "Object centered at (%d,%d) is entirely off the main image, "
-                    "whose bounds are (%d,%d,%d,%d)."%(
-                        stamps[k].center.x, stamps[k].center.y,
-                        full_image.bounds.xmin, full_image.bounds.xmax,
-                        full_image.bounds.ymin, full_image.bounds.ymax))
+                current_var = 0.
+        elif stream:
+            # Add each stamp to the full image as soon as it is built, rather than keeping all
+            # of them in memory until the end.  Likewise for the current noise variance, which
+            # only needs an image if some of the stamps have noise in them already.
+            # The stamps are added in order of obj_num, so the sums where they overlap are the
+            # same as when they are all added at the end, even with multiple processes.
+            noise = {}
+            def stamp_func(k, stamp, current_var):
+                self._addStamp(full_image, stamp, image_num, k, logger)
+                if current_var > 0:
+                    if 'image' not in noise:
+                        noise['image'] = galsim.ImageF(full_image.bounds)
+                    b = stamp.bounds & full_image.bounds
+                    if b.isDefined(): noise['image'][b] += current_var
+
+            galsim.config.BuildStamps(
+                    self.nobjects, base, logger=logger, obj_num=obj_num, do_noise=False,
+                    stamp_func=stamp_func)
+
+            base['index_key'] = 'image_num'
+
+            # Bring the image so far up to a flat noise variance
+            if 'image' in noise:
+                current_var = galsim.config.FlattenNoiseImage(
+                        base, full_image, noise['image'], logger)
+            else:
+                current_var = 0.
+        else:
+            stamps, current_vars = galsim.config.BuildStamps(
+                    self.nobjects, base, logger=logger, obj_num=obj_num, do_noise=False)
+
+            base['index_key'] = 'image_num'
+
+            for k in range(self.nobjects):
+                # This is our signal that the object was skipped.
+                if stamps[k] is None: continue
+                self._addStamp(full_image, stamps[k], image_num, k, logger)
 
-        # Bring the image so far up to a flat noise variance
-        current_var = galsim.config.FlattenNoiseVariance(
-                base, full_image, stamps, current_vars, logger)
+            # Bring the image so far up to a flat noise variance
+            current_var = galsim.config.FlattenNoiseVariance(
+                    base, full_image, stamps, current_vars, logger)
 
         return full_image, current_var
 
+    def _getTiles(self, config, base, full_image, logger):
+        # Figure out how many tiles to split the image into for drawing, and how many processes
+        # to use for them.  Returns 0,0 if the image is not to be drawn in tiles.
+        if 'tile_size' not in config:
+            return 0, 0
+        tile_size = galsim.config.ParseValue(config, 'tile_size', base, int)[0]
+        if tile_size <= 0:
+            raise galsim.GalSimConfigValueError("image.tile_size must be > 0", tile_size)
+        if 'nproc' in config:
+            nproc = galsim.config.ParseValue(config, 'nproc', base, int)[0]
+        else:
+            nproc = 1
+        b = full_image.bounds
+        nx = (b.xmax - b.xmin) // tile_size + 1
+        ny = (b.ymax - b.ymin) // tile_size + 1
+        ntiles = nx * ny
+        nproc = galsim.config.UpdateNProc(nproc, ntiles, base, logger)
+        if nproc <= 1:
+            # Then there is no point in drawing the objects on the border of the tiles
+            # more than once.
+            logger.debug('image %d: Not using tiles, since nproc = 1',base.get('image_num',0))
+            return 0, 0
+        output = base.get('output', {})
+        if any(key in output for key in galsim.config.valid_extra_outputs):
+            # The extra outputs would be processed for some objects more than once.
+            logger.warning('Cannot draw image in tiles when there are extra outputs.  '
+                           'Ignoring image.tile_size.')
+            return 0, 0
+        stamp = base.get('stamp', {})
+        if (any(key in stamp for key in ['reject', 'min_flux_frac', 'min_snr', 'max_snr',
+                                         'retry_failures']) or 'retry_failures' in config):
+            # Objects that are not drawn on a tile can't be retried, so the retried version
+            # would be missing if it landed on that tile.
+            logger.warning('Cannot draw image in tiles when objects may be retried.  '
+                           'Ignoring image.tile_size.')
+            return 0, 0
+        return ntiles, nproc
+
+    def _buildTiles(self, full_image, config, base, image_num, obj_num, ntiles, nproc, logger):
+        # Draw the objects onto the full image in tiles, each of which is built in a single
+        # job by _BuildScatteredTile.  Returns the current noise variance image, or None if
+        # none of the stamps had any noise in them.
+        tile_size = galsim.config.ParseValue(config, 'tile_size', base, int)[0]
+        b = full_image.bounds
+        nx = (b.xmax - b.xmin) // tile_size + 1
+        ny = (b.ymax - b.ymin) // tile_size + 1
+        assert nx * ny == ntiles
+
+        # Sort the objects into the tiles they overlap, so each tile only builds those.
+        tile_obj_nums = [ [] for i in range(ntiles) ]
+        tile_margins = [ {} for i in range(ntiles) ]
+        all_bounds, exact = _GetScatteredStampBounds(base, self.nobjects, obj_num, logger)
+        nunknown = sum(bounds is None for bounds in all_bounds)
+        if nunknown > 0:
+            logger.warning('image %d: The stamp bounds of %d objects are not known before they '
+                           'are built, so every tile will build them.  Set stamp.size or '
+                           'image.tile_margin to avoid this.', image_num, nunknown)
+        for k, bounds in enumerate(all_bounds):
+            if bounds is None:
+                # Then we don't know where it is, so let every tile check it.
+                ix1, ix2, iy1, iy2 = 0, nx-1, 0, ny-1
+            else:
+                bounds = bounds & b
+                if not bounds.isDefined(): continue
+                ix1 = (bounds.xmin - b.xmin) // tile_size
+                ix2 = (bounds.xmax - b.xmin) // tile_size
+                iy1 = (bounds.ymin - b.ymin) // tile_size
+                iy2 = (bounds.ymax - b.ymin) // tile_size
+            for iy in range(iy1, iy2+1):
+                for ix in range(ix1, ix2+1):
+                    tile_obj_nums[iy*nx + ix].append(obj_num + k)
+                    if not exact[k]:
+                        tile_margins[iy*nx + ix][k] = all_bounds[k]
+
+        jobs = []
+        for iy in range(ny):
+            for ix in range(nx):
+                xmin = b.xmin + ix * tile_size
+                ymin = b.ymin + iy * tile_size
+                bounds = galsim.BoundsI(xmin, min(xmin+tile_size-1, b.xmax),
+                                        ymin, min(ymin+tile_size-1, b.ymax))
+                jobs.append({ 'bounds' : bounds, 'nobjects' : self.nobjects,
+                              'obj_num' : obj_num, 'obj_nums' : tile_obj_nums[len(jobs)],
+                              'margins' : tile_margins[len(jobs)], 'dtype' : full_image.dtype })
+        tasks = [ [ (job, k) ] for k, job in enumerate(jobs) ]
+        use_shared_memory = galsim.config.GetSharedMemory(base, nproc, logger)
+
+        noise = {}
+        def done_func(logger, proc, k, result, t):
+            tile, tile_noise = result
+            # The tiles don't overlap, so each pixel of the full image is set exactly once.
+            full_image[tile.bounds] = tile
+            if tile_noise is not None:
+                if 'image' not in noise:
+                    noise['image'] = galsim.ImageF(full_image.bounds)
+                noise['image'][tile.bounds] = tile_noise
+            if proc is None: s0 = ''
+            else: s0 = '%s: '%proc
+            logger.info(s0 + 'image %d: Tile %d: bounds = %s, time = %f sec',
+                        image_num, k, tile.bounds, t)
+
+        def except_func(logger, proc, k, e, tr):
+            if proc is None: s0 = ''
+            else: s0 = '%s: '%proc
+            logger.error(s0 + 'Exception caught when building tile %d of image %d', k, image_num)
+            logger.debug('%s',tr)
+            logger.error('Aborting the rest of this image')
+
+        galsim.config.MultiProcess(nproc, base, _BuildScatteredTile, tasks, 'tile', logger,
+                                   done_func = done_func,
+                                   except_func = except_func,
+                                   use_shared_memory = use_shared_memory,
+                                   keep_results = False)
+        return noise.get('image', None)
+
+    def _addStamp(self, full_image, stamp, image_num, k, logger):
+        # Add a single stamp onto the full image, or at least the part of it that overlaps.
+        bounds = stamp.bounds & full_image.bounds
+        logger.debug('image %d: full bounds = %s',image_num,str(full_image.bounds))
+        logger.debug('image %d: stamp %d bounds = %s',image_num,k,str(stamp.bounds))
+        logger.debug('image %d: Overlap = %s',image_num,str(bounds))
+        if bounds.isDefined():
+            full_image[bounds] += stamp[bounds]
+        else:
+            logger.info(
+                "Object centered at (%d,%d) is entirely off the main image, "
+                "whose bounds are (%d,%d,%d,%d)."%(
+                    stamp.center.x, stamp.center.y,
+                    full_image.bounds.xmin, full_image.bounds.xmax,
+                    full_image.bounds.ymin, full_image.bounds.ymax))
+
     def makeTasks(self, config, base, jobs, logger):
         """Turn a list of jobs into a list of tasks.
 
@@ -190,6 +357,109 @@ class ScatteredImageBuilder(ImageBuilder):
         base['index_key'] = orig_index_key
         return nobj
 
+def _GetScatteredStampBounds(config, nobjects, obj_num, logger):
+    """Find the bounds of the stamps of all the objects in a Scattered image.
+
+    This only does the parts of BuildStamp that find the size and position of the stamp, using a
+    copy of the config dict.  None of the profiles are built.  If the stamp size isn't given,
+    but image.tile_margin is, the stamp is taken to extend that many pixels from its center in
+    each direction.  Otherwise, the bounds are not known until the profile is built.
+
+    @param config           The configuration dict.
+    @param nobjects         The number of objects in the image.
+    @param obj_num          The first object number in the image.
+    @param logger           If given, a logger object to log progress.
+
+    @returns the tuple (all_bounds, exact), where all_bounds is a list of the bounds of each
+             stamp, and exact is a list of whether those bounds are exact or just the
+             tile_margin estimate.  The bounds are undefined if the object is skipped, and None
+             if they can't be determined here.
+    """
+    from .stamp import valid_stamp_types, stamp_ignore, _ShiftStampBounds
+    config1 = galsim.config.CopyConfig(config)
+    if 'tile_margin' in config1['image']:
+        margin = galsim.config.ParseValue(config1['image'], 'tile_margin', config1, int)[0]
+    else:
+        margin = None
+    all_bounds = []
+    exact = []
+    for k in range(nobjects):
+        try:
+            galsim.config.SetupConfigObjNum(config1, obj_num + k, logger)
+            stamp = config1['stamp']
+            builder = valid_stamp_types[stamp['type']]
+            galsim.config.SetupConfigRNG(config1, seed_offset=1, logger=logger)
+            xsize, ysize, image_pos, world_pos = builder.setup(
+                    stamp, config1, 0, 0, stamp_ignore, logger)
+            galsim.config.SetupConfigStampSize(config1, xsize, ysize, image_pos, world_pos,
+                                               logger)
+            if 'skip' in stamp and galsim.config.ParseValue(stamp, 'skip', config1, bool)[0]:
+                all_bounds.append(galsim.BoundsI())
+                exact.append(True)
+            elif xsize and ysize:
+                all_bounds.append(_ShiftStampBounds(galsim._BoundsI(1,xsize,1,ysize), config1))
+                exact.append(True)
+            elif margin is not None and config1['stamp_center'] is not None:
+                all_bounds.append(galsim.BoundsI(config1['stamp_center']).withBorder(margin))
+                exact.append(False)
+            else:
+                all_bounds.append(None)
+                exact.append(False)
+        except Exception as e:
+            # Any errors will be raised again when the object is built on the tiles.
+            logger.debug('obj %d: Unable to get the stamp bounds: %s', obj_num + k, e)
+            all_bounds.append(None)
+            exact.append(False)
+    return all_bounds, exact
+
+def _BuildScatteredTile(config, bounds, nobjects, obj_num, obj_nums, margins, dtype,
+                        logger=None):
+    """Build one tile of a Scattered image.
+
+    Only the objects that overlap the tile are built, in order, and only the part of each stamp
+    that is in the tile is kept.  Since the stamps are added in the same order as when the full
+    image is built at once, the result is identical to the corresponding part of that image.
+
+    @param config           The configuration dict.
+    @param bounds           The bounds of the tile.
+    @param nobjects         The number of objects in the image.
+    @param obj_num          The first object number in the image.
+    @param obj_nums         The object numbers of the objects that may overlap the tile.
+    @param margins          A dict of the bounds estimated from image.tile_margin for the
+                            objects in obj_nums whose stamp size isn't given, indexed by the
+                            object's index in the image.  It is an error for any of these
+                            stamps to be larger than that.
+    @param dtype            The data type of the full image.
+    @param logger           If given, a logger object to log progress. [default: None]
+
+    @returns the tuple (tile, noise_image), where noise_image is the current noise variance in
+             each pixel of the tile, or None if none of the stamps had any noise in them.
+    """
+    tile = galsim.Image(bounds, dtype=dtype, init_value=0)
+    noise = {}
+    def stamp_func(k, stamp, current_var):
+        if k in margins and not margins[k].includes(stamp.bounds):
+            raise galsim.GalSimConfigError(
+                "The stamp for object %d has bounds %s, which extend past image.tile_margin "
+                "from its center. Increase image.tile_margin."%(obj_num+k, stamp.bounds))
+        b = stamp.bounds & tile.bounds
+        if not b.isDefined(): return
+        tile[b] += stamp[b]
+        if current_var > 0:
+            if 'image' not in noise:
+                noise['image'] = galsim.ImageF(bounds)
+            noise['image'][b] += current_var
+
+    config['_tile_bounds'] = bounds
+    config['_tile_obj_nums'] = set(obj_nums)
+    try:
+        galsim.config.BuildStamps(nobjects, config, logger=logger, obj_num=obj_num,
+                                  do_noise=False, stamp_func=stamp_func)
+    finally:
+        del config['_tile_bounds']
+        del config['_tile_obj_nums']
+    return tile, noise.get('image', None)
+
 # Register this as a valid image type
 from .image import RegisterImageType
 RegisterImageType('Scattered', ScatteredImageBuilder())
@@ -170,11 +170,12 @@ def ProcessInput(config, logger=None, file_scope_only=False, safe_only=False):
                         continue
 
                     logger.debug('file %d: %s kwargs = %s',file_num,key,kwargs)
-                    if use_manager:
-                        tag = key + str(i)
-                        input_obj = getattr(config['_input_manager'],tag)(**kwargs)
-                    else:
-                        input_obj = loader.init_func(**kwargs)
+                    with galsim.config.TimeStage(config, 'input'):
+                        if use_manager:
+                            tag = key + str(i)
+                            input_obj = getattr(config['_input_manager'],tag)(**kwargs)
+                        else:
+                            input_obj = loader.init_func(**kwargs)
 
                     logger.debug('file %d: Built input object %s %d',file_num,key,i)
                     if 'file_name' in kwargs:
@@ -449,6 +450,55 @@ def _GenerateFromCatalog(config, base, value_type):
     #print(base['file_num'],'Catalog: col = %s, index = %s, val = %s'%(col, index, val))
     return val, safe
 
+def _BatchFromCatalog(config, base, value_type, delta):
+    """@brief Return the values read from an input catalog for all the objects in the current image.
+    """
+    input_cat = GetInputObj('catalog', config, base, 'Catalog')
+    # Proxies to a catalog in another process would need one call per value, so there
+    # is nothing to gain from batching.
+    if not isinstance(input_cat, galsim.Catalog):
+        return None
+    galsim.config.SetDefaultIndex(config, input_cat.getNObjects())
+
+    # Only do this if the column doesn't change, and the index is a simple Sequence.
+    from .value import _IsBatchConstant, _BatchFromSequence
+    if not _IsBatchConstant(config, ['col', 'num']):
+        return None
+    index_param = config['index']
+    if not isinstance(index_param, dict) or index_param.get('type',None) != 'Sequence':
+        return None
+    if galsim.config.GetIndex(index_param, base, is_sequence=True)[1] != 'obj_num':
+        return None
+
+    req = { 'col' : input_cat.isFits() and str or int , 'index' : int }
+    opt = { 'num' : int }
+    kwargs, safe = galsim.config.GetAllParams(config, base, req=req, opt=opt)
+    col = kwargs['col']
+    indices = _BatchFromSequence(index_param, base, int, delta)
+    if indices is None:
+        return None
+
+    # Let the regular function raise the appropriate error for any invalid col or index.
+    if min(indices) < 0 or max(indices) >= input_cat.getNObjects():
+        return None
+    if input_cat.isFits():
+        if col not in input_cat.names:
+            return None
+        col_data = input_cat.data[col]
+    else:
+        if col < 0 or col >= input_cat.ncols:
+            return None
+        col_data = input_cat.data[:, col]
+    values = [ col_data[i] for i in indices ]
+
+    if value_type is float:
+        values = [ float(v) for v in values ]
+    elif value_type is int:
+        values = [ int(v) for v in values ]
+    elif value_type is bool:
+        values = [ galsim.config.value._GetBoolValue(v) for v in values ]
+    return values
+
 def _GenerateFromDict(config, base, value_type):
     """@brief Return a value read from an input dict.
     """
@@ -465,8 +515,9 @@ def _GenerateFromDict(config, base, value_type):
     return val, safe
 
 # Register these as valid value types
-from .value import RegisterValueType
+from .value import RegisterValueType, RegisterBatchValueType
 RegisterValueType('Catalog', _GenerateFromCatalog, [ float, int, bool, str ], input_type='catalog')
+RegisterBatchValueType('Catalog', _BatchFromCatalog)
 RegisterInputType('catalog', InputLoader(galsim.Catalog, has_nobj=True))
 RegisterInputType('dict', InputLoader(galsim.Dict, file_scope=True))
 RegisterValueType('Dict', _GenerateFromDict, [ float, int, bool, str ], input_type='dict')
@@ -19,6 +19,7 @@
 import os
 import galsim
 import logging
+import numpy as np
 
 from ..utilities import ensure_dir
 
@@ -34,21 +35,70 @@ from ..utilities import ensure_dir
 valid_output_types = {}
 
 
-def BuildFiles(nfiles, config, file_num=0, logger=None, except_abort=False):
+def BuildFiles(nfiles, config, file_num=0, logger=None, except_abort=False, resume=False,
+               serve=None, authkey=None):
     """
     Build a number of output files as specified in config.
 
+    If resume is True, then a manifest of the files that have been completed is kept in the
+    file given by config['output']['manifest'] (or a name based on config['root'] if that is not
+    given).  Each entry records a hash of the config used to build the file.  Files that are
+    listed in the manifest with the same hash, and which still exist with the same size, are
+    skipped.  Any others are built, and added to the manifest as they are finished.  So if a
+    run is interrupted, running it again with resume=True will only build the files that are
+    missing or stale.  The random number generators are seeded according to the file_num,
+    image_num and obj_num, so the rebuilt files are the same as they would have been.
+
+    If serve is given, then the files are not built here.  Instead, they are handed out to
+    worker processes, possibly on other machines, which connect to the given address using
+    BuildFilesFromServer with the same config.  Each worker asks for the next file to build
+    when it finishes the previous one, so faster machines build more of the files.  If a worker
+    dies, the file it was building is given to another worker once nothing has been heard from
+    it for output.task_timeout seconds (default 60).  This function returns when all the files
+    have been built.
+
+    The connections use pickle, so anyone who can connect can run arbitrary code on the server
+    or the workers.  Therefore, a secret authentication key is required (cf. GetServeAuthKey),
+    which must be given to the workers too.  The config hash is combined with it, so workers
+    with a different config are also not allowed to connect.  The server only listens on the
+    local machine unless the address explicitly gives a host name (or 0.0.0.0 for all
+    interfaces).
+
+    If resume is used along with serve, the workers report the sizes of the files they write,
+    so the server doesn't need to be able to see them to update the manifest.  However, the
+    server checks the files listed in the manifest when it starts, so it does need to see them
+    for the resume to skip anything.  I.e. the output directory should be on a filesystem that
+    is shared between the server and the workers.
+
     @param nfiles           The number of files to build.
     @param config           A configuration dict.
     @param file_num         If given, the first file_num. [default: 0]
     @param logger           If given, a logger object to log progress. [default: None]
     @param except_abort     Whether to abort processing when a file raises an exception (True)
                             or just report errors and continue on (False). [default: False]
+    @param resume           Whether to skip files that were already built by a previous run
+                            according to the manifest file. [default: False]
+    @param serve            If given, an address (host:port) at which to serve the files to be
+                            built by other processes. [default: None]
+    @param authkey          The secret authentication key to use with serve.  [default: None,
+                            which means to use the GALSIM_SERVE_AUTHKEY environment variable]
     """
     logger = galsim.config.LoggerWrapper(logger)
     import time
     t1 = time.time()
 
+    if serve is not None:
+        authkey = GetServeAuthKey(config, authkey)
+
+    if resume:
+        # Get the hash of the config before anything starts modifying it.
+        config_hash = GetConfigHash(config)
+        manifest_name = GetManifestFileName(config, file_num, nfiles)
+        manifest = ReadManifest(manifest_name)
+        logger.warning('Resuming using manifest file %s with %d completed files',
+                       manifest_name, len(manifest))
+    nresumed = 0
+
     # The next line relies on getting errors when the rng is undefined.  However, the default
     # rng is None, which is a valid thing to construct a Deviate object from.  So for now,
     # set the rng to object() to make sure we get errors where we are expecting to.
@@ -60,7 +110,7 @@ def BuildFiles(nfiles, config, file_num=0, logger=None, except_abort=False):
     galsim.config.ProcessInput(config, logger=logger, safe_only=True)
 
     jobs = []  # Will be a list of the kwargs to use for each job
-    info = []  # Will be a list of (file_num, file_name) correspongind to each jobs.
+    info = []  # Will be a list of (file_num, file_name, file_hash) corresponding to each job.
 
     # Count from 0 to make sure image_num, etc. get counted right.  We'll start actually
     # building the files at first_file_num.
@@ -105,8 +155,18 @@ def BuildFiles(nfiles, config, file_num=0, logger=None, except_abort=False):
             # safe to do with multiple processes. (At least not without extra code in the
             # getFilename function...)
             file_name = builder.getFilename(output, config, logger)
-            jobs.append(kwargs)
-            info.append( (file_num, file_name) )
+            if resume:
+                file_hash = GetFileHash(config_hash, file_num, image_num, obj_num)
+                if CheckManifest(manifest, file_name, file_hash):
+                    logger.warning('Skipping file %d = %s because it was already built',
+                                   file_num, file_name)
+                    nresumed += 1
+                else:
+                    jobs.append(kwargs)
+                    info.append( (file_num, file_name, file_hash) )
+            else:
+                jobs.append(kwargs)
+                info.append( (file_num, file_name, None) )
 
         # nobj is a list of nobj for each image in that file.
         # So len(nobj) = nimages and sum(nobj) is the total number of objects
@@ -116,8 +176,11 @@ def BuildFiles(nfiles, config, file_num=0, logger=None, except_abort=False):
         obj_num += sum(nobj)
 
     def done_func(logger, proc, k, result, t2):
-        file_num, file_name = info[k]
-        file_name2, t = result  # This is the t for which 0 means the file was skipped.
+        file_num, file_name, file_hash = info[k]
+        file_name2, t = result[:2]  # This is the t for which 0 means the file was skipped.
+        # Workers connected to a server send back the size, since the file might not be
+        # visible here.
+        size = result[2] if len(result) > 2 else None
         if file_name2 != file_name:  # pragma: no cover  (I think this should never happen.)
             raise galsim.GalSimError("Files seem to be out of sync. %s != %s",
                                      file_name, file_name2)
@@ -125,11 +188,28 @@ def BuildFiles(nfiles, config, file_num=0, logger=None, except_abort=False):
             if proc is None: s0 = ''
             else: s0 = '%s: '%proc
             logger.warning(s0 + 'File %d = %s: time = %f sec', file_num, file_name, t)
+        if t != 0 and resume:
+            # Record this file as done.  Write the manifest right away, so it is up to date
+            # if the run is interrupted.
+            def record():
+                file_size = size if size is not None else os.path.getsize(file_name)
+                manifest[file_name] = { 'hash' : file_hash, 'size' : file_size }
+                WriteManifest(manifest_name, manifest)
+            if writer is not None:
+                # Then the file might not be written yet.  Let the writer do this when it is.
+                writer.submit(record, (), file_name)
+            else:
+                record()
 
     def except_func(logger, proc, k, e, tr):
-        file_num, file_name = info[k]
+        file_num, file_name, file_hash = info[k]
         if proc is None: s0 = ''
         else: s0 = '%s: '%proc
+        if isinstance(e, AsyncWriteError):
+            # This is from writing an earlier file, not from building this one.
+            logger.error(s0 + 'Exception caught when writing file %s', e.file_name)
+            logger.error('%s',e)
+            return
         logger.error(s0 + 'Exception caught for file %d = %s', file_num, file_name)
         if except_abort:
             logger.debug('%s',tr)
@@ -138,26 +218,64 @@ def BuildFiles(nfiles, config, file_num=0, logger=None, except_abort=False):
             logger.warning('%s',tr)
             logger.error('File %s not written! Continuing on...',file_name)
 
+    # If we are skipping some files, we might not need as many processes now.
+    nproc = min(nproc, max(len(jobs), 1))
+
+    # If requested, write the files in a background thread while the next ones are built.
+    # This is only useful if we are building the files one at a time.
+    writer = None
+    if nproc == 1 and serve is None and 'async_write' in output:
+        if galsim.config.ParseValue(output, 'async_write', config, bool)[0]:
+            if 'max_queued_writes' in output:
+                max_queue = galsim.config.ParseValue(output, 'max_queued_writes', config, int)[0]
+            else:
+                max_queue = 2
+            writer = AsyncWriter(max_queue, except_abort, logger)
+            orig_config['_output_writer'] = writer
+
     # Convert to the tasks structure we need for MultiProcess
     # Each task is a list of (job, k) tuples.  In this case, we only have one job per task.
     tasks = [ [ (job, k) ] for (k, job) in enumerate(jobs) ]
 
-    results = galsim.config.MultiProcess(nproc, orig_config, BuildFile, tasks, 'file',
-                                         logger, done_func = done_func,
-                                         except_func = except_func,
-                                         except_abort = except_abort)
+    try:
+        if serve is not None:
+            if len(tasks) > 0:
+                results = galsim.config.ServeJobs(serve, authkey, orig_config, tasks, 'file',
+                                                  logger, done_func = done_func,
+                                                  except_func = except_func,
+                                                  except_abort = except_abort,
+                                                  timeout = GetTaskTimeout(config))
+            else:
+                results = []
+        else:
+            results = galsim.config.MultiProcess(nproc, orig_config, BuildFile, tasks, 'file',
+                                                 logger, done_func = done_func,
+                                                 except_func = except_func,
+                                                 except_abort = except_abort)
+    finally:
+        if writer is not None:
+            del orig_config['_output_writer']
+            writer.close()
     t2 = time.time()
 
     if not results:  # pragma: no cover
         nfiles_written = 0
     else:
-        fnames, times = zip(*results)
+        # (Results from a server also include the file sizes.)
+        fnames, times = zip(*[ r[:2] for r in results ])
         nfiles_written = sum([ t!=0 for t in times])
+        if writer is not None:
+            nfiles_written -= len(writer.failed)
 
-    if nfiles_written == 0:  # pragma: no cover
+    if nfiles_written == 0 and nresumed > 0 and len(jobs) == 0:
+        logger.warning('All %d files were already built',nresumed)
+    elif nfiles_written == 0:  # pragma: no cover
         logger.error('No files were written.  All were either skipped or had errors.')
     else:
-        if nfiles_written > 1 and nproc != 1:
+        if serve is not None:
+            logger.warning('Total time for %d files built by the workers = %f sec',
+                           nfiles_written,t2-t1)
+        elif nfiles_written > 1 and nproc != 1:
             logger.warning('Total time for %d files with %d processes = %f sec',
                            nfiles_written,nproc,t2-t1)
         logger.warning('Done building files')
@@ -166,7 +284,80 @@ def BuildFiles(nfiles, config, file_num=0, logger=None, except_abort=False):
     #save information here in e.g. custom output types
     return orig_config
 
-output_ignore = [ 'nproc', 'skip', 'noclobber', 'retry_io' ]
+output_ignore = [ 'nproc', 'skip', 'noclobber', 'retry_io', 'manifest',
+                  'async_write', 'max_queued_writes', 'task_timeout' ]
+
+def GetTaskTimeout(config):
+    """Get the time (in seconds) after which a worker that has stopped responding is presumed
+    to have died, when serving files with BuildFiles(serve=...).
+
+    This is given by output.task_timeout, or 60 seconds if that is not given.
+
+    @param config           The configuration dict.
+
+    @returns the timeout
+    """
+    if 'output' in config and 'task_timeout' in config['output']:
+        return galsim.config.ParseValue(config['output'], 'task_timeout', config, float)[0]
+    else:
+        return 60.
+
+def GetServeAuthKey(config, authkey=None):
+    """Get the authentication key to use for BuildFiles(serve=...) and BuildFilesFromServer.
+
+    This combines the given secret key with the config hash (cf. GetConfigHash), so that only
+    processes that know the secret and have the same config can connect.  If authkey is None,
+    the secret is taken from the GALSIM_SERVE_AUTHKEY environment variable.  It is an error if
+    there is no secret.
+
+    @param config           The configuration dict.
+    @param authkey          The secret key. [default: None]
+
+    @returns the authentication key as a string
+    """
+    if authkey is None:
+        authkey = os.environ.get('GALSIM_SERVE_AUTHKEY', None)
+    if not authkey:
+        raise galsim.GalSimValueError(
+            "A secret authkey is required to serve or connect to files to be built.  "
+            "Set the GALSIM_SERVE_AUTHKEY environment variable.", authkey)
+    return authkey + ':' + GetConfigHash(config)
+
+def _BuildFileForServer(config, file_num=0, image_num=0, obj_num=0, logger=None):
+    # Build the file and also return its size, since the server may not be able to see it.
+    file_name, t = BuildFile(config, file_num, image_num, obj_num, logger)
+    size = os.path.getsize(file_name) if t != 0 else 0
+    return file_name, t, size
+
+def BuildFilesFromServer(address, config, logger=None, authkey=None):
+    """
+    Build the output files handed out by a call to BuildFiles(serve=address) in another
+    process, possibly on another machine, until there are none left.
+
+    The config dict should be the same as the one used by the server (aside from things that
+    don't affect the output files, such as nproc), and the secret authkey must be the same.
+    Otherwise, the connection is refused.
+
+    @param address          The address (host:port) of the server.
+    @param config           A configuration dict.
+    @param logger           If given, a logger object to log progress. [default: None]
+    @param authkey          The secret authentication key.  [default: None, which means to use
+                            the GALSIM_SERVE_AUTHKEY environment variable]
+
+    @returns the number of files built by this process
+    """
+    logger = galsim.config.LoggerWrapper(logger)
+    authkey = GetServeAuthKey(config, authkey)
+    timeout = GetTaskTimeout(config)
+
+    # Do the same setup as BuildFiles does before building the files.
+    config['rng'] = object()
+    galsim.config.ProcessInput(config, logger=logger, safe_only=True)
+    if 'output' not in config: config['output'] = {}
+    orig_config = galsim.config.CopyConfig(config)
+
+    return galsim.config.RunJobsFromServer(address, authkey, orig_config, _BuildFileForServer,
+                                           'file', logger, timeout=timeout)
 
 def BuildFile(config, file_num=0, image_num=0, obj_num=0, logger=None):
     """
@@ -236,7 +427,8 @@ def BuildFile(config, file_num=0, image_num=0, obj_num=0, logger=None):
     # Go back to file_num as the default index_key.
     config['index_key'] = 'file_num'
 
-    data = builder.addExtraOutputHDUs(config, data, logger)
+    with galsim.config.TimeStage(config, 'extra'):
+        data = builder.addExtraOutputHDUs(config, data, logger)
 
     if 'retry_io' in output:
         ntries = galsim.config.ParseValue(output,'retry_io',config,int)[0]
@@ -245,16 +437,175 @@ def BuildFile(config, file_num=0, image_num=0, obj_num=0, logger=None):
     else:
         ntries = 1
 
-    args = (data, file_name, output, config, logger)
-    RetryIO(builder.writeFile, args, ntries, file_name, logger)
-    logger.debug('file %d: Wrote %s to file %r',file_num,output_type,file_name)
+    writer = config.get('_output_writer', None)
+    if writer is not None:
+        # The config dict is updated for the next file while this one is waiting to be written,
+        # so give the writer its own copy.  (The copy shares config['_stats'] with the original,
+        # so the write time is still recorded.)
+        config1 = galsim.config.CopyConfig(config)
+        args = (data, file_name, config1['output'], config1, logger)
+        writer.submit(_WriteFile, (builder, args, ntries, file_name, config1, logger), file_name)
+        logger.debug('file %d: Queued %s to be written to file %r',file_num,output_type,file_name)
+    else:
+        args = (data, file_name, output, config, logger)
+        _WriteFile(builder, args, ntries, file_name, config, logger)
+        logger.debug('file %d: Wrote %s to file %r',file_num,output_type,file_name)
 
-    builder.writeExtraOutputs(config, data, logger)
+    with galsim.config.TimeStage(config, 'write_extra'):
+        builder.writeExtraOutputs(config, data, logger)
 
     t2 = time.time()
+    galsim.config.RecordTime(config, 'file', t2-t1)
 
     return file_name, t2-t1
 
+def _WriteFile(builder, args, ntries, file_name, config, logger):
+    # Write the file, recording the time taken if appropriate.
+    with galsim.config.TimeStage(config, 'write'):
+        AtomicRetryIO(builder.writeFile, args, ntries, file_name, logger)
+
+def GetConfigHash(config):
+    """Get a hash of the parts of the config dict that affect the content of the output files.
+
+    This is used for the resume option of BuildFiles to check whether a file that was built
+    previously is still valid.  Items that do not affect the output (e.g. nproc), and values
+    that are just cached during processing (e.g. current), are not included.  The GalSim
+    version is included, since changes to the code may change the output.
+
+    Values in the config dict that aren't plain numbers, strings, lists or dicts (e.g. a GSObject
+    given directly) are included via their repr.  If the repr of any of these isn't the same
+    from one run to the next (e.g. if it includes a memory address, like a function), this
+    raises a GalSimConfigError, since the hash would never match.  If such an item doesn't
+    affect the output files, its key may be added to galsim.config.hash_ignore.
+
+    @param config           The configuration dict.
+
+    @returns the hash as a hex string.
+    """
+    import json
+    import hashlib
+    clean = _CleanConfigForHash(dict( (k, config[k]) for k in galsim.config.top_level_fields
+                                      if k in config and k != 'profile' ))
+    s = galsim.__version__ + json.dumps(clean, sort_keys=True)
+    return hashlib.md5(s.encode('utf-8')).hexdigest()
+
+# Items that don't affect the content of the output files, so we don't include them in the hash.
+hash_ignore = [ 'nproc', 'noclobber', 'retry_io', 'manifest', 'shared_memory', 'sort_by_cost',
+                'async_write', 'max_queued_writes', 'batch_values', 'task_timeout',
+                'stream_stamps', 'tile_size', 'tile_margin' ]
+
+def _CleanConfigForHash(config, key=None):
+    # Convert the config dict into something json can write, which doesn't change between runs.
+    # key is the (dotted) name of the current item, for the error message.
+    import re
+    if isinstance(config, dict):
+        return dict( (k, _CleanConfigForHash(v, k if key is None else key + '.' + str(k)))
+                     for k, v in config.items()
+                     if not str(k).startswith('current') and not str(k).startswith('_')
+                     and k not in hash_ignore )
+    elif isinstance(config, (list, tuple)):
+        return [ _CleanConfigForHash(v, '%s[%d]'%(key,i)) for i, v in enumerate(config) ]
+    elif isinstance(config, (set, frozenset)):
+        return sorted( _CleanConfigForHash(v, key) for v in config )
+    elif config is None or isinstance(config, (bool, int, float, str)):
+        return config
+    elif isinstance(config, np.generic):
+        return config.item()
+    elif isinstance(config, np.ndarray):
+        return _CleanConfigForHash(config.tolist(), key)
+    else:
+        s = repr(config)
+        if re.search(r' at 0x[0-9a-fA-F]+', s):
+            raise galsim.GalSimConfigError(
+                "The config item %s = %s can't be included in the config hash, since its repr "
+                "is different in each run.  If it doesn't affect the output files, add %r "
+                "to galsim.config.hash_ignore."%(key, s, key.split('.')[-1]))
+        return s
+
+def GetFileHash(config_hash, file_num, image_num, obj_num):
+    """Get the hash for a particular file from the hash of the whole config.
+
+    @param config_hash      The hash of the config dict, from GetConfigHash.
+    @param file_num         The file_num of the file.
+    @param image_num        The image_num of the first image in the file.
+    @param obj_num          The obj_num of the first object in the file.
+
+    @returns the hash as a hex string.
+    """
+    import hashlib
+    s = '%s %d %d %d'%(config_hash, file_num, image_num, obj_num)
+    return hashlib.md5(s.encode('utf-8')).hexdigest()
+
+def GetManifestFileName(config, file_num, nfiles):
+    """Get the name of the manifest file to use for the resume option of BuildFiles.
+
+    This is config['output']['manifest'] if given.  Otherwise, it is based on config['root'].
+    If only some of the files are being built (e.g. when using njobs > 1), the range of file_num
+    values is included in the name, so that separate jobs don't write to the same manifest.
+
+    @param config           The configuration dict.
+    @param file_num         The first file_num being built.
+    @param nfiles           The number of files being built.
+
+    @returns the file name of the manifest
+    """
+    output = config.get('output',{})
+    if 'manifest' in output:
+        manifest_name = galsim.config.ParseValue(output, 'manifest', config, str)[0]
+    elif 'root' in config:
+        if file_num == 0 and nfiles == GetNFiles(config):
+            manifest_name = config['root'] + '_manifest.json'
+        else:
+            manifest_name = config['root'] + '_manifest_%d-%d.json'%(file_num, file_num+nfiles-1)
+    else:
+        raise galsim.GalSimConfigError(
+            "No output.manifest specified and unable to generate it automatically.")
+    ensure_dir(manifest_name)
+    return manifest_name
+
+def ReadManifest(manifest_name):
+    """Read the manifest of completed files.
+
+    @param manifest_name    The name of the manifest file.
+
+    @returns a dict with the information about each completed file, indexed by file name.
+             If the manifest file does not exist, this is an empty dict.
+    """
+    import json
+    if not os.path.isfile(manifest_name):
+        return {}
+    with open(manifest_name) as fin:
+        return json.load(fin)
+
+def WriteManifest(manifest_name, manifest):
+    """Write the manifest of completed files.
+
+    The file is written to a temporary file first and then moved into place, so the manifest
+    is never left incomplete if the program is killed.
+
+    @param manifest_name    The name of the manifest file.
+    @param manifest         The dict with the information about each completed file.
+    """
+    import json
+    tmp_name = manifest_name + '.tmp'
+    with open(tmp_name, 'w') as fout:
+        json.dump(manifest, fout, sort_keys=True, indent=1)
+    os.rename(tmp_name, manifest_name)
+
+def CheckManifest(manifest, file_name, file_hash):
+    """Check whether a file is listed in the manifest as having been built already with the
+    same config, and that it still exists with the same size.
+
+    @param manifest         The dict with the information about each completed file.
+    @param file_name        The name of the file to check.
+    @param file_hash        The hash of the config for this file, from GetFileHash.
+
+    @returns whether the file is done and valid.
+    """
+    entry = manifest.get(file_name, None)
+    return (entry is not None and entry['hash'] == file_hash and os.path.isfile(file_name) and
+            os.path.getsize(file_name) == entry['size'])
+
 def GetNFiles(config):
     """
     Get the number of files that will be made, based on the information in the config dict.
@@ -384,6 +735,137 @@ def RetryIO(func, args, ntries, file_name, logger):
             break
     return ret
 
+def AtomicRetryIO(func, args, ntries, file_name, logger):
+    """Call RetryIO to write a file, but write it to a temporary name in the same directory
+    and then rename it to file_name once it is complete.
+
+    The file_name in args is replaced by the temporary name, which ends with the same file name
+    (so it has the same extension).  This way, a partially written file never appears with
+    the real name, and if two processes write the same file at once (e.g. if a server gave a
+    task to another worker when the first one was slow to respond), one of the complete
+    files ends up there.
+
+    @param func             The function to call to write the file.
+    @param args             The arguments to pass to func.  One of these should be file_name.
+    @param ntries           How many times to try to write the file.
+    @param file_name        The name of the file to write.
+    @param logger           A logger object to log progress.
+    """
+    import socket
+    dir_name, base_name = os.path.split(file_name)
+    tmp_name = os.path.join(dir_name, '.tmp-%s-%d-%s'%(socket.gethostname(), os.getpid(),
+                                                       base_name))
+    args = tuple(tmp_name if isinstance(a, type(file_name)) and a == file_name else a
+                 for a in args)
+    try:
+        ret = RetryIO(func, args, ntries, file_name, logger)
+        # os.replace overwrites an existing file on all systems, but is Python 3 only.
+        getattr(os, 'replace', os.rename)(tmp_name, file_name)
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+    return ret
+
+
+class AsyncWriter(object):
+    """A background thread to write output files while the next ones are being built.
+
+    This is used by BuildFiles when output.async_write is True.  BuildFile then calls submit
+    with the function to write each file, rather than writing it directly.  Writing (and
+    especially compressing) large FITS files can take a significant fraction of the time to
+    build them, and most of this time is spent in C code that releases the GIL, so this can
+    hide most of the I/O time.
+
+    The number of files waiting to be written is limited to max_queue.  If the queue is full,
+    submit waits until there is room, so the memory used for the pending files stays bounded.
+
+    Functions are run in the order they are submitted.  If one raises an exception, the error
+    is logged, and any later functions for the same file are skipped.  If except_abort is True,
+    an AsyncWriteError, which records the name of the file that failed, is then raised by the
+    next call to submit or check (or close).
+
+    The arguments given to submit should not be modified after submitting them, since the
+    function may not have been run yet.  BuildFile gives it a copy of the config dict for this
+    reason, since the original is updated for the next file while the write is pending.
+
+    Note: Only the main output file is written in the background.  The extra outputs are
+    written synchronously, since they are finalized using the current state of the config dict.
+
+    @param max_queue        The maximum number of functions waiting to be run.
+    @param except_abort     Whether an exception should be raised in the main thread.
+    @param logger           If given, a logger object to log progress. [default: None]
+    """
+    def __init__(self, max_queue, except_abort=False, logger=None):
+        import threading
+        try:
+            import queue
+        except ImportError:  # pragma: no cover
+            import Queue as queue
+        self.queue = queue.Queue(maxsize=max(max_queue, 1))
+        self.except_abort = except_abort
+        self.logger = galsim.config.LoggerWrapper(logger)
+        self.failed = []
+        self.error = None
+        self.error_file = None
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        for func, args, file_name in iter(self.queue.get, None):
+            if file_name in self.failed:
+                continue
+            try:
+                func(*args)
+            except Exception as e:
+                import traceback
+                self.logger.error('Exception caught when writing file %s',file_name)
+                self.logger.warning('%s',traceback.format_exc())
+                self.failed.append(file_name)
+                if self.error is None:
+                    self.error = e
+                    self.error_file = file_name
+
+    def check(self):
+        """Raise an AsyncWriteError if except_abort is True and any function has failed.
+        """
+        if self.except_abort and self.error is not None:
+            e = self.error
+            self.error = None
+            raise AsyncWriteError(self.error_file, e)
+
+    def submit(self, func, args, file_name):
+        """Queue up a function to be run in the background thread.
+
+        @param func         The function to run.
+        @param args         A tuple of the arguments to pass to func.
+        @param file_name    The name of the file being written.
+        """
+        self.check()
+        self.queue.put( (func, args, file_name) )
+
+    def close(self):
+        """Wait for all the queued functions to finish, and stop the background thread.
+        """
+        self.queue.put(None)
+        self.thread.join()
+        self.check()
+
+
+class AsyncWriteError(galsim.GalSimError):
+    """An exception raised by AsyncWriter when writing a file in the background failed.
+
+    Attributes:
+
+        file_name = the name of the file that could not be written
+        error = the original exception
+    """
+    def __init__(self, file_name, error):
+        super(AsyncWriteError, self).__init__(
+            "Error writing file %s: %s: %s"%(file_name, type(error).__name__, error))
+        self.file_name = file_name
+        self.error = error
+
 
 class OutputBuilder(object):
     """A base class for building and writing the output objects.
@@ -536,6 +1018,10 @@ class OutputBuilder(object):
     def writeFile(self, data, file_name, config, base, logger):
         """Write the data to a file.
 
+        Note: If output.async_write is True, this is called from a background thread while
+        the next file is being built.  So it should not use any values in the config dict
+        that are specific to the current file.
+
         @param data             The data to write.  Usually a list of images returned by
                                 buildImages, but possibly with extra HDUs tacked onto the end
                                 from the extra output items.
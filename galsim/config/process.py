@@ -20,8 +20,11 @@ import os
 import galsim
 import logging
 import copy
+import numpy as np
 from collections import OrderedDict
 
+from .stats import TakeStats
+
 def MergeConfig(config1, config2, logger=None):
     """
     Merge config2 into config1 such that it has all the information from either config1 or
@@ -695,7 +698,8 @@ def ProcessAllTemplates(config, logger=None, base=None):
                     ProcessAllTemplates(item, logger, base)
 
 # This is the main script to process everything in the configuration dict.
-def Process(config, logger=None, njobs=1, job=1, new_params=None, except_abort=False):
+def Process(config, logger=None, njobs=1, job=1, new_params=None, except_abort=False, pool=None,
+            resume=False, stats=None, serve=None, connect=None, authkey=None):
     """
     Do all processing of the provided configuration dict.  In particular, this
     function handles processing the output field, calling other functions to
@@ -708,6 +712,12 @@ def Process(config, logger=None, njobs=1, job=1, new_params=None, except_abort=F
     the total amount of work into njobs and only do one of those jobs here.  To do this,
     set njobs to be the number of jobs total and job to be which job should be done here.
 
+    Alternatively, the files can be handed out dynamically to processes on multiple machines.
+    Run one process with serve=host:port, and any number of processes (on any machines that
+    can reach that address) with connect=host:port.  The first one determines which files need
+    to be built and hands them out to the others one at a time as they finish the previous one.
+    They all need to use the same secret authkey.  See BuildFiles for details.
+
     @param config           The configuration dict.
     @param logger           If given, a logger object to log progress. [default: None]
     @param njobs            The total number of jobs to split the work into. [default: 1]
@@ -716,6 +726,20 @@ def Process(config, logger=None, njobs=1, job=1, new_params=None, except_abort=F
                             dict after any template loading (if any). [default: None]
     @param except_abort     Whether to abort processing when a file raises an exception (True)
                             or just report errors and continue on (False). [default: False]
+    @param pool             If given, a WorkerPool to use for any multiprocessing, rather than
+                            starting new processes each time.  [default: None]
+    @param resume           Whether to skip any files that were already built by a previous run
+                            with the same config.  See BuildFiles for details. [default: False]
+    @param stats            If given, a ConfigStats instance in which to record the time taken
+                            by each stage of the processing.  [default: None]
+    @param serve            If given, an address (host:port) at which to serve the files to
+                            other processes, rather than building them here. [default: None]
+    @param connect          If given, the address (host:port) of a process that is serving the
+                            files to be built, rather than deciding here which files to build.
+                            [default: None]
+    @param authkey          The secret authentication key to use with serve or connect.
+                            [default: None, which means to use the GALSIM_SERVE_AUTHKEY
+                            environment variable]
     """
     logger = LoggerWrapper(logger)
     import pprint
@@ -767,15 +791,864 @@ def Process(config, logger=None, njobs=1, job=1, new_params=None, except_abort=F
     if nfiles == 1:
         except_abort = True  # Mostly just so the message reads better.
 
+    if pool is not None:
+        config['_worker_pool'] = pool
+    if stats is not None:
+        config['_stats'] = stats
+
     #BuildFiles returns the config dictionary, which can includes stuff added
     #by custom output types during the run.
-    config_out = galsim.config.BuildFiles(nfiles, config, file_num=start, logger=logger,
-                                         except_abort=except_abort)
+    try:
+        if connect is not None:
+            galsim.config.BuildFilesFromServer(connect, config, logger=logger, authkey=authkey)
+            config_out = config
+        else:
+            config_out = galsim.config.BuildFiles(nfiles, config, file_num=start, logger=logger,
+                                                  except_abort=except_abort, resume=resume,
+                                                  serve=serve, authkey=authkey)
+    finally:
+        # Don't leave the pool or stats in the config dict.  The caller is responsible for them.
+        config.pop('_worker_pool', None)
+        config.pop('_stats', None)
+    config_out.pop('_worker_pool', None)
+    config_out.pop('_stats', None)
     #Return config_out in case useful
     return config_out
 
+
+class SharedImage(object):
+    """A lightweight, picklable stand-in for an Image whose pixel values have been copied into
+    a multiprocessing.shared_memory block.
+
+    This is used by MultiProcess when use_shared_memory=True to avoid sending large image arrays
+    back to the main process through the results pipe.  Only the name of the shared memory block
+    and a few descriptive attributes (shape, dtype, bounds, wcs) are pickled.  The main process
+    then calls getImage() to reconstruct the Image and release the shared memory block.
+
+    @param image        The Image to put into shared memory.
+    """
+    def __init__(self, image):
+        from multiprocessing import shared_memory
+        array = image.array
+        shm = shared_memory.SharedMemory(create=True, size=array.nbytes)
+        shared_array = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+        shared_array[:,:] = array
+        # Need to remove the reference to the buffer before we can close our handle on it.
+        del shared_array
+        shm.close()
+
+        self.name = shm.name
+        self.shape = array.shape
+        self.dtype = array.dtype
+        self.bounds = image.bounds
+        self.wcs = image.wcs
+        self.isconst = image.isconst
+
+    def getImage(self):
+        """Reconstruct the Image from the shared memory block, and release the block.
+
+        @returns the reconstructed Image.
+        """
+        from multiprocessing import shared_memory
+        shm = shared_memory.SharedMemory(name=self.name)
+        try:
+            array = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+        if self.isconst:
+            array.flags.writeable = False
+        return galsim._Image(array, self.bounds, self.wcs)
+
+def ShareImages(result):
+    """Replace any Images in a job result by SharedImage descriptors.
+
+    The result may be an Image, or a tuple or list possibly containing Images (e.g. the
+    (image, current_var) tuple returned by BuildStamp).  Anything else is returned unchanged.
+
+    @param result           The return value of a job function.
+
+    @returns the equivalent result with Images replaced by SharedImage instances.
+    """
+    if isinstance(result, galsim.Image):
+        # Can't make a shared memory block of size 0, so just send these normally.
+        return SharedImage(result) if result.array.nbytes > 0 else result
+    elif isinstance(result, tuple):
+        return tuple(ShareImages(r) for r in result)
+    elif isinstance(result, list):
+        return [ ShareImages(r) for r in result ]
+    else:
+        return result
+
+def UnshareImages(result):
+    """The reverse of ShareImages.  Replace any SharedImage descriptors by the real Images.
+
+    @param result           The result returned from ShareImages.
+
+    @returns the equivalent result with SharedImage instances replaced by regular Images.
+    """
+    if isinstance(result, SharedImage):
+        return result.getImage()
+    elif isinstance(result, tuple):
+        return tuple(UnshareImages(r) for r in result)
+    elif isinstance(result, list):
+        return [ UnshareImages(r) for r in result ]
+    else:
+        return result
+
+def GetSharedMemory(config, nproc, logger=None):
+    """Check whether config['image']['shared_memory'] requests that results from worker
+    processes be sent back through shared memory rather than pickled through a pipe.
+
+    This is only relevant if nproc > 1.  It also requires the multiprocessing.shared_memory
+    module, which is only available in Python 3.8+.  If this is not available, a warning is
+    emitted, and the normal transport is used.
+
+    @param config           The configuration dict.
+    @param nproc            The number of processes that will be used.
+    @param logger           If given, a logger object to log progress. [default: None]
+
+    @returns whether to use shared memory for the results.
+    """
+    logger = LoggerWrapper(logger)
+    if nproc <= 1 or 'image' not in config or 'shared_memory' not in config['image']:
+        return False
+    use_shared_memory = galsim.config.ParseValue(config['image'], 'shared_memory', config, bool)[0]
+    if use_shared_memory:
+        try:
+            from multiprocessing import shared_memory
+        except ImportError:  # pragma: no cover
+            logger.warning("image.shared_memory requires Python 3.8 or later.  "
+                           "Using the normal pipe to send results.")
+            use_shared_memory = False
+    return use_shared_memory
+
+
+def _PoolWorker(j, task_queue, results_queue, logger):
+    """The function run by each of the processes in a WorkerPool.
+
+    This is a module-level function (rather than being defined inside WorkerPool.start), so
+    that it can be pickled when the processes are started with the spawn method.
+
+    Each worker has its own task_queue, which is used to send it both the new config dicts
+    (as ('SETUP', data) messages) and the tasks to do.  It sends back each job's result on the
+    shared results_queue, followed by a done marker at the end of each task, so the pool knows
+    it is ready for more.
+
+    @param j                The index of this worker in the pool.
+    @param task_queue       The queue from which to get the messages for this worker.
+    @param results_queue    The queue on which to put the results.
+    @param logger           A logger (proxy) to use for logging progress.
+    """
+    import time
+    import traceback
+    import pickle
+    from multiprocessing import current_process
+
+    proc = current_process().name
+    logger = LoggerWrapper(logger)
+    pr = None
+    for msg, data in iter(task_queue.get, 'STOP'):
+        if msg == 'SETUP':
+            job_func, item, use_shared_memory, config_pickle = data
+            config = pickle.loads(config_pickle)
+            ImportModules(config)
+            # Start with empty stats, so we only send back what was done here.
+            TakeStats(config)
+            if pr is None and 'profile' in config and config['profile']:
+                import cProfile
+                pr = cProfile.Profile()
+                pr.enable()
+            logger.debug('%s: Received new config for building %ss',proc,item)
+            continue
+        task = data
+        try:
+            logger.debug('%s: Received job to do %d %ss, starting with %s',
+                         proc,len(task),item,task[0][1])
+            for kwargs, k in task:
+                t1 = time.time()
+                kwargs['config'] = config
+                kwargs['logger'] = logger
+                result = job_func(**kwargs)
+                t2 = time.time()
+                if use_shared_memory:
+                    result = ShareImages(result)
+                results_queue.put( (result, k, t2-t1, proc, TakeStats(config)) )
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            tr = traceback.format_exc()
+            logger.debug('%s: Caught exception: %s\n%s',proc,str(e),tr)
+            results_queue.put( (e, k, tr, proc, TakeStats(config)) )
+        results_queue.put( (None, None, None, j, None) )
+    logger.debug('%s: Received STOP', proc)
+    if pr is not None:
+        import pstats
+        from io import StringIO
+        pr.disable()
+        s = StringIO()
+        ps = pstats.Stats(pr, stream=s).sort_stats('time').reverse_order()
+        ps.print_stats()
+        logger.error("*** Start profile for %s ***\n%s\n*** End profile for %s ***",
+                     proc,s.getvalue(),proc)
+
+class WorkerPool(object):
+    """A pool of worker processes that persists across multiple calls to MultiProcess.
+
+    Normally, each call to MultiProcess starts up nproc new processes and shuts them down again
+    at the end.  When image.nproc > 1, this happens once per file in BuildImages or once per
+    image in BuildStamps, which for runs with many files or images can be a significant overhead.
+    A WorkerPool instead keeps its processes (and the logger proxy they use) alive, and
+    MultiProcess will just send the new jobs to the existing processes.
+
+    To use it, pass the pool to Process (or set config['_worker_pool'] = pool directly).
+    The workers are only started the first time they are needed, so it is cheap to make a pool
+    even if it may not end up being used.  It should be closed when you are done with it, which
+    is most easily done by using it as a context manager:
+
+        >>> with galsim.config.WorkerPool() as pool:
+        ...     for config in all_config:
+        ...         galsim.config.Process(config, logger, pool=pool)
+
+    Since the workers are persistent, the config dict for each call to MultiProcess needs to be
+    pickled and sent to them, rather than being inherited by the fork.  Each worker only receives
+    this once per call (not once per job), and only if it is given at least one job to do.
+    If the config dict is not picklable, MultiProcess falls back to the normal behavior of
+    starting new processes.  The input objects are not pickled with it.  When nproc > 1 these are
+    held by the input manager in the main process, and the workers just get proxies to them, so
+    every call to an input object from a worker goes back to the main process.  The pool only
+    saves the cost of starting the processes.  It doesn't keep any inputs loaded in the workers,
+    and the inputs are still loaded for each config as usual.
+
+    Jobs are handed out one task at a time to whichever worker is free (with up to two tasks
+    outstanding per worker to keep them busy), so the load is balanced dynamically.
+
+    If a later call to MultiProcess asks for a different number of processes than are running
+    (and the pool was constructed with nproc=None), the workers are restarted with the new number.
+    If the config dict is the same as the one the workers already have (e.g. for several calls
+    that only differ in the jobs being done), it is not sent to them again.
+
+    @param nproc        The number of worker processes to use.  [default: None, which means to
+                        use the nproc given by each call to MultiProcess that uses the pool]
+    @param logger       If given, a logger object for the workers to log progress.
+                        [default: None]
+    """
+    def __init__(self, nproc=None, logger=None):
+        self.nproc = nproc
+        self._nproc = nproc
+        self.logger = LoggerWrapper(logger)
+        self.p_list = []
+        self.gen = 0
+        self._last_setup = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def started(self):
+        """Whether the worker processes are currently running.
+        """
+        return len(self.p_list) > 0
+
+    def start(self, nproc=None, logger=None):
+        """Start the worker processes.
+
+        This is normally called automatically by the first call to run() that needs them.
+
+        @param nproc        The number of processes to start if the pool was constructed with
+                            nproc=None.  If the workers are already running with a different
+                            number of processes, they are restarted.  [default: None]
+        @param logger       The logger for the workers to use if the pool was constructed with
+                            logger=None.  [default: None]
+        """
+        from multiprocessing import Process, Queue
+
+        if self._nproc is not None:
+            nproc = self._nproc
+        if self.started:
+            if nproc is None or nproc == self.nproc: return
+            self.logger.info("Restarting worker pool to change from %d to %d processes",
+                             self.nproc, nproc)
+            self.close()
+        if nproc is None or nproc < 1:
+            raise galsim.GalSimValueError("Invalid nproc for WorkerPool", nproc)
+        self.nproc = nproc
+        if not self.logger:
+            self.logger = LoggerWrapper(logger)
+
+        # Each worker has its own queue, which is used to send it both the new config dicts
+        # and the tasks to do.  See _PoolWorker for details.
+        try:
+            # See the comment in MultiProcess about why this is necessary for shared memory.
+            from multiprocessing import resource_tracker
+            resource_tracker.ensure_running()
+        except ImportError:  # pragma: no cover
+            pass
+
+        self.logger.info("Starting worker pool with %d processes",self.nproc)
+        self.logger_proxy = GetLoggerProxy(self.logger.logger)
+        self.results_queue = Queue()
+        self.task_queues = [ Queue() for j in range(self.nproc) ]
+        self.worker_gen = [ 0 ] * self.nproc
+        for j in range(self.nproc):
+            p = Process(target=_PoolWorker,
+                        args=(j, self.task_queues[j], self.results_queue, self.logger_proxy),
+                        name='Process-%d'%(j+1))
+            p.start()
+            self.p_list.append(p)
+
+    def close(self):
+        """Stop the worker processes.
+
+        The pool may still be used after this.  The processes will be restarted if necessary.
+        """
+        if not self.started: return
+        for q in self.task_queues:
+            q.put('STOP')
+        for p in self.p_list:
+            p.join()
+        self._reset()
+
+    def terminate(self):
+        """Terminate the worker processes without waiting for them to finish their current jobs.
+        """
+        for p in self.p_list:
+            p.terminate()
+        self._reset()
+
+    def _reset(self):
+        for q in self.task_queues:
+            q.close()
+        self.results_queue.close()
+        self.p_list = []
+        self.task_queues = []
+        self.logger_proxy = None
+        self._last_setup = None
+
+    def run(self, nproc, config, job_func, tasks, item, logger=None,
+            done_func=None, except_func=None, except_abort=True, use_shared_memory=False,
+            keep_results=True):
+        """Run the given tasks using the worker processes.
+
+        The parameters have the same meaning as for MultiProcess.  This is normally called by
+        MultiProcess, rather than directly.
+
+        @returns a list of the outputs from job_func for each job, or None if the config could
+                 not be sent to the workers.  (There may be Nones in the list for any jobs that
+                 failed if except_abort=False.)
+        """
+        import pickle
+        from collections import deque
+        logger = LoggerWrapper(logger)
+        if self._nproc is not None:
+            nproc = self._nproc
+
+        # Make the version of the config that the workers will use.  The managers can't be
+        # pickled, but the workers only need the proxy objects that they made, not the managers.
+        config1 = CopyConfig(config)
+        config1.pop('_worker_pool', None)
+        config1.pop('output_manager', None)
+        config1.pop('_output_writer', None)
+        # The globals for Eval items include modules, so they can't be pickled.  The workers
+        # remake them when needed.
+        config1.pop('eval_gdict', None)
+        config1['current_nproc'] = nproc
+        try:
+            config_pickle = pickle.dumps(config1, pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug("Unable to pickle the config dict for the worker pool: %s",e)
+            logger.debug("Starting new processes instead.")
+            return None
+
+        self.start(nproc, logger)
+        logger.warning("Using %d processes for %s processing",self.nproc,item)
+
+        # Only send the config to the workers again if it is different from the last one.
+        setup = ('SETUP', (job_func, item, use_shared_memory, config_pickle))
+        if setup != self._last_setup:
+            self.gen += 1
+            self._last_setup = setup
+        pending = deque(tasks)
+        nrunning = [ 0 ] * self.nproc
+
+        def dispatch(j):
+            if not pending: return
+            if self.worker_gen[j] != self.gen:
+                self.task_queues[j].put(setup)
+                self.worker_gen[j] = self.gen
+            self.task_queues[j].put( ('TASK', pending.popleft()) )
+            nrunning[j] += 1
+
+        # Temporarily mark that we are multiprocessing, so we know not to start another
+        # round of multiprocessing later.
+        config['current_nproc'] = nproc
+
+        njobs = sum([len(task) for task in tasks])
+        results = [ None for k in range(njobs) ]
+        raise_error = None
+        try:
+            # Give each worker up to 2 tasks to start, so it always has the next one ready.
+            for n in range(2):
+                for j in range(self.nproc):
+                    dispatch(j)
+
+            while sum(nrunning) > 0:
+                res, k, t, proc, job_stats = self.results_queue.get()
+                _MergeStats(config, job_stats)
+                if k is None:
+                    # The worker (whose index is in the proc slot) finished a task.
+                    nrunning[proc] -= 1
+                    dispatch(proc)
+                elif isinstance(res, Exception):
+                    if except_func is not None:  # pragma: no branch
+                        except_func(logger, proc, k, res, t)
+                    if except_abort or isinstance(res, KeyboardInterrupt):
+                        raise_error = res
+                        break
+                else:
+                    if use_shared_memory:
+                        res = UnshareImages(res)
+                    if done_func is not None:  # pragma: no branch
+                        done_func(logger, proc, k, res, t)
+                    if keep_results:
+                        results[k] = res
+
+        except Exception as e:  # pragma: no cover
+            import traceback
+            logger.error("Caught a fatal exception during multiprocessing:\n%r",e)
+            logger.error("%s",traceback.format_exc())
+            raise_error = e
+
+        finally:
+            del config['current_nproc']
+
+        if raise_error is not None:
+            # We can't reuse the workers, since they may still have work queued up.
+            self.terminate()
+            raise raise_error
+
+        return results
+
+
+class _JobQueue(object):
+    """The queue of tasks that is served to other processes by ServeJobs.
+
+    This lives in the server process of a _JobManager, which handles each connection in its own
+    thread, so everything is done with the lock held.  Tasks given out to a worker from which
+    nothing has been heard for more than timeout seconds are put back at the front of the queue
+    for another worker to do.
+    """
+    def __init__(self, tasks, timeout):
+        import threading
+        from collections import deque
+        self.tasks = tasks
+        self.timeout = timeout
+        self.pending = deque(range(len(tasks)))
+        self.running = {}       # task index -> worker name
+        self.finished = set()
+        self.last_seen = {}     # worker name -> time of last contact
+        self.events = []        # things for ServeJobs to process, in order
+        self.lock = threading.Lock()
+
+    def _requeue(self):
+        import time
+        now = time.time()
+        for i, worker in list(self.running.items()):
+            if now - self.last_seen.get(worker, now) > self.timeout:
+                del self.running[i]
+                self.pending.appendleft(i)
+                self.events.append( ('requeue', i, worker, None) )
+
+    def getTask(self, worker):
+        """Get the next task for the given worker.
+
+        @returns (i, task), or (-1, None) if there are no tasks available right now, but
+                 some may become available if other workers fail, or None if all the tasks
+                 are finished.
+        """
+        import time
+        with self.lock:
+            self.last_seen[worker] = time.time()
+            self._requeue()
+            if len(self.finished) == len(self.tasks):
+                return None
+            elif self.pending:
+                i = self.pending.popleft()
+                self.running[i] = worker
+                return i, self.tasks[i]
+            else:
+                return -1, None
+
+    def heartbeat(self, worker):
+        """Note that the given worker is still alive.
+        """
+        import time
+        with self.lock:
+            self.last_seen[worker] = time.time()
+
+    def finish(self, worker, i, results, stats):
+        """Report the results of task i.
+        """
+        import time
+        with self.lock:
+            self.last_seen[worker] = time.time()
+            # If this task was given to another worker after this one was thought to have died,
+            # only use the first results we get for it.
+            if i in self.finished: return
+            self.finished.add(i)
+            self.running.pop(i, None)
+            if i in self.pending:
+                self.pending.remove(i)
+            self.events.append( ('finish', i, worker, (results, stats)) )
+
+    def takeEvents(self):
+        """Take the list of events that have happened since the last call.
+        """
+        with self.lock:
+            self._requeue()
+            events = self.events
+            self.events = []
+            return events
+
+from multiprocessing.managers import BaseManager
+class _JobManager(BaseManager): pass
+
+# The _JobQueue in the server process of a _JobManager, which is made by its initializer.
+_job_queue = None
+
+def _InitJobQueue(tasks, timeout):
+    global _job_queue
+    _job_queue = _JobQueue(tasks, timeout)
+
+def _GetJobQueue():
+    return _job_queue
+
+_JobManager.register('get_job_queue', callable=_GetJobQueue)
+
+def ParseAddress(address):
+    """Convert an address string of the form host:port into a tuple (host, port).
+
+    The host may be omitted (e.g. ':5000' or '5000'), in which case it is 127.0.0.1, so a
+    server only accepts connections from the local machine.  To accept connections from other
+    machines, give the host name of the server (or 0.0.0.0 for all interfaces).
+
+    @param address          The address string.
+
+    @returns the tuple (host, port)
+    """
+    if ':' in address:
+        host, port = address.rsplit(':',1)
+    else:
+        host, port = '', address
+    if host == '':
+        host = '127.0.0.1'
+    try:
+        port = int(port)
+    except ValueError:
+        raise galsim.GalSimValueError("Invalid address.  Should be host:port", address)
+    return host, port
+
+def ServeJobs(address, authkey, config, tasks, item, logger=None, done_func=None,
+              except_func=None, except_abort=True, timeout=60.):
+    """Serve a list of tasks to worker processes (possibly on other machines), which connect
+    to the given address and run them using RunJobsFromServer.
+
+    This is an alternative to MultiProcess, which instead runs the tasks in processes on the
+    local machine.  The meaning of the tasks, item, done_func, except_func, and except_abort
+    parameters, and the return value, are the same as for MultiProcess.
+
+    The tasks are handed out one at a time to whichever worker asks for the next one, so faster
+    machines naturally do more of them.  The workers send a heartbeat every timeout/4 seconds
+    while they are working.  If nothing is heard from a worker for more than timeout seconds,
+    it is presumed to have died, and its current task is given to the next worker that asks.
+
+    This function returns once all the tasks are finished.  There need to be some workers
+    running for that to happen, but they may be started before or after this is called.
+
+    @param address          The address to serve on, as a string host:port.  (cf. ParseAddress)
+    @param authkey          The authentication key (a string) that workers need to connect.
+                            The connections use pickle, so this should include a secret that
+                            only the workers know.  (cf. galsim.config.GetServeAuthKey)
+    @param config           The configuration dict.
+    @param tasks            A list of tasks to run.  Each task is a list of jobs, each of which
+                            is a tuple (kwargs, k).
+    @param item             A string indicating what is being worked on.
+    @param logger           If given, a logger object to log progress. [default: None]
+    @param done_func        A function to run upon completion of each job.  [default: None]
+    @param except_func      A function to run if an exception is encountered.  [default: None]
+    @param except_abort     Whether an exception should abort the rest of the processing.
+                            [default: True]
+    @param timeout          How long (in seconds) to wait to hear from a worker before deciding
+                            that it died. [default: 60]
+
+    @returns a list of the outputs from the job function for each job
+    """
+    import time
+    logger = LoggerWrapper(logger)
+    manager = _JobManager(address=ParseAddress(address), authkey=authkey.encode('utf-8'))
+    manager.start(_InitJobQueue, (tasks, timeout))
+    queue = manager.get_job_queue()
+    logger.warning("Serving %d %s tasks at %s:%d", len(tasks), item, *manager.address)
+
+    njobs = sum([len(task) for task in tasks])
+    results = [ None for k in range(njobs) ]
+    raise_error = None
+    nfinished = 0
+    try:
+        while nfinished < len(tasks) and raise_error is None:
+            events = queue.takeEvents()
+            if len(events) == 0:
+                time.sleep(0.1)
+            for kind, i, worker, data in events:
+                if kind == 'requeue':
+                    logger.warning("No response from %s.  Giving %s task %d to another worker.",
+                                   worker, item, i)
+                    continue
+                nfinished += 1
+                job_results, job_stats = data
+                _MergeStats(config, job_stats)
+                for res, k, t, is_error in job_results:
+                    if is_error:
+                        # Then res is really the exception and t is the traceback.
+                        if except_func is not None:  # pragma: no branch
+                            except_func(logger, worker, k, res, t)
+                        if except_abort or isinstance(res, KeyboardInterrupt):
+                            raise_error = res
+                            break
+                    else:
+                        if done_func is not None:  # pragma: no branch
+                            done_func(logger, worker, k, res, t)
+                        results[k] = res
+                if raise_error is not None:
+                    break
+    finally:
+        # Any workers still asking for tasks will find that the server is gone and stop.
+        manager.shutdown()
+
+    if raise_error is not None:
+        raise raise_error
+
+    # If there are any failures, then there will still be some Nones in the results list.
+    # Remove them.
+    results = [ r for r in results if r is not None ]
+    return results
+
+def _ConnectToJobQueue(host, port, authkey, timeout):
+    # Connect to the _JobQueue served at (host, port), trying for up to timeout seconds.
+    import time
+    manager = _JobManager(address=(host, port), authkey=authkey)
+    t1 = time.time()
+    while True:
+        try:
+            manager.connect()
+            return manager.get_job_queue()
+        except (IOError, OSError) as e:
+            if time.time() - t1 > timeout:
+                raise galsim.GalSimError("Unable to connect to %s:%d. %r"%(host, port, e))
+            time.sleep(0.5)
+
+def _SendHeartbeats(host, port, authkey, name, timeout, stop, errors, ppid):
+    """Send heartbeats every timeout/4 seconds to the _JobQueue served at (host, port), using
+    its own connection, until the stop event is set or the process ppid exits.
+
+    RunJobsFromServer runs this in a separate process, so the heartbeats aren't held up by long
+    calls in the worker that don't release the GIL.  If anything goes wrong, the error message
+    is put on the errors queue (so the worker can stop) and this returns.
+    """
+    import os
+    try:
+        queue = _ConnectToJobQueue(host, port, authkey, timeout)
+        while not stop.wait(timeout/4.):
+            if os.getppid() != ppid:
+                # The worker has died, so the server should give its task to another worker.
+                return
+            queue.heartbeat(name)
+    except Exception as e:
+        errors.put(str(e) or repr(e))
+
+def RunJobsFromServer(address, authkey, config, job_func, item, logger=None, timeout=60.):
+    """Run the tasks served by ServeJobs at the given address, until there are none left.
+
+    The tasks are run one at a time in this process, calling job_func(config=config,
+    logger=logger, **kwargs) for each job.  The results, and any exceptions, are sent back to
+    the server.  If the server isn't running yet, this keeps trying to connect for up to
+    timeout seconds.
+
+    The heartbeats are sent by a separate process, so they keep going during long calls that
+    hold the GIL.  If that process loses its connection to the server, the server will soon
+    give the current task to another worker, so this stops without finishing it.
+
+    @param address          The address of the server, as a string host:port.
+    @param authkey          The authentication key (a string), which must match the one
+                            used by the server.
+    @param config           The configuration dict.
+    @param job_func         The function to run for each job.
+    @param item             A string indicating what is being worked on.
+    @param logger           If given, a logger object to log progress. [default: None]
+    @param timeout          The timeout used by the server.  Heartbeats are sent every timeout/4
+                            seconds while working on a task.  [default: 60]
+
+    @returns the number of tasks done by this worker.
+    """
+    import os
+    import socket
+    import time
+    import threading
+    import traceback
+    from multiprocessing import Process, Queue, Event
+    logger = LoggerWrapper(logger)
+    host, port = ParseAddress(address)
+    authkey = authkey.encode('utf-8')
+    name = '%s-%d'%(socket.gethostname(), os.getpid())
+
+    queue = _ConnectToJobQueue(host, port, authkey, timeout)
+    logger.warning("%s: Connected to %s:%d to get %s tasks", name, host, port, item)
+
+    # Send heartbeats in the background, using a separate connection.
+    stop = Event()
+    errors = Queue()
+    args = (host, port, authkey, name, timeout, stop, errors, os.getpid())
+    try:
+        heartbeat = Process(target=_SendHeartbeats, args=args)
+        heartbeat.daemon = True
+        heartbeat.start()
+    except (AssertionError, OSError) as e:
+        # e.g. a daemon process can't start any processes of its own.  Then use a thread.
+        logger.info('%s: Unable to start a process to send heartbeats (%s).  Using a thread.',
+                    name, e)
+        heartbeat = threading.Thread(target=_SendHeartbeats, args=args)
+        heartbeat.daemon = True
+        heartbeat.start()
+
+    lost = []
+    def lost_connection():
+        # Check whether the heartbeat process has lost its connection to the server.
+        if not lost and not errors.empty():
+            lost.append(errors.get())
+        return len(lost) > 0
+
+    def stop_working():
+        logger.error('%s: Lost the connection for sending heartbeats to %s:%d: %s',
+                     name, host, port, lost[0])
+        logger.error('%s: Stopping, since the server will give this task to another worker.',
+                     name)
+
+    # Start with empty stats, so we only send back what was done here.
+    TakeStats(config)
+
+    ntasks = 0
+    try:
+        while True:
+            try:
+                if lost_connection():
+                    # If the server has just shut down, this is normal, and this raises.
+                    queue.heartbeat(name)
+                    stop_working()
+                    break
+                next_task = queue.getTask(name)
+            except (EOFError, IOError, OSError):
+                # The server has shut down, so everything is done.
+                break
+            if next_task is None:
+                break
+            i, task = next_task
+            if task is None:
+                # Nothing to do right now, but another worker might fail.
+                time.sleep(min(1., timeout/4.))
+                continue
+
+            logger.debug('%s: Received job to do %d %ss, starting with %s',
+                         name,len(task),item,task[0][1])
+            job_results = []
+            abandoned = False
+            for kwargs, k in task:
+                if lost_connection():
+                    # Don't keep going with a task that will be given to another worker.
+                    stop_working()
+                    abandoned = True
+                    break
+                t1 = time.time()
+                try:
+                    kwargs['config'] = config
+                    kwargs['logger'] = logger
+                    result = job_func(**kwargs)
+                    job_results.append( (result, k, time.time()-t1, False) )
+                except KeyboardInterrupt:
+                    raise
+                except Exception as e:
+                    tr = traceback.format_exc()
+                    logger.debug('%s: Caught exception: %s\n%s',name,str(e),tr)
+                    job_results.append( (e, k, tr, True) )
+                    break
+            if abandoned:
+                break
+            try:
+                queue.finish(name, i, job_results, TakeStats(config))
+            except (EOFError, IOError, OSError):  # pragma: no cover
+                break
+            ntasks += 1
+    finally:
+        stop.set()
+        heartbeat.join()
+
+    logger.warning("%s: Finished %d %s tasks", name, ntasks, item)
+    return ntasks
+
+
+def ScheduleTasks(tasks, costs, nproc):
+    """Reorder and group a list of tasks according to their estimated costs.
+
+    The tasks are sorted so the most expensive ones are done first.  This way, a few very
+    expensive jobs near the end of the list don't leave most of the processes idle while one
+    process finishes them.
+
+    The cheap tasks at the end of the sorted list are also grouped together into larger chunks,
+    so there is less communication overhead for them.  Each chunk is made to have a total cost of
+    about 1/(2 nproc) of the cost remaining at that point, so the chunks get smaller as the work
+    runs down (i.e. guided self-scheduling).  Jobs that were in the same task remain in the same
+    task, in the same order, so stamp types that need jobs to be done sequentially by the same
+    process (e.g. Ring) are unaffected.
+
+    The costs only need to be correct in a relative sense.  The results are unchanged by
+    the scheduling, since each job's index k is kept with it, and the random number generators
+    are seeded according to obj_num, not the order in which the jobs are done.
+
+    @param tasks            A list of tasks.  Each task is a list of jobs, each of which is
+                            a tuple (kwargs, k).
+    @param costs            A list of the estimated cost of each job, indexed by k.
+    @param nproc            How many processes will be used.
+
+    @returns the new list of tasks
+    """
+    task_costs = [ sum([costs[k] for kwargs, k in task]) for task in tasks ]
+    # Note: sorted is stable, so equal cost tasks stay in their original order.
+    order = sorted(range(len(tasks)), key=lambda i: -task_costs[i])
+
+    remaining = float(sum(task_costs))
+    new_tasks = []
+    chunk = []
+    chunk_cost = 0.
+    for i in order:
+        if not chunk:
+            target = remaining / (2*nproc)
+        chunk.extend(tasks[i])
+        chunk_cost += task_costs[i]
+        remaining -= task_costs[i]
+        if chunk_cost >= target:
+            new_tasks.append(chunk)
+            chunk = []
+            chunk_cost = 0.
+    if chunk:
+        new_tasks.append(chunk)
+    return new_tasks
+
+
 def MultiProcess(nproc, config, job_func, tasks, item, logger=None,
-                 done_func=None, except_func=None, except_abort=True):
+                 done_func=None, except_func=None, except_abort=True, use_shared_memory=False,
+                 costs=None, keep_results=True):
     """A helper function for performing a task using multiprocessing.
 
     A note about the nomenclature here.  We use the term "job" to mean the job of building a single
@@ -809,6 +1682,18 @@ def MultiProcess(nproc, config, job_func, tasks, item, logger=None,
     @param except_abort     Whether an exception should abort the rest of the processing.
                             If False, then the returned results list will not include anything
                             for the jobs that failed.  [default: True]
+    @param use_shared_memory  Whether to send any Images in the job results back to the main
+                            process via shared memory blocks rather than pickling them through
+                            the results queue.  Only relevant if nproc > 1.  [default: False]
+    @param costs            If given, a list of the estimated relative cost of each job (indexed
+                            by k).  The tasks are then reordered and grouped using
+                            ScheduleTasks so the most expensive jobs are done first.  Since this
+                            may group several tasks together, it should only be used with
+                            except_abort=True.  Only relevant if nproc > 1.  [default: None]
+    @param keep_results     Whether to keep the outputs of the jobs to return at the end.  If
+                            the done_func does everything that is needed with each result, this
+                            may be set to False, so each one can be freed as soon as it has been
+                            handled.  In this case, the returned list is empty.  [default: True]
 
     @returns a list of the outputs from job_func for each job
     """
@@ -833,6 +1718,9 @@ def MultiProcess(nproc, config, job_func, tasks, item, logger=None,
         # Logger before calling the functions.
         logger = LoggerWrapper(logger)
 
+        # Start with empty stats, so we only send back what was done here.
+        TakeStats(config)
+
         if 'profile' in config and config['profile']:
             import cProfile, pstats, io
             pr = cProfile.Profile()
@@ -850,13 +1738,15 @@ def MultiProcess(nproc, config, job_func, tasks, item, logger=None,
                     kwargs['logger'] = logger
                     result = job_func(**kwargs)
                     t2 = time.time()
-                    results_queue.put( (result, k, t2-t1, proc) )
+                    if use_shared_memory:
+                        result = ShareImages(result)
+                    results_queue.put( (result, k, t2-t1, proc, TakeStats(config)) )
             except KeyboardInterrupt:
                 raise
             except Exception as e:
                 tr = traceback.format_exc()
                 logger.debug('%s: Caught exception: %s\n%s',proc,str(e),tr)
-                results_queue.put( (e, k, tr, proc) )
+                results_queue.put( (e, k, tr, proc, TakeStats(config)) )
         logger.debug('%s: Received STOP', proc)
         if pr is not None:
             pr.disable()
@@ -875,7 +1765,24 @@ def MultiProcess(nproc, config, job_func, tasks, item, logger=None,
 
     njobs = sum([len(task) for task in tasks])
 
-    if nproc > 1:
+    if nproc > 1 and costs is not None:
+        tasks = ScheduleTasks(tasks, costs, nproc)
+        logger.debug("Scheduled %d %ss by estimated cost into %d tasks",njobs,item,len(tasks))
+
+    # If there is a persistent WorkerPool available, use that rather than starting new processes.
+    results = None
+    if nproc > 1 and config.get('_worker_pool', None) is not None:
+        results = config['_worker_pool'].run(nproc, config, job_func, tasks, item, logger,
+                                             done_func=done_func, except_func=except_func,
+                                             except_abort=except_abort,
+                                             use_shared_memory=use_shared_memory,
+                                             keep_results=keep_results)
+
+    if results is not None:
+        # The WorkerPool already did everything.
+        pass
+
+    elif nproc > 1:
         logger.warning("Using %d processes for %s processing",nproc,item)
 
         from multiprocessing import Process, Queue, current_process
@@ -893,6 +1800,15 @@ def MultiProcess(nproc, config, job_func, tasks, item, logger=None,
         if 'profile' in config and config['profile']:
             logger.info("Starting separate profiling for each of the %d processes.",nproc)
 
+        if use_shared_memory:
+            # Make sure the resource tracker is running in this process before starting the
+            # workers, so they all share it.  Otherwise, each worker starts its own tracker,
+            # which would destroy the shared memory blocks when the worker exits, possibly
+            # before we have read them here.
+            from multiprocessing import resource_tracker
+            resource_tracker.ensure_running()
+            logger.debug("Using shared memory to send %s images to the main process",item)
+
         # The logger is not picklable, so we need to make a proxy for it so all the
         # processes can emit logging information safely.
         logger_proxy = GetLoggerProxy(logger)
@@ -922,7 +1838,8 @@ def MultiProcess(nproc, config, job_func, tasks, item, logger=None,
             # This loop is happening while the other processes are still working on their tasks.
             results = [ None for k in range(njobs) ]
             for kk in range(njobs):
-                res, k, t, proc = results_queue.get()
+                res, k, t, proc, job_stats = results_queue.get()
+                _MergeStats(config, job_stats)
                 if isinstance(res, Exception):
                     # res is really the exception, e
                     # t is really the traceback
@@ -936,9 +1853,12 @@ def MultiProcess(nproc, config, job_func, tasks, item, logger=None,
                         break
                 else:
                     # The normal case
+                    if use_shared_memory:
+                        res = UnshareImages(res)
                     if done_func is not None:  # pragma: no branch
                         done_func(logger, proc, k, res, t)
-                    results[k] = res
+                    if keep_results:
+                        results[k] = res
 
         except Exception as e:  # pragma: no cover
             logger.error("Caught a fatal exception during multiprocessing:\n%r",e)
@@ -980,7 +1900,8 @@ def MultiProcess(nproc, config, job_func, tasks, item, logger=None,
                     t2 = time.time()
                     if done_func is not None:  # pragma: no branch
                         done_func(logger, None, k, result, t2-t1)
-                    results[k] = result
+                    if keep_results:
+                        results[k] = result
                 except KeyboardInterrupt:
                     raise
                 except Exception as e:
@@ -997,6 +1918,12 @@ def MultiProcess(nproc, config, job_func, tasks, item, logger=None,
     return results
 
 
+def _MergeStats(config, job_stats):
+    # Add the stats sent back from a worker process to the ones in the main process.
+    if job_stats is not None and config.get('_stats', None) is not None:
+        config['_stats'].merge(job_stats)
+
+
 valid_index_keys = [ 'obj_num_in_file', 'obj_num', 'image_num', 'file_num' ]
 
 def GetIndex(config, base, is_sequence=False):
@@ -20,6 +20,7 @@ import galsim
 import logging
 import numpy as np
 import math
+import time
 
 # This file handles the building of postage stamps to place onto a larger image.
 # There is only one type of stamp currently, called Basic, which builds a galaxy from
@@ -36,7 +37,7 @@ valid_stamp_types = {}
 
 
 def BuildStamps(nobjects, config, obj_num=0,
-                xsize=0, ysize=0, do_noise=True, logger=None):
+                xsize=0, ysize=0, do_noise=True, logger=None, stamp_func=None):
     """
     Build a number of postage stamp images as specified by the config dict.
 
@@ -54,8 +55,21 @@ def BuildStamps(nobjects, config, obj_num=0,
     @param do_noise         Whether to add noise to the image (according to config['noise']).
                             [default: True]
     @param logger           If given, a logger object to log progress. [default: None]
-
-    @returns the tuple (images, current_vars).  Both are lists.
+    @param stamp_func       If given, a function to call with each stamp as soon as it has been
+                            built, rather than keeping all of them to return at the end.  It will
+                            be called as
+                                stamp_func(k, image, current_var)
+                            where k is the index of the object (starting at 0 for obj_num).  It
+                            is not called for objects that are skipped.  The stamps are given to
+                            it in order of k, even if they are built by multiple processes, so
+                            the results don't depend on which process finishes first.  (Stamps
+                            that finish before the ones before them are held until then.  So
+                            image.sort_by_cost is ignored in this case, since building the
+                            stamps out of order would mean holding most of them.)
+                            [default: None]
+
+    @returns the tuple (images, current_vars).  Both are lists.  If stamp_func is given, these
+             lists are empty.
     """
     logger = galsim.config.LoggerWrapper(logger)
     logger.debug('image %d: BuildStamps nobjects = %d: obj = %d',
@@ -68,6 +82,7 @@ def BuildStamps(nobjects, config, obj_num=0,
         nproc = galsim.config.UpdateNProc(nproc, nobjects, config, logger)
     else:
         nproc = 1
+    use_shared_memory = galsim.config.GetSharedMemory(config, nproc, logger)
 
     jobs = []
     for k in range(nobjects):
@@ -79,7 +94,38 @@ def BuildStamps(nobjects, config, obj_num=0,
         }
         jobs.append(kwargs)
 
+    # If requested, generate values that are simple functions of obj_num (e.g. Sequence or
+    # Catalog) for all the objects at once, rather than separately for each object.
+    if (nobjects > 1 and 'image' in config and 'batch_values' in config['image'] and
+            galsim.config.ParseValue(config['image'], 'batch_values', config, bool)[0]):
+        config['_batch_obj_range'] = (obj_num, obj_num + nobjects)
+
+    # If requested, estimate the cost of each stamp, so the most expensive ones can be done first.
+    # But not when the stamps are given to stamp_func, since they have to be given in order.
+    # Then the stamps built out of order would all be held in pending below until the cheap
+    # ones before them were done, so they would all be in memory at once.
+    if stamp_func is None:
+        costs, cost_units, cost_keys = EstimateStampCosts(config, jobs, nproc, logger)
+    else:
+        if (nproc > 1 and 'image' in config and 'sort_by_cost' in config['image'] and
+                galsim.config.ParseValue(config['image'], 'sort_by_cost', config, bool)[0]):
+            logger.warning('Ignoring image.sort_by_cost, since the stamps are being added to '
+                           'the image as soon as they are built.')
+        costs, cost_units, cost_keys = None, None, None
+
+    # The number of stamps given to stamp_func.  (A list, so done_func can update it.)
+    nbuilt = [0]
+    # The results that are waiting for earlier ones to finish before going to stamp_func,
+    # and the next k to give to stamp_func.
+    pending = {}
+    next_k = [0]
+
     def done_func(logger, proc, k, result, t):
+        if cost_keys is not None and cost_keys[k] is not None and cost_units[k] > 0:
+            # Record how long this kind of stamp actually took per unit of estimated cost.
+            scale = config['_stamp_cost_scale'].setdefault(cost_keys[k], [0., 0.])
+            scale[0] += t
+            scale[1] += cost_units[k]
         if result[0] is not None:
             # Note: numpy shape is y,x
             image = result[0]
@@ -88,6 +134,14 @@ def BuildStamps(nobjects, config, obj_num=0,
             else: s0 = '%s: '%proc
             obj_num = jobs[k]['obj_num']
             logger.info(s0 + 'Stamp %d: size = %d x %d, time = %f sec', obj_num, xs, ys, t)
+        if stamp_func is not None:
+            pending[k] = result
+            while next_k[0] in pending:
+                image, current_var = pending.pop(next_k[0])
+                if image is not None:
+                    nbuilt[0] += 1
+                    stamp_func(next_k[0], image, current_var)
+                next_k[0] += 1
 
     def except_func(logger, proc, k, e, tr):
         if proc is None: s0 = ''
@@ -101,14 +155,25 @@ def BuildStamps(nobjects, config, obj_num=0,
     # Each task is a list of (job, k) tuples.
     tasks = MakeStampTasks(config, jobs, logger)
 
-    results = galsim.config.MultiProcess(nproc, config, BuildStamp, tasks, 'stamp', logger,
-                                         done_func = done_func,
-                                         except_func = except_func)
-
-    images, current_vars = zip(*results)
+    try:
+        results = galsim.config.MultiProcess(nproc, config, BuildStamp, tasks, 'stamp', logger,
+                                             done_func = done_func,
+                                             except_func = except_func,
+                                             use_shared_memory = use_shared_memory,
+                                             costs = costs,
+                                             keep_results = stamp_func is None)
+    finally:
+        config.pop('_batch_obj_range', None)
+
+    if stamp_func is None:
+        images, current_vars = zip(*results)
+        nbuilt[0] = sum(im is not None for im in images)
+    else:
+        images, current_vars = [], []
 
     logger.debug('image %d: Done making stamps',config.get('image_num',0))
-    if all(im is None for im in images):
+    # (When drawing one tile of a Scattered image, it's normal for there to be nothing on it.)
+    if nbuilt[0] == 0 and '_tile_bounds' not in config:
         logger.error('No stamps were built.  All objects were skipped.')
 
     return images, current_vars
@@ -262,7 +327,7 @@ def SetupConfigStampSize(config, xsize, ysize, image_pos, world_pos, logger=None
 stamp_ignore = ['xsize', 'ysize', 'size', 'image_pos', 'world_pos',
                 'offset', 'retry_failures', 'gsparams', 'draw_method',
                 'n_photons', 'max_extra_noise', 'poisson_flux',
-                'skip', 'reject', 'min_flux_frac', 'min_snr', 'max_snr']
+                'skip', 'reject', 'min_flux_frac', 'min_snr', 'max_snr', 'cost']
 
 valid_draw_methods = ('auto', 'fft', 'phot', 'real_space', 'no_pixel', 'sb')
 
@@ -281,6 +346,11 @@ def BuildStamp(config, obj_num=0, xsize=0, ysize=0, do_noise=True, logger=None):
     @returns the tuple (image, current_var)
     """
     logger = galsim.config.LoggerWrapper(logger)
+    # When drawing one tile of a Scattered image, the objects that are known not to overlap the
+    # tile are skipped without doing anything else.
+    if '_tile_obj_nums' in config and obj_num not in config['_tile_obj_nums']:
+        return None, 0.
+    t1 = time.time()
     SetupConfigObjNum(config, obj_num, logger)
 
     stamp = config['stamp']
@@ -315,8 +385,9 @@ def BuildStamp(config, obj_num=0, xsize=0, ysize=0, do_noise=True, logger=None):
         try:
 
             # Do the necessary initial setup for this stamp type.
-            xsize, ysize, image_pos, world_pos = builder.setup(
-                    stamp, config, xsize, ysize, stamp_ignore, logger)
+            with galsim.config.TimeStage(config, 'setup'):
+                xsize, ysize, image_pos, world_pos = builder.setup(
+                        stamp, config, xsize, ysize, stamp_ignore, logger)
 
             # Save these values for possible use in Evals or other modules
             SetupConfigStampSize(config, xsize, ysize, image_pos, world_pos, logger)
@@ -353,9 +424,10 @@ def BuildStamp(config, obj_num=0, xsize=0, ysize=0, do_noise=True, logger=None):
 
             if not skip:
                 try :
-                    psf = galsim.config.BuildGSObject(config, 'psf', gsparams=gsparams,
-                                                      logger=logger)[0]
-                    prof = builder.buildProfile(stamp, config, psf, gsparams, logger)
+                    with galsim.config.TimeStage(config, 'build_profile'):
+                        psf = galsim.config.BuildGSObject(config, 'psf', gsparams=gsparams,
+                                                          logger=logger)[0]
+                        prof = builder.buildProfile(stamp, config, psf, gsparams, logger)
                 except galsim.config.gsobject.SkipThisObject as e:
                     logger.debug('obj %d: Caught SkipThisObject: e = %s',obj_num,e.msg)
                     logger.info('Skipping object %d',obj_num)
@@ -378,7 +450,10 @@ def BuildStamp(config, obj_num=0, xsize=0, ysize=0, do_noise=True, logger=None):
                 skip = builder.updateSkip(prof, im, method, offset, stamp, config, logger)
 
             if not skip:
-                im = builder.draw(prof, im, method, offset, stamp, config, logger)
+                with galsim.config.TimeStage(config, 'draw_' + method):
+                    im = builder.draw(prof, im, method, offset, stamp, config, logger)
+                if '_stats' in config:
+                    _RecordDrawSizes(prof, im, method, stamp, config)
 
                 scale_factor = builder.getSNRScale(im, stamp, config, logger)
                 im, prof = builder.applySNRScale(im, prof, scale_factor, method, logger)
@@ -410,7 +485,8 @@ def BuildStamp(config, obj_num=0, xsize=0, ysize=0, do_noise=True, logger=None):
                                 "Rejected an object %d times. If this is expected, "
                                 "you should specify a larger stamp.retry_failures."%(ntries))
 
-            galsim.config.ProcessExtraOutputsForStamp(config, skip, logger)
+            with galsim.config.TimeStage(config, 'extra'):
+                galsim.config.ProcessExtraOutputsForStamp(config, skip, logger)
 
             # We always need to do the whiten step here in the stamp processing
             if not skip:
@@ -423,8 +499,10 @@ def BuildStamp(config, obj_num=0, xsize=0, ysize=0, do_noise=True, logger=None):
 
             # Sometimes, depending on the image type, we go on to do the rest of the noise as well.
             if do_noise and not skip:
-                im, current_var = builder.addNoise(stamp,config,im,skip,current_var,logger)
+                with galsim.config.TimeStage(config, 'noise'):
+                    im, current_var = builder.addNoise(stamp,config,im,skip,current_var,logger)
 
+            galsim.config.RecordTime(config, 'stamp', time.time() - t1)
             return im, current_var
 
         except KeyboardInterrupt:
@@ -449,6 +527,28 @@ def BuildStamp(config, obj_num=0, xsize=0, ysize=0, do_noise=True, logger=None):
                 builder.reset(config, logger)
                 continue
 
+def _RecordDrawSizes(prof, image, method, config, base):
+    """Record the sizes relevant to the drawing of a stamp in base['_stats'].
+    """
+    if image is None: return
+    galsim.config.RecordSize(base, 'stamp_size', image.array.size)
+    if prof is None: return
+    if method == 'phot':
+        if 'n_photons' in config:
+            n_photons = galsim.config.ParseValue(config, 'n_photons', base, int)[0]
+        else:
+            # This is the number shot for profiles that are positive everywhere.  (Others
+            # need a few more, but finding out exactly how many would use the rng.)
+            n_photons = int(abs(prof.flux) + 0.5)
+        galsim.config.RecordSize(base, 'n_photons', n_photons)
+    elif method in ('fft', 'auto') and image.wcs is not None and image.wcs.isPixelScale():
+        # This is the real-space size that drawFFT uses.
+        b = image.bounds
+        N = max(prof.getGoodImageSize(image.scale),
+                max(abs(b.xmin), abs(b.xmax), abs(b.ymin), abs(b.ymax)) * 2)
+        N = max(galsim.Image.good_fft_size(N), prof.gsparams.minimum_fft_size)
+        galsim.config.RecordSize(base, 'fft_size', N)
+
 def MakeStampTasks(config, jobs, logger):
     """Turn a list of jobs into a list of tasks.
 
@@ -472,6 +572,106 @@ def MakeStampTasks(config, jobs, logger):
     stamp_type = stamp.get('type', 'Basic')
     return valid_stamp_types[stamp_type].makeTasks(stamp, config, jobs, logger)
 
+# The maximum number of profiles that EstimateStampCosts will build in the main process in order
+# to estimate the costs of the stamps.  If more stamps than this need their profile built to
+# estimate their cost, the stamps are just built in order.
+max_cost_builds = 50
+
+def EstimateStampCosts(config, jobs, nproc, logger):
+    """Estimate the relative cost of building each stamp in a list of jobs.
+
+    This is only done if nproc > 1 and config['image']['sort_by_cost'] is True (and BuildStamps
+    isn't given a stamp_func, which needs the stamps in order).  Then the
+    estimated costs are passed to MultiProcess, which starts with the most expensive stamps,
+    rather than doing them in order.
+
+    The estimates are made by the stamp builder's getCost method, using a copy of the config
+    dict, so the processing of the real config is not affected.  This first tries to estimate
+    the costs from values that are cheap to evaluate (e.g. stamp.cost, n_photons, the flux or the
+    stamp size).  Only if that isn't possible is the profile built in the main process, and
+    this is only done if there are at most galsim.config.stamp.max_cost_builds such stamps, so
+    the serial work here stays small compared to the parallel work.  For large numbers of
+    auto-sized stamps, setting stamp.cost to an expression of cheap values is recommended.
+
+    The raw estimates from getCost are in different units for different kinds of stamps (e.g.
+    photons for draw_method='phot' vs. pixels for 'fft').  So they are converted to seconds
+    using the measured times of stamps of each kind that have already been built.  These are
+    accumulated in config['_stamp_cost_scale'] across calls to BuildStamps.  Estimates in
+    different units are never compared directly: stamps of a kind that has not been timed yet
+    are given the mean cost of the timed ones, and if there are several kinds and none of them
+    have been timed yet, the stamps are built in order (but the times are recorded, so the next
+    call can use them).
+
+    @param config           The configuration dict.
+    @param jobs             A list of jobs.  Each job in the list is a dict of parameters that
+                            includes 'obj_num', 'xsize' and 'ysize'.
+    @param nproc            How many processes will be used.
+    @param logger           If given, a logger object to log progress.
+
+    @returns costs, units, keys, where costs is the list of the estimated costs (in seconds,
+             once there are timings available), and units and keys are the raw estimates
+             returned by getCost.  If the costs are not being estimated, these are all None.
+             If the raw estimates are available, but can't be compared, costs is None.
+    """
+    if (nproc <= 1 or 'image' not in config or 'sort_by_cost' not in config['image'] or
+            not galsim.config.ParseValue(config['image'], 'sort_by_cost', config, bool)[0]):
+        return None, None, None
+
+    config1 = galsim.config.CopyConfig(config)
+    # Don't include the profiles built here in the stats.
+    config1.pop('_stats', None)
+
+    def get_cost(job, build_profile):
+        obj_num = job['obj_num']
+        SetupConfigObjNum(config1, obj_num, logger)
+        stamp = config1['stamp']
+        builder = valid_stamp_types[stamp['type']]
+        galsim.config.SetupConfigRNG(config1, seed_offset=1, logger=logger)
+        return builder.getCost(stamp, config1, job['xsize'], job['ysize'], logger,
+                               build_profile=build_profile)
+
+    units = [ None ] * len(jobs)
+    keys = [ None ] * len(jobs)
+    try:
+        # First get all the estimates that don't require building the profile.
+        for k, job in enumerate(jobs):
+            units[k], keys[k] = get_cost(job, False)
+        need_build = [ k for k in range(len(jobs)) if units[k] is None ]
+        if len(need_build) > max_cost_builds:
+            logger.debug('%d stamps would need to build their profile to estimate the cost.',
+                         len(need_build))
+            logger.debug('Building stamps in order.')
+            return None, None, None
+        for k in need_build:
+            units[k], keys[k] = get_cost(jobs[k], True)
+    except Exception as e:
+        # Don't let this stop anything.  The exception will be raised properly when the
+        # object is actually built if it is a real problem.
+        logger.debug('Unable to estimate cost: %s',e)
+        logger.debug('Building stamps in order.')
+        return None, None, None
+
+    scales = config.setdefault('_stamp_cost_scale', {})
+    def calibrated(key):
+        return key in scales and scales[key][1] > 0
+    present = set([ key for key in keys if key is not None ])
+    uncalibrated = [ key for key in present if not calibrated(key) ]
+    if len(uncalibrated) == len(present):
+        if len(present) > 1:
+            logger.debug('Stamp costs in different units have not been timed yet.')
+            logger.debug('Building stamps in order.')
+            return None, units, keys
+        # Only one kind of estimate, so the raw units are fine.
+        costs = list(units)
+    else:
+        costs = [ cost * scales[key][0] / scales[key][1] if calibrated(key) else None
+                  for cost, key in zip(units, keys) ]
+        known = [ c for c in costs if c is not None ]
+        default_cost = np.mean(known) if known else 0.
+        costs = [ c if c is not None else default_cost for c in costs ]
+    logger.debug('Estimated costs for %d stamps: total = %f',len(costs),sum(costs))
+    return costs, units, keys
+
 
 def DrawBasic(prof, image, method, offset, config, base, logger, **kwargs):
     """The basic implementation of the draw command
@@ -733,28 +933,19 @@ class StampBuilder(object):
         @returns whether to skip drawing this object.
         """
         if isinstance(prof,galsim.GSObject) and base.get('current_image',None) is not None:
-            if image is None:
-                prof = base['wcs'].toImage(prof, image_pos=base['image_pos'])
-                N = prof.getGoodImageSize(1.)
-                N += 2 + int(np.abs(offset.x) + np.abs(offset.y))
-                bounds = galsim._BoundsI(1,N,1,N)
-            else:
-                bounds = image.bounds
-
-            # Set the origin appropriately
-            stamp_center = base['stamp_center']
-            if stamp_center:
-                bounds = bounds.shift(stamp_center - bounds.center)
-            else:
-                bounds = bounds.shift(base.get('image_origin',galsim.PositionI(1,1)) -
-                                      galsim.PositionI(bounds.xmin, bounds.ymin))
-
+            bounds = GetStampBounds(prof, image, offset, base)
             overlap = bounds & base['current_image'].bounds
             if not overlap.isDefined():
                 logger.info('obj %d: skip drawing object because its image will be entirely off '
                             'the main image.', base['obj_num'])
                 return True
 
+            # When a Scattered image is drawn in tiles, only draw the objects on the current tile.
+            if '_tile_bounds' in base and not (overlap & base['_tile_bounds']).isDefined():
+                logger.debug('obj %d: skip drawing object because its image will be entirely off '
+                             'the current tile.', base['obj_num'])
+                return True
+
         return False
 
     def draw(self, prof, image, method, offset, config, base, logger):
@@ -994,6 +1185,116 @@ class StampBuilder(object):
         """
         return [ [(job, k)] for k, job in enumerate(jobs) ]
 
+    def getCost(self, config, base, xsize, ysize, logger, build_profile=True):
+        """Estimate the relative cost of building the stamp for the current object.
+
+        This is used when image.sort_by_cost is True to decide which stamps to build first.
+        The base dict has been set up for the current obj_num (including the rng), but it is
+        a copy of the real config dict, so it is fine to modify it here.
+
+        If config['cost'] is given, this value is used directly.  Otherwise, the cost is
+        estimated from the draw method:
+
+            - For 'phot', the number of photons (n_photons if given, else the flux).
+            - For 'fft' and 'auto', the number of pixels in the FFT, times log2 of that.
+            - For the others, the number of pixels in the stamp.
+
+        The flux is taken from gal.flux if given, and the number of pixels from the stamp size if
+        known.  Otherwise these require building the profile, which is only done if
+        build_profile is True.
+
+        The returned key identifies the units of the cost, so estimates of different kinds can
+        be calibrated separately using their measured times.  It may be None if the cost is 0.
+
+        @param config           The configuration dict for the stamp field.
+        @param base             The base configuration dict.
+        @param xsize            The xsize of the stamp to build (if known).
+        @param ysize            The ysize of the stamp to build (if known).
+        @param logger           If given, a logger object to log progress.
+        @param build_profile    Whether it is ok to build the profile if necessary.
+                                [default: True]
+
+        @returns cost, key, or None, None if the profile would be needed, but build_profile
+                 is False.
+        """
+        if 'cost' in config:
+            return galsim.config.ParseValue(config, 'cost', base, float)[0], 'cost'
+
+        xsize, ysize, image_pos, world_pos = self.setup(
+                config, base, xsize, ysize, stamp_ignore, logger)
+        SetupConfigStampSize(base, xsize, ysize, image_pos, world_pos, logger)
+
+        if 'skip' in config and galsim.config.ParseValue(config, 'skip', base, bool)[0]:
+            return 0., None
+
+        method = galsim.config.ParseValue(config, 'draw_method', base, str)[0]
+        if method == 'phot':
+            if 'n_photons' in config:
+                return galsim.config.ParseValue(config, 'n_photons', base, float)[0], method
+            gal = base.get('gal', None)
+            if isinstance(gal, dict) and 'flux' in gal:
+                return abs(galsim.config.ParseValue(gal, 'flux', base, float)[0]), method
+        elif xsize and ysize:
+            npix = float(xsize * ysize)
+            if method in ('fft', 'auto'):
+                # This isn't quite the same as the FFT size used below, so use a different key.
+                return npix * max(math.log(npix,2), 1.), method + '_stamp'
+            else:
+                return npix, method
+
+        if not build_profile:
+            return None, None
+
+        gsparams = {}
+        if 'gsparams' in config:
+            gsparams = galsim.config.UpdateGSParams(gsparams, config['gsparams'], base)
+        try:
+            psf = galsim.config.BuildGSObject(base, 'psf', gsparams=gsparams, logger=logger)[0]
+            prof = self.buildProfile(config, base, psf, gsparams, logger)
+        except galsim.config.gsobject.SkipThisObject:
+            return 0., None
+        if prof is None:
+            return 0., None
+
+        if method == 'phot':
+            return abs(prof.flux), method
+        elif method in ('fft', 'auto'):
+            nk = 2. * prof.maxk / prof.stepk
+            return nk**2 * max(math.log(nk,2), 1.), method
+        else:
+            scale = base['wcs'].maxLinearScale(base['image_pos'])
+            npix = prof.getGoodImageSize(scale)**2
+            return float(npix), method
+
+
+def GetStampBounds(prof, image, offset, base):
+    """Get the bounds that the stamp for the current object will have once it is drawn.
+
+    @param prof         The profile to draw.
+    @param image        The image onto which to draw the profile (which may be None).
+    @param offset       The offset to apply when drawing.
+    @param base         The base configuration dict.
+
+    @returns the bounds of the stamp
+    """
+    if image is None:
+        prof = base['wcs'].toImage(prof, image_pos=base['image_pos'])
+        N = prof.getGoodImageSize(1.)
+        N += 2 + int(np.abs(offset.x) + np.abs(offset.y))
+        bounds = galsim._BoundsI(1,N,1,N)
+    else:
+        bounds = image.bounds
+    return _ShiftStampBounds(bounds, base)
+
+def _ShiftStampBounds(bounds, base):
+    # Set the origin of the stamp bounds appropriately for the current object.
+    stamp_center = base['stamp_center']
+    if stamp_center:
+        return bounds.shift(stamp_center - bounds.center)
+    else:
+        return bounds.shift(base.get('image_origin',galsim.PositionI(1,1)) -
+                            galsim.PositionI(bounds.xmin, bounds.ymin))
+
 
 def RegisterStampType(stamp_type, builder):
     """Register an image type for use by the config apparatus.
@@ -0,0 +1,285 @@
+# Copyright (c) 2012-2018 by the GalSim developers team on GitHub
+# https://github.com/GalSim-developers
+#
+# This file is part of GalSim: The modular galaxy image simulation toolkit.
+# https://github.com/GalSim-developers/GalSim
+#
+# GalSim is free software: redistribution and use in source and binary forms,
+# with or without modification, are permitted provided that the following
+# conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions, and the disclaimer given in the accompanying LICENSE
+#    file.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions, and the disclaimer given in the documentation
+#    and/or other materials provided with the distribution.
+#
+from __future__ import print_function
+
+import time
+import threading
+
+# This file handles the optional timing and counters for the different stages of the config
+# processing.  If config['_stats'] is a ConfigStats instance, then the various stages record
+# how long they took into it.  Otherwise nothing is recorded.
+
+class ConfigStats(object):
+    """A record of the time spent in each stage of processing a config dict, along with
+    the sizes of some things that tend to determine how long they take.
+
+    To use this, pass it as the stats parameter of galsim.config.Process (or set
+    config['_stats'] to it directly before calling e.g. BuildFiles).  The `galsim` executable
+    does this when run with the -s option.
+
+    The stages that are timed are:
+
+        input           Loading each input object.
+        file            Building each file (including writing it).
+        image           Building each image (including its stamps).
+        stamp           Building each stamp (including all of the below).
+        setup           The setup of each stamp, which parses its size, position, etc.
+        build_profile   Building the profile (PSF and galaxy) for each stamp.
+        draw_{method}   Drawing each stamp, with the draw method used given by {method}.
+        noise           Adding noise to each stamp or image.
+        extra           Processing any extra outputs for each stamp or image.
+        write           Writing each output file.
+        write_extra     Writing the extra output files for each output file.
+
+    Note that these are nested.  e.g. the time for file includes the time for each image in it.
+
+    The sizes that are recorded are:
+
+        stamp_size      The number of pixels in each stamp.
+        fft_size        The size of the (square) image used for the FFT when drawing with
+                        method=fft or auto.
+        n_photons       The number of photons shot when drawing with method=phot.  (If
+                        n_photons is not given explicitly, this is the flux, which is the
+                        number shot for profiles that are positive everywhere.)
+
+    Each of these is a sum over all the processes used.  When stamps, images, or files are built
+    in other processes, the records from each job are sent back with its result and added to
+    the ones here.
+    """
+    def __init__(self):
+        # Both of these are dicts of name -> [count, total, min, max]
+        self.times = {}
+        self.sizes = {}
+        self._lock = threading.Lock()
+
+    def addTime(self, stage, t):
+        """Record that an instance of the given stage took time t (in seconds).
+        """
+        self._add(self.times, stage, t)
+
+    def addSize(self, name, value):
+        """Record a value for the given size.
+        """
+        self._add(self.sizes, name, value)
+
+    def _add(self, d, name, value):
+        # The output writer may record the write times from another thread.
+        with self._lock:
+            if name in d:
+                entry = d[name]
+                entry[0] += 1
+                entry[1] += value
+                if value < entry[2]: entry[2] = value
+                if value > entry[3]: entry[3] = value
+            else:
+                d[name] = [1, value, value, value]
+
+    def merge(self, other):
+        """Add the records from another ConfigStats instance to this one.
+        """
+        with self._lock:
+            for d, d2 in ((self.times, other.times), (self.sizes, other.sizes)):
+                for name, entry2 in d2.items():
+                    if name in d:
+                        entry = d[name]
+                        entry[0] += entry2[0]
+                        entry[1] += entry2[1]
+                        entry[2] = min(entry[2], entry2[2])
+                        entry[3] = max(entry[3], entry2[3])
+                    else:
+                        d[name] = list(entry2)
+
+    def clear(self):
+        """Remove all the records.
+        """
+        with self._lock:
+            self.times.clear()
+            self.sizes.clear()
+
+    def __getstate__(self):
+        d = self.__dict__.copy()
+        del d['_lock']
+        return d
+
+    def __setstate__(self, d):
+        self.__dict__ = d
+        self._lock = threading.Lock()
+
+    def getReport(self):
+        """Get a list of the records, suitable for writing to a file.
+
+        Each item in the list is a dict with the following keys:
+
+            kind        Either 'time' or 'size'.
+            name        The name of the stage or size.
+            count       How many times it was recorded.
+            total       The total of all the recorded values.
+            mean        The mean value.
+            min         The minimum value.
+            max         The maximum value.
+            per_object  The total divided by the number of stamps built.
+            per_image   The total divided by the number of images built.
+            per_file    The total divided by the number of files built.
+
+        The last three are None if there were no such items built (or recorded).
+        """
+        nobj = self.times.get('stamp', [0])[0]
+        nimages = self.times.get('image', [0])[0]
+        nfiles = self.times.get('file', [0])[0]
+        def per(total, n):
+            return total / n if n > 0 else None
+
+        report = []
+        for kind, d in (('time', self.times), ('size', self.sizes)):
+            for name in sorted(d):
+                count, total, vmin, vmax = d[name]
+                report.append({
+                    'kind' : kind,
+                    'name' : name,
+                    'count' : count,
+                    'total' : total,
+                    'mean' : float(total) / count,
+                    'min' : vmin,
+                    'max' : vmax,
+                    'per_object' : per(float(total), nobj),
+                    'per_image' : per(float(total), nimages),
+                    'per_file' : per(float(total), nfiles),
+                })
+        return report
+
+    def write(self, file_name, file_type=None):
+        """Write the report to a file, either as json or csv.
+
+        @param file_name        The name of the file to write.
+        @param file_type        Either 'json' or 'csv'.  [default: None, which means to use
+                                csv if the file name ends in '.csv' and json otherwise.]
+        """
+        report = self.getReport()
+        if file_type is None:
+            file_type = 'csv' if file_name.lower().endswith('.csv') else 'json'
+        if file_type == 'json':
+            import json
+            with open(file_name, 'w') as fout:
+                json.dump(report, fout, indent=2)
+        elif file_type == 'csv':
+            with open(file_name, 'w') as fout:
+                fout.write(','.join(report_keys) + '\n')
+                for row in report:
+                    fout.write(','.join(['' if row[k] is None else str(row[k])
+                                         for k in report_keys]) + '\n')
+        else:
+            import galsim
+            raise galsim.GalSimValueError("Invalid file_type for ConfigStats.write", file_type,
+                                          ('json', 'csv'))
+
+    def summary(self):
+        """Get a string with a summary of the times, suitable for logging.
+        """
+        lines = [ '%-16s %8s %12s %12s %12s'%('stage','count','total','mean','per_object') ]
+        for row in self.getReport():
+            if row['kind'] != 'time': continue
+            per_object = '' if row['per_object'] is None else '%.6f'%row['per_object']
+            lines.append('%-16s %8d %12.3f %12.6f %12s'%(
+                         row['name'], row['count'], row['total'], row['mean'], per_object))
+        return '\n'.join(lines)
+
+report_keys = [ 'kind', 'name', 'count', 'total', 'mean', 'min', 'max',
+                'per_object', 'per_image', 'per_file' ]
+
+
+class _StageTimer(object):
+    # A context manager that records the time taken for a stage.
+    def __init__(self, stats, stage):
+        self.stats = stats
+        self.stage = stage
+
+    def __enter__(self):
+        self.t1 = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.stats.addTime(self.stage, time.time() - self.t1)
+
+
+class _NoTimer(object):
+    # A context manager that does nothing, for when there is no ConfigStats to record into.
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+_no_timer = _NoTimer()
+
+def TimeStage(config, stage):
+    """Get a context manager that records the time taken for a stage in config['_stats'].
+
+    If there is no config['_stats'], this does nothing.  Typical usage:
+
+        with galsim.config.TimeStage(config, 'noise'):
+            AddNoise(...)
+
+    @param config           The configuration dict.
+    @param stage            The name of the stage.
+
+    @returns a context manager
+    """
+    stats = config.get('_stats', None)
+    if stats is None:
+        return _no_timer
+    else:
+        return _StageTimer(stats, stage)
+
+def RecordTime(config, stage, t):
+    """Record the time taken for a stage in config['_stats'] if there is one.
+
+    @param config           The configuration dict.
+    @param stage            The name of the stage.
+    @param t                The time taken (in seconds).
+    """
+    stats = config.get('_stats', None)
+    if stats is not None:
+        stats.addTime(stage, t)
+
+def RecordSize(config, name, value):
+    """Record the value of a size in config['_stats'] if there is one.
+
+    @param config           The configuration dict.
+    @param name             The name of the size.
+    @param value            The value to record.
+    """
+    stats = config.get('_stats', None)
+    if stats is not None:
+        stats.addSize(name, value)
+
+def TakeStats(config):
+    """Take the records that have been made in config['_stats'] since the last call, and replace
+    it with a new empty ConfigStats instance.
+
+    This is used in the worker processes of MultiProcess to send the records for each job back
+    to the main process.
+
+    @param config           The configuration dict.
+
+    @returns the ConfigStats instance that was in config['_stats'], or None if there was none.
+    """
+    stats = config.get('_stats', None)
+    if stats is not None:
+        config['_stats'] = ConfigStats()
+    return stats
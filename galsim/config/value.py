@@ -33,16 +33,27 @@ import galsim
 # that the value type is able to generate.
 valid_value_types = {}
 
+# This module-level dict will store the value types that can generate values for many objects
+# at once.  See the RegisterBatchValueType function at the end of this file.
+valid_batch_value_types = {}
+
 
 # Standard keys to ignore while parsing values:
 standard_ignore = [
-    'type', 'current', 'index_key', 'repeat', 'rng_num', '_gen_fn', '_get',
+    'type', 'current', 'index_key', 'repeat', 'rng_num', '_gen_fn', '_get', '_get_items', '_batch',
     '#' # When we read in json files, there represent comments
 ]
 
 def ParseValue(config, key, base, value_type):
     """@brief Read or generate a parameter value from config.
 
+    The work that only needs to be done once for each value is saved in the config dict the
+    first time it is parsed, so later objects skip it: the '$' and '@' shorthands and lists are
+    converted to dicts in place, the type lookup and validation are saved in '_gen_fn', and the
+    parameter checks for a type are saved in '_get' and '_get_items' (by GetAllParams).  The
+    value is still generated by calling the generating function for each object (unless it is
+    reused via 'current' according to its index_key), so the dict structure is walked each time.
+
     @returns the tuple (value, safe).
     """
     # Special: if the "value_type" is GSObject, then switch over to that builder instead.
@@ -105,7 +116,12 @@ def ParseValue(config, key, base, value_type):
             param['_gen_fn'] = generate_func
 
         #print('generate_func = ',generate_func)
-        val_safe = generate_func(param, base, value_type)
+        if '_batch_obj_range' in base and index_key == 'obj_num' and (
+                type_name in valid_batch_value_types):
+            val_safe = _GetBatchValue(param, base, value_type, index, generate_func,
+                                      valid_batch_value_types[type_name])
+        else:
+            val_safe = generate_func(param, base, value_type)
         #print('returned val, safe = ',val_safe)
         if isinstance(val_safe, tuple):
             val, safe = val_safe
@@ -179,6 +195,48 @@ def ParseValue(config, key, base, value_type):
         return val, True
 
 
+def _GetBatchValue(param, base, value_type, index, generate_func, batch_func):
+    """Get a value from the saved batch of values for the objects in the current image, or
+    if there is no such batch yet, try to make it.
+
+    base['_batch_obj_range'] is the range of obj_num values (start, end) in the current image.
+    The batch function is called with an array delta = obj_num - base['obj_num'] for all of
+    these obj_num values, and it returns a list of the values for each of them, or None if
+    this item cannot be generated in batch mode.  In the latter case, the normal generating
+    function is used instead.
+    """
+    obj_range = base['_batch_obj_range']
+    if '_batch' in param:
+        batch_range, batch_type, batch_start, values = param['_batch']
+        # Only use the saved values within the same call to BuildStamps, since other things
+        # (e.g. the input catalog) may have changed since then.
+        if (batch_range is obj_range and batch_type is value_type and
+                0 <= index - batch_start < len(values)):
+            return values[index - batch_start], False
+    start, end = obj_range
+    obj_num = base.get('obj_num',0)
+    if start <= obj_num < end:
+        import numpy as np
+        values = batch_func(param, base, value_type, np.arange(start - obj_num, end - obj_num))
+        if values is not None:
+            param['_batch'] = (obj_range, value_type, index + start - obj_num, values)
+            return values[obj_num - start], False
+    return generate_func(param, base, value_type)
+
+def _IsBatchConstant(config, keys):
+    """Check that the given parameters are all simple values, which won't change from one
+    object to the next.  (If they are not yet parsed, they might be lists or strings that
+    would be converted into dicts, so those are not considered constant here.)
+    """
+    for key in keys:
+        if key in config:
+            param = config[key]
+            if isinstance(param, (dict, list)):
+                return False
+            if isinstance(param, basestring) and param[:1] in ('$', '@'):
+                return False
+    return True
+
 def GetCurrentValue(key, config, value_type=None, base=None):
     """@brief Get the current value of another config item given the key name.
 
@@ -338,9 +396,14 @@ def GetAllParams(config, base, req={}, opt={}, single=[], ignore=[]):
     @returns the tuple (kwargs, safe).
     """
     get = CheckAllParams(config,req,opt,single,ignore)
+    # Save the sorted items, so we only need to sort them the first time.  (Or again if the
+    # _get dict has been remade.)
+    get_items = config.get('_get_items', None)
+    if get_items is None or get_items[0] is not get:
+        get_items = config['_get_items'] = (get, sorted(get.items()))
     kwargs = {}
     safe = True
-    for (key, value_type) in sorted(get.items()):
+    for (key, value_type) in get_items[1]:
         val, safe1 = ParseValue(config, key, base, value_type)
         safe = safe and safe1
         kwargs[key] = val
@@ -507,8 +570,8 @@ def _GenerateFromDeg(config, base, value_type):
     #print(base['obj_num'],'Generate from Deg: kwargs = ',kwargs)
     return kwargs['theta'] * galsim.degrees, safe
 
-def _GenerateFromSequence(config, base, value_type):
-    """@brief Return next in a sequence of integers
+def _GetSequenceParams(config, base, value_type):
+    """@brief Get the parameters of a Sequence: first, step, repeat, nitems, and the index.
     """
     ignore = [ 'default' ]
     opt = { 'first' : value_type, 'last' : value_type, 'step' : value_type,
@@ -551,6 +614,12 @@ def _GenerateFromSequence(config, base, value_type):
             nitems = (last - first)//step + 1
     #print('nitems = ',nitems)
     #print('repeat = ',repeat)
+    return first, step, repeat, nitems, index
+
+def _GenerateFromSequence(config, base, value_type):
+    """@brief Return next in a sequence of integers
+    """
+    first, step, repeat, nitems, index = _GetSequenceParams(config, base, value_type)
 
     index = index // repeat
     #print('index => ',index)
@@ -563,6 +632,20 @@ def _GenerateFromSequence(config, base, value_type):
     #print(base[index_key],'Sequence index = %s + %d*%s = %s'%(first,index,step,value))
     return value, False
 
+def _BatchFromSequence(config, base, value_type, delta):
+    """@brief Return the values of a sequence for all the objects in the current image.
+    """
+    if value_type is bool:
+        return None
+    if not _IsBatchConstant(config, ['first', 'last', 'step', 'repeat', 'nitems']):
+        return None
+    first, step, repeat, nitems, index = _GetSequenceParams(config, base, value_type)
+
+    index = (index + delta) // repeat
+    if nitems is not None and nitems > 0:
+        index = index % nitems
+    return (first + index*step).tolist()
+
 
 def _GenerateFromNumberedFile(config, base, value_type):
     """@brief Return a file_name using a root, a number, and an extension
@@ -734,6 +817,35 @@ def RegisterValueType(type_name, gen_func, valid_types, input_type=None):
         else:
             RegisterInputConnectedType(input_type, type_name)
 
+def RegisterBatchValueType(type_name, batch_func):
+    """Register a function to generate the values of a value type for all the objects in an
+    image at once.
+
+    This is used when image.batch_values is True.  The first time a value of this type is needed
+    for an object in the image, batch_func is called to generate the values for all the objects
+    in the image.  Later objects then just use the corresponding value from this list.
+
+    The batch function should return exactly the same values that the regular generating
+    function would return for each object.  So it is only appropriate for types whose values
+    are a deterministic function of the index (e.g. Sequence, Catalog).  Types that use the
+    random number generator cannot be done this way, since each object has its own rng, and
+    the number of values drawn from it before this one can vary from object to object.
+
+    The call signature is
+
+        values = batch_func(config, base, value_type, delta)
+
+    where delta is a numpy array of obj_num - base['obj_num'] for all the objects in the image.
+    It should return a list of the values, or None if the values cannot be generated in batch
+    mode (e.g. if some of the parameters vary from one object to the next).  In that case,
+    the regular generating function is used instead.  The values are assumed not to be safe.
+
+    @param type_name        The name of the 'type' specification in the config dict.  This
+                            should already have been registered with RegisterValueType.
+    @param batch_func       A function to generate the values for all the objects in the image.
+    """
+    valid_batch_value_types[type_name] = batch_func
+
 
 RegisterValueType('List', _GenerateFromList,
               [ float, int, bool, str, galsim.Angle, galsim.Shear, galsim.PositionD,
@@ -744,6 +856,7 @@ RegisterValueType('Current', _GenerateFromCurrent,
 RegisterValueType('Sum', _GenerateFromSum,
              [ float, int, galsim.Angle, galsim.Shear, galsim.PositionD ])
 RegisterValueType('Sequence', _GenerateFromSequence, [ float, int, bool ])
+RegisterBatchValueType('Sequence', _BatchFromSequence)
 RegisterValueType('NumberedFile', _GenerateFromNumberedFile, [ str ])
 RegisterValueType('FormattedStr', _GenerateFromFormattedStr, [ str ])
 RegisterValueType('Rad', _GenerateFromRad, [ galsim.Angle ])
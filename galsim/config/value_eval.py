@@ -63,6 +63,85 @@ def _isWordInString(w, s):
     # cf. https://stackoverflow.com/questions/5319922/python-check-if-word-is-in-a-string
     return re.search(r'\b({0})\b'.format(w),s) is not None
 
+def _getWords(s):
+    # Return the set of all the whole words in the given string.
+    # For a word w made of only alphanumeric characters and _, `w in _getWords(s)` is equivalent
+    # to `_isWordInString(w,s)`, but it only requires scanning the string once.
+    return set(re.findall(r'\w+', s))
+
+def _hasWord(w, words, s):
+    # Check whether w is a whole word in s, using the precomputed words = _getWords(s) if possible.
+    if re.match(r'\w+$', w):
+        return w in words
+    else:
+        return _isWordInString(w, s)
+
+# The compiled code for each lambda function we have made, keyed by the source string.  Many
+# config dicts use the same Eval strings (e.g. in each copy of the config, or in each process),
+# so this avoids having to parse and compile them again each time.
+_eval_code_cache = {}
+_max_eval_code_cache = 1000
+
+def _compileEval(source):
+    # Compile the source as an expression, reusing the code object if we have already done so.
+    code = _eval_code_cache.get(source, None)
+    if code is None:
+        if len(_eval_code_cache) >= _max_eval_code_cache:
+            _eval_code_cache.clear()
+        code = compile(source, '<string>', 'eval')
+        _eval_code_cache[source] = code
+    return code
+
+def _GetEvalGlobals(base):
+    """@brief Get the global variables to use for evaluating Eval strings.
+    """
+    if 'eval_gdict' not in base:
+        from future.utils import exec_
+        # Start with the current globals, and add extra items to them.
+        gdict = globals().copy()
+        # We allow the following modules to be used in the eval string:
+        exec_('import math', gdict)
+        exec_('import numpy', gdict)
+        exec_('import numpy as np', gdict)
+        exec_('import os', gdict)
+        base['eval_gdict'] = gdict
+    return base['eval_gdict']
+
+class _EvalFunction(object):
+    """The compiled form of an Eval string, which is saved in the config dict as config['_fn'].
+
+    This holds the list of the parameters that the string uses, along with their types, and the
+    lambda function to call with their current values.
+
+    Only the source string is pickled, not the compiled function, so the config dict may be sent
+    to other processes.  The function is remade from the (cached) code object when it is next
+    needed.
+    """
+    def __init__(self, string, keys, opt):
+        self.string = string
+        # The keys in the config dict for the parameters, in the order the lambda takes them.
+        self.keys = keys
+        self.opt = opt
+        self.source = 'lambda %s: %s'%(','.join([ key[1:] for key in keys ]), string)
+        self.code = _compileEval(self.source)
+        self.fn = None
+
+    def __call__(self, base, params):
+        if self.fn is None:
+            if self.code is None:
+                self.code = _compileEval(self.source)
+            self.fn = eval(self.code, _GetEvalGlobals(base))
+        return self.fn(*[ params[key] for key in self.keys ])
+
+    def __getstate__(self):
+        d = self.__dict__.copy()
+        d['code'] = None
+        d['fn'] = None
+        return d
+
+    def __setstate__(self, d):
+        self.__dict__ = d
+
 def _GenerateFromEval(config, base, value_type):
     """@brief Evaluate a string as the provided type
     """
@@ -76,20 +155,7 @@ def _GenerateFromEval(config, base, value_type):
     else:
         # If the function is not already compiled, then this is the first time through, so do
         # a full parsing of all the possibilities.
-
-        from future.utils import exec_
-        # These will be the variables to use for evaluating the eval statement.
-        # Start with the current locals and globals, and add extra items to them.
-        if 'eval_gdict' not in base:
-            gdict = globals().copy()
-            # We allow the following modules to be used in the eval string:
-            exec_('import math', gdict)
-            exec_('import numpy', gdict)
-            exec_('import numpy as np', gdict)
-            exec_('import os', gdict)
-            base['eval_gdict'] = gdict
-        else:
-            gdict = base['eval_gdict']
+        gdict = _GetEvalGlobals(base)
 
         if 'str' not in config:
             raise galsim.GalSimConfigError(
@@ -117,7 +183,11 @@ def _GenerateFromEval(config, base, value_type):
                 config['x' + key_name] = { 'type' : 'Current', 'key' : key }
 
         # The parameters to the function are the keys in the config dict minus their initial char.
-        params = [ key[1:] for key in config.keys() if key not in eval_ignore ]
+        keys = [ key for key in config.keys() if key not in eval_ignore ]
+        params = [ key[1:] for key in keys ]
+
+        # Only scan the string for words once, rather than once for each possible variable.
+        words = _getWords(string)
 
         # Also bring in any top level eval_variables that might be relevant.
         if 'eval_variables' in base:
@@ -126,53 +196,47 @@ def _GenerateFromEval(config, base, value_type):
                 raise galsim.GalSimConfigError("eval_variables must be a dict")
             for key in base['eval_variables']:
                 # Only add variables that appear in the string.
-                if _isWordInString(key[1:],string) and key[1:] not in params:
+                if _hasWord(key[1:],words,string) and key[1:] not in params:
                     config[key] = { 'type' : 'Current',
                                     'key' : 'eval_variables.' + key }
+                    keys.append(key)
                     params.append(key[1:])
 
         # Also check for the allowed base variables:
         for key in eval_base_variables:
-            if key in base and _isWordInString(key,string) and key not in params:
+            if key in base and key in words and key not in params:
                 config['x' + key] = { 'type' : 'Current', 'key' : key }
+                keys.append('x' + key)
                 params.append(key)
         #print('params = ',params)
         #print('config = ',config)
 
+        # The types of the parameters are given by the first letter of their keys.
+        opt = { key : _type_by_letter(key) for key in keys }
+
         # Now compile the string into a lambda function, which will be faster for subsequent
         # passes into this builder.
         try:
             if len(params) == 0:
-                value = eval(string, gdict)
+                value = eval(_compileEval(string), gdict)
                 config['_value'] = value
                 return value
             else:
-                fn_str = 'lambda %s: %s'%(','.join(params), string)
-                #print('fn_str = ',fn_str)
-                fn = eval(fn_str, gdict)
+                fn = _EvalFunction(string, keys, opt)
                 config['_fn'] = fn
         except KeyboardInterrupt:
             raise
         except Exception as e:
             raise galsim.GalSimConfigError(
                 "Unable to evaluate string %r as a %s\n%r"%(string, value_type, e))
- 
+
     # Always need to evaluate any parameters to pass to the function
-    opt = {}
-    for key in config.keys():
-        if key not in eval_ignore:
-            opt[key] = _type_by_letter(key)
-    #print('opt = ',opt)
-    params, safe = galsim.config.GetAllParams(config, base, opt=opt, ignore=eval_ignore)
+    params, safe = galsim.config.GetAllParams(config, base, opt=fn.opt, ignore=eval_ignore)
     #print('params = ',params)
 
-    # Strip off the first character of the keys
-    params = { key[1:] : value for key, value in params.items() }
-    #print('params => ',params)
-
     # Evaluate the compiled function
     try:
-        val = fn(**params)
+        val = fn(base, params)
         #print('val = ',val)
         return val, safe
     except KeyboardInterrupt:
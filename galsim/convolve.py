@@ -20,10 +20,10 @@ import numpy as np
 
 from . import _galsim
 from .gsparams import GSParams
-from .gsobject import GSObject
+from .gsobject import GSObject, _sbp_xValues
 from .chromatic import ChromaticObject, ChromaticConvolution
 from .utilities import lazy_property, doc_inherit
-from .errors import GalSimError, convert_cpp_errors, galsim_warn
+from .errors import GalSimError, GalSimRangeError, convert_cpp_errors, galsim_warn
 
 def Convolve(*args, **kwargs):
     """A function for convolving 2 or more GSObject or ChromaticObject instances.
@@ -386,6 +386,23 @@ class Convolution(GSObject):
         kv_list = [obj.kValue(pos) for obj in self.obj_list]
         return np.prod(kv_list)
 
+    @doc_inherit
+    def _xValueArray(self, x, y):
+        if len(self.obj_list) == 1:
+            return self.obj_list[0]._xValueArray(x, y)
+        elif len(self.obj_list) == 2:
+            try:
+                return _sbp_xValues(self._sbp, x, y)
+            except (AttributeError, RuntimeError):
+                raise GalSimError(
+                    "At least one profile in %s does not implement real-space convolution"%self)
+        else:
+            raise GalSimError("Cannot use real_space convolution for >2 profiles")
+
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        return np.prod([obj._kValueArray(kx, ky) for obj in self.obj_list], axis=0)
+
     @doc_inherit
     def _drawReal(self, image):
         if len(self.obj_list) == 1:
@@ -409,7 +426,7 @@ class Convolution(GSObject):
         # both have their negative ones at the end.
         # However, this decision is now made by the convolve method.
         for obj in self.obj_list[1:]:
-            p1 = PhotonArray(len(photons))
+            p1 = PhotonArray(len(photons), dtype=photons.dtype)
             obj._shoot(p1, rng)
             photons.convolve(p1, rng)
 
@@ -432,6 +449,39 @@ class Convolution(GSObject):
 
 
 
+def set_convolve_cache_size(nbytes):
+    """Set the maximum memory used to keep the Fourier-space images of convolution components.
+
+    When a Convolution is drawn with an FFT, each of its components is drawn in Fourier space
+    on the same grid, and the images are multiplied together.  If the same component is drawn
+    on the same grid more than once, e.g. a single PSF convolved with many galaxies that are
+    drawn onto stamps of the same size and pixel scale, its image is kept the second time it is
+    drawn, and later convolutions use the kept image rather than drawing it again.
+
+    A component counts as the same only if it is the same object with the same GSParams, so
+    make the PSF once and use it in all the convolutions.  Components that are only drawn once
+    are not kept, so the galaxies don't push the PSF out of the cache.  When the cache is full,
+    the least recently used images are removed.
+
+    The default size is 100 MB.
+
+    @param nbytes       The maximum number of bytes to use.  0 turns off the cache and empties
+                        it.
+    """
+    if nbytes < 0:
+        raise GalSimRangeError("nbytes must be >= 0", nbytes, 0)
+    _galsim.SetConvolveCacheSize(int(nbytes))
+
+def get_convolve_cache_size():
+    """Get the maximum memory used to keep the Fourier-space images of convolution components.
+
+    See set_convolve_cache_size for details.
+
+    @returns the maximum number of bytes.
+    """
+    return _galsim.GetConvolveCacheSize()
+
+
 def Deconvolve(obj, gsparams=None, propagate_gsparams=True):
     """A function for deconvolving by either a GSObject or ChromaticObject.
 
@@ -609,6 +659,13 @@ class Deconvolution(GSObject):
         else:
             return 1./kval
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        kval = self.orig_obj._kValueArray(kx, ky)
+        small = np.abs(kval) < self._min_acc_kvalue
+        kval[small] = 1.
+        return np.where(small, self._inv_min_acc_kvalue, 1./kval)
+
     @doc_inherit
     def _drawKImage(self, image):
         self.orig_obj._drawKImage(image)
@@ -777,7 +834,7 @@ class AutoConvolution(Convolution):
     def _shoot(self, photons, rng):
         from .photon_array import PhotonArray
         self.orig_obj._shoot(photons, rng)
-        photons2 = PhotonArray(len(photons))
+        photons2 = PhotonArray(len(photons), dtype=photons.dtype)
         self.orig_obj._shoot(photons2, rng)
         photons.convolve(photons2, rng)
 
@@ -938,7 +995,7 @@ class AutoCorrelation(Convolution):
     def _shoot(self, photons, rng):
         from .photon_array import PhotonArray
         self.orig_obj._shoot(photons, rng)
-        photons2 = PhotonArray(len(photons))
+        photons2 = PhotonArray(len(photons), dtype=photons.dtype)
         self.orig_obj._shoot(photons2, rng)
 
         # Flip sign of (x, y) in one of the results
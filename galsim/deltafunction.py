@@ -112,10 +112,18 @@ class DeltaFunction(GSObject):
         else:
             return 0.
 
+    @doc_inherit
+    def _xValueArray(self, x, y):
+        return np.where((x == 0.) & (y == 0.), DeltaFunction._mock_inf, 0.)
+
     @doc_inherit
     def _kValue(self, kpos):
         return self.flux
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        return np.full(len(kx), self.flux, dtype=complex)
+
     @doc_inherit
     def _shoot(self, photons, rng):
         flux_per_photon = self.flux / len(photons)
@@ -146,11 +146,21 @@ class Exponential(GSObject):
         r = math.sqrt(pos.x**2 + pos.y**2)
         return self._norm * math.exp(-r * self._inv_r0)
 
+    @doc_inherit
+    def _xValueArray(self, x, y):
+        r = np.sqrt(x**2 + y**2)
+        return self._norm * np.exp(-r * self._inv_r0)
+
     @doc_inherit
     def _kValue(self, kpos):
         ksqp1 = (kpos.x**2 + kpos.y**2) * self._r0**2 + 1.
         return self._flux / (ksqp1 * math.sqrt(ksqp1))
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        ksqp1 = (kx**2 + ky**2) * self._r0**2 + 1.
+        return (self._flux / (ksqp1 * np.sqrt(ksqp1))).astype(complex)
+
     @doc_inherit
     def _drawReal(self, image):
         self._sbp.draw(image._image, image.scale)
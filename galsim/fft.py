@@ -293,3 +293,142 @@ def irfft2(a, shift_in=False, shift_out=False):
     return xim.array
 
 
+
+
+def has_threads():
+    """Check whether GalSim was built with the fftw3_threads library.
+
+    If so, FFTW may use up to galsim.get_num_threads() threads for large transforms.
+    (cf. galsim.set_num_threads)
+
+    @returns whether FFTW can use multiple threads.
+    """
+    return _galsim.HasFFTWThreads()
+
+def clear_plans():
+    """Drop all the FFTW plans that GalSim has saved.
+
+    GalSim keeps the plan for each transform size that it uses (up to 100 of them, dropping the
+    ones that were used the longest time ago), so it doesn't need to make a new plan each time.
+    This drops all of them, e.g. to free the memory they use.  The FFTW wisdom is kept, so any
+    measured plans can be made again quickly.  (cf. forget_wisdom)
+    """
+    _galsim.ClearFFTPlans()
+
+# The plans that FFTW uses for each transform size are much better if FFTW has measured the
+# speed of the different algorithms.  This "wisdom" can be kept in a file, so it only needs to
+# be measured once.  If the GALSIM_FFTW_WISDOM environment variable is set, it is loaded from
+# that file when galsim is imported and saved again when Python exits (if anything new was
+# measured).
+def _default_wisdom_file():
+    import os
+    file_name = os.environ.get('GALSIM_FFTW_WISDOM', '')
+    return os.path.expanduser(file_name) if file_name else None
+
+_wisdom_file = _default_wisdom_file()
+
+def get_wisdom_file():
+    """Get the name of the file in which the FFTW wisdom is saved.
+
+    FFTW can find much faster ways to do a transform of a given size if it first measures how
+    long the different algorithms take.  GalSim does this for any size that is used more than
+    a few times.  This "wisdom" may be saved to a file when Python exits and read back in the
+    next time galsim is imported, so the measurements only need to be done once.
+
+    This is only done if you ask for it, by setting the GALSIM_FFTW_WISDOM environment variable
+    to the name of the file to use (e.g. ~/.cache/galsim/fftw_wisdom), or by calling
+    set_wisdom_file.  Otherwise, nothing is written.
+
+    @returns the file name, or None if the wisdom is not being saved.
+    """
+    return _wisdom_file if _wisdom_file else None
+
+def set_wisdom_file(file_name):
+    """Set the name of the file in which to save the FFTW wisdom when Python exits.
+
+    By default, the wisdom isn't saved, unless the GALSIM_FFTW_WISDOM environment variable
+    is set.  This turns on the saving (or turns it off, if file_name is None).
+
+    See get_wisdom_file for details.  Note that this doesn't load the wisdom from the new file.
+    Use load_wisdom for that.
+
+    @param file_name    The name of the file to use, or None to not save the wisdom.
+    """
+    global _wisdom_file
+    _wisdom_file = file_name
+
+def load_wisdom(file_name=None):
+    """Load some FFTW wisdom from a file.
+
+    This is added to any wisdom that is already known.
+
+    @param file_name    The name of the file to read.  [default: None, which means to use
+                        get_wisdom_file()]
+
+    @returns whether any wisdom was read.
+    """
+    if file_name is None:
+        file_name = get_wisdom_file()
+        if file_name is None:
+            return False
+    return _galsim.ImportFFTWWisdom(file_name)
+
+def save_wisdom(file_name=None):
+    """Save the current FFTW wisdom to a file.
+
+    If the file already exists, the wisdom in it is kept as well.  The file is written to a
+    temporary name first and then moved into place, so several processes may do this at the
+    same time.
+
+    @param file_name    The name of the file to write.  [default: None, which means to use
+                        get_wisdom_file()]
+    """
+    import os
+    import tempfile
+    from .errors import GalSimError
+    if file_name is None:
+        file_name = get_wisdom_file()
+        if file_name is None:
+            raise GalSimError("No file name given for the FFTW wisdom.")
+    dir_name = os.path.dirname(os.path.abspath(file_name))
+    if not os.path.isdir(dir_name):
+        try:
+            os.makedirs(dir_name)
+        except OSError:  # pragma: no cover  (Another process made it first.)
+            if not os.path.isdir(dir_name): raise
+    # Don't lose any wisdom that another process has saved since we loaded it.
+    if os.path.isfile(file_name):
+        _galsim.ImportFFTWWisdom(file_name)
+    fd, tmp_name = tempfile.mkstemp(dir=dir_name, prefix='.fftw_wisdom')
+    os.close(fd)
+    try:
+        if not _galsim.ExportFFTWWisdom(tmp_name):
+            raise GalSimError("Unable to write FFTW wisdom to %s"%tmp_name)
+        os.rename(tmp_name, file_name)
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+
+def forget_wisdom():
+    """Forget all the FFTW wisdom that has been loaded or measured so far, along with the
+    saved plans.
+
+    This doesn't change the file on disk.
+    """
+    _galsim.ForgetFFTWWisdom()
+
+def _save_wisdom_at_exit():
+    if _wisdom_file and _galsim.FFTWWisdomChanged():
+        try:
+            save_wisdom()
+        except Exception:  # pragma: no cover
+            # This is just an optimization, so don't complain if we can't write it.
+            pass
+
+try:
+    load_wisdom()
+except Exception:  # pragma: no cover
+    pass
+
+import atexit
+atexit.register(_save_wisdom_at_exit)
@@ -195,6 +195,10 @@ class FourierSqrtProfile(GSObject):
     def _kValue(self, pos):
         return np.sqrt(self.orig_obj._kValue(pos))
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        return np.sqrt(self.orig_obj._kValueArray(kx, ky))
+
     @doc_inherit
     def _drawKImage(self, image):
         self.orig_obj._drawKImage(image)
@@ -169,11 +169,21 @@ class Gaussian(GSObject):
         rsq = pos.x**2 + pos.y**2
         return self._norm * math.exp(-0.5 * rsq * self._inv_sigsq)
 
+    @doc_inherit
+    def _xValueArray(self, x, y):
+        rsq = x**2 + y**2
+        return self._norm * np.exp(-0.5 * rsq * self._inv_sigsq)
+
     @doc_inherit
     def _kValue(self, kpos):
         ksq = (kpos.x**2 + kpos.y**2) * self._sigsq
         return self._flux * math.exp(-0.5 * ksq)
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        ksq = (kx**2 + ky**2) * self._sigsq
+        return (self._flux * np.exp(-0.5 * ksq)).astype(complex)
+
     @doc_inherit
     def _drawReal(self, image):
         self._sbp.draw(image._image, image.scale)
@@ -62,6 +62,20 @@ from .utilities import lazy_property, parse_pos_args
 from .errors import GalSimError, GalSimRangeError, GalSimValueError, GalSimIncompatibleValuesError
 from .errors import GalSimFFTSizeError, GalSimNotImplementedError, convert_cpp_errors, galsim_warn
 
+# drawPhot shoots objects with more than this many photons in chunks of this size, each with
+# its own rng, so they can be shot in several threads.  cf. galsim.set_num_threads.
+_photon_chunk_size = 1000000
+
+# Rough costs in ns of the steps of drawing a profile, which drawImage uses to pick the
+# method when method='fastest'.  They only need to be right to within a factor of a few, since
+# the methods usually differ by much more than that when the choice matters.
+_draw_costs = {
+    'fft' : 10.,            # Per element of the FFT, times log2 of the FFT size.
+    'kvalue' : 50.,         # Per element of the k-space image, to fill it in.
+    'real_space' : 20000.,  # Per pixel, to integrate the profile over the pixel.
+    'photon' : 200.,        # Per photon, to shoot it and add it to the image.
+}
+
 
 class GSObject(object):
     """Base class for all GalSim classes that represent some kind of surface brightness profile.
@@ -735,6 +749,58 @@ class GSObject(object):
         """
         raise NotImplementedError("%s does not implement kValue"%self.__class__.__name__)
 
+    def xValueArray(self, x, y):
+        """Returns the values of the object at many 2D positions in real space.
+
+        This is equivalent to calling xValue(x[i], y[i]) for each position, but it is much
+        faster for large numbers of positions.  For most profiles, the values are calculated in
+        a single C++ call, which releases the GIL.
+
+        As for xValue(), this is only available if `obj.is_analytic_x == True`.
+
+        @param x        A numpy array of the x positions (in world coordinates).
+        @param y        A numpy array of the y positions.  Must have the same shape as `x`.
+
+        @returns a numpy array of the surface brightness at each position, with the same shape
+                 as `x`.
+        """
+        x, y = _parse_xy_arrays(x, y, 'x', 'y')
+        return self._xValueArray(x.ravel(), y.ravel()).reshape(x.shape)
+
+    def _xValueArray(self, x, y):
+        """Equivalent to xValueArray(x, y), but x and y must be 1-d, contiguous float64 numpy
+        arrays of the same length.  They are not modified.
+
+        The base class implementation just calls _xValue for each position.
+        """
+        return np.array([self._xValue(PositionD(x[i], y[i])) for i in range(len(x))],
+                        dtype=float)
+
+    def kValueArray(self, kx, ky):
+        """Returns the values of the object at many 2D positions in k space.
+
+        This is equivalent to calling kValue(kx[i], ky[i]) for each position, but it is much
+        faster for large numbers of positions.  For most profiles, the values are calculated in
+        a single C++ call, which releases the GIL.
+
+        @param kx       A numpy array of the kx positions.
+        @param ky       A numpy array of the ky positions.  Must have the same shape as `kx`.
+
+        @returns a complex numpy array of the fourier amplitude at each position, with the same
+                 shape as `kx`.
+        """
+        kx, ky = _parse_xy_arrays(kx, ky, 'kx', 'ky')
+        return self._kValueArray(kx.ravel(), ky.ravel()).reshape(kx.shape)
+
+    def _kValueArray(self, kx, ky):
+        """Equivalent to kValueArray(kx, ky), but kx and ky must be 1-d, contiguous float64 numpy
+        arrays of the same length.  They are not modified.
+
+        The base class implementation just calls _kValue for each position.
+        """
+        return np.array([self._kValue(PositionD(kx[i], ky[i])) for i in range(len(kx))],
+                        dtype=complex)
+
     def withGSParams(self, gsparams):
         """Create a version of the current object with the given gsparams
 
@@ -1179,7 +1245,7 @@ class GSObject(object):
                   method='auto', area=1., exptime=1., gain=1., add_to_image=False,
                   use_true_center=True, offset=None, n_photons=0., rng=None, max_extra_noise=0.,
                   poisson_flux=None, sensor=None, surface_ops=(), n_subsample=3, maxN=None,
-                  save_photons=False, setup_only=False):
+                  save_photons=False, setup_only=False, photon_dtype=np.float64):
         """Draws an Image of the object.
 
         The drawImage() method is used to draw an Image of the current object using one of several
@@ -1285,6 +1351,15 @@ class GSObject(object):
                         it could be useful if you want to view the surface brightness profile of an
                         object directly, without including the pixel integration.
 
+            'fastest'   This estimates how long each of 'fft', 'real_space' and 'phot' would take
+                        from the size of the FFT (which depends on the profile's stepk and maxk),
+                        the number of image pixels and the number of photons, and uses whichever
+                        should be fastest.  'phot' is only considered if you give `n_photons` or
+                        `max_extra_noise`, since otherwise the photon noise could be more than you
+                        want.  'fft' is not used for a simple profile with hard edges, for which
+                        'real_space' is more accurate.  The method that was used is recorded in
+                        the `draw_method` attribute of the returned image.
+
         The 'phot' method has a few extra parameters that adjust how it functions.  The total
         number of photons to shoot is normally calculated from the object's flux.  This flux is
         taken to be given in photons/cm^2/s, so for most simple profiles, this times area * exptime
@@ -1349,6 +1424,10 @@ class GSObject(object):
         of profile the object has, how big your image is relative to the size of your object,
         whether you are keeping `poisson_flux=True`, etc.
 
+        It will also have an attribute `draw_method` giving the method that was used to draw it.
+        This is 'fft' or 'real_space' for `method='auto'` (depending on which one that chose) and
+        the method that was picked for `method='fastest'`.
+
         The following code snippet illustrates how `gain`, `exptime`, `area`, and `method` can all
         influence the relationship between the `flux` attribute of a `GSObject` and both the pixel
         values and `.added_flux` attribute of an `Image` drawn with `drawImage()`:
@@ -1495,7 +1574,8 @@ class GSObject(object):
                             photons onto the image. [default: None]
         @param surface_ops  A list of operators that can modify the photon array that will be
                             applied in order before accumulating the photons on the sensor.
-                            [default: ()]
+                            They are applied together in a single pass over the photons
+                            (cf. PhotonOpList). [default: ()]
         @param n_subsample  The number of sub-pixels per final pixel to use for fft drawing when
                             using a sensor.  The sensor step needs to know the sub-pixel positions
                             of the photons, which is lost in the fft method.  So using smaller
@@ -1511,14 +1591,116 @@ class GSObject(object):
                             is set up correctly.  This is used internally by GalSim, but there
                             may be cases where the user will want the same functionality.
                             [default: False]
+        @param photon_dtype The type of the arrays in the PhotonArrays used for photon shooting
+                            or with a sensor.  np.float32 halves the memory they need (including
+                            for `save_photons`).  [default: np.float64]
 
         @returns the drawn Image.
         """
-        from .image import Image, ImageD
-        from .convolve import Convolve, Convolution, Deconvolve
+        from .image import ImageD
+        from .convolve import Convolve, Deconvolve, Convolution
         from .box import Pixel
         from .wcs import PixelScale
-        from .photon_array import PhotonArray
+        from .photon_array import PhotonArray, PhotonOpList
+
+        prof, prof_no_pixel, image, local_wcs, flux_scale, real_space, method = (
+                self._setup_draw_image(
+                    image, nx, ny, bounds, scale, wcs, dtype, method, area, exptime, gain,
+                    add_to_image, use_true_center, offset, n_photons, rng, max_extra_noise,
+                    poisson_flux, sensor, surface_ops, maxN, save_photons))
+
+        if setup_only:
+            image.added_flux = 0.
+            return image
+
+        # Making a view of the image lets us change the center without messing up the original.
+        imview = image._view()
+        imview._shift(-image.center)  # equiv. to setCenter(0,0), but faster
+        imview.wcs = PixelScale(1.0)
+        orig_center = image.center  # Save the original center to pass to sensor.accumulate
+        if method == 'phot':
+            added_photons, photons = prof.drawPhot(imview, gain, add_to_image,
+                                                   n_photons, rng, max_extra_noise, poisson_flux,
+                                                   sensor, surface_ops, maxN,
+                                                   orig_center, local_wcs, photon_dtype)
+        else:
+            # If not using phot, but doing sensor, then make a copy.
+            if sensor is not None:
+                if imview.dtype in (np.float32, np.float64):
+                    dtype = None
+                else:
+                    dtype = np.float64
+                draw_image = imview.real.subsample(n_subsample, n_subsample, dtype=dtype)
+                draw_image._shift(-draw_image.center)  # eqiv. to setCenter(0,0)
+                if method in ('auto', 'fft', 'real_space'):
+                    # Need to reconvolve by the new smaller pixel instead
+                    prof = Convolve(
+                            prof_no_pixel,
+                            Pixel(scale=1.0/n_subsample, gsparams=self.gsparams),
+                            real_space=real_space, gsparams=self.gsparams)
+                elif n_subsample != 1:
+                    # We can't just pull off the pixel-free version, so we need to deconvolve
+                    # by the original pixel and reconvolve by the smaller one.
+                    prof = Convolve(
+                            prof,
+                            Deconvolve(Pixel(scale=1.0, gsparams=self.gsparams)),
+                            Pixel(scale=1.0/n_subsample, gsparams=self.gsparams),
+                            gsparams=self.gsparams)
+                add = False
+                if not add_to_image: imview.setZero()
+            else:
+                draw_image = imview
+                add = add_to_image
+
+            if prof.is_analytic_x:
+                added_photons = prof.drawReal(draw_image, add)
+            else:
+                added_photons = prof.drawFFT(draw_image, add)
+
+            if sensor is not None:
+                photons = PhotonArray.makeFromImage(draw_image, rng=rng, dtype=photon_dtype)
+                if len(surface_ops) > 0:
+                    PhotonOpList(surface_ops).applyTo(photons, local_wcs)
+                if imview.dtype in (np.float32, np.float64):
+                    added_photons = sensor.accumulate(photons, imview, orig_center)
+                else:
+                    # Need a temporary
+                    im1 = ImageD(bounds=imview.bounds)
+                    added_photons = sensor.accumulate(photons, im1, orig_center)
+                    imview.array[:,:] += im1.array.astype(imview.dtype, copy=False)
+
+        image.added_flux = added_photons / flux_scale
+        if method == 'auto' and isinstance(prof, Convolution):
+            method = 'real_space' if prof.real_space else 'fft'
+        image.draw_method = method
+        if save_photons:
+            image.photons = photons
+
+        return image
+
+    def _setup_draw_image(self, image=None, nx=None, ny=None, bounds=None, scale=None, wcs=None,
+                          dtype=None, method='auto', area=1., exptime=1., gain=1.,
+                          add_to_image=False, use_true_center=True, offset=None, n_photons=0.,
+                          rng=None, max_extra_noise=0., poisson_flux=None, sensor=None,
+                          surface_ops=(), maxN=None, save_photons=False):
+        """Check the arguments to drawImage and set up the image.
+
+        This does everything in drawImage up to (but not including) the actual drawing.
+        The arguments are the same as for drawImage (except for n_subsample and setup_only).
+
+        @returns (prof, prof_no_pixel, image, local_wcs, flux_scale, real_space, method) where
+            prof is the profile to draw in image coordinates (including the pixel if appropriate),
+            prof_no_pixel is the same profile without the pixel,
+            image is the set up image,
+            local_wcs is the local wcs at the object's position in the image,
+            flux_scale is the factor by which the flux was scaled,
+            real_space is the real_space parameter used for the pixel convolution, and
+            method is the method to use (which is only different from the input method if
+            that was 'fastest').
+        """
+        from .image import Image
+        from .convolve import Convolve, Convolution
+        from .box import Pixel
 
         # Check that image is sane
         if image is not None and not isinstance(image, Image):
@@ -1532,9 +1714,10 @@ class GSObject(object):
         if exptime <= 0.:
             raise GalSimRangeError("Invalid exptime <= 0.", exptime, 0., None)
 
-        if method not in ('auto', 'fft', 'real_space', 'phot', 'no_pixel', 'sb'):
+        if method not in ('auto', 'fft', 'real_space', 'phot', 'no_pixel', 'sb', 'fastest'):
             raise GalSimValueError("Invalid method name", method,
-                                   ('auto', 'fft', 'real_space', 'phot', 'no_pixel', 'sb'))
+                                   ('auto', 'fft', 'real_space', 'phot', 'no_pixel', 'sb',
+                                    'fastest'))
 
         # Check that the user isn't convolving by a Pixel already.  This is almost always an error.
         if method == 'auto' and isinstance(self, Convolution):
@@ -1549,7 +1732,8 @@ class GSObject(object):
                     "an _additional_ Pixel, you can suppress this warning by using method=fft.")
 
         # Some parameters are only relevant for method == 'phot'
-        if method != 'phot' and sensor is None:
+        # (The ones that say how many photons to use are also allowed for method == 'fastest'.)
+        if method not in ('phot', 'fastest') and sensor is None:
             if n_photons != 0.:
                 raise GalSimIncompatibleValuesError(
                     "n_photons is only relevant for method='phot'",
@@ -1566,6 +1750,7 @@ class GSObject(object):
                 raise GalSimIncompatibleValuesError(
                     "poisson_flux is only relevant for method='phot'",
                     method=method, sensor=sensor, poisson_flux=poisson_flux)
+        if method != 'phot' and sensor is None:
             if surface_ops != ():
                 raise GalSimIncompatibleValuesError(
                     "surface_ops are only relevant for method='phot'",
@@ -1581,7 +1766,7 @@ class GSObject(object):
                     "Setting maxN is incompatible with save_photons=True")
 
         # Do any delayed computation needed by fft or real_space drawing.
-        if method != 'phot':
+        if method not in ('phot', 'fastest'):
             self._prepareDraw()
 
         # Figure out what wcs we are going to use.
@@ -1596,6 +1781,13 @@ class GSObject(object):
         # Get the local WCS, accounting for the offset correctly.
         local_wcs = self._local_wcs(wcs, image, offset, use_true_center, new_bounds)
 
+        # Pick the method now if necessary, since the flux scaling depends on it.
+        if method == 'fastest':
+            prof = local_wcs.profileToImage(self, flux_ratio=area*exptime)
+            method = prof._fastest_method(new_bounds, n_photons, max_extra_noise)
+            if method != 'phot':
+                self._prepareDraw()
+
         # Account for area and exptime.
         flux_scale = area * exptime
         # For surface brightness normalization, also scale by the pixel area.
@@ -1615,14 +1807,13 @@ class GSObject(object):
             local_wcs = local_wcs.withOrigin(offset)
 
         # If necessary, convolve by the pixel
+        prof_no_pixel = prof
+        real_space = None
         if method in ('auto', 'fft', 'real_space'):
-            if method == 'auto':
-                real_space = None
-            elif method == 'fft':
+            if method == 'fft':
                 real_space = False
-            else:
+            elif method == 'real_space':
                 real_space = True
-            prof_no_pixel = prof
             prof = Convolve(prof, Pixel(scale=1.0, gsparams=self.gsparams),
                             real_space=real_space, gsparams=self.gsparams)
 
@@ -1630,71 +1821,67 @@ class GSObject(object):
         image = prof._setup_image(image, nx, ny, bounds, add_to_image, dtype)
         image.wcs = wcs
 
-        if setup_only:
-            image.added_flux = 0.
-            return image
+        return prof, prof_no_pixel, image, local_wcs, flux_scale, real_space, method
 
-        # Making a view of the image lets us change the center without messing up the original.
-        imview = image._view()
-        imview._shift(-image.center)  # equiv. to setCenter(0,0), but faster
-        imview.wcs = PixelScale(1.0)
-        orig_center = image.center  # Save the original center to pass to sensor.accumulate
-        if method == 'phot':
-            added_photons, photons = prof.drawPhot(imview, gain, add_to_image,
-                                                   n_photons, rng, max_extra_noise, poisson_flux,
-                                                   sensor, surface_ops, maxN,
-                                                   orig_center, local_wcs)
-        else:
-            # If not using phot, but doing sensor, then make a copy.
-            if sensor is not None:
-                if imview.dtype in (np.float32, np.float64):
-                    dtype = None
-                else:
-                    dtype = np.float64
-                draw_image = imview.real.subsample(n_subsample, n_subsample, dtype=dtype)
-                draw_image._shift(-draw_image.center)  # eqiv. to setCenter(0,0)
-                if method in ('auto', 'fft', 'real_space'):
-                    # Need to reconvolve by the new smaller pixel instead
-                    prof = Convolve(
-                            prof_no_pixel,
-                            Pixel(scale=1.0/n_subsample, gsparams=self.gsparams),
-                            real_space=real_space, gsparams=self.gsparams)
-                elif n_subsample != 1:
-                    # We can't just pull off the pixel-free version, so we need to deconvolve
-                    # by the original pixel and reconvolve by the smaller one.
-                    prof = Convolve(
-                            prof,
-                            Deconvolve(Pixel(scale=1.0, gsparams=self.gsparams)),
-                            Pixel(scale=1.0/n_subsample, gsparams=self.gsparams),
-                            gsparams=self.gsparams)
-                add = False
-                if not add_to_image: imview.setZero()
-            else:
-                draw_image = imview
-                add = add_to_image
+    def _fastest_method(self, bounds, n_photons=0., max_extra_noise=0.):
+        """Estimate which of 'fft', 'real_space' or 'phot' will be the fastest way to draw this
+        profile, which should already be in image coordinates (with the flux in photons).
 
-            if prof.is_analytic_x:
-                added_photons = prof.drawReal(draw_image, add)
-            else:
-                added_photons = prof.drawFFT(draw_image, add)
+        This is how drawImage picks the method when method='fastest'.  The costs of each step
+        are taken from the _draw_costs dict.
 
-            if sensor is not None:
-                photons = PhotonArray.makeFromImage(draw_image, rng=rng)
-                for op in surface_ops:
-                    op.applyTo(photons, local_wcs)
-                if imview.dtype in (np.float32, np.float64):
-                    added_photons = sensor.accumulate(photons, imview, orig_center)
-                else:
-                    # Need a temporary
-                    im1 = ImageD(bounds=imview.bounds)
-                    added_photons = sensor.accumulate(photons, im1, orig_center)
-                    imview.array[:,:] += im1.array.astype(imview.dtype, copy=False)
+        @param bounds           The bounds of the image, or an undefined BoundsI if the image
+                                will be made with the profile's good image size.
+        @param n_photons        The n_photons parameter of drawImage. [default: 0.]
+        @param max_extra_noise  The max_extra_noise parameter of drawImage. [default: 0.]
 
-        image.added_flux = added_photons / flux_scale
-        if save_photons:
-            image.photons = photons
+        @returns the name of the method
+        """
+        from .convolve import Convolve, Convolution
+        from .transform import Transformation
+        from .box import Pixel
 
-        return image
+        # A real-space convolution can't be convolved by the pixel in real space as well.
+        orig = self
+        while isinstance(orig, Transformation): orig = orig.original
+        real_ok = self.is_analytic_x and not isinstance(orig, Convolution)
+
+        conv = Convolve(self, Pixel(scale=1.0, gsparams=self.gsparams), gsparams=self.gsparams)
+        if bounds.isDefined():
+            shape = bounds.numpyShape()
+            npix = shape[0] * shape[1]
+            image_N = max(shape) + 1
+        else:
+            image_N = conv.getGoodImageSize(1.0)
+            npix = image_N * image_N
+
+        costs = {}
+        # FFTs are not accurate for profiles with hard edges, so those should be drawn in
+        # real space when they can be (as they are by method='auto').
+        if not (real_ok and self.has_hard_edges):
+            N, Nk = conv._fft_sizes(image_N, 1.0)
+            if Nk <= self.gsparams.maximum_fft_size:
+                costs['fft'] = Nk * Nk * (_draw_costs['fft'] * np.log2(Nk) +
+                                          _draw_costs['kvalue'] / 2.)
+        if real_ok:
+            costs['real_space'] = npix * _draw_costs['real_space']
+        if n_photons != 0. or max_extra_noise > 0.:
+            if n_photons == 0.:
+                # The same number of photons that _calculate_nphotons would use.
+                n_photons = abs(self.flux)
+                if n_photons > 0.:
+                    eta = self.negative_flux / (self.positive_flux + self.negative_flux)
+                    n_photons /= (1.-2.*eta)**2 * (1. + max_extra_noise / self.max_sb)
+            costs['phot'] = n_photons * _draw_costs['photon']
+
+        for method in sorted(costs, key=costs.get):
+            # Some profiles (e.g. Deconvolution) can't be shot.  Check this from the structure of
+            # the profile, since shooting even one photon may need an expensive setup.
+            if method == 'phot' and not _can_shoot(self):
+                continue
+            return method
+        # If nothing works, then 'fft' will raise an appropriate error.
+        return 'fft'
 
     def drawReal(self, image, add_to_image=False):
         """
@@ -1787,21 +1974,41 @@ class GSObject(object):
         """
         from .bounds import _BoundsI
         from .image import ImageCD, ImageCF
-        # Start with what this profile thinks a good size would be given the image's pixel scale.
-        N = self.getGoodImageSize(image.scale)
-
         # We must make something big enough to cover the target image size:
         image_N = max(np.max(np.abs((image.bounds._getinitargs()))) * 2,
                       np.max(image.bounds.numpyShape()))
-        N = max(N, image_N)
+        N, Nk = self._fft_sizes(image_N, image.scale)
+
+        if Nk > self.gsparams.maximum_fft_size:
+            raise GalSimFFTSizeError("drawFFT requires an FFT that is too large.", Nk)
+
+        dk = 2.*np.pi / (N * image.scale)
+        bounds = _BoundsI(0,Nk//2,-Nk//2,Nk//2)
+        if image.dtype in (np.complex128, np.float64, np.int32, np.uint32):
+            kimage = ImageCD(bounds=bounds, scale=dk)
+        else:
+            kimage = ImageCF(bounds=bounds, scale=dk)
+        return kimage, N
+
+    def _fft_sizes(self, image_N, scale):
+        """Get the sizes drawFFT uses for the real-space and k-space images.
+
+        @param image_N      The size needed to cover the target image.
+        @param scale        The pixel scale of the target image.
+
+        @returns (N, Nk), where Nk is larger than N if the k-space image needs to be wrapped.
+        """
+        from .image import Image
+        # Start with what this profile thinks a good size would be given the image's pixel scale.
+        N = max(self.getGoodImageSize(scale), image_N)
 
         # Round up to a good size for making FFTs:
-        N = image.good_fft_size(N)
+        N = Image.good_fft_size(N)
 
         # Make sure we hit the minimum size specified in the gsparams.
         N = max(N, self.gsparams.minimum_fft_size)
 
-        dk = 2.*np.pi / (N * image.scale)
+        dk = 2.*np.pi / (N * scale)
 
         maxk = self.maxk
         if N*dk/2 > maxk:
@@ -1809,16 +2016,7 @@ class GSObject(object):
         else:
             # There will be aliasing.  Make a larger image and then wrap it.
             Nk = int(np.ceil(maxk/dk)) * 2
-
-        if Nk > self.gsparams.maximum_fft_size:
-            raise GalSimFFTSizeError("drawFFT requires an FFT that is too large.", Nk)
-
-        bounds = _BoundsI(0,Nk//2,-Nk//2,Nk//2)
-        if image.dtype in (np.complex128, np.float64, np.int32, np.uint32):
-            kimage = ImageCD(bounds=bounds, scale=dk)
-        else:
-            kimage = ImageCF(bounds=bounds, scale=dk)
-        return kimage, N
+        return N, Nk
 
     def drawFFT_finish(self, image, kimage, wrap_size, add_to_image):
         """
@@ -2011,7 +2209,7 @@ class GSObject(object):
     def drawPhot(self, image, gain=1., add_to_image=False,
                  n_photons=0, rng=None, max_extra_noise=0., poisson_flux=None,
                  sensor=None, surface_ops=(), maxN=None, orig_center=PositionI(0,0),
-                 local_wcs=None):
+                 local_wcs=None, photon_dtype=np.float64):
         """
         Draw this profile into an Image by shooting photons.
 
@@ -2072,6 +2270,14 @@ class GSObject(object):
         @param orig_center  The position of the image center in the original image coordinates.
                             [default: (0,0)]
         @param local_wcs    The local wcs in the original image. [default: None]
+        @param photon_dtype The type of the arrays in the PhotonArrays. [default: np.float64]
+
+        If more than 10^6 photons are needed, galsim.get_num_threads() > 1, and the sensor is a
+        plain Sensor with no `surface_ops`, then the photons are shot in chunks of 10^6 (or
+        `maxN` if that is smaller).  Each chunk uses its own random number generator, seeded
+        from `rng`, so the chunks can be shot in several threads (cf. galsim.set_num_threads).
+        The resulting image is the same for any number of threads > 1, except for rounding
+        errors.  With a single thread, the photons are all shot from `rng` as usual.
 
         @returns (nphotons, photons) where
             nphotons is the total flux of photons that landed inside the image bounds, and
@@ -2079,6 +2285,7 @@ class GSObject(object):
         """
         from .sensor import Sensor
         from .image import ImageD
+        from .utilities import get_num_threads
         # Make sure the type of n_photons is correct and has a valid value:
         if n_photons < 0.:
             raise GalSimRangeError("Invalid n_photons < 0.", n_photons, 0., None)
@@ -2115,31 +2322,18 @@ class GSObject(object):
 
         if not add_to_image: image.setZero()
 
-        # Nleft is the number of photons remaining to shoot.
-        Nleft = Ntot
-        photons = None  # Just in case Nleft is already 0.
-        resume = False
-        while Nleft > 0:
-            # Shoot at most maxN at a time
-            thisN = min(maxN, Nleft)
-
-            try:
-                photons = self.shoot(thisN, rng)
-            except (GalSimError, NotImplementedError) as e:
-                raise GalSimNotImplementedError(
-                        "Unable to draw this GSObject with photon shooting.  Perhaps it "
-                        "is a Deconvolve or is a compound including one or more "
-                        "Deconvolve objects.\nOriginal error: %r"%(e))
-
-            if g != 1. or thisN != Ntot:
-                photons.scaleFlux(g * thisN / Ntot)
-
-            if image.scale != 1.:
-                photons.scaleXY(1./image.scale)  # Convert x,y to image coords if necessary
-
-            for op in surface_ops:
-                op.applyTo(photons, local_wcs)
+        # When using several threads, bright objects with a plain Sensor are shot in chunks,
+        # each with its own rng.  Silicon sensors and surface_ops need the photons in order, so
+        # those are always done serially, as is everything when using a single thread.
+        if (Ntot > _photon_chunk_size and get_num_threads() > 1 and
+                type(sensor) is Sensor and len(surface_ops) == 0):
+            return self._drawPhotChunks(image, Ntot, g, rng, min(maxN, _photon_chunk_size),
+                                        photon_dtype)
 
+        photons = None  # Just in case Ntot is 0.
+        resume = False
+        for photons in self._photonBatches(Ntot, maxN, rng, g, 1./image.scale,
+                                           surface_ops, local_wcs, photon_dtype):
             if image.dtype in (np.float32, np.float64):
                 added_flux += sensor.accumulate(photons, image, orig_center, resume=resume)
                 resume = True  # Resume from this point if there are any further iterations.
@@ -2149,12 +2343,148 @@ class GSObject(object):
                 added_flux += sensor.accumulate(photons, im1, orig_center)
                 image.array[:,:] += im1.array.astype(image.dtype, copy=False)
 
+        return added_flux, photons
+
+    def _photonBatches(self, Ntot, maxN, rng, flux_scale, xy_scale, surface_ops, local_wcs,
+                       dtype):
+        # Shoot Ntot photons, at most maxN at a time, and yield each batch after scaling the
+        # fluxes (so the total is flux_scale times the flux) and the positions and applying
+        # the surface_ops.  Only one batch is in memory at a time.
+        from .photon_array import PhotonOpList
+        Nleft = Ntot
+        while Nleft > 0:
+            thisN = min(maxN, Nleft)
+
+            photons = self._shootForDraw(thisN, rng, dtype)
+
+            if flux_scale != 1. or thisN != Ntot:
+                photons.scaleFlux(flux_scale * thisN / Ntot)
+
+            if xy_scale != 1.:
+                photons.scaleXY(xy_scale)  # Convert x,y to image coords if necessary
+
+            if len(surface_ops) > 0:
+                PhotonOpList(surface_ops).applyTo(photons, local_wcs)
+
             Nleft -= thisN
+            yield photons
 
-        return added_flux, photons
+    def shootBatches(self, n_photons, max_batch, rng=None, surface_ops=(), local_wcs=None,
+                     dtype=np.float64):
+        """Shoot photons in batches of at most `max_batch` photons.
+
+        This is a generator, which shoots each batch of photons when it is needed, so only one
+        batch is in memory at a time.  This lets you process (or write out) the photons for very
+        bright objects without ever having them all in memory at once.  E.g.
+
+            >>> for k, photons in enumerate(obj.shootBatches(10**9, 10**6, rng=rng)):
+            ...     photons.write('photons_%d.fits'%k)
+
+        The fluxes of each batch are scaled so that the total flux of all the batches is the
+        flux of the profile, so the batches together are equivalent to `shoot(n_photons)`.
+
+        @param n_photons    The total number of photons to shoot.
+        @param max_batch    The maximum number of photons in each batch.
+        @param rng          If provided, a random number generator to use for photon shooting,
+                            which may be any kind of BaseDeviate object.  If `rng` is None, one
+                            will be automatically created, using the time as a seed.
+                            [default: None]
+        @param surface_ops  A list of operators to apply in order to each batch of photons.
+                            [default: ()]
+        @param local_wcs    The local wcs to pass to the surface_ops. [default: None]
+        @param dtype        The type of the arrays in the PhotonArrays. [default: np.float64]
+
+        @returns a generator of PhotonArrays.
+        """
+        from .random import BaseDeviate
+        n_photons = int(n_photons)
+        max_batch = int(max_batch)
+        if n_photons < 0:
+            raise GalSimRangeError("Invalid n_photons < 0.", n_photons, 0)
+        if max_batch <= 0:
+            raise GalSimRangeError("Invalid max_batch <= 0.", max_batch, 1)
+        if rng is None:
+            rng = BaseDeviate()
+        return self._photonBatches(n_photons, max_batch, rng, 1., 1., surface_ops, local_wcs,
+                                   dtype)
+
+    def _drawPhotChunks(self, image, Ntot, g, rng, chunk_size, dtype=np.float64):
+        """Shoot Ntot photons in chunks of chunk_size, using get_num_threads() threads.
+
+        Each chunk uses its own BaseDeviate, seeded from rng, so the photons do not depend on
+        the number of threads.  Each thread adds its photons to its own ImageD, and these are
+        added to the image at the end.
+
+        @returns (nphotons, photons) as for drawPhot.  photons is the last chunk shot.
+        """
+        from .random import BaseDeviate
+        from .image import ImageD
+        from .utilities import get_num_threads
+        import threading
 
+        if rng is None:
+            rng = BaseDeviate()
+        nchunks = (Ntot + chunk_size - 1) // chunk_size
+        # Seeds of 0 would mean to use the time, so make sure they are all > 0.  (And < 2^31,
+        # so they fit in a long on all systems.)
+        seeds = [ rng.raw() % 0x7fffffff + 1 for k in range(nchunks) ]
+        nthreads = min(get_num_threads(), nchunks-1)
+
+        buffers = [ ImageD(bounds=image.bounds) for i in range(nthreads) ]
+        results = [ (0., None) ] * nthreads
+        errors = [ None ] * nthreads
+
+        def shoot_chunk(k, buffer):
+            thisN = min(chunk_size, Ntot - k * chunk_size)
+            photons = self._shootForDraw(thisN, BaseDeviate(seeds[k]), dtype)
+            photons.scaleFlux(g * thisN / Ntot)
+            if image.scale != 1.:
+                photons.scaleXY(1./image.scale)  # Convert x,y to image coords if necessary
+            return photons.addTo(buffer), photons
 
-    def shoot(self, n_photons, rng=None):
+        def shoot_chunks(i):
+            # Thread i shoots chunks i+1, i+1+nthreads, ...
+            try:
+                added_flux = 0.
+                photons = None
+                for k in range(i+1, nchunks, nthreads):
+                    flux, photons = shoot_chunk(k, buffers[i])
+                    added_flux += flux
+                results[i] = (added_flux, photons)
+            except Exception as e:
+                errors[i] = e
+
+        # Shoot the first chunk in this thread, so any lazily built attributes of the profile
+        # are made before the other threads start.
+        added_flux, _ = shoot_chunk(0, buffers[0])
+
+        threads = [ threading.Thread(target=shoot_chunks, args=(i,)) for i in range(1,nthreads) ]
+        for t in threads: t.start()
+        shoot_chunks(0)
+        for t in threads: t.join()
+        for e in errors:
+            if e is not None: raise e
+
+        for flux, _ in results:
+            added_flux += flux
+        for buffer in buffers[1:]:
+            buffers[0].array[:,:] += buffer.array
+        image.array[:,:] += buffers[0].array.astype(image.dtype, copy=False)
+
+        # Return the last chunk's photons, which were shot by thread (nchunks-2) % nthreads.
+        return added_flux, results[(nchunks-2) % nthreads][1]
+
+    def _shootForDraw(self, n_photons, rng, dtype=np.float64):
+        # Shoot photons for drawPhot, with a more helpful error message if that isn't possible.
+        try:
+            return self.shoot(n_photons, rng, dtype)
+        except (GalSimError, NotImplementedError) as e:
+            raise GalSimNotImplementedError(
+                    "Unable to draw this GSObject with photon shooting.  Perhaps it "
+                    "is a Deconvolve or is a compound including one or more "
+                    "Deconvolve objects.\nOriginal error: %r"%(e))
+
+    def shoot(self, n_photons, rng=None, dtype=np.float64):
         """Shoot photons into a PhotonArray.
 
         @param n_photons    The number of photons to use for photon shooting.
@@ -2162,13 +2492,15 @@ class GSObject(object):
                             which may be any kind of BaseDeviate object.  If `rng` is None, one
                             will be automatically created, using the time as a seed.
                             [default: None]
+        @param dtype        The type of the arrays in the PhotonArray, either np.float64 or
+                            np.float32. [default: np.float64]
 
         @returns PhotonArray.
         """
         from .random import BaseDeviate
         from .photon_array import PhotonArray
 
-        photons = PhotonArray(n_photons)
+        photons = PhotonArray(n_photons, dtype=dtype)
         if n_photons == 0:
             # It's ok to shoot 0, but downstream can have problems with it, so just stop now.
             return photons
@@ -2313,3 +2645,233 @@ class GSObject(object):
 
     # Derived classes should define the __eq__ function
     def __ne__(self, other): return not self.__eq__(other)
+
+
+def _can_shoot(prof):
+    """Check whether a profile can be drawn with photon shooting, without shooting any photons.
+
+    A profile can be shot if its class implements _shoot, and all of its components can be shot.
+    The only other exception is an InterpolatedImage using a SincInterpolant.
+    """
+    from .sum import Sum
+    from .convolve import Convolution, AutoConvolution, AutoCorrelation
+    from .transform import Transformation
+    from .interpolatedimage import InterpolatedImage
+    from .interpolant import SincInterpolant
+    if isinstance(prof, Transformation):
+        return _can_shoot(prof.original)
+    elif isinstance(prof, (AutoConvolution, AutoCorrelation)):
+        return _can_shoot(prof.orig_obj)
+    elif isinstance(prof, (Sum, Convolution)):
+        return all(_can_shoot(obj) for obj in prof.obj_list)
+    elif isinstance(prof, InterpolatedImage):
+        return not isinstance(prof.x_interpolant, SincInterpolant)
+    else:
+        # Use the first class in the mro that defines _shoot.  The GSObject one just raises.
+        for cls in type(prof).__mro__:
+            if '_shoot' in cls.__dict__:
+                return cls is not GSObject
+        return False  # pragma: no cover  (GSObject defines _shoot)
+
+def _parse_xy_arrays(x, y, xname, yname):
+    # Convert x and y to contiguous float64 arrays of the same shape for xValueArray and
+    # kValueArray.
+    x = np.ascontiguousarray(x, dtype=float)
+    y = np.ascontiguousarray(y, dtype=float)
+    if x.shape != y.shape:
+        raise GalSimIncompatibleValuesError(
+            "%s and %s must have the same shape"%(xname, yname), **{xname:x, yname:y})
+    return x, y
+
+def _sbp_xValues(sbp, x, y):
+    # Calculate sbp.xValue at each position in a single C++ call.
+    val = np.empty(len(x), dtype=float)
+    sbp.xValues(x.ctypes.data, y.ctypes.data, val.ctypes.data, len(x))
+    return val
+
+def _sbp_kValues(sbp, kx, ky):
+    # Calculate sbp.kValue at each position in a single C++ call.
+    val = np.empty(len(kx), dtype=complex)
+    sbp.kValues(kx.ctypes.data, ky.ctypes.data, val.ctypes.data, len(kx))
+    return val
+
+
+# The method codes for the C++ DrawMany function.
+_draw_many_methods = { 'no_pixel' : 0, 'sb' : 0, 'auto' : 1, 'fft' : 2, 'real_space' : 3 }
+
+def drawImages(objs, images, offsets=None, wcs=None, method='auto', **kwargs):
+    """Draw each of a list of profiles onto the corresponding image.
+
+    This is equivalent to
+
+        >>> for obj, image, offset in zip(objs, images, offsets):
+        ...     obj.drawImage(image, offset=offset, wcs=wcs, method=method, **kwargs)
+
+    but it is faster for large numbers of small profiles.  The profiles are transformed to
+    image coordinates, convolved by the pixel (if appropriate for the method), and drawn
+    either in real space or with an FFT all in a single C++ call, without the Python overhead
+    for each one.  The GIL is released during that call, and the images are shared among
+    galsim.get_num_threads() threads.  The results are the same as drawImage, up to rounding
+    errors in the last few digits.
+
+    This fast path has some limits.  The following are instead drawn one at a time with
+    drawImage:
+
+    - Any image that is not float32 or float64, is not contiguous, or has undefined bounds.
+    - Any image whose wcs is not uniform or is not equivalent to a PixelScale or JacobianWCS
+      (e.g. a ShearWCS), or that has no wcs at all.
+    - Everything if `add_to_image=True`, method='phot' or 'fastest', a sensor is given, or
+      there are other kwargs besides `area`, `exptime`, `gain`, `use_true_center` and `dtype`.
+    - Any profile for which drawImage would emit a warning (e.g. a Convolution that already
+      includes a Pixel with method='auto') or raise an exception (e.g. an FFT that is too
+      large).
+
+    The images are drawn in several threads only if none of the profiles is an InterpolatedImage
+    (which is not safe to draw from several threads at once) and none of the images share any
+    pixels.  Otherwise they are drawn in order in a single thread, so where images overlap, the
+    later one wins, as with drawImage.  This is also true when some of the profiles in the batch
+    need to be drawn with drawImage (cf. above).
+
+    @param objs         A list of GSObjects to draw.
+    @param images       A list of images on which to draw them, e.g. postage stamps or
+                        subimages of a larger image.  Any of them with undefined bounds will be
+                        resized appropriately, as in drawImage.
+    @param offsets      An optional list of offsets to use for each profile. (cf. the `offset`
+                        parameter of drawImage) [default: None]
+    @param wcs          Either a single wcs to use for all the images or a list with one for each
+                        image. [default: None, which means to use each image's own wcs]
+    @param method       Which method to use for rendering the images. [default: 'auto']
+    @param **kwargs     Any other keyword arguments are passed to drawImage.  These are the same
+                        for all the images.
+
+    @returns the list of drawn images.
+    """
+    from .image import Image
+    from .wcs import BaseWCS, PixelScale, JacobianWCS
+    from .convolve import Convolution
+    from .box import Pixel
+
+    images = list(images)
+    if len(objs) != len(images):
+        raise GalSimIncompatibleValuesError(
+            "objs and images must have the same length", objs=objs, images=images)
+    if offsets is None:
+        offsets = [None] * len(objs)
+    elif len(offsets) != len(objs):
+        raise GalSimIncompatibleValuesError(
+            "offsets must have the same length as objs", objs=objs, offsets=offsets)
+    if wcs is None or isinstance(wcs, BaseWCS):
+        wcs = [wcs] * len(objs)
+    elif len(wcs) != len(objs):
+        raise GalSimIncompatibleValuesError(
+            "wcs must have the same length as objs", objs=objs, wcs=wcs)
+    for k in ('image', 'offset', 'nx', 'ny', 'bounds'):
+        if k in kwargs:
+            raise TypeError("drawImages got an unexpected keyword argument %r"%k)
+    if kwargs.pop('setup_only', False):
+        return [ obj.drawImage(image, offset=offset, wcs=w, method=method, setup_only=True,
+                               **kwargs)
+                 for obj, image, offset, w in zip(objs, images, offsets, wcs) ]
+    if kwargs.get('sensor', None) is None:
+        kwargs.pop('n_subsample', None)  # Only relevant with a sensor.
+        kwargs.pop('photon_dtype', None)
+
+    area = kwargs.get('area', 1.)
+    exptime = kwargs.get('exptime', 1.)
+    gain = kwargs.get('gain', 1.)
+    use_true_center = kwargs.get('use_true_center', True)
+    image_dtype = kwargs.get('dtype', None)
+    fast = (method in _draw_many_methods and not kwargs.get('add_to_image', False) and
+            set(kwargs) <= set(('area', 'exptime', 'gain', 'use_true_center', 'dtype',
+                                'add_to_image')) and
+            area > 0. and exptime > 0. and gain > 0.)
+
+    # The parameters for DrawMany for each distinct wcs, keyed by id.
+    wcs_params = {}
+    def get_wcs_params(w):
+        if id(w) not in wcs_params:
+            params = None
+            if w.isUniform() and not (w.isPixelScale() and w.scale <= 0):
+                local_wcs = w.local()
+                # The same flux scaling as _setup_draw_image and _profileToImage.
+                flux_scale = area * exptime
+                if method == 'sb':
+                    flux_scale /= local_wcs.pixelArea()
+                if gain != 1:
+                    flux_scale /= gain
+                if type(local_wcs) is PixelScale:
+                    s = local_wcs.scale
+                    params = (1./s, 0., 0., 1./s, s**2 * flux_scale, flux_scale)
+                elif type(local_wcs) is JacobianWCS:
+                    dudx, dudy, dvdx, dvdy = local_wcs.getMatrix().ravel()
+                    det = local_wcs._det
+                    params = (dvdy/det, -dudy/det, -dvdx/det, dudx/det,
+                              flux_scale * local_wcs.pixelArea(), flux_scale)
+            wcs_params[id(w)] = (w, params)
+        return wcs_params[id(w)][1]
+
+    # The profiles that can be drawn in a single C++ call, keyed by dtype.
+    batch = { np.float32 : [], np.float64 : [] }
+    method_code = _draw_many_methods.get(method, 0)
+
+    def draw_slow(k):
+        images[k] = objs[k].drawImage(images[k], offset=offsets[k], wcs=wcs[k], method=method,
+                                      **kwargs)
+
+    def draw_batch():
+        for dtype, draw_func in ((np.float32, _galsim.DrawManyF),
+                                 (np.float64, _galsim.DrawManyD)):
+            if len(batch[dtype]) == 0: continue
+            params = np.array([ b[3] for b in batch[dtype] ], dtype=float)
+            status = np.zeros(len(batch[dtype]), dtype=np.intc)
+            sums = np.zeros(len(batch[dtype]), dtype=float)
+            with convert_cpp_errors():
+                draw_func([ b[1] for b in batch[dtype] ], [ b[2] for b in batch[dtype] ],
+                          params.ctypes.data, method_code, bool(use_true_center),
+                          status.ctypes.data, sums.ctypes.data)
+            # The ones with status 0 need to be drawn with drawImage, after the others.  So if
+            # any of the later images overlap one of those, they are drawn again to keep the
+            # order of the overlapping images the same as drawing them one at a time.
+            redrawn = []
+            for (k, _, _, _, flux_scale), st, added_photons in zip(batch[dtype], status, sums):
+                if st == 0 or any([ np.may_share_memory(images[k].array, images[j].array)
+                                    for j in redrawn ]):
+                    # drawImage will emit the appropriate warning or exception.
+                    draw_slow(k)
+                    redrawn.append(k)
+                    continue
+                image = images[k]
+                image.added_flux = added_photons / flux_scale
+                if method == 'auto':
+                    image.draw_method = 'real_space' if st == 1 else 'fft'
+                else:
+                    image.draw_method = method
+            del batch[dtype][:]
+
+    for k, (obj, image, offset, w) in enumerate(zip(objs, images, offsets, wcs)):
+        if image is not None and not isinstance(image, Image):
+            raise TypeError("image is not an Image instance", image)
+        if w is None and image is not None:
+            w = image.wcs
+        params = None
+        if (fast and image is not None and image.bounds.isDefined() and
+                image.dtype in batch and image.iscontiguous and
+                (image_dtype is None or image_dtype == image.dtype) and
+                isinstance(obj, GSObject) and isinstance(w, BaseWCS)):
+            params = get_wcs_params(w)
+            if (method == 'auto' and isinstance(obj, Convolution) and
+                    any([ isinstance(o, Pixel) for o in obj.obj_list ])):
+                params = None  # drawImage warns about this.
+        if params is None:
+            # Draw the ones before this first, in case the images overlap.
+            draw_batch()
+            draw_slow(k)
+            continue
+        obj._prepareDraw()
+        offset = obj._parse_offset(offset)
+        image.wcs = w
+        batch[image.dtype].append((k, obj._sbp, image._image,
+                                   params[:4] + (offset.x, offset.y, params[4]), params[5]))
+    draw_batch()
+
+    return images
@@ -19,7 +19,7 @@
 import math
 
 from . import _galsim
-from .gsobject import GSObject
+from .gsobject import GSObject, _sbp_kValues
 from .gsparams import GSParams
 from .utilities import lazy_property, doc_inherit
 from .exponential import Exponential
@@ -210,6 +210,10 @@ class InclinedExponential(GSObject):
     def _kValue(self, kpos):
         return self._sbp.kValue(kpos._p)
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        return _sbp_kValues(self._sbp, kx, ky)
+
     @doc_inherit
     def _drawKImage(self, image):
         self._sbp.drawK(image._image, image.scale)
@@ -451,6 +455,10 @@ class InclinedSersic(GSObject):
     def _kValue(self, kpos):
         return self._sbp.kValue(kpos._p)
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        return _sbp_kValues(self._sbp, kx, ky)
+
     @doc_inherit
     def _drawKImage(self, image):
         self._sbp.drawK(image._image, image.scale)
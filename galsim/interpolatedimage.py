@@ -24,7 +24,7 @@ from past.builtins import basestring
 import numpy as np
 import math
 
-from .gsobject import GSObject
+from .gsobject import GSObject, _sbp_xValues, _sbp_kValues
 from .gsparams import GSParams
 from .image import Image
 from .bounds import _BoundsI
@@ -680,10 +680,18 @@ class InterpolatedImage(GSObject):
     def _xValue(self, pos):
         return self._sbp.xValue(pos._p)
 
+    @doc_inherit
+    def _xValueArray(self, x, y):
+        return _sbp_xValues(self._sbp, x, y)
+
     @doc_inherit
     def _kValue(self, kpos):
         return self._sbp.kValue(kpos._p)
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        return _sbp_kValues(self._sbp, kx, ky)
+
     @doc_inherit
     def _shoot(self, photons, rng):
         with convert_cpp_errors():
@@ -1028,6 +1036,10 @@ class InterpolatedKImage(GSObject):
     def _kValue(self, kpos):
         return self._sbp.kValue(kpos._p)
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        return _sbp_kValues(self._sbp, kx, ky)
+
     @doc_inherit
     def _drawKImage(self, image):
         self._sbp.drawK(image._image, image.scale)
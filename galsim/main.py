@@ -79,6 +79,29 @@ def parse_args():
             '-x', '--except_abort', action='store_const', default=False, const=True,
             help='abort the whole job whenever any file raises an exception rather than '
                  'continuing on')
+        parser.add_argument(
+            '-r', '--resume', action='store_const', default=False, const=True,
+            help='skip any files that were already built by a previous run with the same '
+                 'config, according to the manifest file written by that run')
+        parser.add_argument(
+            '-s', '--stats', type=str, action='store', default=None,
+            help='filename for writing the time taken by each stage of the processing, '
+                 'along with some relevant sizes. The format is csv if the filename ends '
+                 'in .csv, and json otherwise [default is to not record these]')
+        parser.add_argument(
+            '--pool', action='store_const', default=False, const=True,
+            help='use the same worker processes for all the multiprocessing in all the config '
+                 'documents.  This is the default if image.nproc or output.nproc is set to '
+                 'anything other than 1 in any of them (or on the command line)')
+        parser.add_argument(
+            '--serve', type=str, action='store', default=None,
+            help='serve the files to be built to worker processes that connect to this address '
+                 '(host:port), rather than building them here.  The host defaults to 127.0.0.1. '
+                 'A secret key must be given in the GALSIM_SERVE_AUTHKEY environment variable')
+        parser.add_argument(
+            '--connect', type=str, action='store', default=None,
+            help='build the files served by another galsim process at this address (host:port) '
+                 'until there are none left.  Uses the secret key in GALSIM_SERVE_AUTHKEY')
         parser.add_argument(
             '--version', action='store_const', default=False, const=True,
             help='show the version of GalSim')
@@ -132,6 +155,29 @@ def parse_args():
             '-x', '--except_abort', action='store_const', default=False, const=True,
             help='abort the whole job whenever any file raises an exception rather than '
                  'just reporting the exception and continuing on')
+        parser.add_option(
+            '-r', '--resume', action='store_const', default=False, const=True,
+            help='skip any files that were already built by a previous run with the same '
+                 'config, according to the manifest file written by that run')
+        parser.add_option(
+            '-s', '--stats', type=str, action='store', default=None,
+            help='filename for writing the time taken by each stage of the processing, '
+                 'along with some relevant sizes. The format is csv if the filename ends '
+                 'in .csv, and json otherwise [default is to not record these]')
+        parser.add_option(
+            '--pool', action='store_const', default=False, const=True,
+            help='use the same worker processes for all the multiprocessing in all the config '
+                 'documents.  This is the default if image.nproc or output.nproc is set to '
+                 'anything other than 1 in any of them (or on the command line)')
+        parser.add_option(
+            '--serve', type=str, action='store', default=None,
+            help='serve the files to be built to worker processes that connect to this address '
+                 '(host:port), rather than building them here.  The host defaults to 127.0.0.1. '
+                 'A secret key must be given in the GALSIM_SERVE_AUTHKEY environment variable')
+        parser.add_option(
+            '--connect', type=str, action='store', default=None,
+            help='build the files served by another galsim process at this address (host:port) '
+                 'until there are none left.  Uses the secret key in GALSIM_SERVE_AUTHKEY')
         parser.add_option(
             '--version', action='store_const', default=False, const=True,
             help='show the version of GalSim')
@@ -188,8 +234,23 @@ def AddModules(config, modules):
         else:
             config['modules'].extend(modules)
 
+def UsesMultiprocessing(config, new_params):
+    """Check whether the processing of a config document may use multiple processes.
+
+    This is True if image.nproc or output.nproc is set to anything other than 1, either in the
+    config dict or in the new_params from the command line.  Other ways of setting these
+    (e.g. in a template) are not checked.
+    """
+    for key, value in new_params.items():
+        if key in ['image.nproc', 'output.nproc'] and value != 1:
+            return True
+    for field in ['image', 'output']:
+        if isinstance(config.get(field), dict) and config[field].get('nproc', 1) != 1:
+            return True
+    return False
+
 def main():
-    from .config import ReadConfig, Process
+    from .config import ReadConfig, Process, WorkerPool, ConfigStats
 
     args = parse_args()
 
@@ -199,6 +260,8 @@ def main():
         raise GalSimRangeError("Invalid job number.  Must be >= 1", args.job, 1, args.njobs)
     if args.job > args.njobs:
         raise GalSimRangeError("Invalid job number.  Must be <= njobs",args.job, 1, args.njobs)
+    if args.serve and args.connect:
+        raise GalSimValueError("Cannot use both --serve and --connect", args.connect)
 
     # Parse the integer verbosity level from the command line args into a logging_level string
     logging_levels = { 0: logging.CRITICAL, 
@@ -224,6 +287,14 @@ def main():
     all_config = ReadConfig(args.config_file, args.file_type, logger)
     logger.debug('Successfully read in config file.')
 
+    # If any of the config documents use multiple processes (or --pool is given), use the same
+    # worker processes for all of them, rather than starting new ones for each round of
+    # multiprocessing.
+    pool = None
+
+    # If requested, record the time taken by each stage for all the config documents together.
+    stats = ConfigStats() if args.stats else None
+
     # Process each config document
     for config in all_config:
 
@@ -236,6 +307,9 @@ def main():
         # Add modules to the config['modules'] list
         AddModules(config, args.module)
 
+        if pool is None and (args.pool or UsesMultiprocessing(config, new_params)):
+            pool = WorkerPool(logger=logger)
+
         # Profiling doesn't work well with multiple processes.  We'll need to separately
         # enable profiling withing the workers and output when the process ends.  Set
         # config['profile'] = True to enable this.
@@ -245,8 +319,22 @@ def main():
         logger.debug("Process config dict: \n%s", pprint.pformat(config))
 
         # Process the configuration
-        Process(config, logger, njobs=args.njobs, job=args.job, new_params=new_params,
-                except_abort=args.except_abort)
+        try:
+            Process(config, logger, njobs=args.njobs, job=args.job, new_params=new_params,
+                    except_abort=args.except_abort, pool=pool, resume=args.resume, stats=stats,
+                    serve=args.serve, connect=args.connect)
+        except:
+            if pool is not None:
+                pool.terminate()
+            raise
+
+    if pool is not None:
+        pool.close()
+
+    if stats is not None:
+        logger.info('Time taken by each stage:\n%s', stats.summary())
+        stats.write(args.stats)
+        logger.warning('Wrote stats for each stage to %s', args.stats)
 
     if args.profile:
         # cf. example code here: https://docs.python.org/2/library/profile.html
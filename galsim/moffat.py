@@ -20,7 +20,7 @@ import numpy as np
 import math
 
 from . import _galsim
-from .gsobject import GSObject
+from .gsobject import GSObject, _sbp_xValues, _sbp_kValues
 from .gsparams import GSParams
 from .utilities import lazy_property, doc_inherit
 from .position import PositionD
@@ -209,10 +209,18 @@ class Moffat(GSObject):
     def _xValue(self, pos):
         return self._sbp.xValue(pos._p)
 
+    @doc_inherit
+    def _xValueArray(self, x, y):
+        return _sbp_xValues(self._sbp, x, y)
+
     @doc_inherit
     def _kValue(self, kpos):
         return self._sbp.kValue(kpos._p)
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        return _sbp_kValues(self._sbp, kx, ky)
+
     @doc_inherit
     def _drawReal(self, image):
         self._sbp.draw(image._image, image.scale)
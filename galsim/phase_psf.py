@@ -1481,6 +1481,16 @@ class PhaseScreenPSF(GSObject):
         self._prepareDraw()
         return self._ii._kValue(kpos)
 
+    @doc_inherit
+    def _xValueArray(self, x, y):
+        self._prepareDraw()
+        return self._ii._xValueArray(x, y)
+
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        self._prepareDraw()
+        return self._ii._kValueArray(kx, ky)
+
     @doc_inherit
     def _drawReal(self, image):
         self._ii._drawReal(image)
@@ -1519,7 +1529,7 @@ class PhaseScreenPSF(GSObject):
         photons.flux = self._flux / n_photons
 
         if self.second_kick:
-            p2 = PhotonArray(len(photons))
+            p2 = PhotonArray(len(photons), dtype=photons.dtype)
             self.second_kick._shoot(p2, rng)
             photons.convolve(p2, rng)
 
@@ -1952,6 +1962,14 @@ class OpticalPSF(GSObject):
     def _kValue(self, kpos):
         return self._psf._kValue(kpos)
 
+    @doc_inherit
+    def _xValueArray(self, x, y):
+        return self._psf._xValueArray(x, y)
+
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        return self._psf._kValueArray(kx, ky)
+
     @doc_inherit
     def _drawReal(self, image):
         self._psf._drawReal(image)
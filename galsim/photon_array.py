@@ -29,6 +29,10 @@ from .angle import radians, arcsec
 from .errors import GalSimError, GalSimRangeError, GalSimValueError, GalSimUndefinedBoundsError
 from .errors import GalSimIncompatibleValuesError, convert_cpp_errors
 
+# PhotonOpList applies its operators to this many photons at a time, which should be small
+# enough for the photons to stay in the cache.
+_photon_op_chunk_size = 4096
+
 # Add on more methods in the python layer
 
 class PhotonArray(object):
@@ -80,6 +84,12 @@ class PhotonArray(object):
     anything yet.  The constructor allocates space for the x,y,flux arrays, since those are always
     needed.  The other arrays are only allocated on demand if the user accesses these attributes.
 
+    The arrays are normally float64, but you may use `dtype=np.float32` to store them in single
+    precision.  This halves the memory needed for the photons (and the memory bandwidth used
+    when shooting them and adding them to an image), at the cost of only keeping about 7
+    significant digits in each value.  This is usually plenty for positions in pixels, but be
+    careful with very large images.
+
     @param N            The number of photons to store in this PhotonArray.  This value cannot be
                         changed.
     @param x            Optionally, the initial x values. [default: None]
@@ -88,13 +98,21 @@ class PhotonArray(object):
     @param dxdz         Optionally, the initial dxdz values. [default: None]
     @param dydz         Optionally, the initial dydz values. [default: None]
     @param wavelength   Optionally, the initial wavelength values. [default: None]
+    @param dtype        The type of the arrays, either np.float64 or np.float32.
+                        [default: np.float64]
     """
-    def __init__(self, N, x=None, y=None, flux=None, dxdz=None, dydz=None, wavelength=None):
+    _valid_dtypes = (np.float64, np.float32)
+
+    def __init__(self, N, x=None, y=None, flux=None, dxdz=None, dydz=None, wavelength=None,
+                 dtype=np.float64):
+        dtype = np.dtype(dtype).type
+        if dtype not in self._valid_dtypes:
+            raise GalSimValueError("Invalid dtype for PhotonArray", dtype, self._valid_dtypes)
         # Only x, y, flux are built by default, since these are always required.
         # The others we leave as None unless/until they are needed.
-        self._x = np.zeros(N, dtype=float)
-        self._y = np.zeros(N, dtype=float)
-        self._flux = np.zeros(N, dtype=float)
+        self._x = np.zeros(N, dtype=dtype)
+        self._y = np.zeros(N, dtype=dtype)
+        self._flux = np.zeros(N, dtype=dtype)
         self._dxdz = None
         self._dydz = None
         self._wave = None
@@ -114,6 +132,11 @@ class PhotonArray(object):
     def __len__(self):
         return len(self._x)
 
+    @property
+    def dtype(self):
+        """The type of the arrays, either np.float64 or np.float32."""
+        return self._x.dtype.type
+
     @property
     def x(self):
         return self._x
@@ -229,6 +252,8 @@ class PhotonArray(object):
             s += ", dxdz=array(%r), dydz=array(%r)"%(self.dxdz.tolist(), self.dydz.tolist())
         if self.hasAllocatedWavelengths():
             s += ", wavelength=array(%r)"%(self.wavelength.tolist())
+        if self.dtype != np.float64:
+            s += ", dtype=numpy.%s"%(self.dtype.__name__)
         s += ")"
         return s
 
@@ -248,6 +273,7 @@ class PhotonArray(object):
     def __eq__(self, other):
         return (
             isinstance(other, PhotonArray) and
+            self.dtype == other.dtype and
             np.array_equal(self.x,other.x) and
             np.array_equal(self.y,other.y) and
             np.array_equal(self.flux,other.flux) and
@@ -280,7 +306,7 @@ class PhotonArray(object):
             _wave = self._wave.ctypes.data
         with convert_cpp_errors():
             return _galsim.PhotonArray(int(self.size()), _x, _y, _flux, _dxdz, _dydz, _wave,
-                                       self._is_corr)
+                                       self._is_corr, self.dtype == np.float32)
 
     def addTo(self, image):
         """Add flux of photons to an image by binning into pixels.
@@ -300,7 +326,7 @@ class PhotonArray(object):
         return self._pa.addTo(image._image)
 
     @classmethod
-    def makeFromImage(cls, image, max_flux=1., rng=None):
+    def makeFromImage(cls, image, max_flux=1., rng=None, dtype=np.float64):
         """Turn an existing image into a PhotonArray that would accumulate into this image.
 
         The flux in each non-zero pixel will be turned into 1 or more photons with random positions
@@ -314,6 +340,7 @@ class PhotonArray(object):
         @param image        The image to turn into a PhotonArray
         @param max_flux     The maximum flux value to use for any output photon [default: 1]
         @param rng          A BaseDeviate to use for the random number generation [default: None]
+        @param dtype        The type of the arrays in the PhotonArray. [default: np.float64]
 
         @returns a PhotonArray
         """
@@ -325,7 +352,7 @@ class PhotonArray(object):
         # This goes a bit over what we actually need, but not by much.  Worth it to not have to
         # worry about array reallocations.
         N = int(np.prod(image.array.shape) + total_flux / max_flux)
-        photons = cls(N)
+        photons = cls(N, dtype=dtype)
 
         if rng is None:
             rng = BaseDeviate()
@@ -344,7 +371,7 @@ class PhotonArray(object):
         The output file will be a FITS binary table with a row for each photon in the PhotonArray.
         Columns will include 'id' (sequential from 1 to nphotons), 'x', 'y', and 'flux'.
         Additionally, the columns 'dxdz', 'dydz', and 'wavelength' will be included if they are
-        set for this PhotonArray object.
+        set for this PhotonArray object.  The columns are single precision if the PhotonArray is.
 
         The file can be read back in with the classmethod `PhotonArray.read`.
 
@@ -356,18 +383,19 @@ class PhotonArray(object):
         from ._pyfits import pyfits
         from . import fits
 
+        fmt = 'E' if self.dtype == np.float32 else 'D'
         cols = []
         cols.append(pyfits.Column(name='id', format='J', array=range(self.size())))
-        cols.append(pyfits.Column(name='x', format='D', array=self.x))
-        cols.append(pyfits.Column(name='y', format='D', array=self.y))
-        cols.append(pyfits.Column(name='flux', format='D', array=self.flux))
+        cols.append(pyfits.Column(name='x', format=fmt, array=self.x))
+        cols.append(pyfits.Column(name='y', format=fmt, array=self.y))
+        cols.append(pyfits.Column(name='flux', format=fmt, array=self.flux))
 
         if self.hasAllocatedAngles():
-            cols.append(pyfits.Column(name='dxdz', format='D', array=self.dxdz))
-            cols.append(pyfits.Column(name='dydz', format='D', array=self.dydz))
+            cols.append(pyfits.Column(name='dxdz', format=fmt, array=self.dxdz))
+            cols.append(pyfits.Column(name='dydz', format=fmt, array=self.dydz))
 
         if self.hasAllocatedWavelengths():
-            cols.append(pyfits.Column(name='wavelength', format='D', array=self.wavelength))
+            cols.append(pyfits.Column(name='wavelength', format=fmt, array=self.wavelength))
 
         cols = pyfits.ColDefs(cols)
         try:
@@ -394,7 +422,8 @@ class PhotonArray(object):
         N = len(data)
         names = data.columns.names
 
-        photons = cls(N, x=data['x'], y=data['y'], flux=data['flux'])
+        dtype = np.float32 if data['x'].dtype.itemsize == 4 else np.float64
+        photons = cls(N, x=data['x'], y=data['y'], flux=data['flux'], dtype=dtype)
         if 'dxdz' in names:
             photons.dxdz = data['dxdz']
             photons.dydz = data['dydz']
@@ -423,8 +452,13 @@ class WavelengthSampler(object):
 
     def applyTo(self, photon_array, local_wcs=None):
         """Assign wavelengths to the photons sampled from the SED * Bandpass."""
-        photon_array.wavelength = self.sed.sampleWavelength(
-                photon_array.size(), self.bandpass, rng=self.rng, npoints=self.npoints)
+        _applyNative([self._nativeOp(photon_array, local_wcs)], photon_array)
+
+    def _nativeOp(self, photon_array, local_wcs):
+        photon_array.allocateWavelengths()
+        dev = self.sed._get_deviate(self.bandpass, self.npoints)
+        return _galsim.WavelengthSamplerOp(dev._inverse_cdf._tab, 1.+self.sed.redshift,
+                                           self.rng._rng)
 
 class FRatioAngles(object):
     """A surface-layer operator that assigns photon directions based on the f/ratio and
@@ -456,35 +490,13 @@ class FRatioAngles(object):
 
     def applyTo(self, photon_array, local_wcs=None):
         """Assign directions to the photons in photon_array."""
+        _applyNative([self._nativeOp(photon_array, local_wcs)], photon_array)
 
-        dxdz = photon_array.dxdz
-        dydz = photon_array.dydz
-        n_photons = len(dxdz)
-
-        # The f/ratio is the ratio of the focal length to the diameter of the aperture of
-        # the telescope.  The angular radius of the field of view is defined by the
-        # ratio of the radius of the aperture to the focal length
-        pupil_angle = np.arctan(0.5 / self.fratio)  # radians
-        obscuration_angle = np.arctan(0.5 * self.obscuration / self.fratio)
-
-        # Generate azimuthal angles for the photons
-        phi = np.empty(n_photons)
-        self.ud.generate(phi)
-        phi *= (2 * np.pi)
-
-        # Generate inclination angles for the photons, which are uniform in sin(theta) between
-        # the sine of the obscuration angle and the sine of the pupil radius
-        sintheta = np.empty(n_photons)
-        self.ud.generate(sintheta)
-        sintheta = np.sin(obscuration_angle) + (np.sin(pupil_angle) - np.sin(obscuration_angle)) \
-            * sintheta
-
-        # Assign the directions to the arrays. In this class the convention for the
-        # zero of phi does not matter but it would if the obscuration is dependent on
-        # phi
-        tantheta = np.sqrt(np.square(sintheta) / (1. - np.square(sintheta)))
-        dxdz[:] = tantheta * np.sin(phi)
-        dydz[:] = tantheta * np.cos(phi)
+    def _nativeOp(self, photon_array, local_wcs):
+        # The convention for the zero of phi does not matter here, but it would if the
+        # obscuration were dependent on phi.
+        photon_array.allocateAngles()
+        return _galsim.FRatioAnglesOp(self.fratio, self.obscuration, self.ud._rng)
 
 class PhotonDCR(object):
     """A surface-layer operator that applies the effect of differential chromatic refraction (DCR)
@@ -568,6 +580,11 @@ class PhotonDCR(object):
     def applyTo(self, photon_array, local_wcs):
         """Apply the DCR effect to the photons
         """
+        native = self._nativeOp(photon_array, local_wcs)
+        if native is not None:
+            _applyNative([native], photon_array)
+            return
+
         from . import dcr
         if not photon_array.hasAllocatedWavelengths():
             raise GalSimError("PhotonDCR requires that wavelengths be set")
@@ -595,3 +612,100 @@ class PhotonDCR(object):
         dy = local_wcs._y(du, dv)
         photon_array.x += dx
         photon_array.y += dy
+
+    # The refraction is calculated from the current wavelengths when the native op is made.
+    _native_reads_photons = True
+
+    def _nativeOp(self, photon_array, local_wcs):
+        # The native version needs the shifts in image coordinates to be an affine function of
+        # the shifts in world coordinates.
+        from . import dcr
+        if local_wcs is None or not local_wcs.isUniform():
+            return None
+        if not photon_array.hasAllocatedWavelengths():
+            raise GalSimError("PhotonDCR requires that wavelengths be set")
+        x0 = local_wcs._x(0., 0.)
+        y0 = local_wcs._y(0., 0.)
+        affine = np.array([local_wcs._x(1., 0.) - x0, local_wcs._x(0., 1.) - x0,
+                           local_wcs._y(1., 0.) - y0, local_wcs._y(0., 1.) - y0,
+                           x0, y0], dtype=float)
+        refraction = dcr.get_refraction(photon_array.wavelength, self.zenith_angle, **self.kw)
+        refraction = np.ascontiguousarray(refraction, dtype=float)
+        sinp, cosp = self.parallactic_angle.sincos()
+        return _galsim.PhotonDCROp(
+                refraction.ctypes.data, len(refraction), self.base_refraction, sinp, cosp,
+                radians / self.scale_unit, self.base_wavelength, self.alpha,
+                affine.ctypes.data, local_wcs.origin.x, local_wcs.origin.y)
+
+def _applyNative(natives, photon_array, chunk_size=None):
+    # Apply a list of native operators to all the photons, chunk_size photons at a time.
+    n = len(photon_array)
+    if chunk_size is None:
+        chunk_size = max(n, 1)
+    ops = _galsim.PhotonOpList(chunk_size)
+    for native in natives:
+        ops.append(native)
+    with convert_cpp_errors():
+        ops.applyTo(photon_array._pa, 0, n)
+
+class PhotonOpList(object):
+    """A list of surface operators (such as WavelengthSampler, FRatioAngles and PhotonDCR) that
+    are applied together in a single pass over the photons.
+
+    Rather than each operator making its own pass over all the photons (with numpy temporaries
+    for each step), the photons are split into chunks that are small enough to stay in the
+    cache, and all the operators are applied in order to each chunk before moving on to the next
+    one.  The built-in operators are applied to each chunk in C++, without going back to
+    Python.  drawImage does this automatically with its `surface_ops`, but you can also use a
+    PhotonOpList yourself wherever a single surface operator is allowed.
+
+    Other operators that follow the same interface (i.e. have a method
+    `applyTo(photon_array, local_wcs)`) may be included in the list too.  These are applied to
+    all the photons at once, after the operators before them in the list have finished.  An
+    operator may also provide a native implementation by defining a method
+    `_nativeOp(photon_array, local_wcs)` that allocates any arrays it needs in the photon_array
+    and returns a C++ PhotonOp (or None to use its applyTo method instead).  If making the
+    native op needs the current values in the photon_array, the class should also set
+    `_native_reads_photons = True`.
+
+    The operators draw their random numbers in the same order as when they are applied one at a
+    time, so the results are the same as applying each operator to all the photons in turn, for
+    any chunk size.
+
+    @param ops          A list of surface operators.
+    @param chunk_size   The number of photons to process at a time. [default: 4096]
+    """
+    def __init__(self, ops, chunk_size=None):
+        self.ops = []
+        for op in ops:
+            if isinstance(op, PhotonOpList):
+                self.ops.extend(op.ops)
+            else:
+                self.ops.append(op)
+        self.chunk_size = int(chunk_size) if chunk_size is not None else _photon_op_chunk_size
+        if self.chunk_size <= 0:
+            raise GalSimRangeError("chunk_size must be positive", chunk_size, 1)
+
+    def applyTo(self, photon_array, local_wcs=None):
+        """Apply all the operators to the photons in photon_array."""
+        # Collect consecutive operators that have native implementations into a single native
+        # PhotonOpList.  This is flushed before any operator that needs to see the photons
+        # as they are at that point in the list.
+        natives = []
+        for op in self.ops:
+            if getattr(op, '_native_reads_photons', False) and natives:
+                _applyNative(natives, photon_array, self.chunk_size)
+                natives = []
+            native = op._nativeOp(photon_array, local_wcs) if hasattr(op, '_nativeOp') else None
+            if native is None:
+                if natives:
+                    _applyNative(natives, photon_array, self.chunk_size)
+                    natives = []
+                op.applyTo(photon_array, local_wcs)
+            else:
+                natives.append(native)
+        if natives:
+            _applyNative(natives, photon_array, self.chunk_size)
+
+    def __repr__(self):
+        return 'galsim.PhotonOpList(%r, chunk_size=%r)'%(self.ops, self.chunk_size)
@@ -20,7 +20,7 @@ import numpy as np
 
 from . import _galsim
 from .gsparams import GSParams
-from .gsobject import GSObject
+from .gsobject import GSObject, _sbp_kValues
 from .position import PositionD
 from .utilities import lazy_property, doc_inherit
 from .errors import (
@@ -352,6 +352,10 @@ class RandomWalk(GSObject):
     def _kValue(self, kpos):
         return self._sbp.kValue(kpos._p)
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        return _sbp_kValues(self._sbp, kx, ky)
+
     @doc_inherit
     def _shoot(self, photons, rng):
         self._sbp.shoot(photons._pa, rng._rng)
@@ -35,7 +35,7 @@ page on the GalSim Wiki: https://github.com/GalSim-developers/GalSim/wiki/RealGa
 import os
 import numpy as np
 
-from .gsobject import GSObject
+from .gsobject import GSObject, _sbp_kValues
 from .gsparams import GSParams
 from .chromatic import ChromaticSum
 from .position import PositionD
@@ -464,6 +464,10 @@ class RealGalaxy(GSObject):
     def _kValue(self, kpos):
         return self._sbp.kValue(kpos._p)
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        return _sbp_kValues(self._sbp, kx, ky)
+
     @doc_inherit
     def _drawKImage(self, image):
         self._sbp.drawK(image._image, image.scale)
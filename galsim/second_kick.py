@@ -28,7 +28,7 @@ handles the high frequency modes."""
 import numpy as np
 
 from . import _galsim
-from .gsobject import GSObject
+from .gsobject import GSObject, _sbp_xValues, _sbp_kValues
 from .gsparams import GSParams
 from .utilities import lazy_property, doc_inherit
 from .position import PositionD
@@ -230,10 +230,18 @@ class SecondKick(GSObject):
     def _xValue(self, pos):
         return self._sbp.xValue(pos._p)
 
+    @doc_inherit
+    def _xValueArray(self, x, y):
+        return _sbp_xValues(self._sbp, x, y)
+
     @doc_inherit
     def _kValue(self, kpos):
         return self._sbp.kValue(kpos._p)
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        return _sbp_kValues(self._sbp, kx, ky)
+
     @doc_inherit
     def _shoot(self, photons, rng):
         self._sbp.shoot(photons._pa, rng._rng)
@@ -920,9 +920,22 @@ class SED(object):
         @param npoints   Number of points DistDeviate should use for its internal interpolation
                          tables. [default: None, which uses the DistDeviate default]
         """
-        from .random import DistDeviate
         nphotons=int(nphotons)
 
+        dev = self._get_deviate(bandpass, npoints)
+
+        # Reset the deviate explicitly
+        if rng is not None: dev.reset(rng)
+
+        ret = np.empty(nphotons)
+        dev.generate(ret)
+        ret *= (1. + self.redshift)
+        return ret
+
+    def _get_deviate(self, bandpass, npoints):
+        # The DistDeviate used by sampleWavelength.  Its values need to be multiplied by
+        # (1+redshift).
+        from .random import DistDeviate
         key = (bandpass,npoints)
         if key in self._cache_deviate:
             dev = self._cache_deviate[key]
@@ -940,14 +953,7 @@ class SED(object):
                 dev = DistDeviate(function=sed._fast_spec, x_min=xmin, x_max=xmax,
                                   npoints=npoints)
             self._cache_deviate[key] = dev
-
-        # Reset the deviate explicitly
-        if rng is not None: dev.reset(rng)
-
-        ret = np.empty(nphotons)
-        dev.generate(ret)
-        ret *= (1. + self.redshift)
-        return ret
+        return dev
 
     def __eq__(self, other):
         return (isinstance(other, SED) and
@@ -36,7 +36,7 @@ from .position import PositionI, PositionD
 from .table import LookupTable
 from .random import UniformDeviate
 from . import meta_data
-from .errors import GalSimUndefinedBoundsError, convert_cpp_errors
+from .errors import GalSimUndefinedBoundsError, GalSimRangeError, convert_cpp_errors
 
 class Sensor(object):
     """
@@ -122,6 +122,22 @@ class SiliconSensor(Sensor):
     of treering_center, which should still be defined in terms of the coordinate system of the
     images being passed to `accumulate`.
 
+    For large images, you can set `tile_size` to have `accumulate` split the image into square
+    tiles of that many pixels on a side, and accumulate the photons landing in different tiles in
+    parallel, using up to galsim.get_num_threads() threads (cf. galsim.set_num_threads).  The
+    photons are added in rounds, where the tiles that still have photons to add share a total
+    of `nrecalc` electrons before the pixel distortions are updated for the new charge in all the
+    tiles.  So the pixel distortions are updated about as often as in the serial calculation,
+    but the charge added in the same round by different tiles isn't seen by the others until
+    the end of the round.  The results are statistically equivalent, but not identical, to not
+    using tiles.  Each tile uses its own random number sequence (seeded from `rng`), so the
+    results don't depend on the number of threads.
+
+    The state of the Silicon model after a call to `accumulate` can be saved to a file along with
+    the image, using `save_state`, and restored with `load_state`, possibly by a different
+    SiliconSensor object in a different process.  Then you can continue accumulating photons
+    onto the image with `accumulate(..., resume=True)`.  This lets you split up a long
+    accumulation into several jobs, or build up an image in stages.
 
     @param name             The base name of the files which contains the sensor information,
                             presumably calculated from the Poisson_CCD simulator, which may
@@ -149,10 +165,14 @@ class SiliconSensor(Sensor):
                             required if treering_func is provided]
     @param transpose        Transpose the meaning of (x,y) so the brighter-fatter effect is
                             stronger along the x direction. [default: False]
+    @param tile_size        If given, the size (in pixels) of the tiles to use for accumulating
+                            the photons in parallel.  Something like 128 is reasonable for
+                            full CCD images. [default: None, which means to accumulate all the
+                            photons serially]
     """
     def __init__(self, name='lsst_itl_8', strength=1.0, rng=None, diffusion_factor=1.0, qdist=3,
                  nrecalc=10000, treering_func=None, treering_center=PositionD(0,0),
-                 transpose=False):
+                 transpose=False, tile_size=None):
         self.name = name
         self.strength = float(strength)
         self.rng = UniformDeviate(rng)
@@ -162,8 +182,12 @@ class SiliconSensor(Sensor):
         self.treering_func = treering_func
         self.treering_center = treering_center
         self.transpose = bool(transpose)
+        self.tile_size = int(tile_size) if tile_size is not None else None
         self._last_image = None
 
+        if self.tile_size is not None and self.tile_size <= 0:
+            raise GalSimRangeError("tile_size must be positive", tile_size, 1)
+
         self.config_file = name + '.cfg'
         self.vertex_file = name + '.dat'
         if not os.path.isfile(self.config_file):
@@ -221,15 +245,18 @@ class SiliconSensor(Sensor):
         if self.strength != 1.: s += ', strength=%f'%self.strength
         if self.diffusion_factor != 1.: s += ', diffusion_factor=%f'%self.diffusion_factor
         if self.transpose: s += ', transpose=True'
+        if self.tile_size is not None: s += ', tile_size=%d'%self.tile_size
         s += ')'
         return s
 
     def __repr__(self):
         return ('galsim.SiliconSensor(name=%r, strength=%f, rng=%r, diffusion_factor=%f, '
-                'qdist=%d, nrecalc=%f, treering_func=%r, treering_center=%r, transpose=%r)')%(
+                'qdist=%d, nrecalc=%f, treering_func=%r, treering_center=%r, transpose=%r, '
+                'tile_size=%r)')%(
                         self.name, self.strength, self.rng,
                         self.diffusion_factor, self.qdist, self.nrecalc,
-                        self.treering_func, self.treering_center, self.transpose)
+                        self.treering_func, self.treering_center, self.transpose,
+                        self.tile_size)
 
     def __eq__(self, other):
         return (isinstance(other, SiliconSensor) and
@@ -241,7 +268,8 @@ class SiliconSensor(Sensor):
                 self.nrecalc == other.nrecalc and
                 self.treering_func == other.treering_func and
                 self.treering_center == other.treering_center and
-                self.transpose == other.transpose)
+                self.transpose == other.transpose and
+                self.tile_size == other.tile_size)
 
     __hash__ = None
 
@@ -263,7 +291,8 @@ class SiliconSensor(Sensor):
         @param image        The image into which the photons should be accumuated.
         @param orig_center  The position of the image center in the original image coordinates.
                             [default: (0,0)]
-        @param resume       Resume accumulating on the same image as a previous call to accumulate.
+        @param resume       Resume accumulating on the same image as a previous call to accumulate
+                            (or the image returned by load_state).
                             This skips an initial (slow) calculation at the start of the
                             accumulation to see what flux is already on the image, which can
                             be more efficient, especially when the number of pixels is large.
@@ -281,8 +310,168 @@ class SiliconSensor(Sensor):
         self._last_image = image
         if not image.bounds.isDefined():
             raise GalSimUndefinedBoundsError("Calling accumulate on image with undefined bounds")
-        return self._silicon.accumulate(photons._pa, self.rng._rng, image._image, orig_center._p,
-                                        resume)
+        if self.tile_size is None:
+            return self._silicon.accumulate(photons._pa, self.rng._rng, image._image,
+                                            orig_center._p, resume)
+        else:
+            from .utilities import get_num_threads
+            with convert_cpp_errors():
+                return self._silicon.accumulate_tiles(photons._pa, self.rng._rng, image._image,
+                                                      orig_center._p, resume, self.tile_size,
+                                                      get_num_threads())
+
+    def save_state(self, file_name, image=None):
+        """Save the current state of the Silicon model to a FITS file, along with the image
+        onto which the photons have been accumulated.
+
+        The file has three HDUs: the image, the charge that has been added since the pixel
+        distortions were last updated, and the vertices of the distorted pixel boundaries.
+        For a large image, the last of these is quite large (about 600 bytes per pixel for the
+        lsst_itl_8 sensor), so it is usually best not to compress the file.  Then the pixel
+        boundaries are written in chunks, and `load_state` can read them from a memory map of
+        the file, so they never need to be all in memory at once.
+
+        The header of the last HDU records the parameters of the sensor that affect the pixel
+        boundaries (the sensor name, the size of the Poisson simulation, qdist, nrecalc,
+        transpose and the tree rings), and `load_state` checks that they match.
+
+        Note that the state of `rng` is not saved, so you should make sure that the sensor
+        used to continue the accumulation uses a different random number sequence.
+
+        @param file_name    The name of the file to write to.
+        @param image        The image onto which the photons have been accumulated.  This must
+                            be the same image as was used in the last call to accumulate.
+                            [default: None, which means to use that image]
+        """
+        from .image import ImageD
+        from .fits import write, writeFile, _parse_compression
+        from ._pyfits import pyfits
+        if self._last_image is None:
+            raise RuntimeError("save_state called, but accumulate has not been run yet.")
+        if image is None:
+            image = self._last_image
+        elif image is not self._last_image:
+            raise RuntimeError("save_state called, but provided image does not match the one "
+                               "used in the previous accumulate call.")
+
+        delta = ImageD(image.bounds)
+        npoly = self._silicon.getNumPolygons()
+        nv = 4 * self.config['NumVertices'] + 4
+        with convert_cpp_errors():
+            self._silicon.getDelta(delta._image)
+
+        hdu_list = pyfits.HDUList()
+        write(image, hdu_list=hdu_list)
+        write(delta, hdu_list=hdu_list)
+
+        header = pyfits.Header()
+        header['XTENSION'] = 'IMAGE'
+        header['BITPIX'] = -64
+        header['NAXIS'] = 3
+        header['NAXIS1'] = 2
+        header['NAXIS2'] = nv
+        header['NAXIS3'] = npoly
+        header['PCOUNT'] = 0
+        header['GCOUNT'] = 1
+        header['GS_NRCL'] = (self._silicon.getNextRecalc(),
+                             "GalSim Silicon flux to add before next update")
+        for key, value, comment in self._state_header():
+            header[key] = (value, comment)
+
+        chunk_size = 10000
+        file_compress, pyfits_compress = _parse_compression('auto', file_name)
+        if file_compress or pyfits_compress:
+            # Compressed files need to be written all at once.
+            polys = np.empty((npoly, nv, 2), dtype=float)
+            with convert_cpp_errors():
+                self._silicon.getImagePolys(0, npoly, polys.ctypes.data)
+            hdu = pyfits.ImageHDU(polys)
+            for card in header.cards:
+                if card.keyword.startswith('GS_'):
+                    hdu.header[card.keyword] = (card.value, card.comment)
+            hdu_list.append(hdu)
+            writeFile(file_name, hdu_list)
+        else:
+            # Otherwise write the first two HDUs, and then stream the pixel boundaries into
+            # the last one in chunks.
+            writeFile(file_name, hdu_list)
+            stream = pyfits.StreamingHDU(file_name, header)
+            try:
+                for start in range(0, npoly, chunk_size):
+                    n = min(chunk_size, npoly - start)
+                    chunk = np.empty((n, nv, 2), dtype=float)
+                    with convert_cpp_errors():
+                        self._silicon.getImagePolys(start, n, chunk.ctypes.data)
+                    stream.write(chunk)
+            finally:
+                stream.close()
+
+    def _state_header(self):
+        # The header items that save_state writes, and load_state checks, to make sure that the
+        # pixel boundaries are used with the same kind of sensor.
+        import hashlib
+        func = self.treering_func
+        digest = hashlib.md5()
+        digest.update(np.ascontiguousarray(func.x, dtype='<f8').tobytes())
+        digest.update(np.ascontiguousarray(func.f, dtype='<f8').tobytes())
+        digest.update(repr((func.interpolant, func.x_log, func.f_log)).encode('utf-8'))
+        return [ ('GS_SNSR', self.name, "GalSim Silicon sensor name"),
+                 ('GS_NX', self.config['PixelBoundaryNx'], "GalSim Silicon simulation Nx"),
+                 ('GS_NY', self.config['PixelBoundaryNy'], "GalSim Silicon simulation Ny"),
+                 ('GS_QDIST', self.qdist, "GalSim Silicon qdist"),
+                 ('GS_NRECA', self.nrecalc, "GalSim Silicon nrecalc"),
+                 ('GS_TRANS', self.transpose, "GalSim Silicon transpose"),
+                 ('GS_TRFN', digest.hexdigest(), "GalSim Silicon tree ring function (md5)"),
+                 ('GS_TRCX', self.treering_center.x, "GalSim Silicon tree ring center x"),
+                 ('GS_TRCY', self.treering_center.y, "GalSim Silicon tree ring center y") ]
+
+    def load_state(self, file_name):
+        """Restore the state of the Silicon model from a file written by `save_state`.
+
+        The returned image can then be used as the image for `accumulate` with `resume=True`.
+
+        @param file_name    The name of the file to read.
+
+        @returns the image that was saved along with the state.
+        """
+        from .image import ImageD
+        from .fits import read, readFile, closeHDUList
+        hdu, hdu_list, fin = readFile(file_name, hdu=2)
+        try:
+            image = read(hdu_list=hdu_list, hdu=0).copy()
+            delta = ImageD(read(hdu_list=hdu_list, hdu=1))
+            next_recalc = hdu.header['GS_NRCL']
+            polys = hdu.data
+            nv = 4 * self.config['NumVertices'] + 4
+            if delta.bounds != image.bounds or polys.shape != (image.bounds.area(), nv, 2):
+                raise OSError("File %s is not a valid Silicon state for sensor %s"%(
+                              file_name, self.name))
+            for key, value, comment in self._state_header():
+                if key not in hdu.header:
+                    raise OSError("File %s is not a valid Silicon state: missing %s"%(
+                                  file_name, key))
+                saved = hdu.header[key]
+                if isinstance(value, float):
+                    match = np.isclose(saved, value, rtol=1.e-12, atol=0.)
+                else:
+                    match = (saved == value)
+                if not match:
+                    raise OSError("File %s was saved with %s = %r, which does not match the "
+                                  "sensor's value %r"%(file_name, key, saved, value))
+
+            with convert_cpp_errors():
+                self._silicon.setState(delta._image, next_recalc)
+                # Copy the pixel boundaries in chunks, so we don't need to read the whole
+                # (possibly memory mapped) array into memory at once.
+                chunk_size = 10000
+                for start in range(0, len(polys), chunk_size):
+                    chunk = np.ascontiguousarray(polys[start:start+chunk_size], dtype=float)
+                    self._silicon.setImagePolys(start, len(chunk), chunk.ctypes.data)
+        finally:
+            closeHDUList(hdu_list, fin)
+
+        self._last_image = image
+        return image
 
     def calculate_pixel_areas(self, image, orig_center=PositionI(0,0)):
         """Create an image with the corresponding pixel areas according to the Silicon model.
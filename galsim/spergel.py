@@ -20,7 +20,7 @@ import numpy as np
 import math
 
 from . import _galsim
-from .gsobject import GSObject
+from .gsobject import GSObject, _sbp_xValues
 from .gsparams import GSParams
 from .utilities import lazy_property, doc_inherit
 from .position import PositionD
@@ -214,11 +214,20 @@ class Spergel(GSObject):
     def _xValue(self, pos):
         return self._sbp.xValue(pos._p)
 
+    @doc_inherit
+    def _xValueArray(self, x, y):
+        return _sbp_xValues(self._sbp, x, y)
+
     @doc_inherit
     def _kValue(self, kpos):
         ksq = (kpos.x**2 + kpos.y**2) * self._r0**2
         return self._flux * (1.+ksq)**(-1.-self._nu)
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        ksq = (kx**2 + ky**2) * self._r0**2
+        return (self._flux * (1.+ksq)**(-1.-self._nu)).astype(complex)
+
     @doc_inherit
     def _drawReal(self, image):
         self._sbp.draw(image._image, image.scale)
@@ -288,11 +288,19 @@ class Sum(GSObject):
         xv_list = [obj.xValue(pos) for obj in self.obj_list]
         return np.sum(xv_list)
 
+    @doc_inherit
+    def _xValueArray(self, x, y):
+        return np.sum([obj._xValueArray(x, y) for obj in self.obj_list], axis=0)
+
     @doc_inherit
     def _kValue(self, pos):
         kv_list = [obj.kValue(pos) for obj in self.obj_list]
         return np.sum(kv_list)
 
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        return np.sum([obj._kValueArray(kx, ky) for obj in self.obj_list], axis=0)
+
     @doc_inherit
     def _drawReal(self, image):
         self.obj_list[0]._drawReal(image)
@@ -325,7 +333,7 @@ class Sum(GSObject):
                 bd = BinomialDeviate(rng, remainingN, thisAbsoluteFlux/remainingAbsoluteFlux)
                 thisN = int(bd())
             if thisN > 0:
-                thisPA = obj.shoot(thisN, rng)
+                thisPA = obj.shoot(thisN, rng, dtype=photons.dtype)
                 # Now rescale the photon fluxes so that they are each nominally fluxPerPhoton
                 # whereas the shoot() routine would have made them each nominally
                 # thisAbsoluteFlux/thisN
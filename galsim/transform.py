@@ -479,6 +479,20 @@ class Transformation(GSObject):
         fwdT_kpos = PositionD(self._fwdT(kpos.x, kpos.y))
         return self._original._kValue(fwdT_kpos) * self._kfactor(kpos.x, kpos.y)
 
+    @doc_inherit
+    def _xValueArray(self, x, y):
+        # The _inv function modifies its arguments, so these need to be new arrays.
+        x = x - self._offset.x
+        y = y - self._offset.y
+        x, y = self._inv(x, y)
+        return self._original._xValueArray(x, y) * self._amp_scaling
+
+    @doc_inherit
+    def _kValueArray(self, kx, ky):
+        kfactor = self._kfactor(kx.astype(complex), ky.astype(complex))
+        kx, ky = self._fwdT(kx.copy(), ky.copy())
+        return self._original._kValueArray(kx, ky) * kfactor
+
     @doc_inherit
     def _drawReal(self, image):
         if self.offset == PositionD(0.,0.) and np.array_equal(self.jac.ravel(), [1,0,0,1]):
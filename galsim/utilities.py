@@ -1582,3 +1582,89 @@ def find_out_of_bounds_position(x, y, bounds, grid=False):
         if len(w[0]) > 0:
             return PositionD(x[w[0][0]], y[w[0][0]])
     raise GalSimError("No out-of-bounds position")
+
+
+def set_num_threads(num_threads):
+    """Set the number of threads to use when drawing profiles in real space, doing FFTs or
+    shooting photons.
+
+    This applies to drawImage with method='real_space', 'no_pixel' or 'sb'.  Each image is
+    split into blocks of rows, which are drawn in separate threads.  Small images are always
+    drawn in a single thread, since the overhead of starting the threads would be more than the
+    time saved.
+
+    It also sets the number of threads FFTW may use for large FFTs (e.g. when drawing with
+    method='fft'), but only if GalSim was built with the fftw3_threads library.  You can check
+    this with galsim.fft.has_threads().
+
+    For method='phot', when using more than one thread, objects that need more than 10^6
+    photons are shot in chunks of 10^6 photons, which are shared among the threads.  Each chunk
+    has its own random number generator, seeded from the given rng, so the images are the same
+    for any number of threads > 1 (except for rounding errors).  With a single thread, the
+    photons are shot from the given rng as usual.  Chunks are not used with a SiliconSensor or
+    surface_ops, which need the photons in order.
+
+    The GIL is also released while drawing these images, so other Python threads can run at
+    the same time.  (Except for InterpolatedImage, which is not safe to draw from several
+    threads at once.)
+
+    @param num_threads  The number of threads to use.  If this is <= 0, then use the number
+                        of cpus on the machine.
+    """
+    _galsim.SetNumThreads(int(num_threads))
+    _galsim.SetFFTWThreads(int(num_threads))
+
+def get_num_threads():
+    """Get the number of threads being used when drawing profiles in real space, doing FFTs or
+    shooting photons.
+
+    See set_num_threads for details.
+
+    @returns the number of threads
+    """
+    return _galsim.GetNumThreads()
+
+def set_table_cache_dir(dir_name):
+    """Set a directory in which to keep the lookup tables that some profiles need.
+
+    Sersic (and InclinedSersic), Kolmogorov, VonKarman and SecondKick profiles build tables of
+    their Fourier transforms or radial profiles the first time each set of parameters and
+    GSParams is used in a process.  This can take a while, especially for Sersic profiles.
+    If a cache directory is set, each table is written there when it is built, and any later
+    process that needs the same table reads it back rather than building it again.  So many
+    jobs (or the workers of one job) can share the same directory.
+
+    The tables are only looked for when a profile with new parameters is made, so tables that
+    are already in memory are not affected by changing the directory.
+
+    The default is the value of the GALSIM_TABLE_CACHE environment variable, or no cache at
+    all if that is not set.
+
+    @param dir_name     The directory to use, or None to not keep the tables.  It is created if
+                        it does not exist yet.
+    """
+    if dir_name:
+        dir_name = os.path.abspath(os.path.expanduser(dir_name))
+        if not os.path.isdir(dir_name):
+            try:
+                os.makedirs(dir_name)
+            except OSError:  # pragma: no cover  (Another process made it first.)
+                if not os.path.isdir(dir_name): raise
+        _galsim.SetTableCacheDir(dir_name)
+    else:
+        _galsim.SetTableCacheDir('')
+
+def get_table_cache_dir():
+    """Get the directory in which the lookup tables for some profiles are kept.
+
+    See set_table_cache_dir for details.
+
+    @returns the directory, or None if the tables are not being kept.
+    """
+    dir_name = _galsim.GetTableCacheDir()
+    return dir_name if dir_name else None
+
+try:
+    set_table_cache_dir(os.environ.get('GALSIM_TABLE_CACHE'))
+except OSError:  # pragma: no cover
+    pass
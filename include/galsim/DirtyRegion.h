@@ -0,0 +1,124 @@
+/* -*- c++ -*-
+ * Copyright (c) 2012-2018 by the GalSim developers team on GitHub
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ * https://github.com/GalSim-developers/GalSim
+ *
+ * GalSim is free software: redistribution and use in source and binary forms,
+ * with or without modification, are permitted provided that the following
+ * conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice, this
+ *    list of conditions, and the disclaimer given in the accompanying LICENSE
+ *    file.
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions, and the disclaimer given in the documentation
+ *    and/or other materials provided with the distribution.
+ */
+
+#ifndef GalSim_DirtyRegion_H
+#define GalSim_DirtyRegion_H
+
+#include <vector>
+#include <algorithm>
+#include "Bounds.h"
+
+namespace galsim {
+
+    /**
+     * @brief Keeps track of which pixels of an image have changed since it was last cleared.
+     *
+     * The image is divided into square blocks of block_size x block_size pixels, and we record
+     * which blocks have any changed pixels.  Code that updates something based on the changes
+     * can then loop over just the dirty blocks rather than the whole image.
+     *
+     * It also keeps some running statistics of how many times it was cleared, and how many
+     * pixels were in the dirty blocks at those times, which are useful for instrumentation.
+     */
+    class DirtyRegion
+    {
+    public:
+        DirtyRegion(int block_size=32) :
+            _block_size(block_size), _nbx(0), _nby(0), _nclear(0), _area(0) {}
+
+        /// Set the bounds of the image, and mark all pixels as unchanged.
+        void reset(const Bounds<int>& bounds)
+        {
+            _bounds = bounds;
+            _nbx = bounds.isDefined() ?
+                (bounds.getXMax() - bounds.getXMin()) / _block_size + 1 : 0;
+            _nby = bounds.isDefined() ?
+                (bounds.getYMax() - bounds.getYMin()) / _block_size + 1 : 0;
+            _dirty.assign(_nbx * _nby, false);
+            _blocks.clear();
+        }
+
+        /// Mark pixel (i,j) as changed.  (i,j) must be in the bounds of the image.
+        void add(int i, int j)
+        {
+            int k = ((i - _bounds.getXMin()) / _block_size) * _nby +
+                (j - _bounds.getYMin()) / _block_size;
+            if (!_dirty[k]) {
+                _dirty[k] = true;
+                _blocks.push_back(k);
+            }
+        }
+
+        /// Mark all the pixels in b (which may extend past the bounds of the image) as changed.
+        void add(const Bounds<int>& b)
+        {
+            Bounds<int> b2 = b & _bounds;
+            if (!b2.isDefined()) return;
+            for (int i=b2.getXMin(); i<=b2.getXMax()+_block_size-1; i+=_block_size) {
+                for (int j=b2.getYMin(); j<=b2.getYMax()+_block_size-1; j+=_block_size) {
+                    add(std::min(i, b2.getXMax()), std::min(j, b2.getYMax()));
+                }
+            }
+        }
+
+        /// Mark all pixels as unchanged, and update the statistics.
+        void clear()
+        {
+            ++_nclear;
+            for (size_t m=0; m<_blocks.size(); ++m) {
+                _area += getBlock(m).area();
+                _dirty[_blocks[m]] = false;
+            }
+            _blocks.clear();
+        }
+
+        /// The number of blocks with changed pixels.
+        int getNBlocks() const { return int(_blocks.size()); }
+
+        /// The bounds of the m-th block with changed pixels (in the order they were changed).
+        Bounds<int> getBlock(int m) const
+        {
+            int k = _blocks[m];
+            int x1 = _bounds.getXMin() + (k / _nby) * _block_size;
+            int y1 = _bounds.getYMin() + (k % _nby) * _block_size;
+            return Bounds<int>(x1, x1 + _block_size - 1, y1, y1 + _block_size - 1) & _bounds;
+        }
+
+        int getBlockSize() const { return _block_size; }
+        const Bounds<int>& getBounds() const { return _bounds; }
+
+        /// The number of times clear has been called.
+        long getNumClears() const { return _nclear; }
+
+        /// The total number of pixels that were in dirty blocks when clear was called.
+        long getTotalArea() const { return _area; }
+
+    private:
+        int _block_size;
+        Bounds<int> _bounds;
+        int _nbx, _nby;
+        std::vector<bool> _dirty;
+        std::vector<int> _blocks;
+        long _nclear;
+        long _area;
+    };
+
+}
+
+#endif
@@ -177,6 +177,65 @@ namespace galsim {
 
     //! @endcond
 
+    /// @brief The kinds of 2d transform that ExecuteFFT can do.
+    enum FFTKind { FFT_R2C, FFT_C2R, FFT_FORWARD, FFT_BACKWARD };
+
+    /**
+     * @brief Do a 2d FFT of size Ny x Nx (Nx being the rapidly varying index).
+     *
+     * For FFT_R2C, in is a real array and out is complex.  For FFT_C2R, it is the other way
+     * around.  For FFT_FORWARD and FFT_BACKWARD, both are complex.  in and out may be the
+     * same array.  Note that, as usual for FFTW, the input array is overwritten for FFT_C2R.
+     *
+     * Rather than making a new plan each time, the plans are kept and reused for later
+     * transforms of the same size and type.  The first plan for each size is made with
+     * FFTW_ESTIMATE unless there is already some wisdom for it (cf. ImportFFTWWisdom).
+     * Once a size has been used a few times, it is re-planned with FFTW_MEASURE, which adds
+     * its wisdom to FFTW's store.  Making a plan doesn't stop other threads from using the plans
+     * they already have.  At most 100 plans are kept (the ones used most recently), and
+     * ClearFFTPlans drops all of them.
+     *
+     * If GalSim was linked with the fftw3_threads library, the plans may use up to
+     * GetFFTWThreads() threads for large transforms.
+     */
+    void ExecuteFFT(FFTKind kind, int Ny, int Nx, void* in, void* out);
+
+    /**
+     * @brief Set the number of threads FFTW may use for large transforms.
+     *
+     * The default is 1.  If nthreads <= 0, the number of cores reported by the system is used.
+     * This has no effect unless GalSim was linked with the fftw3_threads library.
+     */
+    void SetFFTWThreads(int nthreads);
+
+    /// @brief Get the number of threads FFTW may use for large transforms.
+    int GetFFTWThreads();
+
+    /// @brief Check whether GalSim was linked with the fftw3_threads library.
+    bool HasFFTWThreads();
+
+    /**
+     * @brief Import FFTW wisdom from a file that was written by ExportFFTWWisdom.
+     *
+     * The wisdom is added to any that is already known.  Returns whether it succeeded.
+     */
+    bool ImportFFTWWisdom(const std::string& file_name);
+
+    /// @brief Write all the current FFTW wisdom to a file.  Returns whether it succeeded.
+    bool ExportFFTWWisdom(const std::string& file_name);
+
+    /// @brief Check whether any new wisdom has been measured since the last export.
+    bool FFTWWisdomChanged();
+
+    /// @brief Forget all the FFTW wisdom and the saved plans.
+    void ForgetFFTWWisdom();
+
+    /// @brief Get the number of saved plans.
+    int GetNumFFTPlans();
+
+    /// @brief Drop all the saved plans.  (The wisdom they added to FFTW's store is kept.)
+    void ClearFFTPlans();
+
     class XTable;
 
     /**
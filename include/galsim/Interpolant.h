@@ -22,6 +22,7 @@
 
 #include <cmath>
 #include <map>
+#include <mutex>
 
 #include "Std.h"
 #include "Table.h"
@@ -179,9 +180,14 @@ namespace galsim {
         // Class that draws photons from this Interpolant
         mutable shared_ptr<OneDimensionalDeviate> _sampler;
 
+        // Photons may be shot from several threads at once, so make sure only one of them
+        // builds the sampler.
+        static std::mutex _sampler_mutex;
+
         // Allocate photon sampler and do all of its pre-calculations
         virtual void checkSampler() const
         {
+            std::lock_guard<std::mutex> lock(_sampler_mutex);
             if (_sampler.get()) return;
             // Will assume by default that the Interpolant kernel changes sign at non-zero
             // integers, with one extremum in each integer range.
@@ -70,7 +70,20 @@ namespace galsim {
          */
         PhotonArray(size_t N, double* x, double* y, double* flux,
                     double* dxdz, double* dydz, double* wave, bool is_corr) :
-            _N(N), _x(x), _y(y), _flux(flux), _dxdz(dxdz), _dydz(dydz), _wave(wave),
+            _N(N), _single(false), _x(x), _y(y), _flux(flux), _dxdz(dxdz), _dydz(dydz),
+            _wave(wave), _fx(0), _fy(0), _fflux(0), _fdxdz(0), _fdydz(0), _fwave(0),
+            _is_correlated(is_corr) {}
+
+        /**
+         * @brief Construct a PhotonArray of the given size with the given single-precision
+         * arrays, which should be allocated separately (in Python typically).
+         *
+         * The arguments are the same as for the double version.  All the arrays must be float.
+         */
+        PhotonArray(size_t N, float* x, float* y, float* flux,
+                    float* dxdz, float* dydz, float* wave, bool is_corr) :
+            _N(N), _single(true), _x(0), _y(0), _flux(0), _dxdz(0), _dydz(0), _wave(0),
+            _fx(x), _fy(y), _fflux(flux), _fdxdz(dxdz), _fdydz(dydz), _fwave(wave),
             _is_correlated(is_corr) {}
 
         /**
@@ -80,9 +93,16 @@ namespace galsim {
          */
         size_t size() const { return _N; }
 
+        /**
+         * @brief Whether the arrays are single precision (float) rather than double.
+         */
+        bool isSingle() const { return _single; }
+
         /**
          * @{
          * @brief Accessors that provide access as numpy arrays in Python layer
+         *
+         * The double versions return 0 if the arrays are single precision, and vice versa.
          */
         double* getXArray() { return _x; }
         double* getYArray() { return _y; }
@@ -90,8 +110,15 @@ namespace galsim {
         double* getDXDZArray() { return _dxdz; }
         double* getDYDZArray() { return _dydz; }
         double* getWavelengthArray() { return _wave; }
-        bool hasAllocatedAngles() const { return _dxdz != 0 && _dydz != 0; }
-        bool hasAllocatedWavelengths() const { return _wave != 0; }
+        float* getXArrayF() { return _fx; }
+        float* getYArrayF() { return _fy; }
+        float* getFluxArrayF() { return _fflux; }
+        float* getDXDZArrayF() { return _fdxdz; }
+        float* getDYDZArrayF() { return _fdydz; }
+        float* getWavelengthArrayF() { return _fwave; }
+        bool hasAllocatedAngles() const
+        { return _single ? (_fdxdz != 0 && _fdydz != 0) : (_dxdz != 0 && _dydz != 0); }
+        bool hasAllocatedWavelengths() const { return _single ? _fwave != 0 : _wave != 0; }
         /**
          * @}
          */
@@ -107,9 +134,53 @@ namespace galsim {
          */
         void setPhoton(int i, double x, double y, double flux)
         {
-            _x[i]=x;
-            _y[i]=y;
-            _flux[i]=flux;
+            if (_single) {
+                _fx[i]=x;
+                _fy[i]=y;
+                _fflux[i]=flux;
+            } else {
+                _x[i]=x;
+                _y[i]=y;
+                _flux[i]=flux;
+            }
+        }
+
+        /**
+         * @brief Set the position of a photon
+         *
+         * @param[in] i     Index of desired photon (no bounds checking)
+         * @param[in] x     x coordinate of photon
+         * @param[in] y     y coordinate of photon
+         */
+        void setPosition(int i, double x, double y)
+        {
+            if (_single) { _fx[i]=x; _fy[i]=y; }
+            else { _x[i]=x; _y[i]=y; }
+        }
+
+        /**
+         * @brief Set the inclination angles of a photon (which must be allocated)
+         *
+         * @param[in] i     Index of desired photon (no bounds checking)
+         * @param[in] dxdz  dxdz of photon
+         * @param[in] dydz  dydz of photon
+         */
+        void setAngles(int i, double dxdz, double dydz)
+        {
+            if (_single) { _fdxdz[i]=dxdz; _fdydz[i]=dydz; }
+            else { _dxdz[i]=dxdz; _dydz[i]=dydz; }
+        }
+
+        /**
+         * @brief Set the wavelength of a photon (which must be allocated)
+         *
+         * @param[in] i     Index of desired photon (no bounds checking)
+         * @param[in] wave  wavelength of photon
+         */
+        void setWavelength(int i, double wave)
+        {
+            if (_single) _fwave[i]=wave;
+            else _wave[i]=wave;
         }
 
         /**
@@ -118,7 +189,7 @@ namespace galsim {
          * @param[in] i Index of desired photon (no bounds checking)
          * @returns x coordinate of photon
          */
-        double getX(int i) const { return _x[i]; }
+        double getX(int i) const { return _single ? _fx[i] : _x[i]; }
 
         /**
          * @brief Access y coordinate of a photon
@@ -126,7 +197,7 @@ namespace galsim {
          * @param[in] i Index of desired photon (no bounds checking)
          * @returns y coordinate of photon
          */
-        double getY(int i) const { return _y[i]; }
+        double getY(int i) const { return _single ? _fy[i] : _y[i]; }
 
         /**
          * @brief Access flux of a photon
@@ -134,7 +205,7 @@ namespace galsim {
          * @param[in] i Index of desired photon (no bounds checking)
          * @returns flux of photon
          */
-        double getFlux(int i) const { return _flux[i]; }
+        double getFlux(int i) const { return _single ? _fflux[i] : _flux[i]; }
 
         /**
          * @brief Access dxdz of a photon
@@ -142,7 +213,7 @@ namespace galsim {
          * @param[in] i Index of desired photon (no bounds checking)
          * @returns dxdz of photon
          */
-        double getDXDZ(int i) const { return _dxdz[i]; }
+        double getDXDZ(int i) const { return _single ? _fdxdz[i] : _dxdz[i]; }
 
         /**
          * @brief Access dydz coordinate of a photon
@@ -150,7 +221,7 @@ namespace galsim {
          * @param[in] i Index of desired photon (no bounds checking)
          * @returns dydz coordinate of photon
          */
-        double getDYDZ(int i) const { return _dydz[i]; }
+        double getDYDZ(int i) const { return _single ? _fdydz[i] : _dydz[i]; }
 
         /**
          * @brief Access wavelength of a photon
@@ -158,7 +229,7 @@ namespace galsim {
          * @param[in] i Index of desired photon (no bounds checking)
          * @returns wavelength of photon
          */
-        double getWavelength(int i) const { return _wave[i]; }
+        double getWavelength(int i) const { return _single ? _fwave[i] : _wave[i]; }
 
         /**
          * @brief Return sum of all photons' fluxes
@@ -268,13 +339,31 @@ namespace galsim {
         void setCorrelated(bool is_corr=true) { _is_correlated = is_corr; }
 
     private:
+        // The same operations on the double or float arrays.
+        template <typename T>
+        void scaleFluxT(T* flux, double scale);
+        template <typename T>
+        void scaleXYT(T* x, T* y, double scale);
+        template <typename T, typename U>
+        double addToT(const T* x, const T* y, const T* flux, ImageView<U> target) const;
+        template <typename T, typename U>
+        int setFromT(T* x, T* y, T* flux, const BaseImage<U>& image, double maxFlux,
+                     BaseDeviate ud);
+
         size_t _N;              // The length of the arrays
+        bool _single;           // Are the arrays float rather than double?
         double* _x;             // Array holding x coords of photons
         double* _y;             // Array holding y coords of photons
         double* _flux;          // Array holding flux of photons
         double* _dxdz;          // Array holding dxdz of photons
         double* _dydz;          // Array holding dydz of photons
         double* _wave;          // Array holding wavelength of photons
+        float* _fx;             // The same arrays when the photons are single precision.
+        float* _fy;
+        float* _fflux;
+        float* _fdxdz;
+        float* _fdydz;
+        float* _fwave;
         bool _is_correlated;    // Are the photons correlated?
 
         // Most of the time the arrays are constructed in Python and passed in, so we don't
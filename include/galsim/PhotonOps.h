@@ -0,0 +1,184 @@
+/* -*- c++ -*-
+ * Copyright (c) 2012-2018 by the GalSim developers team on GitHub
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ * https://github.com/GalSim-developers/GalSim
+ *
+ * GalSim is free software: redistribution and use in source and binary forms,
+ * with or without modification, are permitted provided that the following
+ * conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice, this
+ *    list of conditions, and the disclaimer given in the accompanying LICENSE
+ *    file.
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions, and the disclaimer given in the documentation
+ *    and/or other materials provided with the distribution.
+ */
+
+
+#ifndef GalSim_PhotonOps_H
+#define GalSim_PhotonOps_H
+
+/**
+ * @file PhotonOps.h @brief Operations that modify the photons in a PhotonArray, which can be
+ * applied together in a single pass over the photons.
+ */
+
+#include <vector>
+
+#include "Std.h"
+#include "Random.h"
+#include "Table.h"
+#include "PhotonArray.h"
+
+namespace galsim {
+
+    /**
+     * @brief Base class for operations that modify the photons in a PhotonArray.
+     *
+     * Each operation acts on a range of photons, so a list of them can be applied to a chunk of
+     * photons that fits in the cache before moving on to the next chunk.
+     */
+    class PhotonOp
+    {
+    public:
+        virtual ~PhotonOp() {}
+
+        /**
+         * @brief Draw any random numbers the operation needs for the photons with i1 <= i < i2.
+         *
+         * This is called for each operation in a PhotonOpList in turn before any of them are
+         * applied, so the random numbers are drawn in the same order as if each operation were
+         * applied to all of the photons before the next one, regardless of the chunk size.
+         */
+        virtual void prepare(int i1, int i2) {}
+
+        /**
+         * @brief Apply the operation to the photons with i1 <= i < i2, which must be within
+         * the range given to prepare.
+         */
+        virtual void applyTo(PhotonArray& photons, int i1, int i2) = 0;
+    };
+
+    /**
+     * @brief Set the wavelengths of the photons, sampled from an inverse cumulative
+     * distribution function.
+     */
+    class WavelengthSamplerOp : public PhotonOp
+    {
+    public:
+        /**
+         * @param[in] inv_cdf   A Table giving the (unscaled) wavelength as a function of the
+         *                      cumulative probability.
+         * @param[in] scale     A factor by which to multiply the values from inv_cdf
+         *                      (e.g. 1+z for a redshifted SED).
+         * @param[in] rng       The BaseDeviate to use for the random numbers.
+         */
+        WavelengthSamplerOp(const Table& inv_cdf, double scale, BaseDeviate rng) :
+            _inv_cdf(inv_cdf), _scale(scale), _ud(rng), _i1(0) {}
+
+        void prepare(int i1, int i2);
+        void applyTo(PhotonArray& photons, int i1, int i2);
+
+    private:
+        Table _inv_cdf;
+        double _scale;
+        UniformDeviate _ud;
+        int _i1;                // The first photon in the prepared range
+        std::vector<double> _u; // The uniform deviates for the prepared range
+    };
+
+    /**
+     * @brief Set the inclination angles of the photons, uniformly filling the pupil of a
+     * telescope with the given f/ratio and fractional obscuration.
+     *
+     * The azimuthal angles for all the photons in the prepared range are drawn before the
+     * inclination angles, as in the python version.
+     */
+    class FRatioAnglesOp : public PhotonOp
+    {
+    public:
+        FRatioAnglesOp(double fratio, double obscuration, BaseDeviate rng);
+
+        void prepare(int i1, int i2);
+        void applyTo(PhotonArray& photons, int i1, int i2);
+
+    private:
+        double _sin_obs;    // sin of the obscuration angle
+        double _sin_range;  // sin of the pupil angle minus _sin_obs
+        UniformDeviate _ud;
+        int _i1;                    // The first photon in the prepared range
+        std::vector<double> _phi;   // The azimuthal angles for the prepared range
+        std::vector<double> _u;     // The uniform deviates for the inclination angles
+    };
+
+    /**
+     * @brief Shift the photons according to differential chromatic refraction, and optionally
+     * dilate them according to the chromatic seeing.
+     *
+     * The refraction for each photon is calculated in python (with galsim.dcr.get_refraction),
+     * since that needs the wavelengths, so this op applies the resulting shifts to all the
+     * photons in the PhotonArray, indexed the same way.  The shift in world coordinates is
+     * converted to image coordinates with the affine transformation
+     * dx = a[0] du + a[1] dv + a[4], dy = a[2] du + a[3] dv + a[5].
+     */
+    class PhotonDCROp : public PhotonOp
+    {
+    public:
+        /**
+         * @param[in] refraction         The refraction (in radians) of each photon.
+         * @param[in] n                  The number of values in refraction.
+         * @param[in] base_refraction    The refraction (in radians) at base_wavelength.
+         * @param[in] sinp, cosp         sin and cos of the parallactic angle.
+         * @param[in] scale              The number of position units per radian.
+         * @param[in] base_wavelength    The wavelength (in nm) of the fiducial positions.
+         * @param[in] alpha              The power law index for the chromatic seeing.
+         * @param[in] affine             The 6 coefficients of the affine transformation from a
+         *                               shift in world coordinates to image coordinates.
+         * @param[in] cenx, ceny         The center of the dilation in image coordinates.
+         */
+        PhotonDCROp(const double* refraction, int n, double base_refraction,
+                    double sinp, double cosp, double scale, double base_wavelength, double alpha,
+                    const double* affine, double cenx, double ceny);
+
+        void applyTo(PhotonArray& photons, int i1, int i2);
+
+    private:
+        std::vector<double> _refraction;
+        double _base_refraction, _sinp, _cosp, _scale, _base_wavelength, _alpha;
+        double _affine[6];
+        double _cenx, _ceny;
+    };
+
+    /**
+     * @brief A list of PhotonOps that are applied together, chunk by chunk.
+     *
+     * Each chunk of photons has all the operations applied (in order) before moving on to the
+     * next chunk, so the photons stay in the cache while they are being modified.  The random
+     * numbers are all drawn first (cf. PhotonOp::prepare), so the results are the same for any
+     * chunk size.  The list does not own the operations, so they need to be kept alive (in
+     * Python typically) while the list is being used.
+     */
+    class PhotonOpList
+    {
+    public:
+        PhotonOpList(int chunk_size) : _chunk_size(chunk_size) {}
+
+        void append(PhotonOp& op) { _ops.push_back(&op); }
+        size_t size() const { return _ops.size(); }
+
+        /**
+         * @brief Apply all the operations to the photons with i1 <= i < i2.
+         */
+        void applyTo(PhotonArray& photons, int i1, int i2) const;
+
+    private:
+        int _chunk_size;
+        std::vector<PhotonOp*> _ops;
+    };
+
+} // end namespace galsim
+
+#endif
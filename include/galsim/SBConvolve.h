@@ -27,6 +27,26 @@
 
 namespace galsim {
 
+    /**
+     * @brief Set the maximum memory in bytes to use for the cache of k-space images of the
+     * components of convolutions.
+     *
+     * When many profiles are convolved with the same PSF, the PSF is often drawn in k-space on
+     * the same grid many times.  So when SBConvolve needs the k-space image of a component for
+     * the second time on the same grid, it keeps that image to use again.  The least recently
+     * used images are discarded to keep the total below this size.  0 turns off the cache.
+     */
+    void SetConvolveCacheSize(size_t nbytes);
+
+    /// @brief Get the maximum memory in bytes to use for the cache of k-space images.
+    size_t GetConvolveCacheSize();
+
+    /// @brief Get the number of k-space images currently in the cache.
+    int GetNumConvolveCacheImages();
+
+    /// @brief Get the number of times an image in the cache has been used.
+    long GetNumConvolveCacheHits();
+
     // Defined in RealSpaceConvolve.cpp
     double RealSpaceConvolve(
         const SBProfile& p1, const SBProfile& p2, const Position<double>& pos, double flux,
@@ -20,6 +20,7 @@
 #ifndef GalSim_SBConvolveImpl_H
 #define GalSim_SBConvolveImpl_H
 
+#include <mutex>
 #include "SBProfileImpl.h"
 #include "SBConvolve.h"
 
@@ -47,6 +48,13 @@ namespace galsim {
         bool hasHardEdges() const { return false; }
         bool isAnalyticX() const { return _real_space; }
         bool isAnalyticK() const { return true; }    // convolvees must all meet this
+
+        bool isThreadSafe() const
+        {
+            for (ConstIter pptr = _plist.begin(); pptr!=_plist.end(); ++pptr)
+                if (!pptr->isThreadSafe()) return false;
+            return true;
+        }
         double maxK() const;
         double stepK() const;
 
@@ -140,6 +148,27 @@ namespace galsim {
         mutable double _maxk; ///< Minimum maxK() of the convolved SBProfiles.
         mutable double _stepk; ///< Minimum stepK() of the convolved SBProfiles.
 
+        // These are calculated the first time they are needed.  Profiles may be used from
+        // several threads at once, so each calculation is only done once, by one thread.
+        mutable std::once_flag _maxk_once;
+        mutable std::once_flag _stepk_once;
+
+        void calculateMaxK() const;
+        void calculateStepK() const;
+
+        // The arguments to one of the two versions of fillKImage.
+        struct KGrid
+        {
+            bool general;  ///< Whether to use dkxy, dkyx (true) or izero, jzero (false).
+            double kx0, dkx, dkxy, ky0, dky, dkyx;
+            int izero, jzero;
+        };
+
+        // Both versions of fillKImage use this, which takes the k-space images of any components
+        // that have been drawn on the same grid before from the cache (cf. SetConvolveCacheSize).
+        template <typename T>
+        void fillKImageCached(ImageView<std::complex<T> > im, const KGrid& grid) const;
+
         void doFillKImage(ImageView<std::complex<double> > im,
                           double kx0, double dkx, int izero,
                           double ky0, double dky, int jzero) const
@@ -182,6 +211,7 @@ namespace galsim {
         bool hasHardEdges() const { return false; }
         bool isAnalyticX() const { return _real_space; }
         bool isAnalyticK() const { return true; }
+        bool isThreadSafe() const { return _adaptee.isThreadSafe(); }
         double maxK() const { return _adaptee.maxK(); }
         double stepK() const { return _adaptee.stepK() / sqrt(2.); }
 
@@ -258,6 +288,7 @@ namespace galsim {
         bool hasHardEdges() const { return false; }
         bool isAnalyticX() const { return _real_space; }
         bool isAnalyticK() const { return true; }
+        bool isThreadSafe() const { return _adaptee.isThreadSafe(); }
         double maxK() const { return _adaptee.maxK(); }
         double stepK() const { return _adaptee.stepK() / sqrt(2.); }
 
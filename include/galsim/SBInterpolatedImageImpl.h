@@ -69,6 +69,8 @@ namespace galsim {
         // are found by interpolation of a table:
         bool isAnalyticX() const { return true; }
         bool isAnalyticK() const { return true; }
+        // The interpolation in XTable caches some intermediate values.
+        bool isThreadSafe() const { return false; }
         Position<double> centroid() const;
         double getFlux() const;
         double maxSB() const;
@@ -20,6 +20,7 @@
 #ifndef GalSim_SBMoffatImpl_H
 #define GalSim_SBMoffatImpl_H
 
+#include <mutex>
 #include "SBProfileImpl.h"
 #include "SBMoffat.h"
 #include "Table.h"
@@ -124,11 +125,20 @@ namespace galsim {
         mutable double _stepk;
         mutable double _maxk; ///< Maximum k with kValue > 1.e-3
 
+        // The above are calculated the first time they are needed.  Profiles may be used from
+        // several threads at once, so each calculation is only done once, by one thread.
+        mutable std::once_flag _ft_once;
+        mutable std::once_flag _stepk_once;
+        mutable std::once_flag _maxk_once;
+
         double (*_pow_beta)(double x, double beta);
         double (SBMoffatImpl::*_kV)(double ksq) const;
 
         /// Setup the FT Table.
         void setupFT() const;
+        void buildFT() const;
+        void calculateMaxK() const;
+        void calculateStepK() const;
 
         // These are the (unnormalized) kValue functions for untruncated Moffats
         double kV_15(double ksq) const;
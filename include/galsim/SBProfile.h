@@ -54,6 +54,17 @@ namespace galsim {
 
     //! @endcond
 
+    /**
+     * @brief Set the number of threads to use for drawing profiles in real space.
+     *
+     * The default is 1, which means that all the pixels are drawn in the calling thread.
+     * If nthreads <= 0, the number of cores reported by the system is used.
+     */
+    void SetNumThreads(int nthreads);
+
+    /// @brief Get the number of threads to use for drawing profiles in real space.
+    int GetNumThreads();
+
     class SBTransform;
 
     /**
@@ -153,6 +164,26 @@ namespace galsim {
          */
         std::complex<double> kValue(const Position<double>& k) const;
 
+        /**
+         * @brief Return the values of SBProfile at n 2D positions in real space.
+         *
+         * @param[in] x     Array of the x coordinates of the positions.
+         * @param[in] y     Array of the y coordinates of the positions.
+         * @param[out] val  Array in which to put xValue at each position.
+         * @param[in] n     The number of positions.
+         */
+        void xValues(const double* x, const double* y, double* val, int n) const;
+
+        /**
+         * @brief Return the values of SBProfile at n 2D positions in k space.
+         *
+         * @param[in] kx    Array of the kx coordinates of the positions.
+         * @param[in] ky    Array of the ky coordinates of the positions.
+         * @param[out] val  Array in which to put kValue at each position.
+         * @param[in] n     The number of positions.
+         */
+        void kValues(const double* kx, const double* ky, std::complex<double>* val, int n) const;
+
         //@{
         /**
          *  @brief Define the range over which the profile is not trivially zero.
@@ -222,6 +253,15 @@ namespace galsim {
          */
         bool isAnalyticK() const;
 
+        /**
+         * @brief Check whether the real-space values of the SBProfile may be calculated by
+         * several threads at once.
+         *
+         * This is true for most profiles, but not for ones that use a cache of intermediate
+         * results when calculating xValue (e.g. SBInterpolatedImage).
+         */
+        bool isThreadSafe() const;
+
         /// @brief Returns (X, Y) centroid of SBProfile.
         Position<double> centroid() const;
 
@@ -379,6 +419,35 @@ namespace galsim {
         shared_ptr<SBProfileImpl> _pimpl;
     };
 
+    /**
+     * @brief Draw each of a list of profiles onto the corresponding image.
+     *
+     * This does the same thing as drawImage in python for each profile (with a uniform wcs and
+     * an image that is already set up), but the loop is done in C++, so there is no Python
+     * overhead for each image.  Each profile is transformed to image coordinates, convolved by
+     * the pixel if appropriate, and drawn either in real space or with an FFT, centered on the
+     * center of its image.  If all of the profiles are thread-safe, the images are shared among
+     * GetNumThreads() threads, unless some of the images share pixels, in which case they are
+     * drawn in order in a single thread.
+     *
+     * @param[in] profs     The profiles to draw, in world coordinates.
+     * @param[in] images    The images on which to draw them.  Must be the same length as profs.
+     * @param[in] params    7 values for each profile: the jacobian (A,B,C,D) from world to image
+     *                      coordinates, the offset (x,y) of the profile from the image center,
+     *                      and the flux scaling to apply.
+     * @param[in] method    0 to draw without a pixel (method='no_pixel' or 'sb'), 1 for
+     *                      method='auto', 2 for method='fft', or 3 for method='real_space'.
+     * @param[in] use_true_center  Whether to center even-sized images on the true center.
+     * @param[out] status   For each image, 1 if it was drawn in real space, 2 if it was drawn
+     *                      with an FFT, or 0 if it was not drawn, because drawImage would either
+     *                      emit a warning or raise an exception for it.
+     * @param[out] sums     The sum of each image after drawing it.
+     */
+    template <typename T>
+    void DrawMany(const std::vector<SBProfile>& profs, const std::vector<ImageView<T> >& images,
+                  const double* params, int method, bool use_true_center,
+                  int* status, double* sums);
+
 }
 
 #endif
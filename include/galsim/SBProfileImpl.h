@@ -122,9 +122,17 @@ namespace galsim {
 
         virtual double getNegativeFlux() const { return getFlux()>0. ? 0. : -getFlux(); }
 
+        // Most profiles calculate xValue without modifying anything, so several threads may
+        // draw the same profile at once.  Profiles that use a cache need to override this.
+        virtual bool isThreadSafe() const { return true; }
+
         // Public so it can be directly used from SBProfile.
         GSParams gsparams;
 
+        // A number that is different for each profile.  Unlike the address, this is never
+        // reused after the profile is deleted, so it can identify the profile in a cache.
+        const unsigned long long id;
+
         virtual std::string serialize() const = 0;
 
         virtual std::string repr() const {return serialize(); }
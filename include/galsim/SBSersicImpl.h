@@ -20,6 +20,7 @@
 #ifndef GalSim_SBSersicImpl_H
 #define GalSim_SBSersicImpl_H
 
+#include <mutex>
 #include "SBProfileImpl.h"
 #include "SBInclinedSersic.h"
 #include "SBSersic.h"
@@ -118,13 +119,23 @@ namespace galsim {
         mutable double _highk_a; ///< Coefficient of 1/k^2 in high-k asymptote
         mutable double _highk_b; ///< Coefficient of 1/k^3 in high-k asymptote
 
+        // A SersicInfo is shared by all the profiles with the same n and trunc, which may be used
+        // from several threads at once, so each of the above calculations is only done once,
+        // by one thread.
+        mutable std::once_flag _stepk_once;
+        mutable std::once_flag _hlr_once;
+        mutable std::once_flag _flux_once;
+        mutable std::once_flag _ft_once;
+
         // Classes used for photon shooting
         mutable shared_ptr<FluxDensity> _radial;
         mutable shared_ptr<OneDimensionalDeviate> _sampler;
 
         // Helper functions used internally:
         void buildFT() const;
+        void calculateStepK() const;
         void calculateHLR() const;
+        void calculateFluxFraction() const;
         double calculateMissingFluxRadius(double missing_flux_frac) const;
     };
 
@@ -20,6 +20,7 @@
 #ifndef GalSim_SBSpergelImpl_H
 #define GalSim_SBSpergelImpl_H
 
+#include <mutex>
 #include "SBProfileImpl.h"
 #include "SBSpergel.h"
 #include "LRUCache.h"
@@ -99,6 +100,17 @@ namespace galsim {
         mutable double _stepk;   ///< Sampling in k space necessary to avoid folding.
         mutable double _re;      ///< The HLR in units of r0.
 
+        // A SpergelInfo is shared by all the profiles with the same nu, which may be used from
+        // several threads at once, so each of the above calculations is only done once,
+        // by one thread.
+        mutable std::once_flag _maxk_once;
+        mutable std::once_flag _stepk_once;
+        mutable std::once_flag _hlr_once;
+
+        void calculateMaxK() const;
+        void calculateStepK() const;
+        void calculateHLR() const;
+
         // Classes used for photon shooting
         mutable shared_ptr<FluxDensity> _radial;
         mutable shared_ptr<OneDimensionalDeviate> _sampler;
@@ -20,6 +20,7 @@
 #ifndef GalSim_SBTransformImpl_H
 #define GalSim_SBTransformImpl_H
 
+#include <mutex>
 #include "SBProfileImpl.h"
 #include "SBTransform.h"
 
@@ -40,6 +41,7 @@ namespace galsim {
         bool isAxisymmetric() const { return _stillIsAxisymmetric; }
         bool hasHardEdges() const { return _adaptee.hasHardEdges(); }
         bool isAnalyticX() const { return _adaptee.isAnalyticX(); }
+        bool isThreadSafe() const { return _adaptee.isThreadSafe(); }
         bool isAnalyticK() const { return _adaptee.isAnalyticK(); }
 
         double maxK() const;
@@ -121,7 +123,16 @@ namespace galsim {
         mutable double _coeff_b, _coeff_c, _coeff_c2; ///< Values used in getYRangeX(x,ymin,ymax);
         mutable std::vector<double> _xsplits, _ysplits; ///< Good split points for the intetegrals
 
+        // The above are calculated the first time they are needed.  Profiles may be used from
+        // several threads at once, so each calculation is only done once, by one thread.
+        mutable std::once_flag _maxk_once;
+        mutable std::once_flag _stepk_once;
+        mutable std::once_flag _ranges_once;
+
+        void calculateMaxK() const;
+        void calculateStepK() const;
         void setupRanges() const;
+        void calculateRanges() const;
 
         /**
          * @brief Forward coordinate transform with `M` matrix.
@@ -31,6 +31,7 @@
 #include "Image.h"
 #include "PhotonArray.h"
 #include "Table.h"
+#include "DirtyRegion.h"
 
 namespace galsim
 {
@@ -47,11 +48,28 @@ namespace galsim
         bool insidePixel(int ix, int iy, double x, double y, double zconv,
                          ImageView<T> target, bool* off_edge=0) const;
 
+        // The same, but using the given pixel polygons, which cover the pixels in bounds b,
+        // and the given scratch polygon.
+        bool insidePixel(int ix, int iy, double x, double y, double zconv,
+                         const Bounds<int>& b, const std::vector<Polygon>& imagepolys,
+                         Polygon& testpoly, bool* off_edge=0) const;
+
         double calculateConversionDepth(const PhotonArray& photons, int i, BaseDeviate rng) const;
 
+        // The same, but with the absorption length for the photon's wavelength already
+        // looked up.  (Only used if the photons have wavelengths.)
+        double calculateConversionDepth(const PhotonArray& photons, int i, double abs_length,
+                                        BaseDeviate rng) const;
+
         template <typename T>
         void updatePixelDistortions(ImageView<T> target);
 
+        // The same, but only using the charge in the source pixels, and only updating the
+        // pixels in region.
+        template <typename T>
+        void updatePixelDistortions(ImageView<T> target, const Bounds<int>& source,
+                                    const Bounds<int>& region);
+
         template <typename T>
         void addTreeRingDistortions(ImageView<T> target, Position<int> orig_center);
 
@@ -59,10 +77,49 @@ namespace galsim
         double accumulate(const PhotonArray& photons, BaseDeviate rng, ImageView<T> target,
                           Position<int> orig_center, bool resume);
 
+        // A multithreaded version of accumulate.  The image is split into tiles of
+        // tile_size x tile_size pixels, and the photons incident on each tile are accumulated
+        // in parallel using nthreads threads.  This is done in rounds, with each tile adding up
+        // to nrecalc electrons in each round before the pixel distortions are updated.
+        template <typename T>
+        double accumulateTiles(const PhotonArray& photons, BaseDeviate rng, ImageView<T> target,
+                               Position<int> orig_center, bool resume, int tile_size,
+                               int nthreads);
+
         template <typename T>
         void fillWithPixelAreas(ImageView<T> target, Position<int> orig_center);
 
+        // The parts of the image that have received charge since the pixel distortions were
+        // last updated.
+        const DirtyRegion& getDirtyRegion() const { return _dirty; }
+
+        // Access to the state that accumulate needs in order to resume accumulating onto an
+        // image, so it can be saved and later restored into another Silicon object.
+        // The polygon data are n * nv * 2 values giving the (x,y) of each of the nv vertices
+        // of the pixel polygons start .. start+n-1, where nv = 4 * numVertices + 4.
+        int getNumPolygons() const { return int(_imagepolys.size()); }
+        double getNextRecalc() const { return _resume_next_recalc; }
+        void getDelta(ImageView<double> delta) const;
+        void getImagePolys(int start, int n, double* data) const;
+
+        // setState must be called before setImagePolys, since it resets all the pixel
+        // polygons to the undistorted shape for an image with the bounds of delta.
+        void setState(ImageView<double> delta, double next_recalc);
+        void setImagePolys(int start, int n, const double* data);
+
     private:
+        struct Tile;
+
+        template <typename T>
+        double initialize(ImageView<T> target, Position<int> orig_center, bool resume);
+
+        template <typename T>
+        void flushDelta(ImageView<T> target);
+
+        void accumulateTile(Tile& tile, const PhotonArray& photons,
+                            const std::vector<double>& abs_length,
+                            const Bounds<int>& image_bounds, double nrecalc) const;
+
         Polygon _emptypoly;
         mutable Polygon _testpoly;
         std::vector<Polygon> _distortions;
@@ -75,6 +132,7 @@ namespace galsim
         bool _transpose;
         double _resume_next_recalc;
         ImageAlloc<double> _delta;
+        DirtyRegion _dirty;
     };
 }
 
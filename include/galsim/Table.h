@@ -105,6 +105,10 @@ namespace galsim {
 
         void finalize();
 
+        /// The entries that have been added so far.
+        const std::vector<double>& getArgs() const { return _xvec; }
+        const std::vector<double>& getVals() const { return _fvec; }
+
     private:
 
         bool _final;
@@ -0,0 +1,104 @@
+/* -*- c++ -*-
+ * Copyright (c) 2012-2018 by the GalSim developers team on GitHub
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ * https://github.com/GalSim-developers/GalSim
+ *
+ * GalSim is free software: redistribution and use in source and binary forms,
+ * with or without modification, are permitted provided that the following
+ * conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice, this
+ *    list of conditions, and the disclaimer given in the accompanying LICENSE
+ *    file.
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions, and the disclaimer given in the documentation
+ *    and/or other materials provided with the distribution.
+ */
+
+#ifndef GalSim_TableCache_H
+#define GalSim_TableCache_H
+
+#include <string>
+#include <vector>
+
+#include "Table.h"
+#include "GSParams.h"
+
+namespace galsim {
+
+    /**
+     * @brief Set the directory in which to keep the lookup tables that some profiles build.
+     *
+     * SersicInfo, KolmogorovInfo, VonKarmanInfo and SKInfo take a while to build their
+     * tables.  If a cache directory is set, the tables are written there the first time they
+     * are built, and later processes read them back rather than building them again.
+     * An empty string (the default) turns this off.
+     */
+    void SetTableCacheDir(const std::string& dir);
+
+    /// @brief Get the current table cache directory (or "" if there isn't one).
+    std::string GetTableCacheDir();
+
+    /**
+     * @brief Make a key for a TableCacheEntry from the parameters and the GSParams.
+     *
+     * The values are written with enough digits that different values give different keys.
+     */
+    std::string MakeTableCacheKey(const std::vector<double>& params, const GSParams& gsparams);
+
+    /**
+     * @brief The values and tables that one of the *Info classes keeps in the cache directory.
+     *
+     * The key should include everything that the tables depend on, typically the parameters
+     * and the GSParams.  Use it like this:
+     *
+     *     TableCacheEntry entry("SersicInfo", key);
+     *     if (entry.load(1, 1)) {
+     *         x = entry.getValue();
+     *         entry.getTable(table);
+     *     } else {
+     *         // build x and table
+     *         entry.addValue(x);
+     *         entry.addTable(table);
+     *         entry.save();
+     *     }
+     *
+     * The values and tables are read back in the same order they were added.
+     */
+    class TableCacheEntry
+    {
+    public:
+        TableCacheEntry(const std::string& name, const std::string& key);
+
+        /**
+         * @brief Read the entry from the cache directory.
+         *
+         * Returns whether it was found with the expected number of values and tables.
+         */
+        bool load(int nvalues, int ntables);
+
+        /// Write the entry to the cache directory (if there is one).
+        void save() const;
+
+        void addValue(double value) { _values.push_back(value); }
+        void addTable(const TableBuilder& table);
+
+        double getValue();
+        void getTable(TableBuilder& table);
+
+    private:
+        std::string fileName() const;
+
+        std::string _name;
+        std::string _key;
+        std::vector<double> _values;
+        std::vector<std::vector<double> > _tables;  // args and vals of each table in turn
+        size_t _ivalue;
+        size_t _itable;
+    };
+
+}
+
+#endif
@@ -19,6 +19,7 @@
 
 #include "PyBind11Helper.h"
 #include "Image.h"
+#include "FFT.h"
 
 // Note that docstrings are now added in galsim/image.py
 namespace galsim {
@@ -71,6 +72,16 @@ namespace galsim {
         WrapImage<std::complex<float> >(_galsim, "CF");
 
         GALSIM_DOT def("goodFFTSize", &goodFFTSize);
+
+        GALSIM_DOT def("SetFFTWThreads", &SetFFTWThreads);
+        GALSIM_DOT def("GetFFTWThreads", &GetFFTWThreads);
+        GALSIM_DOT def("HasFFTWThreads", &HasFFTWThreads);
+        GALSIM_DOT def("ImportFFTWWisdom", &ImportFFTWWisdom);
+        GALSIM_DOT def("ExportFFTWWisdom", &ExportFFTWWisdom);
+        GALSIM_DOT def("FFTWWisdomChanged", &FFTWWisdomChanged);
+        GALSIM_DOT def("ForgetFFTWWisdom", &ForgetFFTWWisdom);
+        GALSIM_DOT def("GetNumFFTPlans", &GetNumFFTPlans);
+        GALSIM_DOT def("ClearFFTPlans", &ClearFFTPlans);
     }
 
 } // namespace galsim
@@ -19,21 +19,47 @@
 
 #include "PyBind11Helper.h"
 #include "PhotonArray.h"
+#include "PhotonOps.h"
 
 namespace galsim {
 
+    // Release the GIL while adding the photons to an image or convolving them, since these
+    // can take a while for large numbers of photons.
+    template <typename T>
+    static double AddTo(const PhotonArray& photons, ImageView<T> target)
+    {
+        ReleaseGIL release;
+        return photons.addTo(target);
+    }
+
+    static void Convolve(PhotonArray& photons, const PhotonArray& rhs, BaseDeviate rng)
+    {
+        ReleaseGIL release;
+        photons.convolve(rhs, rng);
+    }
+
     template <typename T, typename W>
     static void WrapTemplates(W& wrapper) {
         wrapper
-            .def("addTo", (double (PhotonArray::*)(ImageView<T>) const) &PhotonArray::addTo)
+            .def("addTo", &AddTo<T>)
             .def("setFrom",
                  (int (PhotonArray::*)(const BaseImage<T>&, double, BaseDeviate))
                  &PhotonArray::setFrom);
     }
 
     static PhotonArray* construct(int N, size_t ix, size_t iy, size_t iflux,
-                                  size_t idxdz, size_t idydz, size_t iwave, bool is_corr)
+                                  size_t idxdz, size_t idydz, size_t iwave, bool is_corr,
+                                  bool single)
     {
+        if (single) {
+            float *x = reinterpret_cast<float*>(ix);
+            float *y = reinterpret_cast<float*>(iy);
+            float *flux = reinterpret_cast<float*>(iflux);
+            float *dxdz = reinterpret_cast<float*>(idxdz);
+            float *dydz = reinterpret_cast<float*>(idydz);
+            float *wave = reinterpret_cast<float*>(iwave);
+            return new PhotonArray(N, x, y, flux, dxdz, dydz, wave, is_corr);
+        }
         double *x = reinterpret_cast<double*>(ix);
         double *y = reinterpret_cast<double*>(iy);
         double *flux = reinterpret_cast<double*>(iflux);
@@ -43,14 +69,44 @@ namespace galsim {
         return new PhotonArray(N, x, y, flux, dxdz, dydz, wave, is_corr);
     }
 
+    static PhotonDCROp* constructDCR(size_t irefraction, int n, double base_refraction,
+                                     double sinp, double cosp, double scale,
+                                     double base_wavelength, double alpha,
+                                     size_t iaffine, double cenx, double ceny)
+    {
+        const double* refraction = reinterpret_cast<const double*>(irefraction);
+        const double* affine = reinterpret_cast<const double*>(iaffine);
+        return new PhotonDCROp(refraction, n, base_refraction, sinp, cosp, scale,
+                               base_wavelength, alpha, affine, cenx, ceny);
+    }
+
+    static void ApplyOps(const PhotonOpList& ops, PhotonArray& photons, int i1, int i2)
+    {
+        ReleaseGIL release;
+        ops.applyTo(photons, i1, i2);
+    }
+
     void pyExportPhotonArray(PY_MODULE& _galsim)
     {
         py::class_<PhotonArray> pyPhotonArray(GALSIM_COMMA "PhotonArray" BP_NOINIT);
         pyPhotonArray
             .def(PY_INIT(&construct))
-            .def("convolve", &PhotonArray::convolve);
+            .def("convolve", &Convolve);
         WrapTemplates<double>(pyPhotonArray);
         WrapTemplates<float>(pyPhotonArray);
+
+        py::class_<PhotonOp BP_NONCOPYABLE>(GALSIM_COMMA "PhotonOp" BP_NOINIT);
+        py::class_<WavelengthSamplerOp, BP_BASES(PhotonOp)>(
+            GALSIM_COMMA "WavelengthSamplerOp" BP_NOINIT)
+            .def(py::init<const Table&, double, BaseDeviate>());
+        py::class_<FRatioAnglesOp, BP_BASES(PhotonOp)>(GALSIM_COMMA "FRatioAnglesOp" BP_NOINIT)
+            .def(py::init<double, double, BaseDeviate>());
+        py::class_<PhotonDCROp, BP_BASES(PhotonOp)>(GALSIM_COMMA "PhotonDCROp" BP_NOINIT)
+            .def(PY_INIT(&constructDCR));
+        py::class_<PhotonOpList>(GALSIM_COMMA "PhotonOpList" BP_NOINIT)
+            .def(py::init<int>())
+            .def("append", &PhotonOpList::append)
+            .def("applyTo", &ApplyOps);
     }
 
 } // namespace galsim
@@ -77,4 +77,14 @@ namespace py = pybind11;
 
 #endif
 
+// Release the GIL while running some C++ code that doesn't use any Python objects, so other
+// Python threads can run at the same time.  The GIL is reacquired when this goes out of scope,
+// including when an exception is thrown.
+struct ReleaseGIL
+{
+    ReleaseGIL() : _state(PyEval_SaveThread()) {}
+    ~ReleaseGIL() { PyEval_RestoreThread(_state); }
+    PyThreadState* _state;
+};
+
 #endif
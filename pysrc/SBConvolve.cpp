@@ -47,6 +47,11 @@ namespace galsim {
             .def(py::init<const SBProfile&, bool, GSParams>());
         py::class_<SBAutoCorrelate, BP_BASES(SBProfile)>(GALSIM_COMMA "SBAutoCorrelate" BP_NOINIT)
             .def(py::init<const SBProfile&, bool, GSParams>());
+
+        GALSIM_DOT def("SetConvolveCacheSize", &SetConvolveCacheSize);
+        GALSIM_DOT def("GetConvolveCacheSize", &GetConvolveCacheSize);
+        GALSIM_DOT def("GetNumConvolveCacheImages", &GetNumConvolveCacheImages);
+        GALSIM_DOT def("GetNumConvolveCacheHits", &GetNumConvolveCacheHits);
     }
 
 } // namespace galsim
@@ -23,10 +23,103 @@
 
 namespace galsim {
 
+    // Drawing large images can take a while, so release the GIL while doing it, so other
+    // Python threads can run.  This is only safe if the profile may be used by several
+    // threads at once.
+    template <typename T>
+    static void Draw(const SBProfile& prof, ImageView<T> image, double dx)
+    {
+        if (prof.isThreadSafe()) {
+            ReleaseGIL release;
+            prof.draw(image, dx);
+        } else {
+            prof.draw(image, dx);
+        }
+    }
+
+    // Likewise for shooting photons.  This is safe for all profiles, so long as the same rng
+    // isn't being used by another thread.
+    static void Shoot(const SBProfile& prof, PhotonArray& photons, BaseDeviate rng)
+    {
+        ReleaseGIL release;
+        prof.shoot(photons, rng);
+    }
+
+    // Evaluate the profile at many positions in one call.  Again, only release the GIL if the
+    // profile is thread-safe.
+    static void XValues(const SBProfile& prof, size_t ix, size_t iy, size_t ival, int n)
+    {
+        const double* x = reinterpret_cast<const double*>(ix);
+        const double* y = reinterpret_cast<const double*>(iy);
+        double* val = reinterpret_cast<double*>(ival);
+        if (prof.isThreadSafe()) {
+            ReleaseGIL release;
+            prof.xValues(x, y, val, n);
+        } else {
+            prof.xValues(x, y, val, n);
+        }
+    }
+
+    static void KValues(const SBProfile& prof, size_t ikx, size_t iky, size_t ival, int n)
+    {
+        const double* kx = reinterpret_cast<const double*>(ikx);
+        const double* ky = reinterpret_cast<const double*>(iky);
+        std::complex<double>* val = reinterpret_cast<std::complex<double>*>(ival);
+        if (prof.isThreadSafe()) {
+            ReleaseGIL release;
+            prof.kValues(kx, ky, val, n);
+        } else {
+            prof.kValues(kx, ky, val, n);
+        }
+    }
+
+    // Draw many profiles in one call.  Like Draw, only release the GIL if all of the profiles
+    // are thread-safe.
+    template <typename T>
+    static void CallDrawMany(const std::vector<SBProfile>& profs,
+                             const std::vector<ImageView<T> >& images, size_t iparams,
+                             int method, bool use_true_center, size_t istatus, size_t isums)
+    {
+        const double* params = reinterpret_cast<const double*>(iparams);
+        int* status = reinterpret_cast<int*>(istatus);
+        double* sums = reinterpret_cast<double*>(isums);
+        bool thread_safe = true;
+        for (size_t i=0; i<profs.size(); ++i)
+            if (!profs[i].isThreadSafe()) { thread_safe = false; break; }
+        if (thread_safe) {
+            ReleaseGIL release;
+            DrawMany(profs, images, params, method, use_true_center, status, sums);
+        } else {
+            DrawMany(profs, images, params, method, use_true_center, status, sums);
+        }
+    }
+
+#ifdef USE_BOOST
+    template <typename T>
+    static void PyDrawMany(const py::object& prof_list, const py::object& image_list,
+                           size_t iparams, int method, bool use_true_center,
+                           size_t istatus, size_t isums)
+    {
+        py::stl_input_iterator<SBProfile> piter(prof_list), pend;
+        std::vector<SBProfile> profs(piter, pend);
+        py::stl_input_iterator<ImageView<T> > iiter(image_list), iend;
+        std::vector<ImageView<T> > images(iiter, iend);
+        CallDrawMany(profs, images, iparams, method, use_true_center, istatus, isums);
+    }
+#else
+    template <typename T>
+    static void PyDrawMany(const std::vector<SBProfile>& profs,
+                           const std::vector<ImageView<T> >& images, size_t iparams,
+                           int method, bool use_true_center, size_t istatus, size_t isums)
+    {
+        CallDrawMany(profs, images, iparams, method, use_true_center, istatus, isums);
+    }
+#endif
+
     template <typename T, typename W>
     static void WrapTemplates(W& wrapper)
     {
-        wrapper.def("draw", (void (SBProfile::*)(ImageView<T>, double) const)&SBProfile::draw);
+        wrapper.def("draw", &Draw<T>);
         wrapper.def("drawK", (void (SBProfile::*)(ImageView<std::complex<T> >, double) const)
                     &SBProfile::drawK);
     }
@@ -42,6 +135,8 @@ namespace galsim {
         pySBProfile
             .def("xValue", &SBProfile::xValue)
             .def("kValue", &SBProfile::kValue)
+            .def("xValues", &XValues)
+            .def("kValues", &KValues)
             .def("maxK", &SBProfile::maxK)
             .def("stepK", &SBProfile::stepK)
             .def("centroid", &SBProfile::centroid)
@@ -49,9 +144,15 @@ namespace galsim {
             .def("getPositiveFlux", &SBProfile::getPositiveFlux)
             .def("getNegativeFlux", &SBProfile::getNegativeFlux)
             .def("maxSB", &SBProfile::maxSB)
-            .def("shoot", &SBProfile::shoot);
+            .def("shoot", &Shoot);
         WrapTemplates<float>(pySBProfile);
         WrapTemplates<double>(pySBProfile);
+
+        GALSIM_DOT def("DrawManyF", &PyDrawMany<float>);
+        GALSIM_DOT def("DrawManyD", &PyDrawMany<double>);
+
+        GALSIM_DOT def("SetNumThreads", &SetNumThreads);
+        GALSIM_DOT def("GetNumThreads", &GetNumThreads);
     }
 
 } // namespace galsim
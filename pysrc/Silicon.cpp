@@ -27,9 +27,13 @@ namespace galsim {
     static void WrapTemplates(W& wrapper) {
         typedef double (Silicon::*accumulate_fn)(const PhotonArray&, BaseDeviate,
                                                  ImageView<T>, Position<int>, bool);
+        typedef double (Silicon::*accumulate_tiles_fn)(const PhotonArray&, BaseDeviate,
+                                                       ImageView<T>, Position<int>, bool,
+                                                       int, int);
         typedef void (Silicon::*area_fn)(ImageView<T>, Position<int>);
 
         wrapper.def("accumulate", (accumulate_fn)&Silicon::accumulate);
+        wrapper.def("accumulate_tiles", (accumulate_tiles_fn)&Silicon::accumulateTiles);
         wrapper.def("fill_with_pixel_areas", (area_fn)&Silicon::fillWithPixelAreas);
     }
 
@@ -46,10 +50,39 @@ namespace galsim {
                            treeRingTable, treeRingCenter, abs_length_table, transpose);
     }
 
+    static DirtyRegion GetDirtyRegion(const Silicon& silicon)
+    { return silicon.getDirtyRegion(); }
+
+    static void GetImagePolys(const Silicon& silicon, int start, int n, size_t idata)
+    {
+        double* data = reinterpret_cast<double*>(idata);
+        silicon.getImagePolys(start, n, data);
+    }
+
+    static void SetImagePolys(Silicon& silicon, int start, int n, size_t idata)
+    {
+        const double* data = reinterpret_cast<const double*>(idata);
+        silicon.setImagePolys(start, n, data);
+    }
+
     void pyExportSilicon(PY_MODULE& _galsim)
     {
+        py::class_<DirtyRegion>(GALSIM_COMMA "DirtyRegion" BP_NOINIT)
+            .def("getNBlocks", &DirtyRegion::getNBlocks)
+            .def("getBlock", &DirtyRegion::getBlock)
+            .def("getBlockSize", &DirtyRegion::getBlockSize)
+            .def("getNumClears", &DirtyRegion::getNumClears)
+            .def("getTotalArea", &DirtyRegion::getTotalArea);
+
         py::class_<Silicon> pySilicon(GALSIM_COMMA "Silicon" BP_NOINIT);
         pySilicon.def(PY_INIT(&MakeSilicon));
+        pySilicon.def("getDirtyRegion", &GetDirtyRegion);
+        pySilicon.def("getNumPolygons", &Silicon::getNumPolygons);
+        pySilicon.def("getNextRecalc", &Silicon::getNextRecalc);
+        pySilicon.def("getDelta", &Silicon::getDelta);
+        pySilicon.def("getImagePolys", &GetImagePolys);
+        pySilicon.def("setState", &Silicon::setState);
+        pySilicon.def("setImagePolys", &SetImagePolys);
 
         WrapTemplates<double>(pySilicon);
         WrapTemplates<float>(pySilicon);
@@ -19,6 +19,7 @@
 
 #include "PyBind11Helper.h"
 #include "Table.h"
+#include "TableCache.h"
 #include "Interpolant.h"
 
 namespace galsim {
@@ -162,6 +163,8 @@ namespace galsim {
             .def("gradientGrid", &GradientGrid);
 
         GALSIM_DOT def("WrapArrayToPeriod", &_WrapArrayToPeriod);
+        GALSIM_DOT def("SetTableCacheDir", &SetTableCacheDir);
+        GALSIM_DOT def("GetTableCacheDir", &GetTableCacheDir);
     }
 
 } // namespace galsim
@@ -69,10 +69,10 @@ if "--debug" in sys.argv:
     undef_macros+=['NDEBUG']
 
 copt =  {
-    'gcc' : ['-O2','-msse2','-std=c++11','-fvisibility=hidden'],
-    'icc' : ['-O2','-msse2','-vec-report0','-std=c++11'],
+    'gcc' : ['-O2','-msse2','-std=c++11','-fvisibility=hidden','-pthread'],
+    'icc' : ['-O2','-msse2','-vec-report0','-std=c++11','-pthread'],
     'clang' : ['-O2','-msse2','-std=c++11','-Wno-shorten-64-to-32','-fvisibility=hidden',
-               '-stdlib=libc++'],
+               '-stdlib=libc++','-pthread'],
     'unknown' : [],
 }
 
@@ -198,6 +198,22 @@ def find_fftw_lib(output=False):
         return libpath
 
 
+# Check for the fftw3_threads library, which is usually installed along with fftw3.
+def find_fftw_threads_lib(fftw_lib, output=False):
+    libpath = fftw_lib.replace('libfftw3', 'libfftw3_threads')
+    if output: print("Looking for ",os.path.basename(libpath))
+    if libpath != fftw_lib and os.path.isfile(libpath):
+        try:
+            ctypes.cdll.LoadLibrary(libpath)
+        except OSError:
+            pass
+        else:
+            if output: print("  ", os.path.dirname(libpath), "  (yes)")
+            return libpath
+    if output: print("  (no)  FFTW will only use a single thread.")
+    return None
+
+
 # Check for Eigen in some likely places
 def find_eigen_dir(output=False):
     import distutils.sysconfig
@@ -512,11 +528,16 @@ def add_dirs(builder, output=False):
     # Look for fftw3.
     fftw_lib = find_fftw_lib(output=output)
     fftw_libpath, fftw_libname = os.path.split(fftw_lib)
+    fftw_threads_lib = find_fftw_threads_lib(fftw_lib, output=output)
     if hasattr(builder, 'library_dirs'):
         if fftw_libpath != '':
             builder.library_dirs.append(fftw_libpath)
         builder.libraries.append('galsim')  # Make sure galsim comes before fftw3
+        if fftw_threads_lib is not None:
+            builder.libraries.append(os.path.split(fftw_threads_lib)[1].split('.')[0][3:])
         builder.libraries.append(os.path.split(fftw_lib)[1].split('.')[0][3:])
+    if fftw_threads_lib is not None:
+        builder.define = (builder.define or []) + [('GALSIM_FFTW_THREADS', None)]
     fftw_include = os.path.join(os.path.split(fftw_libpath)[0], 'include')
     if os.path.isfile(os.path.join(fftw_include, 'fftw3.h')):
         print('Include directory for fftw3 is ',fftw_include)
@@ -644,7 +665,7 @@ class my_build_ext(build_ext):
         for e in self.extensions:
             e.extra_compile_args = cflags
             for flag in cflags:
-                if 'stdlib' in flag:
+                if 'stdlib' in flag or flag == '-pthread':
                     e.extra_link_args.append(flag)
 
         # Now run the normal build function.
@@ -722,6 +743,9 @@ class my_test(test):
         fftw_libpath, fftw_libname = os.path.split(fftw_lib)
         if fftw_libpath != '':
             library_dirs.append(fftw_libpath)
+        fftw_threads_lib = find_fftw_threads_lib(fftw_lib)
+        if fftw_threads_lib is not None:
+            libraries.append(os.path.split(fftw_threads_lib)[1].split('.')[0][3:])
         libraries.append(fftw_libname.split('.')[0][3:])
 
         exe_file = os.path.join(builder.build_temp,'cpp_test')
@@ -23,7 +23,13 @@
 
 #include <limits>
 #include <vector>
+#include <map>
 #include <cassert>
+#include <cstdio>
+#include <mutex>
+#include <thread>
+#include <tuple>
+#include <type_traits>
 #include "FFT.h"
 #include "Std.h"
 
@@ -53,6 +59,301 @@ namespace galsim {
         }
     }
 
+    // The number of threads FFTW may use.
+    static int fftw_threads = 1;
+
+    // Don't bother with threads for small transforms.  The overhead would be more than
+    // the time saved.  (cf. the similar criterion in SBProfile::draw.)
+    static const int min_pixels_per_thread = 16384;
+
+    // How many times a size needs to be used before it is worth re-planning with FFTW_MEASURE.
+    static const int measure_after = 4;
+
+    // The most plans to keep.  When there are more than this, the ones that were used the
+    // longest time ago are dropped.
+    static const size_t max_fft_plans = 100;
+
+    // All FFTW calls other than the execute functions need to be done one at a time.
+    static std::mutex fftw_mutex;
+
+    // This one protects fft_plans and wisdom_changed.  It is never held while waiting for
+    // fftw_mutex, so making a new plan (which can take a while with FFTW_MEASURE) doesn't hold
+    // up the transforms that already have one.
+    static std::mutex fft_plans_mutex;
+
+    static bool wisdom_changed = false;
+
+    // Destroy a plan once nothing is using it anymore.
+    struct FFTPlanDeleter
+    {
+        void operator()(fftw_plan plan) const
+        {
+            std::lock_guard<std::mutex> lock(fftw_mutex);
+            fftw_destroy_plan(plan);
+        }
+    };
+    typedef shared_ptr<std::remove_pointer<fftw_plan>::type> FFTPlanPtr;
+
+    // FFTW requires arrays given to an existing plan to have the same alignment as the ones it
+    // was made with.  Our arrays are only guaranteed to be 16 byte aligned, so the alignment
+    // (mod 64, which covers all the SIMD instruction sets) is part of the key for the saved
+    // plans.  The key is (kind, Ny, Nx, in_place, in_align, out_align, nthreads).
+    typedef std::tuple<int,int,int,bool,int,int,int> FFTPlanKey;
+
+    struct FFTPlan
+    {
+        FFTPlan() : nuses(0), last_use(0), measured(false) {}
+        FFTPlanPtr plan;
+        int nuses;
+        long last_use;
+        bool measured;
+    };
+
+    static std::map<FFTPlanKey,FFTPlan> fft_plans;
+    static long fft_plan_clock = 0;
+
+    void SetFFTWThreads(int nthreads)
+    {
+        if (nthreads <= 0) nthreads = std::thread::hardware_concurrency();
+        // hardware_concurrency returns 0 if it can't tell.
+        fftw_threads = std::max(nthreads, 1);
+    }
+
+    int GetFFTWThreads() { return fftw_threads; }
+
+    bool HasFFTWThreads()
+    {
+#ifdef GALSIM_FFTW_THREADS
+        return true;
+#else
+        return false;
+#endif
+    }
+
+    // Make a plan using the given arrays.  fftw_mutex must be locked.
+    static fftw_plan MakePlan(FFTKind kind, int Ny, int Nx, void* in, void* out,
+                              int nthreads, unsigned flags)
+    {
+#ifdef GALSIM_FFTW_THREADS
+        static bool init_threads = false;
+        if (!init_threads) {
+            fftw_init_threads();
+            init_threads = true;
+        }
+        fftw_plan_with_nthreads(nthreads);
+#endif
+        fftw_complex* cin = reinterpret_cast<fftw_complex*>(in);
+        fftw_complex* cout = reinterpret_cast<fftw_complex*>(out);
+        switch (kind) {
+          case FFT_R2C:
+               return fftw_plan_dft_r2c_2d(Ny, Nx, reinterpret_cast<double*>(in), cout, flags);
+          case FFT_C2R:
+               return fftw_plan_dft_c2r_2d(Ny, Nx, cin, reinterpret_cast<double*>(out), flags);
+          case FFT_FORWARD:
+               return fftw_plan_dft_2d(Ny, Nx, cin, cout, FFTW_FORWARD, flags);
+          case FFT_BACKWARD:
+               return fftw_plan_dft_2d(Ny, Nx, cin, cout, FFTW_BACKWARD, flags);
+          default:
+               return 0;
+        }
+    }
+
+    // Make the first plan for a key.  This uses the wisdom if there is any for this size, in
+    // which case measured is set to true.  Otherwise it uses FFTW_ESTIMATE.  Neither of these
+    // touch the arrays, so we can use the real ones.
+    static FFTPlanPtr MakeFirstPlan(FFTKind kind, int Ny, int Nx, void* in, void* out,
+                                    int nthreads, bool& measured)
+    {
+        std::lock_guard<std::mutex> lock(fftw_mutex);
+        fftw_plan plan = MakePlan(kind, Ny, Nx, in, out, nthreads,
+                                  FFTW_MEASURE | FFTW_WISDOM_ONLY);
+        measured = (plan != 0);
+        if (measured) {
+            xdbg<<"Using wisdom for this plan\n";
+        } else {
+            plan = MakePlan(kind, Ny, Nx, in, out, nthreads, FFTW_ESTIMATE);
+        }
+        if (!plan) throw FFTInvalid();
+        return FFTPlanPtr(plan, FFTPlanDeleter());
+    }
+
+    // Make a plan with FFTW_MEASURE.  This overwrites the arrays while it tries out different
+    // algorithms, so it uses scratch arrays with the same alignment as the real ones.
+    static FFTPlanPtr MakeMeasuredPlan(FFTKind kind, int Ny, int Nx, bool in_place,
+                                       int in_align, int out_align, int nthreads)
+    {
+        const size_t ncomplex = (kind == FFT_R2C || kind == FFT_C2R) ?
+            size_t(Ny) * (Nx/2+1) : size_t(Ny) * Nx;
+        const size_t nbytes = ncomplex * sizeof(std::complex<double>);
+        std::vector<char> in_mem(nbytes + 64);
+        std::vector<char> out_mem(in_place ? 0 : nbytes + 64);
+        char* in = in_mem.data() + (64 - (uintptr_t)(in_mem.data()) % 64 + in_align) % 64;
+        char* out = in_place ? in :
+            out_mem.data() + (64 - (uintptr_t)(out_mem.data()) % 64 + out_align) % 64;
+        std::lock_guard<std::mutex> lock(fftw_mutex);
+        fftw_plan plan = MakePlan(kind, Ny, Nx, in, out, nthreads, FFTW_MEASURE);
+        if (!plan) return FFTPlanPtr();
+        return FFTPlanPtr(plan, FFTPlanDeleter());
+    }
+
+    // Drop the plans that were used the longest time ago until there are at most max_fft_plans.
+    // fft_plans_mutex must be locked.  The dropped plans are added to removed, rather than being
+    // destroyed here, since that needs fftw_mutex.
+    static void TrimFFTPlans(std::vector<FFTPlanPtr>& removed)
+    {
+        while (fft_plans.size() > max_fft_plans) {
+            std::map<FFTPlanKey,FFTPlan>::iterator oldest = fft_plans.begin();
+            for (std::map<FFTPlanKey,FFTPlan>::iterator it=fft_plans.begin();
+                 it!=fft_plans.end(); ++it) {
+                if (it->second.last_use < oldest->second.last_use) oldest = it;
+            }
+            removed.push_back(oldest->second.plan);
+            fft_plans.erase(oldest);
+        }
+    }
+
+    void ExecuteFFT(FFTKind kind, int Ny, int Nx, void* in, void* out)
+    {
+        dbg<<"ExecuteFFT "<<kind<<"  "<<Ny<<" x "<<Nx<<std::endl;
+        const bool in_place = (in == out);
+        const int in_align = (uintptr_t)(in) % 64;
+        const int out_align = (uintptr_t)(out) % 64;
+#ifdef GALSIM_FFTW_THREADS
+        int nthreads = std::min(fftw_threads, Nx * Ny / min_pixels_per_thread);
+        nthreads = std::max(nthreads, 1);
+#else
+        const int nthreads = 1;
+#endif
+        FFTPlanKey key(kind, Ny, Nx, in_place, in_align, out_align, nthreads);
+
+        // The plans are made without holding fft_plans_mutex, so other threads can keep using
+        // their plans in the meantime.  Any plans that are replaced or dropped are kept in
+        // removed until the mutex is released.  Then they are destroyed once nothing else is
+        // executing them.
+        FFTPlanPtr plan;
+        std::vector<FFTPlanPtr> removed;
+        bool measure = false;
+        {
+            std::lock_guard<std::mutex> lock(fft_plans_mutex);
+            std::map<FFTPlanKey,FFTPlan>::iterator it = fft_plans.find(key);
+            if (it != fft_plans.end()) {
+                FFTPlan& p = it->second;
+                p.last_use = ++fft_plan_clock;
+                if (!p.measured && ++p.nuses >= measure_after) {
+                    // Only one thread needs to measure it.
+                    p.measured = true;
+                    measure = true;
+                }
+                plan = p.plan;
+            }
+        }
+
+        if (!plan) {
+            bool measured;
+            plan = MakeFirstPlan(kind, Ny, Nx, in, out, nthreads, measured);
+            std::lock_guard<std::mutex> lock(fft_plans_mutex);
+            FFTPlan& p = fft_plans[key];
+            if (p.plan) {
+                // Another thread made one at the same time.  Use that one.
+                removed.push_back(plan);
+                plan = p.plan;
+            } else {
+                p.plan = plan;
+                p.measured = measured;
+            }
+            p.last_use = ++fft_plan_clock;
+            TrimFFTPlans(removed);
+        } else if (measure) {
+            dbg<<"Measuring plan\n";
+            FFTPlanPtr measured = MakeMeasuredPlan(kind, Ny, Nx, in_place,
+                                                   in_align, out_align, nthreads);
+            if (measured) {
+                std::lock_guard<std::mutex> lock(fft_plans_mutex);
+                wisdom_changed = true;
+                std::map<FFTPlanKey,FFTPlan>::iterator it = fft_plans.find(key);
+                // (It might have been dropped in the meantime.)
+                if (it != fft_plans.end()) {
+                    removed.push_back(it->second.plan);
+                    it->second.plan = measured;
+                }
+                plan = measured;
+            }
+        }
+
+        switch (kind) {
+          case FFT_R2C:
+               fftw_execute_dft_r2c(plan.get(), reinterpret_cast<double*>(in),
+                                    reinterpret_cast<fftw_complex*>(out));
+               break;
+          case FFT_C2R:
+               fftw_execute_dft_c2r(plan.get(), reinterpret_cast<fftw_complex*>(in),
+                                    reinterpret_cast<double*>(out));
+               break;
+          default:
+               fftw_execute_dft(plan.get(), reinterpret_cast<fftw_complex*>(in),
+                                reinterpret_cast<fftw_complex*>(out));
+        }
+    }
+
+    int GetNumFFTPlans()
+    {
+        std::lock_guard<std::mutex> lock(fft_plans_mutex);
+        return int(fft_plans.size());
+    }
+
+    void ClearFFTPlans()
+    {
+        // Any plans that are still being executed are destroyed when they finish.
+        std::map<FFTPlanKey,FFTPlan> removed;
+        std::lock_guard<std::mutex> lock(fft_plans_mutex);
+        removed.swap(fft_plans);
+    }
+
+    bool ImportFFTWWisdom(const std::string& file_name)
+    {
+        std::lock_guard<std::mutex> lock(fftw_mutex);
+        FILE* fin = fopen(file_name.c_str(), "r");
+        if (!fin) return false;
+        int ok = fftw_import_wisdom_from_file(fin);
+        fclose(fin);
+        dbg<<"Import wisdom from "<<file_name<<": "<<ok<<std::endl;
+        return ok != 0;
+    }
+
+    bool ExportFFTWWisdom(const std::string& file_name)
+    {
+        bool ok;
+        {
+            std::lock_guard<std::mutex> lock(fftw_mutex);
+            FILE* fout = fopen(file_name.c_str(), "w");
+            if (!fout) return false;
+            fftw_export_wisdom_to_file(fout);
+            ok = (fclose(fout) == 0);
+        }
+        if (ok) {
+            std::lock_guard<std::mutex> lock(fft_plans_mutex);
+            wisdom_changed = false;
+        }
+        return ok;
+    }
+
+    bool FFTWWisdomChanged()
+    {
+        std::lock_guard<std::mutex> lock(fft_plans_mutex);
+        return wisdom_changed;
+    }
+
+    void ForgetFFTWWisdom()
+    {
+        ClearFFTPlans();
+        {
+            std::lock_guard<std::mutex> lock(fftw_mutex);
+            fftw_forget_wisdom();
+        }
+        std::lock_guard<std::mutex> lock(fft_plans_mutex);
+        wisdom_changed = false;
+    }
+
     KTable::KTable(int N, double dk, std::complex<double> value) : _dk(dk), _invdk(1./dk)
     {
         if (N<=0) throw FFTError("KTable size <=0");
@@ -1058,16 +1359,9 @@ namespace galsim {
         }
         xdbg<<"After fill t_array, t_array[0] = "<<t_array[0]<<std::endl;
 
-        fftw_plan plan = fftw_plan_dft_c2r_2d(
-            _N, _N, t_array.get_fftw(), xt._array.get_fftw(), FFTW_ESTIMATE);
-        xdbg<<"After make plan"<<std::endl;
-        if (plan==NULL) throw FFTInvalid();
-
         // Run the transform:
-        fftw_execute(plan);
+        ExecuteFFT(FFT_C2R, _N, _N, t_array.get(), xt._array.get());
         xdbg<<"After exec plan"<<std::endl;
-        fftw_destroy_plan(plan);
-        xdbg<<"After destroy plan"<<std::endl;
 
         xt._dx = 2.*M_PI*_invNd*_invdk;
         dbg<<"dx = "<<xt._dx<<std::endl;
@@ -1106,11 +1400,7 @@ namespace galsim {
         // Make a new copy of data array since measurement will overwrite:
         FFTW_Array<double> t_array = _array;
 
-        fftw_plan plan = fftw_plan_dft_r2c_2d(
-            _N,_N, t_array.get_fftw(), kt._array.get_fftw(), FFTW_ESTIMATE);
-        if (plan==NULL) throw FFTInvalid();
-        fftw_execute(plan);
-        fftw_destroy_plan(plan);
+        ExecuteFFT(FFT_R2C, _N, _N, t_array.get(), kt._array.get());
 
         // Now scale the k spectrum and flip signs for x=0 in middle.
         double fac = _dx * _dx;
@@ -84,6 +84,8 @@
 
 namespace galsim {
 
+    std::mutex Interpolant::_sampler_mutex;
+
     //
     // Generic InterpolantXY class methods
     //
@@ -532,6 +534,7 @@ namespace galsim {
     // outer interval
     void Quintic::checkSampler() const
     {
+        std::lock_guard<std::mutex> lock(_sampler_mutex);
         if (_sampler.get()) return;
         std::vector<double> ranges(8);
         ranges[0] = -3.;
@@ -34,18 +34,19 @@ namespace galsim {
     };
 
     PhotonArray::PhotonArray(int N) : 
-        _N(N), _dxdz(0), _dydz(0), _wave(0), _is_correlated(false), _vx(N), _vy(N), _vflux(N)
+        _N(N), _single(false), _dxdz(0), _dydz(0), _wave(0),
+        _fx(0), _fy(0), _fflux(0), _fdxdz(0), _fdydz(0), _fwave(0),
+        _is_correlated(false), _vx(N), _vy(N), _vflux(N)
     {
         _x = &_vx[0];
         _y = &_vy[0];
         _flux = &_vflux[0];
     }
 
-    template <typename T>
+    template <typename T, typename P>
     struct AddImagePhotons
     {
-        AddImagePhotons(double* x, double* y, double* f,
-                        double maxFlux, BaseDeviate rng) :
+        AddImagePhotons(P* x, P* y, P* f, double maxFlux, BaseDeviate rng) :
             _x(x), _y(y), _f(f), _maxFlux(maxFlux), _ud(rng), _count(0) {}
 
         void operator()(T flux, int i, int j)
@@ -64,30 +65,43 @@ namespace galsim {
 
         int getCount() const { return _count; }
 
-        double* _x;
-        double* _y;
-        double* _f;
+        P* _x;
+        P* _y;
+        P* _f;
         const double _maxFlux;
         UniformDeviate _ud;
         int _count;
     };
 
+    template <typename T, typename U>
+    int PhotonArray::setFromT(T* x, T* y, T* flux, const BaseImage<U>& image, double maxFlux,
+                              BaseDeviate rng)
+    {
+        AddImagePhotons<U,T> adder(x, y, flux, maxFlux, rng);
+        for_each_pixel_ij_ref(image, adder);
+        return adder.getCount();
+    }
+
     template <class T>
     int PhotonArray::setFrom(const BaseImage<T>& image, double maxFlux, BaseDeviate rng)
     {
         dbg<<"bounds = "<<image.getBounds()<<std::endl;
-        dbg<<"flux, maxflux = "<<_flux<<','<<maxFlux<<std::endl;
-        AddImagePhotons<T> adder(_x, _y, _flux, maxFlux, rng);
-        for_each_pixel_ij_ref(image, adder);
-        dbg<<"Done: size = "<<adder.getCount()<<std::endl;
-        _N = adder.getCount();
+        dbg<<"maxflux = "<<maxFlux<<std::endl;
+        if (_single)
+            _N = setFromT(_fx, _fy, _fflux, image, maxFlux, rng);
+        else
+            _N = setFromT(_x, _y, _flux, image, maxFlux, rng);
+        dbg<<"Done: size = "<<_N<<std::endl;
         return _N;
     }
 
     double PhotonArray::getTotalFlux() const
     {
         double total = 0.;
-        return std::accumulate(_flux, _flux+_N, total);
+        if (_single)
+            return std::accumulate(_fflux, _fflux+_N, total);
+        else
+            return std::accumulate(_flux, _flux+_N, total);
     }
 
     void PhotonArray::setTotalFlux(double flux)
@@ -97,18 +111,29 @@ namespace galsim {
         scaleFlux(flux / oldFlux);
     }
 
+    template <typename T>
+    void PhotonArray::scaleFluxT(T* flux, double scale)
+    {
+        for (size_t i=0; i<_N; ++i) flux[i] *= scale;
+    }
+
     void PhotonArray::scaleFlux(double scale)
     {
-        std::transform(_flux, _flux+_N, _flux,
-                       std::bind2nd(std::multiplies<double>(),scale));
+        if (_single) scaleFluxT(_fflux, scale);
+        else scaleFluxT(_flux, scale);
+    }
+
+    template <typename T>
+    void PhotonArray::scaleXYT(T* x, T* y, double scale)
+    {
+        for (size_t i=0; i<_N; ++i) x[i] *= scale;
+        for (size_t i=0; i<_N; ++i) y[i] *= scale;
     }
 
     void PhotonArray::scaleXY(double scale)
     {
-        std::transform(_x, _x+_N, _x,
-                       std::bind2nd(std::multiplies<double>(),scale));
-        std::transform(_y, _y+_N, _y,
-                       std::bind2nd(std::multiplies<double>(),scale));
+        if (_single) scaleXYT(_fx, _fy, scale);
+        else scaleXYT(_x, _y, scale);
     }
 
     void PhotonArray::assignAt(int istart, const PhotonArray& rhs)
@@ -117,26 +142,33 @@ namespace galsim {
             throw std::runtime_error("Trying to assign past the end of PhotonArray");
 
         const int N2 = rhs.size();
-        std::copy(rhs._x, rhs._x+N2, _x+istart);
-        std::copy(rhs._y, rhs._y+N2, _y+istart);
-        std::copy(rhs._flux, rhs._flux+N2, _flux+istart);
+        if (!_single && !rhs._single) {
+            std::copy(rhs._x, rhs._x+N2, _x+istart);
+            std::copy(rhs._y, rhs._y+N2, _y+istart);
+            std::copy(rhs._flux, rhs._flux+N2, _flux+istart);
+        } else {
+            for (int i=0; i<N2; ++i)
+                setPhoton(istart+i, rhs.getX(i), rhs.getY(i), rhs.getFlux(i));
+        }
         if (hasAllocatedAngles() && rhs.hasAllocatedAngles()) {
-            std::copy(rhs._dxdz, rhs._dxdz+N2, _dxdz+istart);
-            std::copy(rhs._dydz, rhs._dydz+N2, _dydz+istart);
+            for (int i=0; i<N2; ++i) {
+                if (_single) {
+                    _fdxdz[istart+i] = rhs.getDXDZ(i);
+                    _fdydz[istart+i] = rhs.getDYDZ(i);
+                } else {
+                    _dxdz[istart+i] = rhs.getDXDZ(i);
+                    _dydz[istart+i] = rhs.getDYDZ(i);
+                }
+            }
         }
         if (hasAllocatedWavelengths() && rhs.hasAllocatedWavelengths()) {
-            std::copy(rhs._wave, rhs._wave+N2, _wave+istart);
+            for (int i=0; i<N2; ++i) {
+                if (_single) _fwave[istart+i] = rhs.getWavelength(i);
+                else _wave[istart+i] = rhs.getWavelength(i);
+            }
         }
     }
 
-    // Helper for multiplying x * y * N
-    struct MultXYScale
-    {
-        MultXYScale(double scale) : _scale(scale) {}
-        double operator()(double x, double y) { return x * y * _scale; }
-        double _scale;
-    };
-
     void PhotonArray::convolve(const PhotonArray& rhs, BaseDeviate rng)
     {
         // If both arrays have correlated photons, then we need to shuffle the photons
@@ -146,12 +178,11 @@ namespace galsim {
         // If neither or only one is correlated, we are ok to just use them in order.
         if (rhs.size() != size())
             throw std::runtime_error("PhotonArray::convolve with unequal size arrays");
-        // Add x coordinates:
-        std::transform(_x, _x+_N, rhs._x, _x, std::plus<double>());
-        // Add y coordinates:
-        std::transform(_y, _y+_N, rhs._y, _y, std::plus<double>());
-        // Multiply fluxes, with a factor of N needed:
-        std::transform(_flux, _flux+_N, rhs._flux, _flux, MultXYScale(_N));
+        // Add x and y coordinates and multiply fluxes, with a factor of N needed:
+        for (size_t i=0; i<_N; ++i) {
+            setPhoton(i, getX(i) + rhs.getX(i), getY(i) + rhs.getY(i),
+                      getFlux(i) * rhs.getFlux(i) * _N);
+        }
 
         // If rhs was correlated, then the output will be correlated.
         // This is ok, but we need to mark it as such.
@@ -174,20 +205,33 @@ namespace galsim {
             if (iIn > iOut) iIn=iOut;  // should not happen, but be safe
             if (iIn < iOut) {
                 // Save input information
-                xSave = _x[iOut];
-                ySave = _y[iOut];
-                fluxSave = _flux[iOut];
+                xSave = getX(iOut);
+                ySave = getY(iOut);
+                fluxSave = getFlux(iOut);
             }
-            _x[iOut] = _x[iIn] + rhs._x[iOut];
-            _y[iOut] = _y[iIn] + rhs._y[iOut];
-            _flux[iOut] = _flux[iIn] * rhs._flux[iOut] * _N;
+            setPhoton(iOut, getX(iIn) + rhs.getX(iOut), getY(iIn) + rhs.getY(iOut),
+                      getFlux(iIn) * rhs.getFlux(iOut) * _N);
             if (iIn < iOut) {
                 // Move saved info to new location in array
-                _x[iIn] = xSave;
-                _y[iIn] = ySave ;
-                _flux[iIn] = fluxSave;
+                setPhoton(iIn, xSave, ySave, fluxSave);
+            }
+        }
+    }
+
+    template <typename T, typename U>
+    double PhotonArray::addToT(const T* x, const T* y, const T* flux, ImageView<U> target) const
+    {
+        Bounds<int> b = target.getBounds();
+        double addedFlux = 0.;
+        for (int i=0; i<int(size()); i++) {
+            int ix = int(floor(x[i] + 0.5));
+            int iy = int(floor(y[i] + 0.5));
+            if (b.includes(ix,iy)) {
+                target(ix,iy) += flux[i];
+                addedFlux += flux[i];
             }
         }
+        return addedFlux;
     }
 
     template <class T>
@@ -200,16 +244,8 @@ namespace galsim {
             throw std::runtime_error("Attempting to PhotonArray::addTo an Image with"
                                      " undefined Bounds");
 
-        double addedFlux = 0.;
-        for (int i=0; i<int(size()); i++) {
-            int ix = int(floor(_x[i] + 0.5));
-            int iy = int(floor(_y[i] + 0.5));
-            if (b.includes(ix,iy)) {
-                target(ix,iy) += _flux[i];
-                addedFlux += _flux[i];
-            }
-        }
-        return addedFlux;
+        if (_single) return addToT(_fx, _fy, _fflux, target);
+        else return addToT(_x, _y, _flux, target);
     }
 
     // instantiate template functions for expected image types
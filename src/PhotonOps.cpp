@@ -0,0 +1,132 @@
+/* -*- c++ -*-
+ * Copyright (c) 2012-2018 by the GalSim developers team on GitHub
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ * https://github.com/GalSim-developers/GalSim
+ *
+ * GalSim is free software: redistribution and use in source and binary forms,
+ * with or without modification, are permitted provided that the following
+ * conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice, this
+ *    list of conditions, and the disclaimer given in the accompanying LICENSE
+ *    file.
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions, and the disclaimer given in the documentation
+ *    and/or other materials provided with the distribution.
+ */
+
+//#define DEBUGLOGGING
+
+#include <cassert>
+#include "PhotonOps.h"
+
+namespace galsim {
+
+    void WavelengthSamplerOp::prepare(int i1, int i2)
+    {
+        _i1 = i1;
+        _u.resize(i2-i1);
+        for (int i=i1; i<i2; ++i) _u[i-i1] = _ud();
+    }
+
+    void WavelengthSamplerOp::applyTo(PhotonArray& photons, int i1, int i2)
+    {
+        if (!photons.hasAllocatedWavelengths())
+            throw std::runtime_error("WavelengthSampler requires allocated wavelengths");
+        assert(i1 >= _i1 && i2 <= _i1 + int(_u.size()));
+        for (int i=i1; i<i2; ++i)
+            photons.setWavelength(i, _inv_cdf.lookup(_u[i-_i1]) * _scale);
+    }
+
+    FRatioAnglesOp::FRatioAnglesOp(double fratio, double obscuration, BaseDeviate rng) :
+        _ud(rng), _i1(0)
+    {
+        // The f/ratio is the ratio of the focal length to the diameter of the aperture of
+        // the telescope.  The angular radius of the field of view is defined by the
+        // ratio of the radius of the aperture to the focal length
+        double pupil_angle = std::atan(0.5 / fratio);
+        double obscuration_angle = std::atan(0.5 * obscuration / fratio);
+        _sin_obs = std::sin(obscuration_angle);
+        _sin_range = std::sin(pupil_angle) - _sin_obs;
+    }
+
+    void FRatioAnglesOp::prepare(int i1, int i2)
+    {
+        // Generate azimuthal angles for all the photons first, then the uniform deviates for
+        // the inclination angles.  (This is the same order of random numbers as the python
+        // version used.)
+        _i1 = i1;
+        _phi.resize(i2-i1);
+        _u.resize(i2-i1);
+        for (int i=i1; i<i2; ++i) _phi[i-i1] = 2. * M_PI * _ud();
+        for (int i=i1; i<i2; ++i) _u[i-i1] = _ud();
+    }
+
+    void FRatioAnglesOp::applyTo(PhotonArray& photons, int i1, int i2)
+    {
+        if (!photons.hasAllocatedAngles())
+            throw std::runtime_error("FRatioAngles requires allocated angles");
+        assert(i1 >= _i1 && i2 <= _i1 + int(_u.size()));
+
+        // The inclination angles are uniform in sin(theta) between the sine of the obscuration
+        // angle and the sine of the pupil radius.
+        for (int i=i1; i<i2; ++i) {
+            double phi = _phi[i-_i1];
+            double sintheta = _sin_obs + _sin_range * _u[i-_i1];
+            double tantheta = std::sqrt(sintheta * sintheta / (1. - sintheta * sintheta));
+            photons.setAngles(i, tantheta * std::sin(phi), tantheta * std::cos(phi));
+        }
+    }
+
+    PhotonDCROp::PhotonDCROp(const double* refraction, int n, double base_refraction,
+                             double sinp, double cosp, double scale,
+                             double base_wavelength, double alpha,
+                             const double* affine, double cenx, double ceny) :
+        _refraction(refraction, refraction+n), _base_refraction(base_refraction),
+        _sinp(sinp), _cosp(cosp), _scale(scale), _base_wavelength(base_wavelength),
+        _alpha(alpha), _cenx(cenx), _ceny(ceny)
+    {
+        std::copy(affine, affine+6, _affine);
+    }
+
+    void PhotonDCROp::applyTo(PhotonArray& photons, int i1, int i2)
+    {
+        if (!photons.hasAllocatedWavelengths())
+            throw std::runtime_error("PhotonDCR requires that wavelengths be set");
+        if (i2 > int(_refraction.size()))
+            throw std::runtime_error("PhotonDCR refraction was calculated for too few photons");
+
+        for (int i=i1; i<i2; ++i) {
+            double x = photons.getX(i);
+            double y = photons.getY(i);
+
+            // Apply the wavelength-dependent scaling
+            if (_alpha != 0.) {
+                double s = std::pow(photons.getWavelength(i) / _base_wavelength, _alpha);
+                x = s * (x - _cenx) + _cenx;
+                y = s * (y - _ceny) + _ceny;
+            }
+
+            // Apply DCR
+            double shift = (_refraction[i] - _base_refraction) * _scale;
+            double du = -shift * _sinp;
+            double dv = shift * _cosp;
+            x += _affine[0] * du + _affine[1] * dv + _affine[4];
+            y += _affine[2] * du + _affine[3] * dv + _affine[5];
+            photons.setPosition(i, x, y);
+        }
+    }
+
+    void PhotonOpList::applyTo(PhotonArray& photons, int i1, int i2) const
+    {
+        dbg<<"Apply "<<_ops.size()<<" ops to photons "<<i1<<" .. "<<i2<<std::endl;
+        for (size_t k=0; k<_ops.size(); ++k) _ops[k]->prepare(i1, i2);
+        for (int j1=i1; j1<i2; j1+=_chunk_size) {
+            int j2 = std::min(j1 + _chunk_size, i2);
+            for (size_t k=0; k<_ops.size(); ++k) _ops[k]->applyTo(photons, j1, j2);
+        }
+    }
+
+}
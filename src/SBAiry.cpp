@@ -22,6 +22,8 @@
 // To enable some extra debugging statements
 //#define AIRY_DEBUG
 
+#include <mutex>
+
 #include "SBAiry.h"
 #include "SBAiryImpl.h"
 #include "math/Bessel.h"
@@ -378,8 +380,13 @@ namespace galsim {
         _sampler->shoot(photons, ud);
     }
 
+    // Photons may be shot from several threads at once, so make sure only one of them
+    // builds the sampler.
+    static std::mutex airy_sampler_mutex;
+
     void AiryInfoObs::checkSampler() const
     {
+        std::lock_guard<std::mutex> lock(airy_sampler_mutex);
         if (this->_sampler.get()) return;
         dbg<<"Airy sampler\n";
         dbg<<"obsc = "<<_obscuration<<std::endl;
@@ -454,6 +461,7 @@ namespace galsim {
 
     void AiryInfoNoObs::checkSampler() const
     {
+        std::lock_guard<std::mutex> lock(airy_sampler_mutex);
         if (this->_sampler.get()) return;
         dbg<<"AiryNoObs sampler\n";
         std::vector<double> ranges(1,0.);
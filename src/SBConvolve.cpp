@@ -19,6 +19,11 @@
 
 //#define DEBUGLOGGING
 
+#include <list>
+#include <map>
+#include <mutex>
+#include <tuple>
+
 #include "SBConvolve.h"
 #include "SBConvolveImpl.h"
 #include "SBTransform.h"
@@ -135,31 +140,37 @@ namespace galsim {
 
     double SBConvolve::SBConvolveImpl::maxK() const
     {
-        if (_maxk == 0.) {
-            for(ConstIter it=_plist.begin(); it!=_plist.end(); ++it) {
-                double it_maxk = it->maxK();
-                dbg<<"SBConvolve component has maxK = "<<it_maxk<<std::endl;
-                if (_maxk <= 0. || it_maxk < _maxk) _maxk = it_maxk;
-            }
-            dbg<<"Net maxK = "<<_maxk<<std::endl;
-        }
+        std::call_once(_maxk_once, &SBConvolveImpl::calculateMaxK, this);
         return _maxk;
     }
 
-    double SBConvolve::SBConvolveImpl::stepK() const
+    void SBConvolve::SBConvolveImpl::calculateMaxK() const
     {
-        if (_stepk == 0.) {
-            for(ConstIter it=_plist.begin(); it!=_plist.end(); ++it) {
-                double it_stepk = it->stepK();
-                dbg<<"SBConvolve component has stepK = "<<it_stepk<<std::endl;
-                _stepk += 1./(it_stepk*it_stepk);  // Accumulate Sum 1/stepk^2
-            }
-            _stepk = 1./sqrt(_stepk);  // Convert to (Sum 1/stepk^2)^(-1/2)
-            dbg<<"Net stepK = "<<_stepk<<std::endl;
+        for(ConstIter it=_plist.begin(); it!=_plist.end(); ++it) {
+            double it_maxk = it->maxK();
+            dbg<<"SBConvolve component has maxK = "<<it_maxk<<std::endl;
+            if (_maxk <= 0. || it_maxk < _maxk) _maxk = it_maxk;
         }
+        dbg<<"Net maxK = "<<_maxk<<std::endl;
+    }
+
+    double SBConvolve::SBConvolveImpl::stepK() const
+    {
+        std::call_once(_stepk_once, &SBConvolveImpl::calculateStepK, this);
         return _stepk;
     }
 
+    void SBConvolve::SBConvolveImpl::calculateStepK() const
+    {
+        for(ConstIter it=_plist.begin(); it!=_plist.end(); ++it) {
+            double it_stepk = it->stepK();
+            dbg<<"SBConvolve component has stepK = "<<it_stepk<<std::endl;
+            _stepk += 1./(it_stepk*it_stepk);  // Accumulate Sum 1/stepk^2
+        }
+        _stepk = 1./sqrt(_stepk);  // Convert to (Sum 1/stepk^2)^(-1/2)
+        dbg<<"Net stepK = "<<_stepk<<std::endl;
+    }
+
     double SBConvolve::SBConvolveImpl::xValue(const Position<double>& pos) const
     {
         // Perform a direct calculation of the convolution at a particular point by
@@ -192,6 +203,165 @@ namespace galsim {
         return kv;
     }
 
+    // The cache of k-space images of components of convolutions.
+    //
+    // Each image is identified by the component's id, the type and bounds of the image and the
+    // k-space grid.  (The id is never reused, so a new profile can't be confused with one that
+    // was deleted, as it could if the key were the SBProfileImpl's address.)  An image is only
+    // saved the second time it is needed, so the components that are only used once (typically
+    // the galaxies) don't push the ones that are used many times (typically the PSF) out of the
+    // cache.  The components that have been seen once are remembered, without their images, up
+    // to a maximum of max_kimage_entries entries.
+    typedef std::tuple<unsigned long long, int, int, int, int, int, bool,
+                       double, double, double, double, double, double, int, int> KImageKey;
+    struct KImageEntry
+    {
+        shared_ptr<void> image;  // The ImageAlloc, or null if it has only been seen once.
+        size_t nbytes;
+    };
+    typedef std::list<std::pair<KImageKey, KImageEntry> > KImageList;
+
+    static std::mutex kimage_cache_mutex;
+    static KImageList kimage_list;  // Most recently used first.
+    static std::map<KImageKey, KImageList::iterator> kimage_map;
+    static size_t kimage_cache_bytes = 0;
+    static size_t kimage_cache_max = 100 * 1024 * 1024;
+    static int kimage_cache_nimages = 0;
+    static long kimage_cache_nhits = 0;
+    static const size_t max_kimage_entries = 1000;
+
+    // Remove the least recently used entries until the cache is within its limits.
+    // The caller must hold the lock.
+    static void TrimKImageCache()
+    {
+        while (!kimage_list.empty() && (kimage_cache_bytes > kimage_cache_max ||
+                                        kimage_list.size() > max_kimage_entries)) {
+            kimage_cache_bytes -= kimage_list.back().second.nbytes;
+            if (kimage_list.back().second.image) --kimage_cache_nimages;
+            kimage_map.erase(kimage_list.back().first);
+            kimage_list.pop_back();
+        }
+    }
+
+    void SetConvolveCacheSize(size_t nbytes)
+    {
+        std::lock_guard<std::mutex> lock(kimage_cache_mutex);
+        kimage_cache_max = nbytes;
+        if (nbytes == 0) {
+            kimage_list.clear();
+            kimage_map.clear();
+            kimage_cache_bytes = 0;
+            kimage_cache_nimages = 0;
+        } else {
+            TrimKImageCache();
+        }
+    }
+
+    size_t GetConvolveCacheSize()
+    {
+        std::lock_guard<std::mutex> lock(kimage_cache_mutex);
+        return kimage_cache_max;
+    }
+
+    int GetNumConvolveCacheImages()
+    {
+        std::lock_guard<std::mutex> lock(kimage_cache_mutex);
+        return kimage_cache_nimages;
+    }
+
+    long GetNumConvolveCacheHits()
+    {
+        std::lock_guard<std::mutex> lock(kimage_cache_mutex);
+        return kimage_cache_nhits;
+    }
+
+    // Look for an image in the cache.  If it isn't there, return null, and set save to whether
+    // the image should be saved (with SaveKImage) once it is drawn.
+    static shared_ptr<void> FindKImage(const KImageKey& key, bool& save)
+    {
+        std::lock_guard<std::mutex> lock(kimage_cache_mutex);
+        save = false;
+        if (kimage_cache_max == 0) return shared_ptr<void>();
+        std::map<KImageKey, KImageList::iterator>::iterator it = kimage_map.find(key);
+        if (it != kimage_map.end()) {
+            kimage_list.splice(kimage_list.begin(), kimage_list, it->second);
+            const KImageEntry& entry = it->second->second;
+            if (entry.image) {
+                ++kimage_cache_nhits;
+                return entry.image;
+            }
+            save = true;
+        } else {
+            KImageEntry entry;
+            entry.nbytes = 0;
+            kimage_list.push_front(std::make_pair(key, entry));
+            kimage_map[key] = kimage_list.begin();
+            TrimKImageCache();
+        }
+        return shared_ptr<void>();
+    }
+
+    static void SaveKImage(const KImageKey& key, shared_ptr<void> image, size_t nbytes)
+    {
+        std::lock_guard<std::mutex> lock(kimage_cache_mutex);
+        if (nbytes > kimage_cache_max) return;
+        std::map<KImageKey, KImageList::iterator>::iterator it = kimage_map.find(key);
+        // If it was pushed out in the meantime or another thread saved it first, never mind.
+        if (it == kimage_map.end() || it->second->second.image) return;
+        KImageEntry& entry = it->second->second;
+        entry.image = image;
+        entry.nbytes = nbytes;
+        kimage_cache_bytes += nbytes;
+        ++kimage_cache_nimages;
+        kimage_list.splice(kimage_list.begin(), kimage_list, it->second);
+        TrimKImageCache();
+    }
+
+    template <typename T>
+    void SBConvolve::SBConvolveImpl::fillKImageCached(ImageView<std::complex<T> > im,
+                                                      const KGrid& grid) const
+    {
+        typedef ImageAlloc<std::complex<T> > KImage;
+        const Bounds<int>& b = im.getBounds();
+        shared_ptr<KImage> im2;
+        ConstIter pptr = _plist.begin();
+        assert(pptr != _plist.end());
+        for (bool first=true; pptr != _plist.end(); ++pptr, first=false) {
+            KImageKey key(GetImpl(*pptr)->id, sizeof(T), b.getXMin(), b.getXMax(),
+                          b.getYMin(), b.getYMax(), grid.general,
+                          grid.kx0, grid.dkx, grid.dkxy, grid.ky0, grid.dky, grid.dkyx,
+                          grid.izero, grid.jzero);
+            bool save;
+            shared_ptr<KImage> kim = std::static_pointer_cast<KImage>(FindKImage(key, save));
+            if (!kim) {
+                xdbg<<"Draw component "<<GetImpl(*pptr)<<", save = "<<save<<std::endl;
+                ImageView<std::complex<T> > view = im;
+                if (save) {
+                    kim.reset(new KImage(b));
+                    view = kim->view();
+                } else if (!first) {
+                    if (!im2) im2.reset(new KImage(b));
+                    kim = im2;
+                    view = kim->view();
+                }
+                if (grid.general)
+                    GetImpl(*pptr)->fillKImage(view, grid.kx0, grid.dkx, grid.dkxy,
+                                               grid.ky0, grid.dky, grid.dkyx);
+                else
+                    GetImpl(*pptr)->fillKImage(view, grid.kx0, grid.dkx, grid.izero,
+                                               grid.ky0, grid.dky, grid.jzero);
+                if (save)
+                    SaveKImage(key, kim, b.area() * sizeof(std::complex<T>));
+                // The first component was drawn directly into im.
+                if (!kim) continue;
+            } else {
+                xdbg<<"Use cached image for component "<<GetImpl(*pptr)<<std::endl;
+            }
+            if (first) im.copyFrom(*kim);
+            else im *= *kim;
+        }
+    }
+
     template <typename T>
     void SBConvolve::SBConvolveImpl::fillKImage(ImageView<std::complex<T> > im,
                                                 double kx0, double dkx, int izero,
@@ -200,16 +370,8 @@ namespace galsim {
         dbg<<"SBConvolve fillKImage\n";
         dbg<<"kx = "<<kx0<<" + i * "<<dkx<<", izero = "<<izero<<std::endl;
         dbg<<"ky = "<<ky0<<" + j * "<<dky<<", jzero = "<<jzero<<std::endl;
-        ConstIter pptr = _plist.begin();
-        assert(pptr != _plist.end());
-        GetImpl(*pptr)->fillKImage(im,kx0,dkx,izero,ky0,dky,jzero);
-        if (++pptr != _plist.end()) {
-            ImageAlloc<std::complex<T> > im2(im.getBounds());
-            for (; pptr != _plist.end(); ++pptr) {
-                GetImpl(*pptr)->fillKImage(im2.view(),kx0,dkx,izero,ky0,dky,jzero);
-                im *= im2;
-            }
-        }
+        KGrid grid = { false, kx0, dkx, 0., ky0, dky, 0., izero, jzero };
+        fillKImageCached(im, grid);
     }
 
     template <typename T>
@@ -220,16 +382,8 @@ namespace galsim {
         dbg<<"SBConvolve fillKImage\n";
         dbg<<"kx = "<<kx0<<" + i * "<<dkx<<" + j * "<<dkxy<<std::endl;
         dbg<<"ky = "<<ky0<<" + i * "<<dkyx<<" + j * "<<dky<<std::endl;
-        ConstIter pptr = _plist.begin();
-        assert(pptr != _plist.end());
-        GetImpl(*pptr)->fillKImage(im,kx0,dkx,dkxy,ky0,dky,dkyx);
-        if (++pptr != _plist.end()) {
-            ImageAlloc<std::complex<T> > im2(im.getBounds());
-            for (; pptr != _plist.end(); ++pptr) {
-                GetImpl(*pptr)->fillKImage(im2.view(),kx0,dkx,dkxy,ky0,dky,dkyx);
-                im *= im2;
-            }
-        }
+        KGrid grid = { true, kx0, dkx, dkxy, ky0, dky, dkyx, 0, 0 };
+        fillKImageCached(im, grid);
     }
 
     double SBConvolve::SBConvolveImpl::getPositiveFlux() const
@@ -20,6 +20,7 @@
 //#define DEBUGLOGGING
 
 #include <algorithm>
+#include <mutex>
 #include "SBInterpolatedImage.h"
 #include "SBInterpolatedImageImpl.h"
 
@@ -594,8 +595,13 @@ namespace galsim {
         dbg<<"new maxk = "<<_maxk<<std::endl;
     }
 
+    // Photons may be shot from several threads at once, so make sure only one of them
+    // builds the tree of pixels.
+    static std::mutex shoot_mutex;
+
     void SBInterpolatedImage::SBInterpolatedImageImpl::checkReadyToShoot() const
     {
+        std::lock_guard<std::mutex> lock(shoot_mutex);
         if (_readyToShoot) return;
 
         dbg<<"SBInterpolatedImage not ready to shoot.  Build _pt:\n";
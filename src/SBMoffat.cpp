@@ -482,71 +482,77 @@ namespace galsim {
     // Set maxK to the value where the FT is down to maxk_threshold
     double SBMoffat::SBMoffatImpl::maxK() const
     {
-        if (_maxk == 0.) {
-            if (_trunc == 0.) {
-                // f(k) = 4 K(beta-1,k) (k/2)^beta / Gamma(beta-1)
-                //
-                // The asymptotic formula for K(beta-1,k) is
-                //     K(beta-1,k) ~= sqrt(pi/(2k)) exp(-k)
-                //
-                // So f(k) becomes
-                //
-                // f(k) ~= 2 sqrt(pi) (k/2)^(beta-1/2) exp(-k) / Gamma(beta-1)
-                //
-                // Solve for f(k) = maxk_threshold
-                //
-                double temp = (this->gsparams.maxk_threshold
-                               * math::tgamma(_beta-1.)
-                               * std::pow(2.,_beta-0.5)
-                               / (2. * sqrt(M_PI)));
-                // Solve k^(beta-1/2) exp(-k) = temp
-                // (beta-1/2) log(k) - k = log(temp)
-                // k = (beta-1/2) log(k) - log(temp)
-                temp = std::log(temp);
-                _maxk = -temp;
-                dbg<<"temp = "<<temp<<std::endl;
-                for (int i=0;i<5;++i) {
-                    _maxk = (_beta-0.5) * std::log(_maxk) - temp;
-                    dbg<<"_maxk = "<<_maxk<<std::endl;
-                }
-            } else {
-                // _maxk is determined during setupFT() as the last k value to have a
-                // kValue > 1.e-3.
-                setupFT();
+        std::call_once(_maxk_once, &SBMoffatImpl::calculateMaxK, this);
+        return _maxk*_inv_rD;
+    }
+
+    void SBMoffat::SBMoffatImpl::calculateMaxK() const
+    {
+        if (_trunc == 0.) {
+            // f(k) = 4 K(beta-1,k) (k/2)^beta / Gamma(beta-1)
+            //
+            // The asymptotic formula for K(beta-1,k) is
+            //     K(beta-1,k) ~= sqrt(pi/(2k)) exp(-k)
+            //
+            // So f(k) becomes
+            //
+            // f(k) ~= 2 sqrt(pi) (k/2)^(beta-1/2) exp(-k) / Gamma(beta-1)
+            //
+            // Solve for f(k) = maxk_threshold
+            //
+            double temp = (this->gsparams.maxk_threshold
+                           * math::tgamma(_beta-1.)
+                           * std::pow(2.,_beta-0.5)
+                           / (2. * sqrt(M_PI)));
+            // Solve k^(beta-1/2) exp(-k) = temp
+            // (beta-1/2) log(k) - k = log(temp)
+            // k = (beta-1/2) log(k) - log(temp)
+            temp = std::log(temp);
+            _maxk = -temp;
+            dbg<<"temp = "<<temp<<std::endl;
+            for (int i=0;i<5;++i) {
+                _maxk = (_beta-0.5) * std::log(_maxk) - temp;
+                dbg<<"_maxk = "<<_maxk<<std::endl;
             }
+        } else {
+            // _maxk is determined during setupFT() as the last k value to have a
+            // kValue > 1.e-3.
+            setupFT();
         }
-        return _maxk*_inv_rD;
     }
 
     // The amount of flux missed in a circle of radius pi/stepk should be at
     // most folding_threshold of the flux.
     double SBMoffat::SBMoffatImpl::stepK() const
+    {
+        std::call_once(_stepk_once, &SBMoffatImpl::calculateStepK, this);
+        return _stepk;
+    }
+
+    void SBMoffat::SBMoffatImpl::calculateStepK() const
     {
         dbg<<"Find Moffat stepK\n";
         dbg<<"beta = "<<_beta<<std::endl;
 
-        if (_stepk == 0.) {
-            // The fractional flux out to radius R is (if not truncated)
-            // 1 - (1+R^2)^(1-beta)
-            // So solve (1+R^2)^(1-beta) = folding_threshold
-            if (_beta <= 1.1) {
-                // Then flux never converges (or nearly so), so just use truncation radius
-                _stepk = M_PI / _maxR;
-            } else {
-                // Ignore the 1 in (1+R^2), so approximately:
-                double R = std::pow(this->gsparams.folding_threshold, 0.5/(1.-_beta)) * _rD;
-                dbg<<"R = "<<R<<std::endl;
-                // If it is truncated at less than this, drop to that value.
-                if (R > _maxR) R = _maxR;
-                dbg<<"_maxR = "<<_maxR<<std::endl;
-                dbg<<"R => "<<R<<std::endl;
-                dbg<<"stepk = "<<(M_PI/R)<<std::endl;
-                // Make sure it is at least 5 hlr
-                R = std::max(R,gsparams.stepk_minimum_hlr*getHalfLightRadius());
-                _stepk = M_PI / R;
-            }
+        // The fractional flux out to radius R is (if not truncated)
+        // 1 - (1+R^2)^(1-beta)
+        // So solve (1+R^2)^(1-beta) = folding_threshold
+        if (_beta <= 1.1) {
+            // Then flux never converges (or nearly so), so just use truncation radius
+            _stepk = M_PI / _maxR;
+        } else {
+            // Ignore the 1 in (1+R^2), so approximately:
+            double R = std::pow(this->gsparams.folding_threshold, 0.5/(1.-_beta)) * _rD;
+            dbg<<"R = "<<R<<std::endl;
+            // If it is truncated at less than this, drop to that value.
+            if (R > _maxR) R = _maxR;
+            dbg<<"_maxR = "<<_maxR<<std::endl;
+            dbg<<"R => "<<R<<std::endl;
+            dbg<<"stepk = "<<(M_PI/R)<<std::endl;
+            // Make sure it is at least 5 hlr
+            R = std::max(R,gsparams.stepk_minimum_hlr*getHalfLightRadius());
+            _stepk = M_PI / R;
         }
-        return _stepk;
     }
 
     // Integrand class for the Hankel transform of Moffat
@@ -565,9 +571,13 @@ namespace galsim {
     };
 
     void SBMoffat::SBMoffatImpl::setupFT() const
+    {
+        std::call_once(_ft_once, &SBMoffatImpl::buildFT, this);
+    }
+
+    void SBMoffat::SBMoffatImpl::buildFT() const
     {
         assert(_trunc > 0.);
-        if (_ft.finalized()) return;
 
         // Do a Hankel transform and store the results in a lookup table.
 
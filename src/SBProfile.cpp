@@ -19,8 +19,18 @@
 
 //#define DEBUGLOGGING
 
+#include <thread>
+#include <functional>
+#include <exception>
+#include <algorithm>
+#include <atomic>
+#include <list>
+#include <cstdint>
+
 #include "SBProfile.h"
 #include "SBTransform.h"
+#include "SBConvolve.h"
+#include "SBBox.h"
 #include "SBProfileImpl.h"
 #include "math/Angle.h"
 
@@ -41,6 +51,18 @@
 
 namespace galsim {
 
+    // The number of threads to use in SBProfile::draw.
+    static int num_threads = 1;
+
+    void SetNumThreads(int nthreads)
+    {
+        if (nthreads <= 0) nthreads = std::thread::hardware_concurrency();
+        // hardware_concurrency returns 0 if it can't tell.
+        num_threads = std::max(nthreads, 1);
+    }
+
+    int GetNumThreads() { return num_threads; }
+
     SBProfile::SBProfile() {}
 
     SBProfile::SBProfile(const SBProfile& rhs) : _pimpl(rhs._pimpl) {}
@@ -86,6 +108,19 @@ namespace galsim {
         return _pimpl->kValue(k);
     }
 
+    void SBProfile::xValues(const double* x, const double* y, double* val, int n) const
+    {
+        assert(_pimpl.get());
+        for (int i=0; i<n; ++i) val[i] = _pimpl->xValue(Position<double>(x[i],y[i]));
+    }
+
+    void SBProfile::kValues(const double* kx, const double* ky, std::complex<double>* val,
+                            int n) const
+    {
+        assert(_pimpl.get());
+        for (int i=0; i<n; ++i) val[i] = _pimpl->kValue(Position<double>(kx[i],ky[i]));
+    }
+
     void SBProfile::getXRange(double& xmin, double& xmax, std::vector<double>& splits) const
     {
         assert(_pimpl.get());
@@ -141,6 +176,12 @@ namespace galsim {
         return _pimpl->isAnalyticK();
     }
 
+    bool SBProfile::isThreadSafe() const
+    {
+        assert(_pimpl.get());
+        return _pimpl->isThreadSafe();
+    }
+
     Position<double> SBProfile::centroid() const
     {
         assert(_pimpl.get());
@@ -179,8 +220,10 @@ namespace galsim {
 
     SBProfile::SBProfile(SBProfileImpl* pimpl) : _pimpl(pimpl) {}
 
+    static std::atomic<unsigned long long> next_profile_id(0);
+
     SBProfile::SBProfileImpl::SBProfileImpl(const GSParams& _gsparams) :
-        gsparams(_gsparams) {}
+        gsparams(_gsparams), id(next_profile_id++) {}
 
     SBProfile::SBProfileImpl* SBProfile::GetImpl(const SBProfile& rhs)
     { return rhs._pimpl.get(); }
@@ -312,7 +355,65 @@ namespace galsim {
         const int izero = xmin < 0 ? -xmin : 0;
         const int jzero = ymin < 0 ? -ymin : 0;
 
-        _pimpl->fillXImage(image, xmin*dx, dx, izero, ymin*dx, dx, jzero);
+        // Don't bother with threads unless each one will have a reasonable number of pixels
+        // to draw.  Otherwise the overhead of starting them is more than what we save.
+        const int min_pixels_per_thread = 4096;
+        const int nrow = image.getNRow();
+        int nthreads = std::min(GetNumThreads(), nrow);
+        nthreads = std::min(nthreads, nrow * image.getNCol() / min_pixels_per_thread);
+
+        if (nthreads > 1 && _pimpl->isThreadSafe()) {
+            dbg<<"Drawing with "<<nthreads<<" threads\n";
+            // Each thread draws a contiguous block of rows.
+            struct FillRows
+            {
+                FillRows(const SBProfileImpl& prof, ImageView<T> im, double x0, double dx,
+                         int izero, double y0, double dy, int jzero) :
+                    _prof(prof), _im(im), _x0(x0), _dx(dx), _izero(izero),
+                    _y0(y0), _dy(dy), _jzero(jzero) {}
+
+                // Exceptions can't propagate out of a thread, so save it to rethrow later.
+                void operator()()
+                {
+                    try {
+                        _prof.fillXImage(_im, _x0, _dx, _izero, _y0, _dy, _jzero);
+                    } catch (...) {
+                        _error = std::current_exception();
+                    }
+                }
+
+                const SBProfileImpl& _prof;
+                ImageView<T> _im;
+                double _x0, _dx;
+                int _izero;
+                double _y0, _dy;
+                int _jzero;
+                std::exception_ptr _error;
+            };
+
+            const int xmax = image.getXMax();
+            std::vector<FillRows> blocks;
+            blocks.reserve(nthreads);
+            for (int k=0; k<nthreads; ++k) {
+                const int y1 = ymin + (k * nrow) / nthreads;
+                const int y2 = ymin + ((k+1) * nrow) / nthreads - 1;
+                // Only use the symmetry around y=0 if it is in this block of rows.
+                const int jzero1 = (y1 < 0 && y2 >= 0) ? -y1 : 0;
+                blocks.push_back(FillRows(*_pimpl, image.subImage(Bounds<int>(xmin,xmax,y1,y2)),
+                                          xmin*dx, dx, izero, y1*dx, dx, jzero1));
+            }
+            std::vector<std::thread> threads;
+            threads.reserve(nthreads-1);
+            for (int k=1; k<nthreads; ++k)
+                threads.push_back(std::thread(std::ref(blocks[k])));
+            // Do the first block in this thread.
+            blocks[0]();
+            for (int k=0; k<nthreads-1; ++k) threads[k].join();
+            for (int k=0; k<nthreads; ++k)
+                if (blocks[k]._error) std::rethrow_exception(blocks[k]._error);
+        } else {
+            _pimpl->fillXImage(image, xmin*dx, dx, izero, ymin*dx, dx, jzero);
+        }
         if (dx != 1.) image *= dx*dx;
     }
 
@@ -331,6 +432,245 @@ namespace galsim {
         _pimpl->fillKImage(image.view(), xmin*dk, dk, izero, ymin*dk, dk, jzero);
     }
 
+    // Sum the elements of an image in double precision.  (BaseImage::sumElements uses T.)
+    template <typename T>
+    static double SumImage(const BaseImage<T>& image)
+    {
+        const T* ptr = image.getData();
+        const int skip = image.getNSkip();
+        const int step = image.getStep();
+        const int ncol = image.getNCol();
+        const int nrow = image.getNRow();
+        double sum = 0.;
+        for (int j=0; j<nrow; ++j, ptr+=skip)
+            for (int i=0; i<ncol; ++i, ptr+=step) sum += *ptr;
+        return sum;
+    }
+
+    // Python-style floor division by 2, which is what drawFFT uses for the image bounds.
+    static int FloorHalf(int n) { return n >= 0 ? n/2 : -((1-n)/2); }
+
+    // Draw prof onto image, which is centered at (0,0), with an FFT.  This is the same
+    // calculation as GSObject.drawFFT in python for an image with scale = 1.
+    // Returns false if the FFT would be larger than maximum_fft_size, in which case the image
+    // is not drawn.
+    template <typename T>
+    static bool DrawFFT(const SBProfile& prof, ImageView<T> image, double& sum)
+    {
+        const Bounds<int> b = image.getBounds();
+        // We must make something big enough to cover the target image size:
+        int image_N = std::max(std::max(std::abs(b.getXMin()), std::abs(b.getXMax())),
+                               std::max(std::abs(b.getYMin()), std::abs(b.getYMax()))) * 2;
+        image_N = std::max(image_N, std::max(image.getNCol(), image.getNRow()));
+
+        // Start with what this profile thinks a good size would be (cf. getGoodImageSize).
+        // (Some slop to keep from getting extra pixels due to roundoff errors in calculations.)
+        int N = int(std::ceil(2.*M_PI / prof.stepK() * (1.-1.e-12)));
+        N = 2 * ((N+1) / 2);
+        N = std::max(N, image_N);
+        N = goodFFTSize(N);
+        const GSParams gsparams = prof.getGSParams();
+        N = std::max(N, gsparams.minimum_fft_size);
+
+        const double dk = 2.*M_PI / N;
+        const double maxk = prof.maxK();
+        // If N*dk/2 <= maxk, there will be aliasing.  Make a larger image and then wrap it.
+        const int Nk = (N*dk/2 > maxk) ? N : int(std::ceil(maxk/dk)) * 2;
+        dbg<<"DrawFFT: N = "<<N<<", Nk = "<<Nk<<std::endl;
+        if (Nk > gsparams.maximum_fft_size) return false;
+
+        ImageAlloc<std::complex<T> > kimage(
+            Bounds<int>(0, Nk/2, FloorHalf(-Nk), Nk/2), std::complex<T>(0.));
+        prof.drawK(kimage.view(), dk);
+
+        // Wrap the full image to the size we want for the FT.
+        const Bounds<int> bwrap(0, N/2, FloorHalf(-N), N/2-1);
+        wrapImage(kimage.view(), bwrap, true, false);
+
+        ImageAlloc<double> real_image(Bounds<int>(FloorHalf(-N), N/2+1, FloorHalf(-N), N/2-1));
+        irfft(kimage.subImage(bwrap), real_image.view(), true, true);
+
+        ImageView<double> temp = real_image.subImage(b);
+        image.copyFrom(temp);
+        sum = SumImage(temp);
+        return true;
+    }
+
+    // Draw one of the images for DrawMany.  Returns the status value described there.
+    template <typename T>
+    static int DrawOne(const SBProfile& prof, ImageView<T> image, const double* params,
+                       int method, bool use_true_center, double& sum)
+    {
+        // Draw the profile centered on the center of the image, as drawImage does.
+        image.shift(-image.getBounds().center());
+
+        // For even-sized images, the draw function centers the result in the pixel just up
+        // and right of the real center.  So shift it back to draw it in the true center.
+        double dx = params[4];
+        double dy = params[5];
+        if (use_true_center) {
+            if (image.getNCol() % 2 == 0) dx -= 0.5;
+            if (image.getNRow() % 2 == 0) dy -= 0.5;
+        }
+
+        // Convert the profile in world coordinates to the profile in image coordinates.
+        const GSParams gsparams = prof.getGSParams();
+        SBProfile image_prof = SBTransform(prof, params[0], params[1], params[2], params[3],
+                                           Position<double>(dx,dy), params[6], gsparams);
+
+        // If necessary, convolve by the pixel.
+        if (method != 0) {
+            // drawImage only uses real space for method='auto' if the profile has hard edges.
+            bool real_space = method == 3 || (method == 1 && image_prof.hasHardEdges());
+            // Cases where the python Convolution would emit a warning are left for drawImage.
+            if (real_space && !image_prof.isAnalyticX()) return 0;
+            if (!real_space && image_prof.hasHardEdges()) return 0;
+            std::list<SBProfile> plist;
+            plist.push_back(image_prof);
+            plist.push_back(SBBox(1., 1., 1., gsparams));
+            image_prof = SBConvolve(plist, real_space, gsparams);
+        }
+
+        if (image_prof.isAnalyticX()) {
+            image_prof.draw(image, 1.);
+            sum = SumImage(image);
+            return 1;
+        } else {
+            return DrawFFT(image_prof, image, sum) ? 2 : 0;
+        }
+    }
+
+    // Return whether any pixel is in both a and b.
+    template <typename T>
+    static bool Overlap(const BaseImage<T>& a, const BaseImage<T>& b)
+    {
+        // The range of memory covered by each image, in bytes.
+        const T* pa = a.getData();
+        const T* pb = b.getData();
+        const std::uintptr_t a1 = reinterpret_cast<std::uintptr_t>(pa);
+        const std::uintptr_t b1 = reinterpret_cast<std::uintptr_t>(pb);
+        const std::uintptr_t a2 = reinterpret_cast<std::uintptr_t>(
+            pa + (a.getNRow()-1) * a.getStride() + (a.getNCol()-1) * a.getStep() + 1);
+        const std::uintptr_t b2 = reinterpret_cast<std::uintptr_t>(
+            pb + (b.getNRow()-1) * b.getStride() + (b.getNCol()-1) * b.getStep() + 1);
+        if (a2 <= b1 || b2 <= a1) return false;
+
+        // Views into the same parent image share the stride.  Then pixel (ia,ja) of a and
+        // (ib,jb) of b are the same if (ja-jb) * stride + (ia-ib) = pb - pa.  So b overlaps
+        // a if there is some row difference dj with |ia-ib| in range for that dj.
+        // Otherwise, be conservative and say they overlap if the memory ranges do.
+        const std::uintptr_t sz = sizeof(T);
+        if (a.getStep() != 1 || b.getStep() != 1 || a.getStride() != b.getStride() ||
+            a.getStride() <= 0 || (a1 > b1 ? a1-b1 : b1-a1) % sz != 0) return true;
+        const long stride = a.getStride();
+        const long d = a1 <= b1 ? long((b1-a1)/sz) : -long((a1-b1)/sz);
+        const long wa = a.getNCol(), ha = a.getNRow();
+        const long wb = b.getNCol(), hb = b.getNRow();
+        // The range of dj = ja-jb that has -wb < d - dj*stride < wa, using floor division.
+        const long num1 = d - wa + 1;
+        const long num2 = d + wb - 1;
+        long lo = num1 >= 0 ? (num1 + stride - 1) / stride : -((-num1) / stride);
+        long hi = num2 >= 0 ? num2 / stride : -((-num2 + stride - 1) / stride);
+        lo = std::max(lo, -(hb-1));
+        hi = std::min(hi, ha-1);
+        return lo <= hi;
+    }
+
+    // Return whether any of the images share any pixels.
+    template <typename T>
+    static bool AnyOverlap(const std::vector<ImageView<T> >& images)
+    {
+        // Sort the images by the start of their data, so only the ones whose memory ranges
+        // overlap need to be checked in detail.
+        const int nimages = images.size();
+        std::vector<std::pair<std::uintptr_t, int> > start(nimages);
+        for (int i=0; i<nimages; ++i) {
+            const BaseImage<T>& im = images[i];
+            start[i] = std::make_pair(reinterpret_cast<std::uintptr_t>(im.getData()), i);
+        }
+        std::sort(start.begin(), start.end());
+        for (int k=0; k<nimages; ++k) {
+            const BaseImage<T>& a = images[start[k].second];
+            const std::uintptr_t end = reinterpret_cast<std::uintptr_t>(
+                a.getData() + (a.getNRow()-1) * a.getStride() + (a.getNCol()-1) * a.getStep());
+            for (int k2=k+1; k2<nimages && start[k2].first <= end; ++k2)
+                if (Overlap(a, images[start[k2].second])) return true;
+        }
+        return false;
+    }
+
+    template <typename T>
+    void DrawMany(const std::vector<SBProfile>& profs, const std::vector<ImageView<T> >& images,
+                  const double* params, int method, bool use_true_center,
+                  int* status, double* sums)
+    {
+        dbg<<"Start DrawMany: "<<profs.size()<<" images\n";
+        assert(profs.size() == images.size());
+        const int nimages = profs.size();
+
+        // Each thread draws every nthreads-th image, starting with the k-th one.
+        struct DrawImages
+        {
+            DrawImages(const std::vector<SBProfile>& profs,
+                       const std::vector<ImageView<T> >& images, const double* params,
+                       int method, bool use_true_center, int* status, double* sums,
+                       int k, int nthreads) :
+                _profs(profs), _images(images), _params(params), _method(method),
+                _use_true_center(use_true_center), _status(status), _sums(sums),
+                _k(k), _nthreads(nthreads) {}
+
+            // Exceptions can't propagate out of a thread, so save it to rethrow later.
+            void operator()()
+            {
+                try {
+                    for (int i=_k; i<int(_profs.size()); i+=_nthreads) {
+                        _status[i] = DrawOne(_profs[i], _images[i], _params + 7*i, _method,
+                                             _use_true_center, _sums[i]);
+                    }
+                } catch (...) {
+                    _error = std::current_exception();
+                }
+            }
+
+            const std::vector<SBProfile>& _profs;
+            const std::vector<ImageView<T> >& _images;
+            const double* _params;
+            int _method;
+            bool _use_true_center;
+            int* _status;
+            double* _sums;
+            int _k, _nthreads;
+            std::exception_ptr _error;
+        };
+
+        bool thread_safe = true;
+        for (int i=0; i<nimages; ++i)
+            if (!profs[i].isThreadSafe()) { thread_safe = false; break; }
+        // If two images share any pixels, draw them in order in a single thread, so the
+        // later one wins, as it would with drawImage.
+        if (thread_safe && GetNumThreads() > 1 && AnyOverlap(images)) {
+            dbg<<"Some images overlap\n";
+            thread_safe = false;
+        }
+        const int nthreads = thread_safe ? std::max(std::min(GetNumThreads(), nimages), 1) : 1;
+        dbg<<"Drawing with "<<nthreads<<" threads\n";
+
+        std::vector<DrawImages> blocks;
+        blocks.reserve(nthreads);
+        for (int k=0; k<nthreads; ++k)
+            blocks.push_back(DrawImages(profs, images, params, method, use_true_center,
+                                        status, sums, k, nthreads));
+        std::vector<std::thread> threads;
+        threads.reserve(nthreads-1);
+        for (int k=1; k<nthreads; ++k)
+            threads.push_back(std::thread(std::ref(blocks[k])));
+        // Do the first set of images in this thread.
+        blocks[0]();
+        for (int k=0; k<nthreads-1; ++k) threads[k].join();
+        for (int k=0; k<nthreads; ++k)
+            if (blocks[k]._error) std::rethrow_exception(blocks[k]._error);
+    }
+
     // The type of T (real or complex) determines whether the call-back is to
     // fillXImage or fillKImage.
     template <typename T>
@@ -498,6 +838,13 @@ namespace galsim {
     template void SBProfile::draw(ImageView<float> image, double dx) const;
     template void SBProfile::draw(ImageView<double> image, double dx) const;
 
+    template void DrawMany(const std::vector<SBProfile>& profs,
+                           const std::vector<ImageView<float> >& images, const double* params,
+                           int method, bool use_true_center, int* status, double* sums);
+    template void DrawMany(const std::vector<SBProfile>& profs,
+                           const std::vector<ImageView<double> >& images, const double* params,
+                           int method, bool use_true_center, int* status, double* sums);
+
     template void SBProfile::drawK(ImageView<std::complex<float> > image, double dk) const;
     template void SBProfile::drawK(ImageView<std::complex<double> > image, double dk) const;
 
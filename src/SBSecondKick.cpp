@@ -21,6 +21,7 @@
 
 #include "SBSecondKick.h"
 #include "SBSecondKickImpl.h"
+#include "TableCache.h"
 #include "SBVonKarmanImpl.h"
 #include "fmath/fmath.hpp"
 #include "Solve.h"
@@ -120,19 +121,39 @@ namespace galsim {
         _radial(Table::spline),
         _kvLUT(Table::spline)
     {
-        // build the radial function
+        TableCacheEntry entry("SKInfo", MakeTableCacheKey({_kcrit}, *_gsparams));
+        if (entry.load(3, 2)) {
+            _maxk = entry.getValue();
+            _delta = entry.getValue();
+            _stepk = entry.getValue();
+            entry.getTable(_kvLUT);
+            entry.getTable(_radial);
+        } else {
+            // build the radial function
 #ifdef DEBUGLOGGING
-        std::clock_t t0 = std::clock();
-        _buildKVLUT();
-        std::clock_t t1 = std::clock();
-        _buildRadial();
-        std::clock_t t2 = std::clock();
-        dbg << "buildKV time = " << (double)(t1-t0)/CLOCKS_PER_SEC << '\n';
-        dbg << "buildRad time = " << (double)(t2-t1)/CLOCKS_PER_SEC << '\n';
+            std::clock_t t0 = std::clock();
+            _buildKVLUT();
+            std::clock_t t1 = std::clock();
+            _buildRadial();
+            std::clock_t t2 = std::clock();
+            dbg << "buildKV time = " << (double)(t1-t0)/CLOCKS_PER_SEC << '\n';
+            dbg << "buildRad time = " << (double)(t2-t1)/CLOCKS_PER_SEC << '\n';
 #else
-        _buildKVLUT();
-        _buildRadial();
+            _buildKVLUT();
+            _buildRadial();
 #endif
+            entry.addValue(_maxk);
+            entry.addValue(_delta);
+            entry.addValue(_stepk);
+            entry.addTable(_kvLUT);
+            entry.addTable(_radial);
+            entry.save();
+        }
+
+        std::vector<double> range(2,0.);
+        range[1] = _radial.argMax();
+        _sampler.reset(new OneDimensionalDeviate(_radial, range, true, *_gsparams));
+        dbg<<"made sampler\n";
     }
 
     inline double pow4(double x) { double x2 = x*x; return x2*x2; }
@@ -313,12 +334,6 @@ namespace galsim {
             _radial.addEntry(2., 0.);
             _radial.finalize();
             _stepk = 1.e10;
-            std::vector<double> range(2,0.);
-            range[1] = _radial.argMax();
-            dbg<<"range = "<<range[0]<<"  "<<range[1]<<std::endl;
-            dbg<<"Make ODD\n";
-            _sampler.reset(new OneDimensionalDeviate(_radial, range, true, *_gsparams));
-            dbg<<"Made ODD\n";
             return;
         }
 
@@ -402,11 +417,6 @@ namespace galsim {
         dbg<<"final R = "<<R<<std::endl;
         _stepk = M_PI / R;
         dbg<<"stepk = "<<_stepk<<std::endl;
-
-        std::vector<double> range(2,0.);
-        range[1] = _radial.argMax();
-        _sampler.reset(new OneDimensionalDeviate(_radial, range, true, *_gsparams));
-        dbg<<"made sampler\n";
         //set_verbose(1);
     }
 
@@ -19,8 +19,11 @@
 
 //#define DEBUGLOGGING
 
+#include <mutex>
+
 #include "SBSersic.h"
 #include "SBSersicImpl.h"
+#include "TableCache.h"
 #include "integ/Int.h"
 #include "Solve.h"
 #include "math/Bessel.h"
@@ -325,29 +328,32 @@ namespace galsim {
 
     double SersicInfo::stepK() const
     {
-        if (_stepk == 0.) {
-            // How far should the profile extend, if not truncated?
-            // Estimate number of effective radii needed to enclose (1-folding_threshold) of flux
-            double R = calculateMissingFluxRadius(_gsparams->folding_threshold);
-            if (_truncated && _trunc < R)  R = _trunc;
-            // Go to at least 5*re
-            R = std::max(R,_gsparams->stepk_minimum_hlr);
-            dbg<<"R => "<<R<<std::endl;
-            _stepk = M_PI / R;
-            dbg<<"stepk = "<<_stepk<<std::endl;
-        }
+        std::call_once(_stepk_once, &SersicInfo::calculateStepK, this);
         return _stepk;
     }
 
+    void SersicInfo::calculateStepK() const
+    {
+        // How far should the profile extend, if not truncated?
+        // Estimate number of effective radii needed to enclose (1-folding_threshold) of flux
+        double R = calculateMissingFluxRadius(_gsparams->folding_threshold);
+        if (_truncated && _trunc < R)  R = _trunc;
+        // Go to at least 5*re
+        R = std::max(R,_gsparams->stepk_minimum_hlr);
+        dbg<<"R => "<<R<<std::endl;
+        _stepk = M_PI / R;
+        dbg<<"stepk = "<<_stepk<<std::endl;
+    }
+
     double SersicInfo::maxK() const
     {
-        if (_maxk == 0.) buildFT();
+        std::call_once(_ft_once, &SersicInfo::buildFT, this);
         return _maxk;
     }
 
     double SersicInfo::getHLR() const
     {
-        if (_re == 0.) calculateHLR();
+        std::call_once(_hlr_once, &SersicInfo::calculateHLR, this);
         return _re;
     }
 
@@ -359,20 +365,23 @@ namespace galsim {
 
     double SersicInfo::getFluxFraction() const
     {
-        if (_flux == 0.) {
-            // Calculate the flux of a truncated profile (relative to the integral for
-            // an untruncated profile).
-            if (_truncated) {
-                // integrate from 0. to _trunc
-                _flux = SersicIntegratedFlux(_n, _trunc);
-                dbg << "Flux fraction = " << _flux << std::endl;
-            } else {
-                _flux = 1.;
-            }
-        }
+        std::call_once(_flux_once, &SersicInfo::calculateFluxFraction, this);
         return _flux;
     }
 
+    void SersicInfo::calculateFluxFraction() const
+    {
+        // Calculate the flux of a truncated profile (relative to the integral for
+        // an untruncated profile).
+        if (_truncated) {
+            // integrate from 0. to _trunc
+            _flux = SersicIntegratedFlux(_n, _trunc);
+            dbg << "Flux fraction = " << _flux << std::endl;
+        } else {
+            _flux = 1.;
+        }
+    }
+
     double SersicInfo::getXNorm() const
     { return 1. / (2.*M_PI*_n*_gamma2n * getFluxFraction()); }
 
@@ -385,7 +394,7 @@ namespace galsim {
     double SersicInfo::kValue(double ksq) const
     {
         assert(ksq >= 0.);
-        if (!_ft.finalized()) buildFT();
+        std::call_once(_ft_once, &SersicInfo::buildFT, this);
 
         if (ksq>=_ksq_max)
             return (_highk_a + _highk_b/sqrt(ksq))/ksq; // high-k asymptote
@@ -413,6 +422,19 @@ namespace galsim {
 
     void SersicInfo::buildFT() const
     {
+        TableCacheEntry entry("SersicInfo", MakeTableCacheKey({_n, _trunc}, *_gsparams));
+        if (entry.load(7, 1)) {
+            _kderiv2 = entry.getValue();
+            _kderiv4 = entry.getValue();
+            _ksq_min = entry.getValue();
+            _ksq_max = entry.getValue();
+            _highk_a = entry.getValue();
+            _highk_b = entry.getValue();
+            _maxk = entry.getValue();
+            entry.getTable(_ft);
+            return;
+        }
+
         // The small-k expansion of the Hankel transform is (normalized to have flux=1):
         // 1 - Gamma(4n) / 4 Gamma(2n) + Gamma(6n) / 64 Gamma(2n) - Gamma(8n) / 2304 Gamma(2n)
         // from the series summation J_0(x) = Sum^inf_{m=0} (-1)^m (m!)^-2 (x/2)^2m
@@ -581,6 +603,16 @@ namespace galsim {
                 xdbg<<"maxk => "<<_maxk<<std::endl;
             }
         }
+
+        entry.addValue(_kderiv2);
+        entry.addValue(_kderiv4);
+        entry.addValue(_ksq_min);
+        entry.addValue(_ksq_max);
+        entry.addValue(_highk_a);
+        entry.addValue(_highk_b);
+        entry.addValue(_maxk);
+        entry.addTable(_ft);
+        entry.save();
     }
 
     // Function object for finding the r that encloses all except a particular flux fraction.
@@ -826,10 +858,15 @@ namespace galsim {
         double _invn;
     };
 
+    // Photons may be shot from several threads at once, so make sure only one of them
+    // builds the sampler.
+    static std::mutex sersic_sampler_mutex;
+
     void SersicInfo::shoot(PhotonArray& photons, UniformDeviate ud) const
     {
         dbg<<"Target flux = 1.0\n";
 
+        std::unique_lock<std::mutex> lock(sersic_sampler_mutex);
         if (!_sampler) {
             // Set up the classes for photon shooting
             _radial.reset(new SersicRadialFunction(_invn));
@@ -839,6 +876,7 @@ namespace galsim {
             range[1] = shoot_maxr;
             _sampler.reset(new OneDimensionalDeviate( *_radial, range, true, *_gsparams));
         }
+        lock.unlock();
 
         assert(_sampler.get());
         _sampler->shoot(photons,ud);
@@ -19,6 +19,8 @@
 
 //#define DEBUGLOGGING
 
+#include <mutex>
+
 #include "SBSpergel.h"
 #include "SBSpergelImpl.h"
 #include "Solve.h"
@@ -625,32 +627,43 @@ namespace galsim {
 
     double SpergelInfo::stepK() const
     {
-        if (_stepk == 0.) {
-            double R = calculateFluxRadius(1.0 - _gsparams->folding_threshold);
-            // Go to at least 5*re
-            R = std::max(R,_gsparams->stepk_minimum_hlr * getHLR());
-            dbg<<"R => "<<R<<std::endl;
-            _stepk = M_PI / R;
-            dbg<<"stepk = "<<_stepk<<std::endl;
-        }
+        std::call_once(_stepk_once, &SpergelInfo::calculateStepK, this);
         return _stepk;
     }
 
+    void SpergelInfo::calculateStepK() const
+    {
+        double R = calculateFluxRadius(1.0 - _gsparams->folding_threshold);
+        // Go to at least 5*re
+        R = std::max(R,_gsparams->stepk_minimum_hlr * getHLR());
+        dbg<<"R => "<<R<<std::endl;
+        _stepk = M_PI / R;
+        dbg<<"stepk = "<<_stepk<<std::endl;
+    }
+
     double SpergelInfo::maxK() const
     {
-        if(_maxk == 0.) {
-            // Solving (1+k^2)^(-1-nu) = maxk_threshold for k
-            _maxk = std::sqrt(std::pow(_gsparams->maxk_threshold, -1./(1+_nu))-1.0);
-        }
+        std::call_once(_maxk_once, &SpergelInfo::calculateMaxK, this);
         return _maxk;
     }
 
+    void SpergelInfo::calculateMaxK() const
+    {
+        // Solving (1+k^2)^(-1-nu) = maxk_threshold for k
+        _maxk = std::sqrt(std::pow(_gsparams->maxk_threshold, -1./(1+_nu))-1.0);
+    }
+
     double SpergelInfo::getHLR() const
     {
-        if (_re == 0.0) _re = calculateFluxRadius(0.5);
+        std::call_once(_hlr_once, &SpergelInfo::calculateHLR, this);
         return _re;
     }
 
+    void SpergelInfo::calculateHLR() const
+    {
+        _re = calculateFluxRadius(0.5);
+    }
+
     double SpergelInfo::getXNorm() const
     { return std::pow(2., -_nu) / _gamma_nup1 / (2.0 * M_PI); }
 
@@ -695,8 +708,13 @@ namespace galsim {
         double _b;
     };
 
+    // Photons may be shot from several threads at once, so make sure only one of them
+    // builds the sampler.
+    static std::mutex spergel_sampler_mutex;
+
     void SpergelInfo::shoot(PhotonArray& photons, UniformDeviate ud) const
     {
+        std::unique_lock<std::mutex> lock(spergel_sampler_mutex);
         if (!_sampler) {
             // Set up the classes for photon shooting
             double shoot_rmax = calculateFluxRadius(1. - _gsparams->shoot_accuracy);
@@ -731,6 +749,7 @@ namespace galsim {
                 _sampler.reset(new OneDimensionalDeviate( *_radial, range, true, *_gsparams));
             }
         }
+        lock.unlock();
 
         assert(_sampler.get());
         _sampler->shoot(photons,ud);
@@ -185,32 +185,43 @@ namespace galsim {
     {
         // The adaptee's maxk can be slow (e.g. high-n Sersic), so delay this calculation
         // until we actually need it.
-        if (_maxk == 0.) _maxk = _adaptee.maxK() / _minor;
+        std::call_once(_maxk_once, &SBTransformImpl::calculateMaxK, this);
         return _maxk;
     }
 
+    void SBTransform::SBTransformImpl::calculateMaxK() const
+    {
+        _maxk = _adaptee.maxK() / _minor;
+    }
+
     double SBTransform::SBTransformImpl::stepK() const
     {
-        if (_stepk == 0.) {
-            _stepk = _adaptee.stepK() / _major;
-            // If we have a shift, we need to further modify stepk
-            //     stepk = Pi/R
-            // R <- R + |shift|
-            // stepk <- Pi/(Pi/stepk + |shift|)
-            if (_cen.x != 0. || _cen.y != 0.) {
-                double shift = sqrt( _cen.x*_cen.x + _cen.y*_cen.y );
-                dbg<<"stepk from adaptee = "<<_stepk<<std::endl;
-                _stepk = M_PI / (M_PI/_stepk + shift);
-                dbg<<"shift = "<<shift<<", stepk -> "<<_stepk<<std::endl;
-            }
-        }
+        std::call_once(_stepk_once, &SBTransformImpl::calculateStepK, this);
         return _stepk;
     }
 
+    void SBTransform::SBTransformImpl::calculateStepK() const
+    {
+        _stepk = _adaptee.stepK() / _major;
+        // If we have a shift, we need to further modify stepk
+        //     stepk = Pi/R
+        // R <- R + |shift|
+        // stepk <- Pi/(Pi/stepk + |shift|)
+        if (_cen.x != 0. || _cen.y != 0.) {
+            double shift = sqrt( _cen.x*_cen.x + _cen.y*_cen.y );
+            dbg<<"stepk from adaptee = "<<_stepk<<std::endl;
+            _stepk = M_PI / (M_PI/_stepk + shift);
+            dbg<<"shift = "<<shift<<", stepk -> "<<_stepk<<std::endl;
+        }
+    }
+
     void SBTransform::SBTransformImpl::setupRanges() const
     {
-        if (_xmin != 0. || _xmax != 0.) return;
+        std::call_once(_ranges_once, &SBTransformImpl::calculateRanges, this);
+    }
 
+    void SBTransform::SBTransformImpl::calculateRanges() const
+    {
         // Calculate the values for getXRange and getYRange:
         if (_adaptee.isAxisymmetric()) {
             // The original is a circle, so first get its radius.
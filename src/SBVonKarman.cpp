@@ -21,6 +21,7 @@
 
 #include "SBVonKarman.h"
 #include "SBVonKarmanImpl.h"
+#include "TableCache.h"
 #include "Solve.h"
 #include "math/Bessel.h"
 #include "math/Gamma.h"
@@ -160,7 +161,23 @@ namespace galsim {
         dbg<<"_delta = "<<_delta<<'\n';
 
         // build the radial function, and along the way, set _stepk, _hlr.
-        _buildRadialFunc();
+        TableCacheEntry entry("VonKarmanInfo",
+                              MakeTableCacheKey({_lam, _L0, double(_doDelta)}, *_gsparams));
+        if (entry.load(2, 1)) {
+            _hlr = entry.getValue();
+            _stepk = entry.getValue();
+            entry.getTable(_radial);
+        } else {
+            _buildRadialFunc();
+            entry.addValue(_hlr);
+            entry.addValue(_stepk);
+            entry.addTable(_radial);
+            entry.save();
+        }
+
+        std::vector<double> range(2, 0.);
+        range[1] = _radial.argMax();
+        _sampler.reset(new OneDimensionalDeviate(_radial, range, true, *_gsparams));
     }
 
     double vkStructureFunction(double rho, double L0, double L0_invcuberoot, double L053) {
@@ -314,10 +331,6 @@ namespace galsim {
         dbg<<"sum = "<<sum<<"   (should be > 0.995)\n";
         if (sum < 1-_gsparams->folding_threshold)
             throw SBError("Could not determine appropriate stepk, given folding_threshold");
-
-        std::vector<double> range(2, 0.);
-        range[1] = _radial.argMax();
-        _sampler.reset(new OneDimensionalDeviate(_radial, range, true, *_gsparams));
     }
 
     void VonKarmanInfo::shoot(PhotonArray& photons, UniformDeviate ud) const
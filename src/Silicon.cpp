@@ -30,6 +30,9 @@
 #include <sstream>
 #include <vector>
 #include <algorithm>
+#include <thread>
+#include <functional>
+#include <exception>
 
 // Uncomment this for debugging output
 //#define DEBUGLOGGING
@@ -155,6 +158,13 @@ namespace galsim {
 
     template <typename T>
     void Silicon::updatePixelDistortions(ImageView<T> target)
+    {
+        updatePixelDistortions(target, target.getBounds(), target.getBounds());
+    }
+
+    template <typename T>
+    void Silicon::updatePixelDistortions(ImageView<T> target, const Bounds<int>& source,
+                                         const Bounds<int>& region)
     {
         dbg<<"updatePixelDistortions\n";
         // This updates the pixel distortions in the _imagepolys
@@ -167,45 +177,58 @@ namespace galsim {
         int nyCenter = (_ny - 1) / 2;
 
         // Now add in the displacements
-        const int i1 = target.getXMin();
-        const int i2 = target.getXMax();
         const int j1 = target.getYMin();
-        const int j2 = target.getYMax();
-        const int ny = j2-j1+1;
-        const int skip = target.getNSkip();
-        const int step = target.getStep();
-        const T* ptr = target.getData();
+        const int ny = target.getYMax()-j1+1;
+        const int i1 = target.getXMin();
+
+        // Only the charge in the source pixels is used, and only the pixels in region are
+        // updated.
+        const int ri1 = region.getXMin();
+        const int ri2 = region.getXMax();
+        const int rj1 = region.getYMin();
+        const int rj2 = region.getYMax();
+        const int rny = rj2-rj1+1;
+        ConstImageView<T> charges = target.subImage(source);
+        const int skip = charges.getNSkip();
+        const int step = charges.getStep();
+        const T* ptr = charges.getData();
 
         // Now we cycle through the pixels in the target image and update any affected
         // pixel shapes.
-        std::vector<bool> changed(_imagepolys.size(), false);
-        for (int j=j1; j<=j2; ++j, ptr+=skip) {
-            for (int i=i1; i<=i2; ++i, ptr+=step) {
+        std::vector<bool> changed((ri2-ri1+1) * rny, false);
+        for (int j=source.getYMin(); j<=source.getYMax(); ++j, ptr+=skip) {
+            for (int i=source.getXMin(); i<=source.getXMax(); ++i, ptr+=step) {
                 double charge = *ptr;
                 if (charge == 0.0) continue;
 
-                int polyi1 = std::max(i - _qDist, i1);
-                int polyi2 = std::min(i + _qDist, i2);
-                int polyj1 = std::max(j - _qDist, j1);
-                int polyj2 = std::min(j + _qDist, j2);
+                int polyi1 = std::max(i - _qDist, ri1);
+                int polyi2 = std::min(i + _qDist, ri2);
+                int polyj1 = std::max(j - _qDist, rj1);
+                int polyj2 = std::min(j + _qDist, rj2);
                 int disti = nxCenter + polyi1 - i;
 
                 for (int polyi=polyi1; polyi<=polyi2; ++polyi, ++disti) {
                     int distj = nyCenter + polyj1 - j;
                     int index = (polyi - i1) * ny + (polyj1 - j1);
+                    int rindex = (polyi - ri1) * rny + (polyj1 - rj1);
                     int dist_index = disti * _ny + distj;
 
-                    for (int polyj=polyj1; polyj<=polyj2; ++polyj, ++distj, ++index, ++dist_index) {
+                    for (int polyj=polyj1; polyj<=polyj2;
+                         ++polyj, ++distj, ++index, ++rindex, ++dist_index) {
                         Polygon& distortion = _distortions[dist_index];
                         Polygon& imagepoly = _imagepolys[index];
                         imagepoly.distort(distortion, charge);
-                        changed[index] = true;
+                        changed[rindex] = true;
                     }
                 }
             }
         }
-        for (size_t k=0; k<_imagepolys.size(); ++k) {
-            if (changed[k]) _imagepolys[k].updateBounds();
+        for (int i=ri1; i<=ri2; ++i) {
+            int index = (i - i1) * ny + (rj1 - j1);
+            int rindex = (i - ri1) * rny;
+            for (int j=rj1; j<=rj2; ++j, ++index, ++rindex) {
+                if (changed[rindex]) _imagepolys[index].updateBounds();
+            }
         }
     }
 
@@ -266,6 +289,14 @@ namespace galsim {
     template <typename T>
     bool Silicon::insidePixel(int ix, int iy, double x, double y, double zconv,
                               ImageView<T> target, bool* off_edge) const
+    {
+        return insidePixel(ix, iy, x, y, zconv, target.getBounds(), _imagepolys, _testpoly,
+                           off_edge);
+    }
+
+    bool Silicon::insidePixel(int ix, int iy, double x, double y, double zconv,
+                              const Bounds<int>& b, const std::vector<Polygon>& imagepolys,
+                              Polygon& testpoly, bool* off_edge) const
     {
         // This scales the pixel distortion based on the zconv, which is the depth
         // at which the electron is created, and then tests to see if the delivered
@@ -274,20 +305,20 @@ namespace galsim {
         // photon within the pixel, with (0,0) in the lower left
 
         // If test pixel is off the image, return false.  (Avoids seg faults!)
-        if (!target.getBounds().includes(Position<int>(ix,iy))) {
+        if (!b.includes(Position<int>(ix,iy))) {
             if (off_edge) *off_edge = true;
             return false;
         }
         xdbg<<"insidePixel: "<<ix<<','<<iy<<','<<x<<','<<y<<','<<off_edge<<std::endl;
 
-        const int i1 = target.getXMin();
-        const int i2 = target.getXMax();
-        const int j1 = target.getYMin();
-        const int j2 = target.getYMax();
+        const int i1 = b.getXMin();
+        const int i2 = b.getXMax();
+        const int j1 = b.getYMin();
+        const int j2 = b.getYMax();
 
         int index = (ix - i1) * (j2 - j1 + 1) + (iy - j1);
         xdbg<<"index = "<<index<<std::endl;
-        const Polygon& poly = _imagepolys[index];
+        const Polygon& poly = imagepolys[index];
         xdbg<<"p = "<<x<<','<<y<<std::endl;
         xdbg<<"inner = "<<poly.getInnerBounds()<<std::endl;
         xdbg<<"outer = "<<poly.getOuterBounds()<<std::endl;
@@ -313,10 +344,10 @@ namespace galsim {
             const double zfactor = std::tanh(zconv / zfit);
 
             // Scale the testpoly vertices by zfactor
-            _testpoly.scale(poly, _emptypoly, zfactor);
+            testpoly.scale(poly, _emptypoly, zfactor);
 
             // Now test to see if the point is inside
-            inside = _testpoly.contains(p);
+            inside = testpoly.contains(p);
         }
 
         // If the nominal pixel is on the edge of the image and the photon misses in the
@@ -328,7 +359,7 @@ namespace galsim {
             xdbg<<"iy,j1,j2 = "<<iy<<','<<j1<<','<<j2<<std::endl;
             *off_edge = false;
             xdbg<<"ix == i1 ? "<<(ix == i1)<<std::endl;
-            xdbg<<"x < inner.xmin? "<<(x < _testpoly.getInnerBounds().getXMin())<<std::endl;
+            xdbg<<"x < inner.xmin? "<<(x < testpoly.getInnerBounds().getXMin())<<std::endl;
             if ((ix == i1) && (x < poly.getInnerBounds().getXMin())) *off_edge = true;
             if ((ix == i2) && (x > poly.getInnerBounds().getXMax())) *off_edge = true;
             if ((iy == j1) && (y < poly.getInnerBounds().getYMin())) *off_edge = true;
@@ -343,18 +374,27 @@ namespace galsim {
 
     double Silicon::calculateConversionDepth(const PhotonArray& photons, int i,
                                              BaseDeviate rng) const
+    {
+        double abs_length = 0.;
+        if (photons.hasAllocatedWavelengths()) {
+            double lambda = photons.getWavelength(i); // in nm
+            // Lookup the absorption length in the imported table
+            abs_length = _abs_length_table.lookup(lambda); // in microns
+        }
+        return calculateConversionDepth(photons, i, abs_length, rng);
+    }
+
+    double Silicon::calculateConversionDepth(const PhotonArray& photons, int i,
+                                             double abs_length, BaseDeviate rng) const
     {
         UniformDeviate ud(rng);
         // Determine the distance the photon travels into the silicon
         double si_length;
         if (photons.hasAllocatedWavelengths()) {
-            double lambda = photons.getWavelength(i); // in nm
-            // Lookup the absorption length in the imported table
-            double abs_length = _abs_length_table.lookup(lambda); // in microns
             si_length = -abs_length * log(1.0 - ud()); // in microns
 #ifdef DEBUGLOGGING
             if (i % 1000 == 0) {
-                xdbg<<"lambda = "<<lambda<<std::endl;
+                xdbg<<"abs_length = "<<abs_length<<std::endl;
                 xdbg<<"si_length = "<<si_length<<std::endl;
             }
 #endif
@@ -386,9 +426,9 @@ namespace galsim {
 
     // Break this bit out mostly to make it easier when profiling to see how much it would help
     // to further optimize this part of the code.
-    template <typename T>
     bool searchNeighbors(const Silicon& silicon, int& ix, int& iy, double x, double y, double zconv,
-                         ImageView<T> target, int& step)
+                         const Bounds<int>& b, const std::vector<Polygon>& imagepolys,
+                         Polygon& testpoly, int& step)
     {
         xdbg<<"searchNeighbors for "<<ix<<','<<iy<<','<<x<<','<<y<<std::endl;
         // The following code finds which pixel we are in given
@@ -407,9 +447,10 @@ namespace galsim {
             double x_off = x - xoff[n];
             double y_off = y - yoff[n];
             xdbg<<n<<"  "<<ix_off<<"  "<<iy_off<<"  "<<x_off<<"  "<<y_off<<std::endl;
-            if (silicon.insidePixel(ix_off, iy_off, x_off, y_off, zconv, target)) {
+            if (silicon.insidePixel(ix_off, iy_off, x_off, y_off, zconv, b, imagepolys,
+                                    testpoly)) {
                 xdbg<<"Found in pixel "<<n<<", ix = "<<ix<<", iy = "<<iy
-                    <<", x="<<x<<", y = "<<y<<", target(ix,iy)="<<target(ix,iy)<<std::endl;
+                    <<", x="<<x<<", y = "<<y<<std::endl;
                 ix = ix_off;
                 iy = iy_off;
                 return true;
@@ -458,27 +499,17 @@ namespace galsim {
         }
     }
 
+    // Set up the pixel polygons and _delta at the start of accumulate, or check that they
+    // are consistent with target if resuming.  Returns the flux to add before the next
+    // call to updatePixelDistortions.
     template <typename T>
-    double Silicon::accumulate(const PhotonArray& photons, BaseDeviate rng, ImageView<T> target,
-                               Position<int> orig_center, bool resume)
+    double Silicon::initialize(ImageView<T> target, Position<int> orig_center, bool resume)
     {
-        UniformDeviate ud(rng);
         Bounds<int> b = target.getBounds();
         if (!b.isDefined())
             throw std::runtime_error("Attempting to PhotonArray::addTo an Image with"
                                      " undefined Bounds");
 
-#ifdef DEBUGLOGGING
-        dbg<<"In Silicon::accumulate\n";
-        dbg<<"bounds = "<<b<<std::endl;
-        dbg<<"total nphotons = "<<photons.size()<<std::endl;
-        dbg<<"hasAllocatedWavelengths = "<<photons.hasAllocatedWavelengths()<<std::endl;
-        dbg<<"hasAllocatedAngles = "<<photons.hasAllocatedAngles()<<std::endl;
-        double Irr = 0.;
-        double Irr0 = 0.;
-        int zerocount=0, neighborcount=0, misscount=0;
-#endif
-
         const int nx = b.getXMax() - b.getXMin() + 1;
         const int ny = b.getYMax() - b.getYMin() + 1;
         const int nxny = nx * ny;
@@ -511,7 +542,11 @@ namespace galsim {
             // the last update.  The easiest way to do that is to just subtract off what has
             // been added so far now and just keep adding to the existing _delta image.
             // It will all be added back at the end of this call to accumulate.
-            target -= _delta;
+            // Only the dirty parts of _delta can be nonzero.
+            for (int m=0; m<_dirty.getNBlocks(); ++m) {
+                Bounds<int> block = _dirty.getBlock(m);
+                target.subImage(block) -= _delta.subImage(block);
+            }
             dbg<<"resume=True.  Use saved next_recalc = "<<next_recalc<<std::endl;
         } else {
             _imagepolys.resize(nxny);
@@ -530,7 +565,119 @@ namespace galsim {
             // of the distortion updates.
             _delta.resize(b);
             _delta.setZero();
+            _dirty.reset(b);
+        }
+        return next_recalc;
+    }
+
+    // Update the pixel shapes for the charge in _delta, add it to target, and clear _delta.
+    // Only the blocks of _delta that have received charge since the last update need to be
+    // checked, and only the pixels within _qDist of those blocks need to be updated.
+    // Each block of pixels to update uses all the charge within _qDist of it in raster order
+    // (the rest of _delta is zero), so the pixel shapes are distorted in exactly the same order
+    // as when updating the whole image.
+    template <typename T>
+    void Silicon::flushDelta(ImageView<T> target)
+    {
+        dbg<<"flushDelta: "<<_dirty.getNBlocks()<<" dirty blocks\n";
+        Bounds<int> b = target.getBounds();
+        DirtyRegion update(_dirty.getBlockSize());
+        update.reset(b);
+        for (int m=0; m<_dirty.getNBlocks(); ++m) {
+            Bounds<int> region = _dirty.getBlock(m);
+            region.addBorder(_qDist);
+            update.add(region);
+        }
+        for (int m=0; m<update.getNBlocks(); ++m) {
+            Bounds<int> region = update.getBlock(m);
+            Bounds<int> source = region;
+            source.addBorder(_qDist);
+            updatePixelDistortions(_delta.view(), source & b, region);
+        }
+        for (int m=0; m<_dirty.getNBlocks(); ++m) {
+            Bounds<int> block = _dirty.getBlock(m);
+            target.subImage(block) += _delta.subImage(block);
+            _delta.subImage(block).setZero();
+        }
+        _dirty.clear();
+    }
+
+    void Silicon::getDelta(ImageView<double> delta) const
+    {
+        if (_resume_next_recalc == -999)
+            throw std::runtime_error("Silicon::getDelta called before accumulate has been run.");
+        if (delta.getBounds() != _delta.getBounds())
+            throw std::runtime_error("Silicon::getDelta called with the wrong bounds.");
+        delta.copyFrom(_delta);
+    }
+
+    void Silicon::getImagePolys(int start, int n, double* data) const
+    {
+        if (start < 0 || start + n > int(_imagepolys.size()))
+            throw std::runtime_error("Silicon::getImagePolys index out of range.");
+        for (int k=start; k<start+n; ++k) {
+            const Polygon& poly = _imagepolys[k];
+            for (int i=0; i<_nv; ++i) {
+                *data++ = poly[i].x;
+                *data++ = poly[i].y;
+            }
         }
+    }
+
+    void Silicon::setState(ImageView<double> delta, double next_recalc)
+    {
+        Bounds<int> b = delta.getBounds();
+        if (!b.isDefined())
+            throw std::runtime_error("Silicon::setState called with undefined bounds.");
+        dbg<<"setState: bounds = "<<b<<", next_recalc = "<<next_recalc<<std::endl;
+        _imagepolys.resize(b.area());
+        for (size_t k=0; k<_imagepolys.size(); ++k)
+            _imagepolys[k] = _emptypoly;
+
+        _delta.resize(b);
+        _delta.copyFrom(delta);
+        _dirty.reset(b);
+        for (int j=b.getYMin(); j<=b.getYMax(); ++j) {
+            for (int i=b.getXMin(); i<=b.getXMax(); ++i) {
+                if (_delta(i,j) != 0.) _dirty.add(i,j);
+            }
+        }
+        _resume_next_recalc = next_recalc;
+    }
+
+    void Silicon::setImagePolys(int start, int n, const double* data)
+    {
+        if (start < 0 || start + n > int(_imagepolys.size()))
+            throw std::runtime_error("Silicon::setImagePolys index out of range.");
+        for (int k=start; k<start+n; ++k) {
+            Polygon& poly = _imagepolys[k];
+            for (int i=0; i<_nv; ++i) {
+                poly[i].x = *data++;
+                poly[i].y = *data++;
+            }
+            poly.updateBounds();
+        }
+    }
+
+    template <typename T>
+    double Silicon::accumulate(const PhotonArray& photons, BaseDeviate rng, ImageView<T> target,
+                               Position<int> orig_center, bool resume)
+    {
+        UniformDeviate ud(rng);
+        Bounds<int> b = target.getBounds();
+
+#ifdef DEBUGLOGGING
+        dbg<<"In Silicon::accumulate\n";
+        dbg<<"bounds = "<<b<<std::endl;
+        dbg<<"total nphotons = "<<photons.size()<<std::endl;
+        dbg<<"hasAllocatedWavelengths = "<<photons.hasAllocatedWavelengths()<<std::endl;
+        dbg<<"hasAllocatedAngles = "<<photons.hasAllocatedAngles()<<std::endl;
+        double Irr = 0.;
+        double Irr0 = 0.;
+        int zerocount=0, neighborcount=0, misscount=0;
+#endif
+
+        double next_recalc = initialize(target, orig_center, resume);
         const double invPixelSize = 1./_pixelSize; // pixels/micron
         const double diffStep_pixel_z = _diffStep / (_sensorThickness * _pixelSize);
 
@@ -543,9 +690,7 @@ namespace galsim {
             // Update shapes every _nrecalc electrons
             if (addedFlux > next_recalc) {
                 dbg<<"updatePixelDistortions because "<<addedFlux<<" > "<<next_recalc<<std::endl;
-                updatePixelDistortions(_delta.view());
-                target += _delta;
-                _delta.setZero();
+                flushDelta(target);
                 next_recalc = addedFlux + _nrecalc;
             }
 
@@ -616,7 +761,8 @@ namespace galsim {
             // Then check neighbors
             int step;  // We might need this below, so let searchNeighbors return it.
             if (!foundPixel) {
-                foundPixel = searchNeighbors(*this, ix, iy, x, y, zconv, target, step);
+                foundPixel = searchNeighbors(*this, ix, iy, x, y, zconv, b, _imagepolys, _testpoly,
+                                             step);
 #ifdef DEBUGLOGGING
                 if (foundPixel) ++neighborcount;
 #endif
@@ -634,7 +780,7 @@ namespace galsim {
                 set_verbose(2);
                 bool off_edge;
                 insidePixel(ix, iy, x, y, zconv, target, &off_edge);
-                searchNeighbors(*this, ix, iy, x, y, zconv, target, step);
+                searchNeighbors(*this, ix, iy, x, y, zconv, b, _imagepolys, _testpoly, step);
                 set_verbose(1);
                 ++misscount;
 #endif
@@ -663,11 +809,15 @@ namespace galsim {
                 Irr0 += flux * rsq;
 #endif
                 _delta(ix,iy) += flux;
+                _dirty.add(ix,iy);
                 addedFlux += flux;
             }
         }
         // No need to update the distortions again, but we do need to add the delta image.
-        target += _delta;
+        for (int m=0; m<_dirty.getNBlocks(); ++m) {
+            Bounds<int> block = _dirty.getBlock(m);
+            target.subImage(block) += _delta.subImage(block);
+        }
         _resume_next_recalc = next_recalc - addedFlux;
         dbg<<"All done.  Added flux "<<addedFlux<<".  Save next_recalc = "<<_resume_next_recalc<<std::endl;
 
@@ -682,6 +832,349 @@ namespace galsim {
         return addedFlux;
     }
 
+    // The state of one tile of the image in accumulateTiles.
+    struct Silicon::Tile
+    {
+        Tile(const Bounds<int>& core_, const Bounds<int>& bounds_, long seed) :
+            core(core_), bounds(bounds_), ud(seed), gd(ud,0,1), addedFlux(0.) {}
+
+        // A pixel off the edge of bounds that received charge from this tile.
+        struct Overflow
+        {
+            Overflow(int ix_, int iy_, double flux_) : ix(ix_), iy(iy_), flux(flux_) {}
+            int ix, iy;
+            double flux;
+        };
+
+        Bounds<int> core;               // The pixels in the tile.
+        Bounds<int> bounds;             // The pixels in the tile plus a halo around it.
+        const int* begin;               // The indices of the photons incident on the tile
+        const int* end;                 // that haven't been accumulated yet.
+        UniformDeviate ud;              // The tile's random number substream.
+        GaussianDeviate gd;
+        ImageAlloc<double> delta;       // The charge added to bounds in this round.
+        std::vector<Overflow> overflow; // The charge added outside bounds in this round.
+        double addedFlux;               // The flux added in this round.
+        bool update;                    // Whether to update the pixels in core this round.
+    };
+
+    // Call op(k) for k in 0..n-1 using nthreads threads.  Thread t does t, t+nthreads, ...
+    template <typename Op>
+    static void runThreads(const Op& op, int n, int nthreads)
+    {
+        struct Block
+        {
+            Block(const Op& op, int n, int k0, int dk) : _op(op), _n(n), _k0(k0), _dk(dk) {}
+
+            void operator()()
+            {
+                try {
+                    for (int k=_k0; k<_n; k+=_dk) _op(k);
+                } catch (...) {
+                    _error = std::current_exception();
+                }
+            }
+
+            const Op& _op;
+            int _n, _k0, _dk;
+            std::exception_ptr _error;
+        };
+
+        nthreads = std::max(std::min(nthreads, n), 1);
+        std::vector<Block> blocks;
+        blocks.reserve(nthreads);
+        for (int k=0; k<nthreads; ++k) blocks.push_back(Block(op, n, k, nthreads));
+        std::vector<std::thread> threads;
+        threads.reserve(nthreads-1);
+        for (int k=1; k<nthreads; ++k)
+            threads.push_back(std::thread(std::ref(blocks[k])));
+        // Do the first block in this thread.
+        blocks[0]();
+        for (int k=0; k<nthreads-1; ++k) threads[k].join();
+        for (int k=0; k<nthreads; ++k)
+            if (blocks[k]._error) std::rethrow_exception(blocks[k]._error);
+    }
+
+    void Silicon::accumulateTile(Tile& tile, const PhotonArray& photons,
+                                 const std::vector<double>& abs_length,
+                                 const Bounds<int>& b, double nrecalc) const
+    {
+        // This is the same as the loop in accumulate (cf. the comments there), except that
+        // it stops after adding nrecalc electrons, it uses the tile's own random numbers and
+        // scratch polygon, and it adds the charge to the tile's delta image.  The pixel
+        // shapes in _imagepolys are only read here, so this is safe to run in parallel.
+        Polygon testpoly = _emptypoly;
+        const double invPixelSize = 1./_pixelSize; // pixels/micron
+        const double diffStep_pixel_z = _diffStep / (_sensorThickness * _pixelSize);
+
+        tile.addedFlux = 0.;
+        for (; tile.begin != tile.end && tile.addedFlux <= nrecalc; ++tile.begin) {
+            const int i = *tile.begin;
+            double x0 = photons.getX(i);
+            double y0 = photons.getY(i);
+            double dz = calculateConversionDepth(photons, i,
+                                                 abs_length.empty() ? 0. : abs_length[i],
+                                                 tile.ud);
+            if (photons.hasAllocatedAngles()) {
+                double dz_pixel = dz * invPixelSize;
+                x0 += photons.getDXDZ(i) * dz_pixel;
+                y0 += photons.getDYDZ(i) * dz_pixel;
+            }
+            double zconv = _sensorThickness - dz;
+            if (zconv < 0.0) continue;
+            if (_diffStep != 0.) {
+                double diffStep = std::max(
+                    0.0, diffStep_pixel_z * std::sqrt(zconv * _sensorThickness));
+                x0 += diffStep * tile.gd();
+                y0 += diffStep * tile.gd();
+            }
+
+            int ix = int(floor(x0 + 0.5));
+            int iy = int(floor(y0 + 0.5));
+            double x = x0 - ix + 0.5;
+            double y = y0 - iy + 0.5;
+
+            bool off_edge;
+            bool foundPixel = insidePixel(ix, iy, x, y, zconv, b, _imagepolys, testpoly,
+                                          &off_edge);
+            if (!foundPixel && off_edge) continue;
+            int step;
+            if (!foundPixel)
+                foundPixel = searchNeighbors(*this, ix, iy, x, y, zconv, b, _imagepolys,
+                                             testpoly, step);
+            if (!foundPixel) {
+                int n = (tile.ud() > 0.5) ? 0 : step;
+                ix = ix + xoff[n];
+                iy = iy + yoff[n];
+            }
+
+            if (b.includes(ix,iy)) {
+                double flux = photons.getFlux(i);
+                if (tile.bounds.includes(ix,iy))
+                    tile.delta(ix,iy) += flux;
+                else
+                    tile.overflow.push_back(Tile::Overflow(ix, iy, flux));
+                tile.addedFlux += flux;
+            }
+        }
+    }
+
+    template <typename T>
+    double Silicon::accumulateTiles(const PhotonArray& photons, BaseDeviate rng,
+                                    ImageView<T> target, Position<int> orig_center, bool resume,
+                                    int tile_size, int nthreads)
+    {
+        UniformDeviate ud(rng);
+        Bounds<int> b = target.getBounds();
+        dbg<<"In Silicon::accumulateTiles\n";
+        dbg<<"bounds = "<<b<<", tile_size = "<<tile_size<<", nthreads = "<<nthreads<<std::endl;
+        if (tile_size <= 0)
+            throw std::runtime_error("Silicon::accumulateTiles requires tile_size > 0");
+
+        initialize(target, orig_center, resume);
+
+        // If resuming, first bring the pixel shapes up to date with the charge from the
+        // previous call.
+        if (resume) flushDelta(target);
+
+        // Set up the tiles.  Each tile has a small halo of pixels around it to hold the
+        // charge from photons that land just outside the tile.
+        const int xmin = b.getXMin();
+        const int ymin = b.getYMin();
+        const int nx = b.getXMax() - xmin + 1;
+        const int ny = b.getYMax() - ymin + 1;
+        const int ntx = (nx-1) / tile_size + 1;
+        const int nty = (ny-1) / tile_size + 1;
+        const int ntiles = ntx * nty;
+        const int halo = 2;
+        std::vector<Tile> tiles;
+        tiles.reserve(ntiles);
+        for (int k=0; k<ntiles; ++k) {
+            int x1 = xmin + (k / nty) * tile_size;
+            int y1 = ymin + (k % nty) * tile_size;
+            Bounds<int> core = Bounds<int>(x1, x1 + tile_size - 1, y1, y1 + tile_size - 1) & b;
+            Bounds<int> bounds = core;
+            bounds.addBorder(halo);
+            // Draw the seeds for all the tiles here, so the results don't depend on the
+            // number of threads.  (0 would mean to seed from the system.)
+            long seed = long(ud() * 2147483646.) + 1;
+            tiles.emplace_back(core, bounds & b, seed);
+        }
+
+        // Sort the photons by the tile of the pixel where they strike the silicon.  (Photons
+        // off the edge of the image go to the nearest tile.)
+        const int nphotons = photons.size();
+        std::vector<int> tile_index(nphotons);
+        std::vector<int> count(ntiles+1, 0);
+        for (int i=0; i<nphotons; ++i) {
+            int ix = int(floor(photons.getX(i) + 0.5)) - xmin;
+            int iy = int(floor(photons.getY(i) + 0.5)) - ymin;
+            ix = std::min(std::max(ix, 0), nx-1);
+            iy = std::min(std::max(iy, 0), ny-1);
+            tile_index[i] = (ix / tile_size) * nty + (iy / tile_size);
+            ++count[tile_index[i]+1];
+        }
+        for (int k=0; k<ntiles; ++k) count[k+1] += count[k];
+        std::vector<int> order(nphotons);
+        for (int i=0; i<nphotons; ++i) order[count[tile_index[i]]++] = i;
+        for (int k=0; k<ntiles; ++k) {
+            tiles[k].begin = order.data() + (k == 0 ? 0 : count[k-1]);
+            tiles[k].end = order.data() + count[k];
+            if (tiles[k].begin != tiles[k].end) {
+                tiles[k].delta.resize(tiles[k].bounds);
+                tiles[k].delta.setZero();
+            }
+        }
+
+        // The absorption length lookups aren't thread safe, so do them all now.
+        std::vector<double> abs_length;
+        if (photons.hasAllocatedWavelengths()) {
+            abs_length.resize(nphotons);
+            for (int i=0; i<nphotons; ++i)
+                abs_length[i] = _abs_length_table.lookup(photons.getWavelength(i));
+        }
+
+        // The operations done in parallel on each tile.
+        struct AccumulateOp
+        {
+            AccumulateOp(const Silicon& silicon, std::vector<Tile>& tiles,
+                         const std::vector<int>& active, const PhotonArray& photons,
+                         const std::vector<double>& abs_length, const Bounds<int>& b,
+                         double nrecalc) :
+                _silicon(silicon), _tiles(tiles), _active(active), _photons(photons),
+                _abs_length(abs_length), _b(b), _nrecalc(nrecalc) {}
+
+            void operator()(int k) const
+            {
+                _silicon.accumulateTile(_tiles[_active[k]], _photons, _abs_length, _b,
+                                        _nrecalc);
+            }
+
+            const Silicon& _silicon;
+            std::vector<Tile>& _tiles;
+            const std::vector<int>& _active;
+            const PhotonArray& _photons;
+            const std::vector<double>& _abs_length;
+            const Bounds<int>& _b;
+            double _nrecalc;
+        };
+
+        struct UpdateOp
+        {
+            UpdateOp(Silicon& silicon, std::vector<Tile>& tiles, const std::vector<int>& update) :
+                _silicon(silicon), _tiles(tiles), _update(update) {}
+
+            void operator()(int k) const
+            {
+                const Bounds<int>& core = _tiles[_update[k]].core;
+                Bounds<int> source = core;
+                source.addBorder(_silicon._qDist);
+                _silicon.updatePixelDistortions(_silicon._delta.view(),
+                                                source & _silicon._dirty.getBounds(), core);
+            }
+
+            Silicon& _silicon;
+            std::vector<Tile>& _tiles;
+            const std::vector<int>& _update;
+        };
+
+        // Marks the tiles that overlap a given region (extended by _qDist) to be updated.
+        struct MarkTiles
+        {
+            MarkTiles(std::vector<Tile>& tiles, const Bounds<int>& b, int tile_size, int nty,
+                      int qDist) :
+                _tiles(tiles), _b(b), _tile_size(tile_size), _nty(nty), _qDist(qDist) {}
+
+            void operator()(Bounds<int> r) const
+            {
+                r.addBorder(_qDist);
+                r = r & _b;
+                if (!r.isDefined()) return;
+                const int tx1 = (r.getXMin() - _b.getXMin()) / _tile_size;
+                const int tx2 = (r.getXMax() - _b.getXMin()) / _tile_size;
+                const int ty1 = (r.getYMin() - _b.getYMin()) / _tile_size;
+                const int ty2 = (r.getYMax() - _b.getYMin()) / _tile_size;
+                for (int tx=tx1; tx<=tx2; ++tx)
+                    for (int ty=ty1; ty<=ty2; ++ty)
+                        _tiles[tx * _nty + ty].update = true;
+            }
+
+            std::vector<Tile>& _tiles;
+            const Bounds<int>& _b;
+            int _tile_size, _nty, _qDist;
+        };
+        MarkTiles mark(tiles, b, tile_size, nty, _qDist);
+
+        // Accumulate the photons in rounds.  In each round, the active tiles add about _nrecalc
+        // electrons in total (i.e. _nrecalc / nactive each, but at least one photon) in
+        // parallel, using the pixel shapes from the start of the round.  Then the charge from
+        // all the tiles is added to _delta, and the pixel shapes are updated (also in parallel,
+        // one tile at a time) before the next round.  So the pixel shapes are updated about as
+        // often as in accumulate, regardless of the number of tiles.
+        double addedFlux = 0.;
+
+        std::vector<int> active;  // The tiles with photons left to accumulate.
+        std::vector<int> last;    // The tiles that were active in the previous round.
+        std::vector<int> update;  // The tiles whose pixel shapes need to be updated.
+        for (int round=0;; ++round) {
+            last.swap(active);
+            active.clear();
+            for (int k=0; k<ntiles; ++k)
+                if (tiles[k].begin != tiles[k].end) active.push_back(k);
+            if (active.empty()) break;
+            dbg<<"Round "<<round<<": "<<active.size()<<" active tiles\n";
+            if (!last.empty()) {
+                // Update the pixel shapes for the charge added in the previous round.  Charge
+                // can affect pixels up to _qDist away, so update any tile that is that close
+                // to where the charge was added.
+                for (int k=0; k<ntiles; ++k) tiles[k].update = false;
+                for (size_t m=0; m<last.size(); ++m) {
+                    const Tile& tile = tiles[last[m]];
+                    mark(tile.bounds);
+                    for (size_t m2=0; m2<tile.overflow.size(); ++m2)
+                        mark(Bounds<int>(tile.overflow[m2].ix, tile.overflow[m2].ix,
+                                         tile.overflow[m2].iy, tile.overflow[m2].iy));
+                }
+                update.clear();
+                for (int k=0; k<ntiles; ++k)
+                    if (tiles[k].update) update.push_back(k);
+                runThreads(UpdateOp(*this, tiles, update), update.size(), nthreads);
+
+                // Then clear _delta for the next round.
+                for (int m=0; m<_dirty.getNBlocks(); ++m)
+                    _delta.subImage(_dirty.getBlock(m)).setZero();
+                _dirty.clear();
+                for (size_t m=0; m<last.size(); ++m) tiles[last[m]].overflow.clear();
+            }
+
+            runThreads(AccumulateOp(*this, tiles, active, photons, abs_length, b,
+                                    _nrecalc / active.size()),
+                       active.size(), nthreads);
+
+            // Add the charge from each tile (in order, so the sums don't depend on the number
+            // of threads) to both the target image and _delta.
+            for (size_t m=0; m<active.size(); ++m) {
+                Tile& tile = tiles[active[m]];
+                _delta.subImage(tile.bounds) += tile.delta;
+                target.subImage(tile.bounds) += tile.delta;
+                _dirty.add(tile.bounds);
+                tile.delta.setZero();
+                for (size_t m2=0; m2<tile.overflow.size(); ++m2) {
+                    const Tile::Overflow& o = tile.overflow[m2];
+                    _delta(o.ix, o.iy) += o.flux;
+                    target(o.ix, o.iy) += o.flux;
+                    _dirty.add(o.ix, o.iy);
+                }
+                addedFlux += tile.addedFlux;
+            }
+        }
+        // As in accumulate, the charge from the last round is left in _delta without updating
+        // the pixel shapes, in case we resume.
+        _resume_next_recalc = 0.;
+        dbg<<"All done.  Added flux "<<addedFlux<<std::endl;
+        return addedFlux;
+    }
+
     template bool Silicon::insidePixel(int ix, int iy, double x, double y, double zconv,
                                        ImageView<double> target, bool*) const;
     template bool Silicon::insidePixel(int ix, int iy, double x, double y, double zconv,
@@ -689,6 +1182,12 @@ namespace galsim {
 
     template void Silicon::updatePixelDistortions(ImageView<double> target);
     template void Silicon::updatePixelDistortions(ImageView<float> target);
+    template void Silicon::updatePixelDistortions(ImageView<double> target,
+                                                  const Bounds<int>& source,
+                                                  const Bounds<int>& region);
+    template void Silicon::updatePixelDistortions(ImageView<float> target,
+                                                  const Bounds<int>& source,
+                                                  const Bounds<int>& region);
 
     template void Silicon::addTreeRingDistortions(ImageView<double> target,
                                                   Position<int> orig_center);
@@ -702,6 +1201,13 @@ namespace galsim {
                                         ImageView<float> target, Position<int> orig_center,
                                         bool resume);
 
+    template double Silicon::accumulateTiles(const PhotonArray& photons, BaseDeviate rng,
+                                             ImageView<double> target, Position<int> orig_center,
+                                             bool resume, int tile_size, int nthreads);
+    template double Silicon::accumulateTiles(const PhotonArray& photons, BaseDeviate rng,
+                                             ImageView<float> target, Position<int> orig_center,
+                                             bool resume, int tile_size, int nthreads);
+
     template void Silicon::fillWithPixelAreas(ImageView<double> target, Position<int> orig_center);
     template void Silicon::fillWithPixelAreas(ImageView<float> target, Position<int> orig_center);
 
@@ -23,6 +23,7 @@
 #include <vector>
 #include <iostream>
 #include <deque>
+#include <atomic>
 
 #ifdef USE_TMV
 #include "TMV.h"
@@ -43,6 +44,7 @@ namespace galsim {
     {
     public:
         ArgVec(const double* args, int n);
+        ArgVec(const ArgVec& rhs);
 
         int upperIndex(double a) const;
         void upperIndexMany(const double* a, int* idx, int N) const;
@@ -62,7 +64,10 @@ namespace galsim {
         double _lower_slop, _upper_slop;
         bool _equalSpaced;
         double _da;
-        mutable int _lastIndex;
+        // The index found by the last call to upperIndex, which is a good place to start the
+        // next search.  Tables may be used from several threads at once, so this is only a
+        // hint: each call reads it once and works with its own copy.
+        mutable std::atomic<int> _lastIndex;
     };
 
     ArgVec::ArgVec(const double* vec, int n): _vec(vec), _n(n)
@@ -74,11 +79,16 @@ namespace galsim {
         for (int i=1; i<_n; i++) {
             if (std::abs((_vec[i] - _vec[0])/_da - i) > tolerance) _equalSpaced = false;
         }
-        _lastIndex = 1;
+        _lastIndex.store(1, std::memory_order_relaxed);
         _lower_slop = (_vec[1]-_vec[0]) * 1.e-6;
         _upper_slop = (_vec[_n-1]-_vec[_n-2]) * 1.e-6;
     }
 
+    ArgVec::ArgVec(const ArgVec& rhs) :
+        _vec(rhs._vec), _n(rhs._n), _lower_slop(rhs._lower_slop), _upper_slop(rhs._upper_slop),
+        _equalSpaced(rhs._equalSpaced), _da(rhs._da),
+        _lastIndex(rhs._lastIndex.load(std::memory_order_relaxed)) {}
+
     // Look up an index.  Use STL binary search.
     int ArgVec::upperIndex(double a) const
     {
@@ -97,46 +107,47 @@ namespace galsim {
             return i;
         } else {
             xdbg<<"Not equal spaced\n";
-            xdbg<<"lastIndex = "<<_lastIndex<<"  "<<_vec[_lastIndex-1]<<" "<<_vec[_lastIndex]<<std::endl;
-            xassert(_lastIndex >= 1);
-            xassert(_lastIndex < _n);
+            int idx = _lastIndex.load(std::memory_order_relaxed);
+            xdbg<<"lastIndex = "<<idx<<"  "<<_vec[idx-1]<<" "<<_vec[idx]<<std::endl;
+            xassert(idx >= 1);
+            xassert(idx < _n);
 
-            if ( a < _vec[_lastIndex-1] ) {
+            if ( a < _vec[idx-1] ) {
                 xdbg<<"Go lower\n";
-                xassert(_lastIndex-2 >= 0);
+                xassert(idx-2 >= 0);
                 // Check to see if the previous one is it.
-                if (a >= _vec[_lastIndex-2]) {
-                    xdbg<<"Previous works: "<<_vec[_lastIndex-2]<<std::endl;
-                    return --_lastIndex;
+                if (a >= _vec[idx-2]) {
+                    xdbg<<"Previous works: "<<_vec[idx-2]<<std::endl;
+                    --idx;
                 } else {
-                    // Look for the entry from 0.._lastIndex-1:
-                    const double* p = std::upper_bound(begin(), begin()+_lastIndex-1, a);
+                    // Look for the entry from 0..idx-1:
+                    const double* p = std::upper_bound(begin(), begin()+idx-1, a);
                     xassert(p != begin());
-                    xassert(p != begin()+_lastIndex-1);
-                    _lastIndex = p-begin();
-                    xdbg<<"Success: "<<_lastIndex<<"  "<<_vec[_lastIndex]<<std::endl;
-                    return _lastIndex;
+                    xassert(p != begin()+idx-1);
+                    idx = p-begin();
+                    xdbg<<"Success: "<<idx<<"  "<<_vec[idx]<<std::endl;
                 }
-            } else if (a > _vec[_lastIndex]) {
-                xassert(_lastIndex+1 < _n);
+            } else if (a > _vec[idx]) {
+                xassert(idx+1 < _n);
                 // Check to see if the next one is it.
-                if (a <= _vec[_lastIndex+1]) {
-                    xdbg<<"Next works: "<<_vec[_lastIndex+1]<<std::endl;
-                    return ++_lastIndex;
+                if (a <= _vec[idx+1]) {
+                    xdbg<<"Next works: "<<_vec[idx+1]<<std::endl;
+                    ++idx;
                 } else {
-                    // Look for the entry from _lastIndex..end
-                    const double* p = std::lower_bound(begin()+_lastIndex+1, end(), a);
-                    xassert(p != begin()+_lastIndex+1);
+                    // Look for the entry from idx..end
+                    const double* p = std::lower_bound(begin()+idx+1, end(), a);
+                    xassert(p != begin()+idx+1);
                     xassert(p != end());
-                    _lastIndex = p-begin();
-                    xdbg<<"Success: "<<_lastIndex<<"  "<<_vec[_lastIndex]<<std::endl;
-                    return _lastIndex;
+                    idx = p-begin();
+                    xdbg<<"Success: "<<idx<<"  "<<_vec[idx]<<std::endl;
                 }
             } else {
                 xdbg<<"lastindex is still good.\n";
-                // Then _lastIndex is correct.
-                return _lastIndex;
+                // Then idx is correct.
+                return idx;
             }
+            _lastIndex.store(idx, std::memory_order_relaxed);
+            return idx;
         }
     }
 
@@ -0,0 +1,223 @@
+/* -*- c++ -*-
+ * Copyright (c) 2012-2018 by the GalSim developers team on GitHub
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ * https://github.com/GalSim-developers/GalSim
+ *
+ * GalSim is free software: redistribution and use in source and binary forms,
+ * with or without modification, are permitted provided that the following
+ * conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice, this
+ *    list of conditions, and the disclaimer given in the accompanying LICENSE
+ *    file.
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions, and the disclaimer given in the documentation
+ *    and/or other materials provided with the distribution.
+ */
+
+//#define DEBUGLOGGING
+
+#include <cassert>
+#include <cstdio>
+#include <cstring>
+#include <fstream>
+#include <iomanip>
+#include <mutex>
+#include <sstream>
+#include <thread>
+#include <unistd.h>
+#include "TableCache.h"
+#include "Std.h"
+
+namespace galsim {
+
+    static std::mutex table_cache_mutex;
+    static std::string table_cache_dir;
+
+    void SetTableCacheDir(const std::string& dir)
+    {
+        std::lock_guard<std::mutex> lock(table_cache_mutex);
+        table_cache_dir = dir;
+    }
+
+    std::string GetTableCacheDir()
+    {
+        std::lock_guard<std::mutex> lock(table_cache_mutex);
+        return table_cache_dir;
+    }
+
+    // Change this if the format of the files changes, or the way any of the tables are built.
+    static const char table_cache_magic[8] = { 'G','S','T','C','A','C','H','2' };
+
+    // The files are written in the native binary format, so record the byte order and the
+    // sizes of the types we write, and don't read files written on a different platform.
+    static const unsigned int table_cache_byte_order = 0x01020304;
+    static const unsigned char table_cache_sizes[2] = {
+        static_cast<unsigned char>(sizeof(double)),
+        static_cast<unsigned char>(sizeof(unsigned long long)) };
+
+    // Guard against trying to allocate something silly if a file is corrupt.
+    static const unsigned long long max_table_cache_size = 100000000;
+
+    // The FNV-1a hash, which (unlike std::hash) is the same on every platform and in every run.
+    static unsigned long long HashKey(const std::string& key)
+    {
+        unsigned long long h = 14695981039346656037ULL;
+        for (size_t i=0; i<key.size(); ++i) {
+            h ^= static_cast<unsigned char>(key[i]);
+            h *= 1099511628211ULL;
+        }
+        return h;
+    }
+
+    template <typename T>
+    static void WriteItem(std::ostream& os, const T& x)
+    { os.write(reinterpret_cast<const char*>(&x), sizeof(T)); }
+
+    template <typename T>
+    static bool ReadItem(std::istream& is, T& x)
+    { return bool(is.read(reinterpret_cast<char*>(&x), sizeof(T))); }
+
+    static void WriteVector(std::ostream& os, const std::vector<double>& v)
+    {
+        unsigned long long n = v.size();
+        WriteItem(os, n);
+        if (n > 0) os.write(reinterpret_cast<const char*>(&v[0]), n*sizeof(double));
+    }
+
+    static bool ReadVector(std::istream& is, std::vector<double>& v)
+    {
+        unsigned long long n;
+        if (!ReadItem(is, n) || n > max_table_cache_size) return false;
+        v.resize(n);
+        if (n > 0) is.read(reinterpret_cast<char*>(&v[0]), n*sizeof(double));
+        return bool(is);
+    }
+
+    std::string MakeTableCacheKey(const std::vector<double>& params, const GSParams& gsparams)
+    {
+        std::ostringstream oss;
+        oss << std::setprecision(17);
+        for (size_t i=0; i<params.size(); ++i) oss << params[i] << ",";
+        oss << "  " << gsparams;
+        return oss.str();
+    }
+
+    TableCacheEntry::TableCacheEntry(const std::string& name, const std::string& key) :
+        _name(name), _key(key), _ivalue(0), _itable(0)
+    {}
+
+    std::string TableCacheEntry::fileName() const
+    {
+        std::string dir = GetTableCacheDir();
+        if (dir.empty()) return dir;
+        std::ostringstream oss;
+        oss << dir << "/" << _name << "_";
+        oss << std::hex << std::setw(16) << std::setfill('0') << HashKey(_key) << ".dat";
+        return oss.str();
+    }
+
+    bool TableCacheEntry::load(int nvalues, int ntables)
+    {
+        std::string file_name = fileName();
+        if (file_name.empty()) return false;
+        std::ifstream fin(file_name.c_str(), std::ios::binary);
+        if (!fin) return false;
+        dbg<<"Reading "<<_name<<" tables from "<<file_name<<std::endl;
+
+        char magic[sizeof(table_cache_magic)];
+        if (!fin.read(magic, sizeof(magic))) return false;
+        if (std::memcmp(magic, table_cache_magic, sizeof(magic)) != 0) return false;
+        unsigned int byte_order;
+        if (!ReadItem(fin, byte_order) || byte_order != table_cache_byte_order) {
+            dbg<<"Wrong byte order in "<<file_name<<std::endl;
+            return false;
+        }
+        unsigned char sizes[sizeof(table_cache_sizes)];
+        if (!fin.read(reinterpret_cast<char*>(sizes), sizeof(sizes)) ||
+            std::memcmp(sizes, table_cache_sizes, sizeof(sizes)) != 0) {
+            dbg<<"Wrong type sizes in "<<file_name<<std::endl;
+            return false;
+        }
+
+        // The file name is just a hash of the key, so check that the key really matches.
+        unsigned long long nkey;
+        if (!ReadItem(fin, nkey) || nkey != _key.size()) return false;
+        std::string key(nkey, ' ');
+        if (!fin.read(&key[0], nkey) || key != _key) return false;
+
+        std::vector<double> values;
+        if (!ReadVector(fin, values) || int(values.size()) != nvalues) return false;
+        unsigned long long n;
+        if (!ReadItem(fin, n) || n != 2*(unsigned long long)(ntables)) return false;
+        std::vector<std::vector<double> > tables(n);
+        for (size_t i=0; i<n; ++i) {
+            if (!ReadVector(fin, tables[i])) return false;
+            if (i % 2 == 1 && tables[i].size() != tables[i-1].size()) return false;
+        }
+
+        _values.swap(values);
+        _tables.swap(tables);
+        _ivalue = _itable = 0;
+        return true;
+    }
+
+    void TableCacheEntry::save() const
+    {
+        std::string file_name = fileName();
+        if (file_name.empty()) return;
+        dbg<<"Writing "<<_name<<" tables to "<<file_name<<std::endl;
+
+        // Write to a temporary file first, so another process never reads a partial file.
+        std::ostringstream oss;
+        oss << file_name << ".tmp" << getpid() << "_" << std::this_thread::get_id();
+        std::string tmp_name = oss.str();
+        {
+            std::ofstream fout(tmp_name.c_str(), std::ios::binary);
+            // This is just an optimization, so don't complain if we can't write it.
+            if (!fout) return;
+            fout.write(table_cache_magic, sizeof(table_cache_magic));
+            WriteItem(fout, table_cache_byte_order);
+            fout.write(reinterpret_cast<const char*>(table_cache_sizes),
+                       sizeof(table_cache_sizes));
+            unsigned long long nkey = _key.size();
+            WriteItem(fout, nkey);
+            fout.write(_key.data(), nkey);
+            WriteVector(fout, _values);
+            unsigned long long n = _tables.size();
+            WriteItem(fout, n);
+            for (size_t i=0; i<_tables.size(); ++i) WriteVector(fout, _tables[i]);
+            fout.close();
+            if (!fout) {
+                std::remove(tmp_name.c_str());
+                return;
+            }
+        }
+        if (std::rename(tmp_name.c_str(), file_name.c_str()) != 0)
+            std::remove(tmp_name.c_str());
+    }
+
+    void TableCacheEntry::addTable(const TableBuilder& table)
+    {
+        _tables.push_back(table.getArgs());
+        _tables.push_back(table.getVals());
+    }
+
+    double TableCacheEntry::getValue()
+    {
+        assert(_ivalue < _values.size());
+        return _values[_ivalue++];
+    }
+
+    void TableCacheEntry::getTable(TableBuilder& table)
+    {
+        assert(_itable+1 < _tables.size());
+        const std::vector<double>& args = _tables[_itable++];
+        const std::vector<double>& vals = _tables[_itable++];
+        for (size_t i=0; i<args.size(); ++i) table.addEntry(args[i], vals[i]);
+        table.finalize();
+    }
+
+}
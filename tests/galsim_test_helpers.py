@@ -143,6 +143,13 @@ def check_basic_x(prof, name, approx_maxsb=False, scale=None):
         assert prof._xValue.__doc__ == galsim.GSObject._xValue.__doc__
         assert prof.__class__._xValue.__doc__ == galsim.GSObject._xValue.__doc__
 
+    # xValueArray should match the image at all the pixels.
+    x, y = np.meshgrid(np.arange(image.xmin, image.xmax+1), np.arange(image.ymin, image.ymax+1))
+    np.testing.assert_allclose(
+            prof.xValueArray(x*dx, y*dx), image.array, rtol=1.e-5, atol=1.e-6*prof.max_sb,
+            err_msg="%s profile sb image does not match xValueArray"%name)
+    assert prof._xValueArray.__doc__ == galsim.GSObject._xValueArray.__doc__
+
     # Direct call to drawReal should also work and be equivalent to the above with scale = 1.
     prof.drawImage(image, method='sb', scale=1., use_true_center=False)
     image2 = image.copy()
@@ -196,6 +203,14 @@ def check_basic_k(prof, name):
         assert prof._kValue.__doc__ == galsim.GSObject._kValue.__doc__
         assert prof.__class__._kValue.__doc__ == galsim.GSObject._kValue.__doc__
 
+    # kValueArray should match the kimage at all the pixels.
+    kx, ky = np.meshgrid(np.arange(kimage.xmin, kimage.xmax+1),
+                         np.arange(kimage.ymin, kimage.ymax+1))
+    np.testing.assert_allclose(
+            prof.kValueArray(kx*dk, ky*dk), kimage.array, rtol=1.e-5, atol=1.e-6*abs(prof.flux),
+            err_msg="%s profile kimage does not match kValueArray"%name)
+    assert prof._kValueArray.__doc__ == galsim.GSObject._kValueArray.__doc__
+
     # If supposed to be axisymmetric, make sure it is in the kValues.
     if prof.is_axisymmetric:
         for r in [0.2, 1.3, 33.4]:
@@ -1551,6 +1551,46 @@ def test_repeat():
     assert "repeat = 3, index = 5, use current object" in cl.output
 
 
+@timer
+def test_build_cache():
+    """Test that the build function and parameter checks are only worked out once per object.
+    """
+    config = {
+        'gal' : {
+            'type' : 'Exponential',
+            'half_light_radius' : 1.7,
+            'flux' : '$(obj_num + 1) * 100',
+            'shear' : { 'type' : 'G1G2', 'g1' : 0.1, 'g2' : -0.2 },
+        }
+    }
+    for obj_num in range(3):
+        config['obj_num'] = obj_num
+        gal1a = galsim.config.BuildGSObject(config, 'gal')[0]
+        gal1b = galsim.Exponential(half_light_radius=1.7, flux=100*(obj_num+1)).shear(
+                g1=0.1, g2=-0.2)
+        gsobject_compare(gal1a, gal1b)
+    build = config['gal']['_build']
+    assert build[1] is galsim.Exponential
+    assert config['gal']['_get_items'][1] == [ ('flux', float), ('half_light_radius', float) ]
+    assert config['gal']['shear']['_get_items'][1] == [ ('g1', float), ('g2', float) ]
+
+    # The cached values are reused for the next object.
+    config['obj_num'] = 3
+    galsim.config.BuildGSObject(config, 'gal')
+    assert config['gal']['_build'] is build
+
+    # If the type changes, they are recalculated.
+    config['gal']['type'] = 'Gaussian'
+    config['gal']['sigma'] = config['gal'].pop('half_light_radius')
+    del config['gal']['_get']
+    config['obj_num'] = 4
+    gal2a = galsim.config.BuildGSObject(config, 'gal')[0]
+    gal2b = galsim.Gaussian(sigma=1.7, flux=500).shear(g1=0.1, g2=-0.2)
+    gsobject_compare(gal2a, gal2b)
+    assert config['gal']['_build'][1] is galsim.Gaussian
+    assert config['gal']['_get_items'][1] == [ ('flux', float), ('sigma', float) ]
+
+
 @timer
 def test_usertype():
     """Test a user-defined type
@@ -1629,3 +1669,4 @@ if __name__ == "__main__":
     test_list()
     test_repeat()
     test_usertype()
+    test_build_cache()
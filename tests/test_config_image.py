@@ -1013,6 +1013,20 @@ def test_scattered_whiten():
     assert "skip drawing object because its image will be entirely off the main image." in cl.output
     im2 = galsim.config.BuildImage(config)
 
+    # The noise is flattened the same way when the stamps are added to the image as they are built.
+    config = galsim.config.CleanConfig(config)
+    config['image']['stream_stamps'] = True
+    im4 = galsim.config.BuildImage(config)
+    np.testing.assert_almost_equal(im4.array, im1.array)
+
+    # And when the image is drawn in tiles.
+    config = galsim.config.CleanConfig(config)
+    del config['image']['stream_stamps']
+    config['image']['tile_size'] = 40
+    config['image']['nproc'] = 2
+    im5 = galsim.config.BuildImage(config)
+    np.testing.assert_almost_equal(im5.array, im1.array)
+
 
 @timer
 def test_tiled():
@@ -2129,6 +2143,399 @@ def test_blend():
         galsim.config.BuildStamp(config, obj_num=8)
 
 
+@timer
+def test_shared_memory():
+    """Test using shared memory to send the results of multiple processes back to the main one.
+    """
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        print('Skipping test_shared_memory, since multiprocessing.shared_memory not available.')
+        return
+
+    config = {
+        'image' : {
+            'type' : 'Scattered',
+            'size' : 64,
+            'pixel_scale' : 0.3,
+            'nobjects' : 8,
+            'random_seed' : 1234,
+            'noise' : { 'type': 'Gaussian', 'sigma': 0.5 }
+        },
+        'gal' : {
+            'type' : 'Exponential',
+            'half_light_radius' : { 'type': 'Random', 'min': 0.5, 'max': 1.5 },
+            'flux' : { 'type': 'Random', 'min': 100, 'max': 1000 },
+        },
+    }
+
+    # First build everything in a single process.
+    config1 = galsim.config.CopyConfig(config)
+    im1 = galsim.config.BuildImage(config1)
+    stamps1 = galsim.config.BuildStamps(8, config1, do_noise=False)[0]
+    images1 = galsim.config.BuildImages(3, config1)
+
+    # Now the same thing using 2 processes with the images sent back through shared memory.
+    config2 = galsim.config.CopyConfig(config)
+    config2['image']['nproc'] = 2
+    config2['image']['shared_memory'] = True
+    im2 = galsim.config.BuildImage(config2)
+    np.testing.assert_array_equal(im2.array, im1.array)
+    assert im2.bounds == im1.bounds
+    assert im2.wcs == im1.wcs
+
+    stamps2 = galsim.config.BuildStamps(8, config2, do_noise=False)[0]
+    for s1, s2 in zip(stamps1, stamps2):
+        np.testing.assert_array_equal(s2.array, s1.array)
+        assert s2.bounds == s1.bounds
+        assert s2.dtype == s1.dtype
+
+    images2 = galsim.config.BuildImages(3, config2)
+    for i1, i2 in zip(images1, images2):
+        np.testing.assert_array_equal(i2.array, i1.array)
+
+    # shared_memory = False is equivalent to not setting it.
+    config2['image']['shared_memory'] = False
+    images3 = galsim.config.BuildImages(3, config2)
+    for i1, i3 in zip(images1, images3):
+        np.testing.assert_array_equal(i3.array, i1.array)
+
+
+@timer
+def test_sort_by_cost():
+    """Test building stamps in order of their estimated cost.
+    """
+    config = {
+        'image' : {
+            'type' : 'Scattered',
+            'size' : 64,
+            'pixel_scale' : 0.3,
+            'nobjects' : 10,
+            'random_seed' : 1234,
+            'noise' : { 'type': 'Gaussian', 'sigma': 0.5 }
+        },
+        'stamp' : {
+            'draw_method' : { 'type': 'List', 'items': [ 'fft', 'phot' ] },
+        },
+        'gal' : {
+            'type' : 'Exponential',
+            'half_light_radius' : { 'type': 'Random', 'min': 0.5, 'max': 1.5 },
+            'flux' : { 'type': 'Random', 'min': 100, 'max': 1000 },
+        },
+    }
+
+    config1 = galsim.config.CopyConfig(config)
+    im1 = galsim.config.BuildImage(config1)
+    stamps1 = galsim.config.BuildStamps(10, config1, do_noise=False)[0]
+
+    # The order in which the stamps are built doesn't change the results.
+    config2 = galsim.config.CopyConfig(config)
+    config2['image']['nproc'] = 2
+    config2['image']['sort_by_cost'] = True
+    with CaptureLog() as cl:
+        im2 = galsim.config.BuildImage(config2, logger=cl.logger)
+    # The first time, the phot and fft costs can't be compared, so the stamps are built in order.
+    assert 'Estimated costs' not in cl.output
+    assert 'have not been timed yet' in cl.output
+    np.testing.assert_array_equal(im2.array, im1.array)
+    # The measured times are recorded to calibrate later estimates.
+    assert sorted(config2['_stamp_cost_scale'].keys()) == ['fft', 'phot']
+    with CaptureLog() as cl:
+        stamps2 = galsim.config.BuildStamps(10, config2, do_noise=False, logger=cl.logger)[0]
+    assert 'Estimated costs for 10 stamps' in cl.output
+    for s1, s2 in zip(stamps1, stamps2):
+        np.testing.assert_array_equal(s2.array, s1.array)
+
+    # If too many profiles would need to be built to estimate the costs, they aren't sorted.
+    max_cost_builds = galsim.config.stamp.max_cost_builds
+    try:
+        galsim.config.stamp.max_cost_builds = 3
+        with CaptureLog() as cl:
+            stamps2 = galsim.config.BuildStamps(10, config2, do_noise=False, logger=cl.logger)[0]
+        assert 'would need to build their profile' in cl.output
+        for s1, s2 in zip(stamps1, stamps2):
+            np.testing.assert_array_equal(s2.array, s1.array)
+    finally:
+        galsim.config.stamp.max_cost_builds = max_cost_builds
+
+    # The costs may also be given explicitly.
+    config3 = galsim.config.CopyConfig(config2)
+    config3['stamp']['cost'] = '$obj_num % 3'
+    im3 = galsim.config.BuildImage(config3)
+    np.testing.assert_array_equal(im3.array, im1.array)
+
+    # Check the scheduling directly.
+    tasks = [ [ ({}, 0) ], [ ({}, 1), ({}, 2) ] ] + [ [ ({}, k) ] for k in range(3,12) ]
+    costs = [ 1., 10., 10. ] + [ 1. ] * 9
+    new_tasks = galsim.config.ScheduleTasks(tasks, costs, 2)
+    # The most expensive task is first.  Ring-like tasks with multiple jobs stay together.
+    # The cheap ones at the end are grouped into progressively smaller chunks.
+    assert [ [k for job, k in task] for task in new_tasks ] == [
+            [1, 2], [0, 3, 4], [5, 6], [7, 8], [9], [10], [11] ]
+
+@timer
+def test_batch_values():
+    """Test generating the values for all the objects in an image at once.
+    """
+    config = {
+        'input' : { 'catalog' : { 'dir' : 'config_input', 'file_name' : 'catalog.txt' } },
+        'image' : {
+            'type' : 'Scattered',
+            'size' : 64,
+            'pixel_scale' : 0.3,
+            'nobjects' : 8,
+            'random_seed' : 1234,
+            'noise' : { 'type': 'Gaussian', 'sigma': 0.5 }
+        },
+        'gal' : {
+            'type' : 'Exponential',
+            'half_light_radius' : { 'type': 'Sequence', 'first': 0.5, 'step': 0.1, 'repeat': 2,
+                                    'nitems': 3 },
+            'flux' : { 'type': 'Catalog', 'col': 11 },
+            'ellip' : { 'type': 'E1E2', 'e1': { 'type': 'Random', 'min': -0.3, 'max': 0.3 },
+                        'e2': { 'type': 'Catalog', 'col': 0 } },
+        },
+    }
+
+    config1 = galsim.config.CopyConfig(config)
+    im1 = galsim.config.BuildImage(config1)
+
+    # The batched values are identical to the ones generated for each object separately.
+    config2 = galsim.config.CopyConfig(config)
+    config2['image']['batch_values'] = True
+    im2 = galsim.config.BuildImage(config2)
+    np.testing.assert_array_equal(im2.array, im1.array)
+    assert '_batch' in config2['gal']['half_light_radius']
+    assert '_batch' in config2['gal']['flux']
+    assert config2['gal']['flux']['_batch'][3] == [23, 15, 82] * 2 + [23, 15]
+    # Random values can't be batched, since each object has its own rng.
+    assert '_batch' not in config2['gal']['ellip']['e1']
+    assert '_batch_obj_range' not in config2
+
+    # Also for later images, which start at a different obj_num.
+    im1 = galsim.config.BuildImage(config1, image_num=1, obj_num=8)
+    im2 = galsim.config.BuildImage(config2, image_num=1, obj_num=8)
+    np.testing.assert_array_equal(im2.array, im1.array)
+
+    # Check the values directly, including some that can't be batched.
+    config3 = {
+        'a' : { 'type': 'Sequence', 'first': 3, 'last': 9, 'step': 2 },
+        'b' : { 'type': 'Sequence', 'first': 1.5, 'step': '$obj_num', 'index_key': 'obj_num' },
+        'c' : { 'type': 'Sequence', 'first': 0.1, 'step': 0.7, 'repeat': 3, 'nitems': 4 },
+        'd' : { 'type': 'Sequence', 'index_key': 'image_num' },
+        'e' : { 'type': 'Sequence', 'first': True },
+    }
+    config4 = galsim.config.CopyConfig(config3)
+    config4['_batch_obj_range'] = (10, 30)
+    for obj_num in range(10, 30):
+        galsim.config.SetupConfigObjNum(config3, obj_num)
+        galsim.config.SetupConfigObjNum(config4, obj_num)
+        for key, value_type in [('a',int), ('b',float), ('c',float), ('d',int), ('e',bool)]:
+            v3 = galsim.config.ParseValue(config3, key, config3, value_type)[0]
+            v4 = galsim.config.ParseValue(config4, key, config4, value_type)[0]
+            assert v3 == v4
+            assert type(v3) == type(v4)
+    assert '_batch' in config4['a']
+    assert '_batch' in config4['c']
+    assert '_batch' not in config4['b']
+    assert '_batch' not in config4['d']
+    assert '_batch' not in config4['e']
+
+@timer
+def test_stream_stamps():
+    """Test adding the stamps to a Scattered image as soon as each one is built.
+    """
+    config = {
+        'image' : {
+            'type' : 'Scattered',
+            'size' : 128,
+            'pixel_scale' : 0.3,
+            'nobjects' : 20,
+            'random_seed' : 1234,
+            'noise' : { 'type': 'Gaussian', 'sigma': 0.5 }
+        },
+        'gal' : {
+            'type' : 'Exponential',
+            'half_light_radius' : { 'type': 'Random', 'min': 0.5, 'max': 1.5 },
+            'flux' : { 'type': 'Random', 'min': 100, 'max': 1000 },
+            'skip' : { 'type': 'RandomBinomial', 'p': 0.2 },
+        },
+        'psf' : { 'type' : 'Gaussian', 'sigma' : 0.5 },
+    }
+
+    config1 = galsim.config.CopyConfig(config)
+    im1 = galsim.config.BuildImage(config1)
+
+    config2 = galsim.config.CopyConfig(config)
+    config2['image']['stream_stamps'] = True
+    im2 = galsim.config.BuildImage(config2)
+    np.testing.assert_array_equal(im2.array, im1.array)
+
+    # With multiple processes, the stamps still get added in the same order, so the sums in
+    # overlapping pixels are the same, even if the stamps finish in a different order.
+    config3 = galsim.config.CopyConfig(config2)
+    config3['image']['nproc'] = 2
+    im3 = galsim.config.BuildImage(config3)
+    np.testing.assert_array_equal(im3.array, im1.array)
+    # The stamps would be built out of order with sort_by_cost, and then most of them would
+    # have to be held until the ones before them were done, so it is ignored.
+    config3['image']['sort_by_cost'] = True
+    config3['stamp'] = { 'cost' : '$obj_num % 7' }
+    with CaptureLog() as cl:
+        im3 = galsim.config.BuildImage(config3, logger=cl.logger)
+    np.testing.assert_array_equal(im3.array, im1.array)
+    assert 'Ignoring image.sort_by_cost' in cl.output
+    assert '_stamp_cost_scale' not in config3
+
+    # The stream_stamps parameter doesn't change the output, so it isn't part of the hash.
+    assert galsim.config.GetConfigHash(config1) == galsim.config.GetConfigHash(config2)
+
+    # BuildStamps doesn't keep the stamps when they are given to stamp_func.
+    built = []
+    def stamp_func(k, stamp, current_var):
+        built.append(k)
+        assert current_var == 0
+    images, current_vars = galsim.config.BuildStamps(10, config1, do_noise=False,
+                                                     stamp_func=stamp_func)
+    assert len(images) == 0
+    assert len(current_vars) == 0
+    assert 0 < len(built) <= 10
+    assert built == sorted(built)
+
+    built2 = []
+    def stamp_func2(k, stamp, current_var):
+        built2.append(k)
+    config4 = galsim.config.CopyConfig(config1)
+    config4['image']['nproc'] = 3
+    config4['image']['sort_by_cost'] = True
+    config4['stamp'] = { 'cost' : '$obj_num % 3' }
+    galsim.config.BuildStamps(10, config4, do_noise=False, stamp_func=stamp_func2)
+    assert built2 == built
+
+
+@timer
+def test_tile_size():
+    """Test drawing a Scattered image in tiles with separate processes.
+    """
+    config = {
+        'image' : {
+            'type' : 'Scattered',
+            'size' : 128,
+            'pixel_scale' : 0.3,
+            'nobjects' : 30,
+            'random_seed' : 1234,
+            'noise' : { 'type': 'Gaussian', 'sigma': 0.5 }
+        },
+        'gal' : {
+            'type' : 'Exponential',
+            'half_light_radius' : { 'type': 'Random', 'min': 0.5, 'max': 1.5 },
+            'flux' : { 'type': 'Random', 'min': 100, 'max': 1000 },
+        },
+        'psf' : { 'type' : 'Gaussian', 'sigma' : 0.5 },
+    }
+
+    config1 = galsim.config.CopyConfig(config)
+    im1 = galsim.config.BuildImage(config1)
+
+    # The objects that straddle the borders of the tiles are drawn in each tile they touch, but
+    # the pixels are added in the same order, so the result is identical.
+    config2 = galsim.config.CopyConfig(config)
+    config2['image']['tile_size'] = 50
+    config2['image']['nproc'] = 2
+    with CaptureLog() as cl:
+        im2 = galsim.config.BuildImage(config2, logger=cl.logger)
+    np.testing.assert_array_equal(im2.array, im1.array)
+    assert 'Tile 8' in cl.output
+    assert 'Tile 9' not in cl.output
+    assert '_tile_bounds' not in config2
+
+    # With nproc=1, the tiles aren't used.
+    config3 = galsim.config.CopyConfig(config)
+    config3['image']['tile_size'] = 50
+    with CaptureLog() as cl:
+        im3 = galsim.config.BuildImage(config3, logger=cl.logger)
+    np.testing.assert_array_equal(im3.array, im1.array)
+    assert 'Tile 0' not in cl.output
+
+    # Nor when the objects may be retried.
+    config4 = galsim.config.CopyConfig(config2)
+    config4['stamp'] = { 'retry_failures' : 2 }
+    with CaptureLog() as cl:
+        im4 = galsim.config.BuildImage(config4, logger=cl.logger)
+    np.testing.assert_array_equal(im4.array, im1.array)
+    assert 'Cannot draw image in tiles when objects may be retried' in cl.output
+    assert 'Tile 0' not in cl.output
+
+    # Also with a fixed stamp size.
+    config1['stamp'] = { 'size' : 32 }
+    config2['stamp'] = { 'size' : 32 }
+    im1 = galsim.config.BuildImage(config1, image_num=1, obj_num=30)
+    im2 = galsim.config.BuildImage(config2, image_num=1, obj_num=30)
+    np.testing.assert_array_equal(im2.array, im1.array)
+
+    # The objects are sorted into the tiles before building them, so each tile only builds the
+    # ones that overlap it.
+    from galsim.config.image_scattered import _GetScatteredStampBounds, _BuildScatteredTile
+    all_bounds, exact = _GetScatteredStampBounds(config2, 30, 30, None)
+    assert len(all_bounds) == 30
+    assert all(exact)
+    for b in all_bounds:
+        assert b.xmax - b.xmin + 1 == 32
+        assert b.ymax - b.ymin + 1 == 32
+    tile_bounds = galsim.BoundsI(1,50,1,50)
+    obj_nums = [ 30+k for k, b in enumerate(all_bounds) if (b & tile_bounds).isDefined() ]
+    assert 0 < len(obj_nums) < 30
+    # The tile has the same type as the full image.
+    config2['image']['nproc'] = 1
+    tile, noise = _BuildScatteredTile(config2, tile_bounds, 30, 30, obj_nums, {}, np.float64)
+    assert tile.dtype == np.float64
+    assert tile.bounds == tile_bounds
+    assert noise is None
+    # Same as when all the objects are checked on the tile.
+    tile2, noise2 = _BuildScatteredTile(config2, tile_bounds, 30, 30, range(30,60), {},
+                                        np.float64)
+    np.testing.assert_array_equal(tile.array, tile2.array)
+    assert np.sum(tile.array) > 0
+
+    # Without a stamp size, none of the profiles are built to find the bounds, so every tile
+    # builds those objects, unless image.tile_margin gives an upper limit to their size.
+    config6 = galsim.config.CopyConfig(config)
+    config6['image']['tile_size'] = 50
+    config6['image']['nproc'] = 2
+    all_bounds, exact = _GetScatteredStampBounds(config6, 30, 0, None)
+    assert all(b is None for b in all_bounds)
+    assert not any(exact)
+    with CaptureLog() as cl:
+        im6 = galsim.config.BuildImage(config6, logger=cl.logger)
+    assert 'The stamp bounds of 30 objects are not known' in cl.output
+    im1 = galsim.config.BuildImage(config)
+    np.testing.assert_array_equal(im6.array, im1.array)
+
+    config6['image']['tile_margin'] = 50
+    all_bounds, exact = _GetScatteredStampBounds(config6, 30, 0, None)
+    assert not any(exact)
+    for b in all_bounds:
+        assert b.xmax - b.xmin + 1 == 101
+        assert b.ymax - b.ymin + 1 == 101
+    with CaptureLog() as cl:
+        im6 = galsim.config.BuildImage(config6, logger=cl.logger)
+    assert 'are not known' not in cl.output
+    np.testing.assert_array_equal(im6.array, im1.array)
+
+    # If the margin is too small, that's an error rather than a wrong image.
+    config6['image']['tile_margin'] = 2
+    with assert_raises(galsim.GalSimConfigError):
+        galsim.config.BuildImage(config6)
+
+    config5 = galsim.config.CopyConfig(config)
+    config5['image']['tile_size'] = 0
+    with assert_raises(galsim.GalSimConfigError):
+        galsim.config.BuildImage(config5)
+
+    # The tile_size parameter doesn't change the output, so it isn't part of the hash.
+    assert galsim.config.GetConfigHash(config) == galsim.config.GetConfigHash(config3)
+
+
 if __name__ == "__main__":
     test_single()
     test_positions()
@@ -2146,3 +2553,8 @@ if __name__ == "__main__":
     test_template()
     test_variable_cat_size()
     test_blend()
+    test_shared_memory()
+    test_sort_by_cost()
+    test_batch_values()
+    test_stream_stamps()
+    test_tile_size()
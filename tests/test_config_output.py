@@ -1426,6 +1426,575 @@ def test_eval_full_word():
     assert np.max(np.abs(im10.array)) > 200
 
 
+@timer
+def test_worker_pool():
+    """Test using a persistent WorkerPool for the multiprocessing.
+    """
+    config = {
+        'image' : {
+            'type' : 'Scattered',
+            'size' : 64,
+            'pixel_scale' : 0.3,
+            'nobjects' : 6,
+            'random_seed' : 1234,
+        },
+        'gal' : {
+            'type' : 'Exponential',
+            'half_light_radius' : { 'type': 'Random', 'min': 0.5, 'max': 1.5 },
+            'flux' : { 'type': 'Random', 'min': 100, 'max': 1000 },
+        },
+        'output' : {
+            'type' : 'Fits',
+            'nfiles' : 3,
+            'file_name' : "$'output/test_worker_pool_%d.fits'%file_num",
+        },
+    }
+
+    # First build everything in a single process.
+    config1 = galsim.config.CopyConfig(config)
+    galsim.config.Process(config1)
+    im1_list = [ galsim.fits.read('output/test_worker_pool_%d.fits'%k) for k in range(3) ]
+
+    with galsim.config.WorkerPool() as pool:
+        assert not pool.started
+
+        # Using image.nproc, the stamps for all 3 files are built by the same processes.
+        config2 = galsim.config.CopyConfig(config)
+        config2['image']['nproc'] = 2
+        galsim.config.Process(config2, pool=pool)
+        assert pool.started
+        assert pool.nproc == 2
+        assert '_worker_pool' not in config2
+        pids = [ p.pid for p in pool.p_list ]
+        for k in range(3):
+            im2 = galsim.fits.read('output/test_worker_pool_%d.fits'%k)
+            np.testing.assert_array_equal(im2.array, im1_list[k].array)
+
+        # Running another config reuses them again, now at the file level.
+        config3 = galsim.config.CopyConfig(config)
+        config3['output']['nproc'] = 2
+        galsim.config.Process(config3, pool=pool)
+        assert [ p.pid for p in pool.p_list ] == pids
+        for k in range(3):
+            im3 = galsim.fits.read('output/test_worker_pool_%d.fits'%k)
+            np.testing.assert_array_equal(im3.array, im1_list[k].array)
+
+        # Asking for a different number of processes restarts the workers.
+        config3b = galsim.config.CopyConfig(config)
+        config3b['image']['nproc'] = 3
+        galsim.config.Process(config3b, pool=pool)
+        assert pool.nproc == 3
+        assert len(pool.p_list) == 3
+        assert [ p.pid for p in pool.p_list ][:2] != pids
+        for k in range(3):
+            im3 = galsim.fits.read('output/test_worker_pool_%d.fits'%k)
+            np.testing.assert_array_equal(im3.array, im1_list[k].array)
+
+        # An exception in a worker terminates the workers, but the pool is still usable.
+        config4 = galsim.config.CopyConfig(config)
+        config4['image']['nproc'] = 2
+        config4['gal']['half_light_radius'] = -1
+        with assert_raises(galsim.GalSimError):
+            galsim.config.Process(config4, pool=pool, except_abort=True)
+        assert not pool.started
+        config5 = galsim.config.CopyConfig(config)
+        config5['image']['nproc'] = 2
+        galsim.config.Process(config5, pool=pool)
+        assert pool.started
+        for k in range(3):
+            im5 = galsim.fits.read('output/test_worker_pool_%d.fits'%k)
+            np.testing.assert_array_equal(im5.array, im1_list[k].array)
+    assert not pool.started
+
+    with assert_raises(galsim.GalSimValueError):
+        galsim.config.WorkerPool(nproc=0).start()
+
+    # If the pool is given nproc, that is used regardless of what the config asks for.
+    with galsim.config.WorkerPool(nproc=2) as pool:
+        config6 = galsim.config.CopyConfig(config)
+        config6['image']['nproc'] = 3
+        galsim.config.Process(config6, pool=pool)
+        assert pool.nproc == 2
+        assert len(pool.p_list) == 2
+
+    # The function run by the workers is picklable, so the pool also works when the processes
+    # are started by spawn rather than fork.
+    import pickle
+    from galsim.config.process import _PoolWorker
+    assert pickle.loads(pickle.dumps(_PoolWorker)) is _PoolWorker
+
+    # The galsim executable only makes a pool if some config asks for multiple processes.
+    from galsim.main import UsesMultiprocessing
+    assert not UsesMultiprocessing(config, {})
+    assert UsesMultiprocessing(config5, {})
+    assert UsesMultiprocessing(config, {'image.nproc' : -1})
+    assert not UsesMultiprocessing(config, {'image.nproc' : 1})
+    assert UsesMultiprocessing({'output' : {'nproc' : 4}}, {})
+
+
+@timer
+def test_resume():
+    """Test the resume option to skip files that were already built.
+    """
+    config = {
+        'image' : {
+            'type' : 'Single',
+            'random_seed' : 1234,
+        },
+        'gal' : {
+            'type' : 'Gaussian',
+            'sigma' : { 'type': 'Random', 'min': 1, 'max': 2 },
+            'flux' : 100,
+        },
+        'output' : {
+            'type' : 'Fits',
+            'nfiles' : 4,
+            'file_name' : "$'output/test_resume_%d.fits'%file_num",
+            'manifest' : 'output/test_resume_manifest.json',
+        },
+    }
+    file_names = [ 'output/test_resume_%d.fits'%k for k in range(4) ]
+    for f in file_names + [config['output']['manifest']]:
+        if os.path.exists(f):
+            os.remove(f)
+
+    # The first time, everything is built and recorded in the manifest.
+    with CaptureLog() as cl:
+        galsim.config.Process(config, logger=cl.logger, resume=True)
+    assert 'already built' not in cl.output
+    manifest = galsim.config.ReadManifest(config['output']['manifest'])
+    assert sorted(manifest.keys()) == file_names
+    im_list = [ galsim.fits.read(f) for f in file_names ]
+
+    # Remove one file and truncate another.  Only those are rebuilt.
+    os.remove(file_names[1])
+    with open(file_names[2], 'w') as fout:
+        fout.write('junk')
+    with CaptureLog() as cl:
+        galsim.config.Process(config, logger=cl.logger, resume=True)
+    assert 'Skipping file 0 = output/test_resume_0.fits because it was already built' in cl.output
+    assert 'Skipping file 3 = output/test_resume_3.fits because it was already built' in cl.output
+    assert 'Skipping file 1' not in cl.output
+    assert 'Skipping file 2' not in cl.output
+    for f, im1 in zip(file_names, im_list):
+        im2 = galsim.fits.read(f)
+        np.testing.assert_array_equal(im2.array, im1.array)
+
+    # Now everything is done.
+    with CaptureLog() as cl:
+        galsim.config.Process(config, logger=cl.logger, resume=True)
+    assert 'All 4 files were already built' in cl.output
+
+    # Changes that don't affect the output are fine.
+    config1 = galsim.config.CopyConfig(config)
+    config1['output']['nproc'] = 2
+    with CaptureLog() as cl:
+        galsim.config.Process(config1, logger=cl.logger, resume=True)
+    assert 'All 4 files were already built' in cl.output
+
+    # But other changes mean all files are stale.
+    config1['gal']['flux'] = 200
+    with CaptureLog() as cl:
+        galsim.config.Process(config1, logger=cl.logger, resume=True)
+    assert 'already built' not in cl.output
+    im2 = galsim.fits.read(file_names[0])
+    np.testing.assert_array_almost_equal(im2.array, 2*im_list[0].array)
+
+    # Without resume, the manifest is ignored.
+    with CaptureLog() as cl:
+        galsim.config.Process(config, logger=cl.logger)
+    assert 'already built' not in cl.output
+
+    # The default manifest name is based on root, and includes the file range if using njobs.
+    config2 = galsim.config.CopyConfig(config)
+    del config2['output']['manifest']
+    config2['root'] = 'output/test_resume'
+    galsim.config.Process(config2, njobs=2, job=2, resume=True)
+    manifest = galsim.config.ReadManifest('output/test_resume_manifest_2-3.json')
+    assert sorted(manifest.keys()) == file_names[2:]
+
+    # Without root, it needs output.manifest
+    del config2['root']
+    with assert_raises(galsim.GalSimConfigError):
+        galsim.config.Process(config2, resume=True)
+
+    # Objects in the config dict are included in the hash using their repr, which is the same
+    # for equal objects.
+    config3 = galsim.config.CopyConfig(config)
+    config3['psf'] = galsim.Gaussian(sigma=0.7)
+    config3['image']['pixel_scale'] = np.float64(0.2)
+    hash3 = galsim.config.GetConfigHash(config3)
+    config3['psf'] = galsim.Gaussian(sigma=0.7)
+    assert galsim.config.GetConfigHash(config3) == hash3
+    config3['psf'] = galsim.Gaussian(sigma=0.8)
+    assert galsim.config.GetConfigHash(config3) != hash3
+
+    # But anything whose repr has a memory address in it would make the hash different in each
+    # run, so that is an error, unless it is in hash_ignore.
+    config3['output']['writer'] = object()
+    with assert_raises(galsim.GalSimConfigError):
+        galsim.config.GetConfigHash(config3)
+    galsim.config.hash_ignore.append('writer')
+    try:
+        assert galsim.config.GetConfigHash(config3) != hash3
+    finally:
+        galsim.config.hash_ignore.remove('writer')
+
+
+@timer
+def test_async_write():
+    """Test writing the output files in a background thread.
+    """
+    config = {
+        'image' : {
+            'type' : 'Single',
+            'random_seed' : 1234,
+        },
+        'gal' : {
+            'type' : 'Gaussian',
+            'sigma' : { 'type': 'Random', 'min': 1, 'max': 2 },
+            'flux' : 100,
+        },
+        'output' : {
+            'type' : 'Fits',
+            'nfiles' : 4,
+            'file_name' : "$'output/test_async_write_%d.fits.gz'%file_num",
+            'weight' : { 'file_name' : "$'output/test_async_write_wt_%d.fits'%file_num" },
+        },
+    }
+    file_names = [ 'output/test_async_write_%d.fits.gz'%k for k in range(4) ]
+
+    galsim.config.Process(config)
+    im1_list = [ galsim.fits.read(f) for f in file_names ]
+    for f in file_names:
+        os.remove(f)
+
+    config1 = galsim.config.CopyConfig(config)
+    config1['output']['async_write'] = True
+    config1['output']['max_queued_writes'] = 1
+    with CaptureLog() as cl:
+        config_out = galsim.config.Process(config1, logger=cl.logger)
+    assert 'Queued Fits to be written to file' in cl.output
+    assert '_output_writer' not in config_out
+    for f, im1 in zip(file_names, im1_list):
+        im2 = galsim.fits.read(f)
+        np.testing.assert_array_equal(im2.array, im1.array)
+        assert os.path.isfile(f.replace('async_write', 'async_write_wt').replace('.gz',''))
+
+    # Works with resume too.  The manifest is only updated once each file is written.
+    config1['output']['manifest'] = 'output/test_async_write_manifest.json'
+    if os.path.exists(config1['output']['manifest']):
+        os.remove(config1['output']['manifest'])
+    galsim.config.Process(config1, resume=True)
+    manifest = galsim.config.ReadManifest(config1['output']['manifest'])
+    assert sorted(manifest.keys()) == file_names
+    for f in file_names:
+        assert manifest[f]['size'] == os.path.getsize(f)
+
+    # Errors in the writer are reported, and are raised if except_abort=True.
+    def write_error():
+        raise OSError("Disk full")
+    with CaptureLog() as cl:
+        writer = galsim.config.AsyncWriter(2, except_abort=False, logger=cl.logger)
+        writer.submit(write_error, (), 'a.fits')
+        writer.submit(lambda: None, (), 'b.fits')
+        writer.close()
+    assert 'Exception caught when writing file a.fits' in cl.output
+    assert writer.failed == ['a.fits']
+
+    # The error is raised with the name of the file that failed, at the next submit or at close.
+    writer = galsim.config.AsyncWriter(2, except_abort=True)
+    writer.submit(write_error, (), 'a.fits')
+    with assert_raises(galsim.config.AsyncWriteError) as cm:
+        writer.close()
+    assert cm.exception.file_name == 'a.fits'
+    assert isinstance(cm.exception.error, OSError)
+    assert 'a.fits' in str(cm.exception)
+    assert 'Disk full' in str(cm.exception)
+
+    writer = galsim.config.AsyncWriter(2, except_abort=True)
+    writer.submit(write_error, (), 'a.fits')
+    writer.submit(lambda: None, (), 'b.fits')
+    writer.queue.put(None)
+    writer.thread.join()
+    with assert_raises(galsim.config.AsyncWriteError) as cm:
+        writer.submit(lambda: None, (), 'c.fits')
+    assert cm.exception.file_name == 'a.fits'
+
+    # The writer gets a copy of the config, so the pending write isn't affected by the
+    # processing of the next file.
+    class CheckOutput(galsim.config.OutputBuilder):
+        def writeFile(self, data, file_name, config, base, logger):
+            import time
+            time.sleep(0.1)
+            assert base['file_num'] == int(file_name[-6])
+            assert config is base['output']
+            galsim.fits.writeMulti(data, file_name)
+    galsim.config.RegisterOutputType('CheckAsync', CheckOutput())
+    config2 = galsim.config.CopyConfig(config)
+    config2['output']['type'] = 'CheckAsync'
+    config2['output']['file_name'] = "$'output/test_async_write_%d.fits'%file_num"
+    del config2['output']['weight']
+    config2['output']['async_write'] = True
+    galsim.config.Process(config2)
+    for k, im1 in enumerate(im1_list):
+        im2 = galsim.fits.read('output/test_async_write_%d.fits'%k)
+        np.testing.assert_array_equal(im2.array, im1.array)
+
+    # An error writing the file is reported with the right file name when using Process.
+    class BadOutput(galsim.config.OutputBuilder):
+        def writeFile(self, data, file_name, config, base, logger):
+            if base['file_num'] == 1:
+                raise OSError("Disk full")
+            galsim.fits.writeMulti(data, file_name)
+    galsim.config.RegisterOutputType('BadAsync', BadOutput())
+    config3 = galsim.config.CopyConfig(config2)
+    config3['output']['type'] = 'BadAsync'
+    with CaptureLog() as cl:
+        with assert_raises(galsim.config.AsyncWriteError):
+            galsim.config.Process(config3, logger=cl.logger, except_abort=True)
+    assert 'Exception caught when writing file output/test_async_write_1.fits' in cl.output
+
+
+@timer
+def test_stats():
+    """Test recording the time taken by each stage of the processing.
+    """
+    config = {
+        'image' : {
+            'type' : 'Scattered',
+            'size' : 64,
+            'pixel_scale' : 0.3,
+            'nobjects' : 4,
+            'random_seed' : 1234,
+            'noise' : { 'type': 'Gaussian', 'sigma': 0.5 },
+        },
+        'stamp' : {
+            'draw_method' : { 'type': 'List', 'items': [ 'fft', 'phot' ] },
+        },
+        'gal' : {
+            'type' : 'Exponential',
+            'half_light_radius' : { 'type': 'Random', 'min': 0.5, 'max': 1.5 },
+            'flux' : 100,
+        },
+        'output' : {
+            'type' : 'Fits',
+            'nfiles' : 3,
+            'file_name' : "$'output/test_stats_%d.fits'%file_num",
+        },
+    }
+
+    def check_stats(stats):
+        times = dict( (row['name'], row) for row in stats.getReport() if row['kind'] == 'time' )
+        sizes = dict( (row['name'], row) for row in stats.getReport() if row['kind'] == 'size' )
+        assert times['file']['count'] == 3
+        assert times['image']['count'] == 3
+        assert times['stamp']['count'] == 12
+        assert times['write']['count'] == 3
+        assert times['setup']['count'] == 12
+        assert times['build_profile']['count'] == 12
+        assert times['draw_fft']['count'] == 6
+        assert times['draw_phot']['count'] == 6
+        # Noise is added once for each image.
+        assert times['noise']['count'] == 3
+        assert times['image']['per_file'] == times['image']['total'] / 3
+        assert times['draw_fft']['per_object'] == times['draw_fft']['total'] / 12
+        assert sizes['n_photons']['count'] == 6
+        assert sizes['n_photons']['min'] == sizes['n_photons']['max'] == 100
+        assert sizes['fft_size']['count'] == 6
+        assert sizes['stamp_size']['count'] == 12
+
+    config1 = galsim.config.CopyConfig(config)
+    stats1 = galsim.config.ConfigStats()
+    galsim.config.Process(config1, stats=stats1)
+    check_stats(stats1)
+    assert '_stats' not in config1
+
+    # With multiple processes, the stats from each process are added together.
+    for key in ['image', 'output']:
+        config2 = galsim.config.CopyConfig(config)
+        config2[key]['nproc'] = 2
+        stats2 = galsim.config.ConfigStats()
+        galsim.config.Process(config2, stats=stats2)
+        check_stats(stats2)
+
+        # Likewise when using a WorkerPool.
+        config3 = galsim.config.CopyConfig(config)
+        config3[key]['nproc'] = 2
+        stats3 = galsim.config.ConfigStats()
+        with galsim.config.WorkerPool() as pool:
+            galsim.config.Process(config3, pool=pool, stats=stats3)
+        check_stats(stats3)
+
+    # Write the report as json or csv.
+    stats1.write('output/test_stats.json')
+    with open('output/test_stats.json') as fin:
+        report = json.load(fin)
+    assert report == json.loads(json.dumps(stats1.getReport()))
+    stats1.write('output/test_stats.csv')
+    with open('output/test_stats.csv') as fin:
+        lines = fin.readlines()
+    assert lines[0].strip() == ','.join(galsim.config.stats.report_keys)
+    assert len(lines) == len(report) + 1
+    with assert_raises(galsim.GalSimValueError):
+        stats1.write('output/test_stats.txt', file_type='txt')
+    print(stats1.summary())
+
+    stats1.clear()
+    assert stats1.getReport() == []
+
+@timer
+def test_serve():
+    """Test serving the files to be built to worker processes.
+    """
+    import socket
+    import threading
+    import time
+    from multiprocessing import Process
+
+    config = {
+        'image' : {
+            'type' : 'Scattered',
+            'size' : 64,
+            'pixel_scale' : 0.3,
+            'nobjects' : 6,
+            'random_seed' : 1234,
+        },
+        'gal' : {
+            'type' : 'Exponential',
+            'half_light_radius' : { 'type': 'Random', 'min': 0.5, 'max': 1.5 },
+            'flux' : { 'type': 'Random', 'min': 100, 'max': 1000 },
+        },
+        'output' : {
+            'type' : 'Fits',
+            'nfiles' : 6,
+            'file_name' : "$'output/test_serve_%d.fits'%file_num",
+            'task_timeout' : 2,
+        },
+    }
+
+    # First build everything in a single process.
+    config1 = galsim.config.CopyConfig(config)
+    galsim.config.Process(config1)
+    im1_list = [ galsim.fits.read('output/test_serve_%d.fits'%k) for k in range(6) ]
+    for k in range(6):
+        os.remove('output/test_serve_%d.fits'%k)
+
+    # Find a free port to use.
+    s = socket.socket()
+    s.bind(('localhost', 0))
+    address = 'localhost:%d'%s.getsockname()[1]
+    s.close()
+
+    # Start some workers.  They keep trying to connect until the server is running.
+    secret = 'test_serve secret'
+    workers = [ Process(target=galsim.config.Process, args=(galsim.config.CopyConfig(config),),
+                        kwargs={'connect' : address, 'authkey' : secret}) for j in range(2) ]
+    for p in workers:
+        p.start()
+
+    # Also connect a worker that takes a task and then dies.  This task is given to one of
+    # the other workers after task_timeout seconds.
+    authkey = galsim.config.GetServeAuthKey(config, secret).encode('utf-8')
+    got = []
+    def dead_worker():
+        manager = galsim.config.process._JobManager(address=galsim.config.ParseAddress(address),
+                                                    authkey=authkey)
+        for i in range(100):
+            try:
+                manager.connect()
+                break
+            except (IOError, OSError):
+                time.sleep(0.1)
+        got.append(manager.get_job_queue().getTask('dead'))
+    t = threading.Thread(target=dead_worker)
+    t.start()
+
+    config2 = galsim.config.CopyConfig(config)
+    with CaptureLog() as cl:
+        galsim.config.Process(config2, logger=cl.logger, serve=address, authkey=secret)
+    t.join()
+    for p in workers:
+        p.join()
+    assert got[0][0] >= 0
+    assert 'Giving file task %d to another worker'%got[0][0] in cl.output
+    for k in range(6):
+        im2 = galsim.fits.read('output/test_serve_%d.fits'%k)
+        np.testing.assert_array_equal(im2.array, im1_list[k].array)
+    # The files are written to a temporary name and then renamed, so none of those are left.
+    assert not any('.tmp-' in f for f in os.listdir('output'))
+
+    # If a task is given to another worker, only the first results for it are used.
+    queue = galsim.config.process._JobQueue([ 'task0', 'task1' ], timeout=0.)
+    assert queue.getTask('slow') == (0, 'task0')
+    time.sleep(0.01)
+    assert queue.getTask('fast') == (0, 'task0')
+    queue.finish('fast', 0, 'fast results', None)
+    queue.finish('slow', 0, 'slow results', None)
+    events = queue.takeEvents()
+    assert [ e[0] for e in events ] == [ 'requeue', 'finish' ]
+    assert events[1][2:] == ('fast', ('fast results', None))
+
+    # If the heartbeats can't be sent, the error is reported, so the worker can stop.
+    from multiprocessing import Event, Queue
+    errors = Queue()
+    host, port = galsim.config.ParseAddress(address)
+    galsim.config.process._SendHeartbeats(host, port, authkey, 'lost', 0.5, Event(), errors,
+                                          os.getppid())
+    assert 'Unable to connect' in errors.get(timeout=10)
+
+    # Workers with a different config or a different secret can't connect.
+    config3 = galsim.config.CopyConfig(config)
+    config3['gal']['flux'] = 17
+    server = threading.Thread(target=galsim.config.Process, args=(galsim.config.CopyConfig(config),),
+                              kwargs={'serve' : address, 'authkey' : secret})
+    server.start()
+    try:
+        with assert_raises(Exception):
+            galsim.config.Process(config3, connect=address, authkey=secret)
+        with assert_raises(Exception):
+            galsim.config.Process(galsim.config.CopyConfig(config), connect=address,
+                                  authkey='wrong')
+    finally:
+        # Let the server finish.  The secret may also be given by an environment variable.
+        os.environ['GALSIM_SERVE_AUTHKEY'] = secret
+        try:
+            galsim.config.Process(galsim.config.CopyConfig(config), connect=address)
+        finally:
+            del os.environ['GALSIM_SERVE_AUTHKEY']
+        server.join()
+
+    # Without a secret, it refuses to serve or connect.
+    with assert_raises(galsim.GalSimValueError):
+        galsim.config.Process(galsim.config.CopyConfig(config), serve=address)
+    with assert_raises(galsim.GalSimValueError):
+        galsim.config.Process(galsim.config.CopyConfig(config), connect=address)
+
+    # Resume works with serve.  The workers report the sizes of the files they wrote.
+    manifest_name = 'output/test_serve_manifest.json'
+    if os.path.exists(manifest_name):
+        os.remove(manifest_name)
+    config4 = galsim.config.CopyConfig(config)
+    config4['output']['manifest'] = manifest_name
+    workers = [ Process(target=galsim.config.Process, args=(galsim.config.CopyConfig(config4),),
+                        kwargs={'connect' : address, 'authkey' : secret}) for j in range(2) ]
+    for p in workers:
+        p.start()
+    galsim.config.Process(galsim.config.CopyConfig(config4), serve=address, authkey=secret,
+                          resume=True)
+    for p in workers:
+        p.join()
+    manifest = galsim.config.ReadManifest(manifest_name)
+    assert len(manifest) == 6
+    for f in manifest:
+        assert manifest[f]['size'] == os.path.getsize(f)
+
+    assert galsim.config.ParseAddress('host:123') == ('host', 123)
+    assert galsim.config.ParseAddress(':123') == ('127.0.0.1', 123)
+    assert galsim.config.ParseAddress('123') == ('127.0.0.1', 123)
+    with assert_raises(galsim.GalSimValueError):
+        galsim.config.ParseAddress('host')
+
 if __name__ == "__main__":
     test_fits()
     test_multifits()
@@ -1439,3 +2008,8 @@ if __name__ == "__main__":
     test_config()
     test_no_output()
     test_eval_full_word()
+    test_worker_pool()
+    test_resume()
+    test_async_write()
+    test_stats()
+    test_serve()
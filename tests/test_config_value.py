@@ -1678,6 +1678,44 @@ def test_eval():
     np.testing.assert_almost_equal(ps_shear.g2, g2)
     np.testing.assert_almost_equal(ps_mu, mu)
 
+@timer
+def test_eval_compile():
+    """Test that Eval strings are only parsed and compiled once.
+    """
+    import pickle
+    config = {
+        'eval_variables' : { 'fscale' : 0.3, 'sunused' : 'abc' },
+        'val1' : { 'type' : 'Eval', 'str' : 'obj_num * scale + x', 'fx' : 1.5 },
+        'val2' : { 'type' : 'Eval', 'str' : 'obj_num * scale + x', 'fx' : 1.5 },
+    }
+
+    for k in range(5):
+        galsim.config.SetupConfigObjNum(config, k)
+        val1 = galsim.config.ParseValue(config, 'val1', config, float)[0]
+        val2 = galsim.config.ParseValue(config, 'val2', config, float)[0]
+        assert val1 == val2 == k * 0.3 + 1.5
+
+    # The variables used by the string were found on the first pass.  Not the unused one.
+    fn1 = config['val1']['_fn']
+    assert sorted(fn1.keys) == ['fscale', 'fx', 'xobj_num']
+    assert 'sunused' not in config['val1']
+    # The same string only gets compiled once.
+    assert fn1.code is config['val2']['_fn'].code
+
+    # The compiled function may be pickled, e.g. to send the config to another process.
+    config2 = { 'val1' : pickle.loads(pickle.dumps(config['val1'])),
+                'eval_variables' : config['eval_variables'] }
+    for k in range(5,10):
+        galsim.config.SetupConfigObjNum(config2, k)
+        val1 = galsim.config.ParseValue(config2, 'val1', config2, float)[0]
+        assert val1 == k * 0.3 + 1.5
+    assert config2['val1']['_fn'].code is fn1.code
+
+    # Words are matched as whole words, not parts of other words.
+    assert galsim.config.value_eval._getWords('a.b + c_d*e1') == set(['a', 'b', 'c_d', 'e1'])
+    assert not galsim.config.value_eval._hasWord('c', set(['c_d']), 'c_d')
+    assert galsim.config.value_eval._hasWord('c_d', set(['c_d']), 'c_d')
+
 
 if __name__ == "__main__":
     test_float_value()
@@ -1688,3 +1726,4 @@ if __name__ == "__main__":
     test_shear_value()
     test_pos_value()
     test_eval()
+    test_eval_compile()
@@ -997,6 +997,58 @@ def test_gsparams():
     assert conv6.obj_list[1].orig_obj.gsparams == galsim.GSParams()
 
 
+@timer
+def test_convolve_cache():
+    """Test that keeping the Fourier-space image of a shared PSF doesn't change the results.
+    """
+    orig_size = galsim.get_convolve_cache_size()
+    assert orig_size == 100 * 1024**2
+
+    psf = galsim.Kolmogorov(fwhm=0.7).shear(g1=0.03, g2=-0.02)
+    gals = [ galsim.Exponential(half_light_radius=hlr).shear(g1=0.1*i, g2=0.05)
+             for i, hlr in enumerate([0.3, 0.5, 0.8, 1.1]) ]
+
+    galsim.set_convolve_cache_size(0)
+    assert galsim.get_convolve_cache_size() == 0
+    ref_images = [ galsim.Convolve(gal, psf).drawImage(nx=48, ny=48, scale=0.2)
+                   for gal in gals ]
+    ref_image = galsim.Convolve(galsim.Exponential(half_light_radius=0.5).shear(g1=0.1, g2=0.05),
+                                psf).drawImage(nx=48, ny=48, scale=0.2)
+
+    galsim.set_convolve_cache_size(10 * 1024**2)
+    assert galsim.get_convolve_cache_size() == 10 * 1024**2
+    try:
+        # Run through twice, so the later images use the kept PSF image.
+        for k in range(2):
+            for gal, ref_im in zip(gals, ref_images):
+                im = galsim.Convolve(gal, psf).drawImage(nx=48, ny=48, scale=0.2)
+                np.testing.assert_array_equal(im.array, ref_im.array)
+                # Different stamp sizes use different grids, so they can't share the same image.
+                im = galsim.Convolve(gal, psf).drawImage(nx=64, ny=64, scale=0.2)
+                im2 = galsim.Convolve(gal, psf).drawImage(nx=64, ny=64, scale=0.2)
+                np.testing.assert_array_equal(im.array, im2.array)
+
+        # The repeated PSF is used from the cache, but a new galaxy never is, even if it is the
+        # same as one drawn before (and maybe at the same address as one that was deleted).
+        galsim.set_convolve_cache_size(0)
+        galsim.set_convolve_cache_size(10 * 1024**2)
+        assert galsim._galsim.GetNumConvolveCacheImages() == 0
+        for i in range(10):
+            gal = galsim.Exponential(half_light_radius=0.5).shear(g1=0.1, g2=0.05)
+            nhits = galsim._galsim.GetNumConvolveCacheHits()
+            im = galsim.Convolve(gal, psf).drawImage(nx=48, ny=48, scale=0.2)
+            np.testing.assert_array_equal(im.array, ref_image.array)
+            # The PSF image is kept the second time it is drawn and used after that.
+            # The galaxies are only drawn once each, so they are never kept.
+            assert galsim._galsim.GetNumConvolveCacheImages() == (0 if i == 0 else 1)
+            assert galsim._galsim.GetNumConvolveCacheHits() == nhits + (1 if i >= 2 else 0)
+            del gal, im
+    finally:
+        galsim.set_convolve_cache_size(orig_size)
+
+    assert_raises(ValueError, galsim.set_convolve_cache_size, -1)
+
+
 if __name__ == "__main__":
     test_convolve()
     test_convolve_flux_scaling()
@@ -1010,3 +1062,4 @@ if __name__ == "__main__":
     test_ne()
     test_convolve_noise()
     test_gsparams()
+    test_convolve_cache()
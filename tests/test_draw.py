@@ -1555,6 +1555,535 @@ def test_direct_scale():
     assert_raises(ValueError, obj.drawPhot, im2, n_photons=-20)
     assert_raises(TypeError, obj.drawPhot, im2, sensor=5)
 
+@timer
+def test_num_threads():
+    """Test drawing in real space with multiple threads.
+    """
+    assert galsim.get_num_threads() == 1
+
+    gal = galsim.Sersic(n=1.5, half_light_radius=2.3, flux=1.e5).shear(g1=0.2, g2=-0.1)
+    psf = galsim.Moffat(beta=3, fwhm=0.9)
+    pix = galsim.Pixel(0.2)
+    im_obj = galsim.InterpolatedImage(galsim.Gaussian(sigma=1.).drawImage(scale=0.3))
+    # These use tables whose points are not equally spaced, so the lookups need to work from
+    # several threads at once.
+    vk = galsim.VonKarman(lam=700., r0=0.15)
+    trunc_psf = galsim.Moffat(beta=2.5, fwhm=0.9, trunc=3.)
+    for obj, method in [ (gal, 'no_pixel'),
+                         (galsim.Add(gal, psf.shift(0.3,0.1)), 'sb'),
+                         (galsim.Convolve(psf, pix, real_space=True), 'no_pixel'),
+                         (im_obj, 'no_pixel'),
+                         (vk, 'no_pixel'),
+                         (trunc_psf, 'no_pixel') ]:
+        for dtype in [np.float32, np.float64]:
+            galsim.set_num_threads(1)
+            im1 = obj.drawImage(nx=200, ny=151, scale=0.2, method=method, dtype=dtype)
+            galsim.set_num_threads(4)
+            assert galsim.get_num_threads() == 4
+            im2 = obj.drawImage(nx=200, ny=151, scale=0.2, method=method, dtype=dtype)
+            # The rows that don't include y=0 are calculated directly rather than by symmetry,
+            # so there can be differences at the level of rounding errors.
+            np.testing.assert_allclose(im2.array, im1.array, rtol=1.e-6, atol=1.e-10)
+
+            # Small images are drawn in a single thread.
+            im3 = obj.drawImage(nx=10, ny=10, scale=0.2, method=method, dtype=dtype)
+            im4 = obj.drawImage(nx=10, ny=10, scale=0.2, method=method, dtype=dtype)
+            np.testing.assert_array_equal(im4.array, im3.array)
+
+    # The GIL is released while drawing, so this can be done from several Python threads.
+    import threading
+    galsim.set_num_threads(1)
+    images = [ galsim.ImageD(200, 200, scale=0.2) for k in range(4) ]
+    threads = [ threading.Thread(target=gal.drawImage, args=(im,), kwargs={'method':'no_pixel'})
+                for im in images ]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    im5 = gal.drawImage(nx=200, ny=200, scale=0.2, method='no_pixel')
+    for im in images:
+        np.testing.assert_array_equal(im.array, im5.array)
+
+    # nthreads <= 0 means to use the number of cpus.
+    galsim.set_num_threads(0)
+    assert galsim.get_num_threads() >= 1
+    galsim.set_num_threads(1)
+
+
+@timer
+def test_fft_wisdom():
+    """Test the saved FFTW plans, threaded FFTs, and the FFTW wisdom file.
+    """
+    import tempfile
+    wisdom_dir = tempfile.mkdtemp()
+    wisdom_file = os.path.join(wisdom_dir, 'sub', 'fftw_wisdom')
+    save_wisdom_file = galsim.fft.get_wisdom_file()
+    # Unless asked for, the wisdom isn't saved.
+    if not os.environ.get('GALSIM_FFTW_WISDOM', ''):
+        assert save_wisdom_file is None
+
+    gal = galsim.Sersic(n=1.5, half_light_radius=2.3, flux=1.e5).shear(g1=0.2, g2=-0.1)
+    psf = galsim.Moffat(beta=3, fwhm=0.9)
+    obj = galsim.Convolve(gal, psf)
+    im1 = obj.drawImage(nx=64, ny=64, scale=0.2, method='fft')
+
+    rng = np.random.RandomState(1234)
+    xar = rng.normal(size=(64,96))
+    kar1 = np.fft.fft2(xar)
+    rkar1 = np.fft.rfft2(xar)
+    # The first few times a size is used, the plan is made with FFTW_ESTIMATE.  After that, it
+    # is measured.  Either way, the results should be the same.
+    for nthreads in [1, 4]:
+        galsim.set_num_threads(nthreads)
+        for i in range(6):
+            np.testing.assert_allclose(galsim.fft.fft2(xar), kar1, atol=1.e-10)
+            np.testing.assert_allclose(galsim.fft.rfft2(xar), rkar1, atol=1.e-10)
+            np.testing.assert_allclose(galsim.fft.irfft2(rkar1), xar, atol=1.e-10)
+            im2 = obj.drawImage(nx=64, ny=64, scale=0.2, method='fft')
+            np.testing.assert_allclose(im2.array, im1.array, rtol=1.e-10, atol=1.e-10)
+    galsim.set_num_threads(1)
+    print('has_threads = ',galsim.fft.has_threads())
+
+    # The plans are kept for reuse, up to 100 of them.
+    galsim.fft.clear_plans()
+    assert galsim._galsim.GetNumFFTPlans() == 0
+    np.testing.assert_allclose(galsim.fft.fft2(xar), kar1, atol=1.e-10)
+    assert galsim._galsim.GetNumFFTPlans() >= 1
+    for n in range(2, 120):
+        galsim.fft.fft2(np.ones((2*n, 2*n)))
+    assert 100 >= galsim._galsim.GetNumFFTPlans() >= 50
+    np.testing.assert_allclose(galsim.fft.fft2(xar), kar1, atol=1.e-10)
+    galsim.fft.clear_plans()
+    assert galsim._galsim.GetNumFFTPlans() == 0
+
+    # Now save it.  The directory is made if necessary.
+    galsim.fft.set_wisdom_file(wisdom_file)
+    assert galsim.fft.get_wisdom_file() == wisdom_file
+    galsim.fft.save_wisdom()
+    assert os.path.isfile(wisdom_file)
+    with open(wisdom_file) as fin:
+        lines = fin.read().splitlines()
+    assert lines[0].startswith('(fftw-3')
+    # The measured sizes each add some lines to the wisdom.
+    assert len(lines) > 2
+    assert os.listdir(os.path.dirname(wisdom_file)) == ['fftw_wisdom']
+
+    # Read it back in.
+    galsim.fft.forget_wisdom()
+    assert galsim.fft.load_wisdom()
+    assert galsim.fft.load_wisdom(wisdom_file)
+    assert not galsim.fft.load_wisdom(os.path.join(wisdom_dir, 'not_there'))
+    np.testing.assert_allclose(galsim.fft.fft2(xar), kar1, atol=1.e-10)
+    im3 = obj.drawImage(nx=64, ny=64, scale=0.2, method='fft')
+    np.testing.assert_allclose(im3.array, im1.array, rtol=1.e-10, atol=1.e-10)
+
+    # Saving again keeps the wisdom that was already in the file.
+    galsim.fft.forget_wisdom()
+    galsim.fft.save_wisdom()
+    with open(wisdom_file) as fin:
+        assert len(fin.read().splitlines()) >= len(lines)
+
+    # With no file, load_wisdom does nothing and save_wisdom needs a file name.
+    galsim.fft.set_wisdom_file(None)
+    assert galsim.fft.get_wisdom_file() is None
+    assert not galsim.fft.load_wisdom()
+    assert_raises(galsim.GalSimError, galsim.fft.save_wisdom)
+    galsim.fft.save_wisdom(wisdom_file)
+    galsim.fft.set_wisdom_file(save_wisdom_file)
+
+
+@timer
+def test_threaded_phot():
+    """Test shooting photons in chunks with multiple threads.
+    """
+    # Use a smaller chunk size, so this doesn't take too long.
+    save_chunk_size = galsim.gsobject._photon_chunk_size
+    galsim.gsobject._photon_chunk_size = 10000
+
+    gal = galsim.Sersic(n=1.5, half_light_radius=2.3, flux=1.e5).shear(g1=0.2, g2=-0.1)
+    psf = galsim.Moffat(beta=3, fwhm=0.9)
+    im_obj = galsim.InterpolatedImage(galsim.Gaussian(sigma=1.).drawImage(scale=0.3))
+    for obj in [ galsim.Convolve(gal, psf), im_obj.withFlux(1.e5) ]:
+        for dtype in [np.float32, np.float64, np.int32]:
+            # With one thread, the photons are all shot from the given rng as usual.
+            galsim.gsobject._photon_chunk_size = 10**9
+            galsim.set_num_threads(2)
+            im0 = obj.drawImage(nx=100, ny=100, scale=0.2, method='phot', dtype=dtype,
+                                rng=galsim.BaseDeviate(1234))
+            galsim.gsobject._photon_chunk_size = 10000
+            galsim.set_num_threads(1)
+            im1 = obj.drawImage(nx=100, ny=100, scale=0.2, method='phot', dtype=dtype,
+                                rng=galsim.BaseDeviate(1234))
+            np.testing.assert_array_equal(im1.array, im0.array)
+
+            im1 = None
+            for nthreads in [2, 3, 8]:
+                galsim.set_num_threads(nthreads)
+                im2 = obj.drawImage(nx=100, ny=100, scale=0.2, method='phot', dtype=dtype,
+                                    rng=galsim.BaseDeviate(1234))
+                if im1 is None:
+                    im1 = im2
+                    # Check that the photons really went somewhere sensible.
+                    np.testing.assert_allclose(im1.array.sum(), obj.flux, rtol=0.05)
+                else:
+                    # The per-thread images are added in different orders, so there can be
+                    # differences at the level of rounding errors, which can change the
+                    # truncated integer values by 1.
+                    atol = 1 if dtype == np.int32 else 1.e-3
+                    np.testing.assert_allclose(im2.array, im1.array, rtol=1.e-5, atol=atol)
+
+    # maxN sets a smaller chunk size.
+    galsim.set_num_threads(4)
+    im3 = gal.drawImage(nx=100, ny=100, scale=0.2, method='phot', rng=galsim.BaseDeviate(1234),
+                        maxN=3000)
+    galsim.set_num_threads(2)
+    im4 = gal.drawImage(nx=100, ny=100, scale=0.2, method='phot', rng=galsim.BaseDeviate(1234),
+                        maxN=3000)
+    np.testing.assert_allclose(im3.array, im4.array, rtol=1.e-5, atol=1.e-3)
+
+    # Errors in any of the threads are raised.
+    galsim.set_num_threads(4)
+    deconv = galsim.Convolve(gal, galsim.Deconvolve(psf))
+    assert_raises(galsim.GalSimNotImplementedError, deconv.drawImage, method='phot',
+                  n_photons=1.e5)
+
+    # With fewer photons than the chunk size, the usual serial code is used.
+    im5 = gal.drawImage(nx=100, ny=100, scale=0.2, method='phot', rng=galsim.BaseDeviate(1234),
+                        n_photons=5000)
+    galsim.set_num_threads(1)
+    im6 = gal.drawImage(nx=100, ny=100, scale=0.2, method='phot', rng=galsim.BaseDeviate(1234),
+                        n_photons=5000)
+    np.testing.assert_array_equal(im5.array, im6.array)
+
+    # The seeds for the chunks are never 0, which would mean to seed from the time.
+    class ZeroDeviate(galsim.BaseDeviate):
+        def raw(self):
+            return 0
+    galsim.set_num_threads(2)
+    im7 = gal.drawImage(nx=100, ny=100, scale=0.2, method='phot', rng=ZeroDeviate(1234))
+    im8 = gal.drawImage(nx=100, ny=100, scale=0.2, method='phot', rng=ZeroDeviate(1234))
+    np.testing.assert_allclose(im7.array, im8.array, rtol=1.e-5, atol=1.e-3)
+    galsim.set_num_threads(1)
+
+    galsim.gsobject._photon_chunk_size = save_chunk_size
+
+@timer
+def test_drawImages():
+    """Test drawing many profiles at once with galsim.drawImages.
+    """
+    rng = np.random.RandomState(8675309)
+    nobj = 20
+    objs = []
+    for i in range(nobj):
+        gal = galsim.Sersic(n=rng.uniform(0.5,3.), half_light_radius=rng.uniform(0.3,1.),
+                            flux=rng.uniform(100,1000))
+        gal = gal.shear(g1=rng.uniform(-0.2,0.2), g2=rng.uniform(-0.2,0.2))
+        objs.append(gal)
+    # Include a few that can't be drawn in the same C++ call.
+    objs[3] = galsim.InterpolatedImage(galsim.Gaussian(sigma=1.).drawImage(scale=0.3))
+    objs[7] = galsim.Convolve(objs[7], galsim.Moffat(beta=3, fwhm=0.9))
+    offsets = [ galsim.PositionD(*rng.uniform(-0.5,0.5,size=2)) for i in range(nobj) ]
+
+    # The profiles' tables (maxk, stepk, Fourier transforms) are built the first time they are
+    # needed.  Make sure this works when several threads need the same ones at once.
+    psf = galsim.Moffat(beta=2.7, fwhm=0.8, trunc=2.4)
+    objs3 = [ galsim.Convolve(galsim.Sersic(n=2.9, half_light_radius=0.6, flux=100.*(i+1))
+                              .shear(g1=0.01*i, g2=0.), psf) for i in range(nobj) ]
+    galsim.set_num_threads(4)
+    images = galsim.drawImages(objs3, [ galsim.ImageD(32,32, scale=0.2) for i in range(nobj) ])
+    galsim.set_num_threads(1)
+    for obj, im2 in zip(objs3, images):
+        im1 = obj.drawImage(galsim.ImageD(32,32, scale=0.2))
+        np.testing.assert_allclose(im2.array, im1.array, rtol=1.e-6,
+                                   atol=1.e-6 * np.max(im1.array))
+
+    for method in ['no_pixel', 'sb', 'auto', 'fft']:
+        for nthreads in [1, 4]:
+            galsim.set_num_threads(nthreads)
+            for dtype in [np.float32, np.float64, np.int32]:
+                # Stamps that are subimages of a larger image.
+                big1 = galsim.Image(200, 40, scale=0.2, dtype=dtype)
+                big2 = galsim.Image(200, 40, scale=0.2, dtype=dtype)
+                bounds = [ galsim.BoundsI(10*i+1, 10*i+10, 11, 30) for i in range(nobj) ]
+                for obj, b, offset in zip(objs, bounds, offsets):
+                    obj.drawImage(big1[b], offset=offset, method=method)
+                images = galsim.drawImages(objs, [ big2[b] for b in bounds ], offsets=offsets,
+                                           method=method)
+                np.testing.assert_allclose(big2.array, big1.array, rtol=1.e-6, atol=1.e-6)
+                for obj, b, offset, im2 in zip(objs, bounds, offsets, images):
+                    im1 = obj.drawImage(big1[b], offset=offset, method=method)
+                    np.testing.assert_allclose(im2.added_flux, im1.added_flux, rtol=1.e-6)
+                    assert im2.draw_method == im1.draw_method
+
+            # Overlapping stamps are drawn in order, so the later one wins.
+            # (Leave out the InterpolatedImage, so this would otherwise use several threads.)
+            objs1 = objs[:3] + objs[4:]
+            big1 = galsim.ImageF(200, 40, scale=0.2)
+            big2 = galsim.ImageF(200, 40, scale=0.2)
+            bounds = [ galsim.BoundsI(7*i+1, 7*i+16, 5+i%3, 24+i%3) for i in range(nobj-1) ]
+            for obj, b, offset in zip(objs1, bounds, offsets):
+                obj.drawImage(big1[b], offset=offset, method=method)
+            galsim.drawImages(objs1, [ big2[b] for b in bounds ], offsets=offsets[:nobj-1],
+                              method=method)
+            np.testing.assert_allclose(big2.array, big1.array, rtol=1.e-6, atol=1.e-6)
+
+    # A non-square pixel scale with other flux scalings.
+    wcs = galsim.JacobianWCS(0.21, 0.03, -0.02, 0.19)
+    kwargs = dict(area=3., exptime=20., gain=4., use_true_center=False)
+    for method in ['no_pixel', 'sb', 'auto']:
+        for nthreads in [1, 4]:
+            galsim.set_num_threads(nthreads)
+            images = galsim.drawImages(objs, [ galsim.ImageD(21,20) for i in range(nobj) ],
+                                       offsets=offsets, wcs=wcs, method=method, **kwargs)
+            for obj, offset, im2 in zip(objs, offsets, images):
+                im1 = obj.drawImage(galsim.ImageD(21,20), offset=offset, wcs=wcs,
+                                    method=method, **kwargs)
+                assert im2.wcs == wcs
+                np.testing.assert_allclose(im2.array, im1.array, rtol=1.e-6,
+                                           atol=1.e-6 * np.max(im1.array))
+                np.testing.assert_allclose(im2.added_flux, im1.added_flux, rtol=1.e-6)
+    galsim.set_num_threads(1)
+
+    # Profiles for which drawImage warns still warn.
+    conv = galsim.Convolve(objs[0], galsim.Pixel(0.2))
+    with assert_warns(galsim.GalSimWarning):
+        images = galsim.drawImages([objs[1], conv],
+                                   [ galsim.ImageF(32,32, scale=0.2) for i in range(2) ])
+    with assert_warns(galsim.GalSimWarning):
+        im1 = conv.drawImage(galsim.ImageF(32,32, scale=0.2))
+    np.testing.assert_allclose(images[1].array, im1.array, rtol=1.e-6, atol=1.e-6)
+
+    # Those are drawn after the rest of the batch, but overlapping stamps still end up as if
+    # they were drawn in order.  (A TopHat has hard edges, so it warns with method='fft'.)
+    objs2 = objs[8:16]
+    objs2[2] = galsim.TopHat(0.6, flux=500.)
+    bounds = [ galsim.BoundsI(7*i+1, 7*i+16, 5, 24) for i in range(len(objs2)) ]
+    for nthreads in [1, 4]:
+        galsim.set_num_threads(nthreads)
+        big1 = galsim.ImageF(80, 30, scale=0.2)
+        big2 = galsim.ImageF(80, 30, scale=0.2)
+        with assert_warns(galsim.GalSimWarning):
+            for obj, b in zip(objs2, bounds):
+                obj.drawImage(big1[b], method='fft')
+        with assert_warns(galsim.GalSimWarning):
+            galsim.drawImages(objs2, [ big2[b] for b in bounds ], method='fft')
+        np.testing.assert_allclose(big2.array, big1.array, rtol=1.e-6, atol=1.e-6)
+    galsim.set_num_threads(1)
+
+    # setup_only is the same as for drawImage.
+    images = galsim.drawImages(objs[4:8], [ galsim.ImageF(32,32, scale=0.2) for i in range(4) ],
+                               setup_only=False)
+    for obj, im2 in zip(objs[4:8], images):
+        im1 = obj.drawImage(galsim.ImageF(32,32, scale=0.2), setup_only=False)
+        np.testing.assert_allclose(im2.array, im1.array, rtol=1.e-6, atol=1.e-6)
+    images = galsim.drawImages(objs[4:8], [ galsim.ImageF() for i in range(4) ],
+                               wcs=galsim.PixelScale(0.2), setup_only=True)
+    for obj, im2 in zip(objs[4:8], images):
+        im1 = obj.drawImage(scale=0.2, dtype=np.float32, setup_only=True)
+        assert im2.bounds == im1.bounds
+        assert im2.added_flux == 0.
+        np.testing.assert_array_equal(im2.array, 0.)
+
+    # New images are made if the images have undefined bounds.
+    images = galsim.drawImages(objs, [ galsim.ImageD() for i in range(nobj) ],
+                               wcs=galsim.PixelScale(0.3), method='no_pixel')
+    for obj, im2 in zip(objs, images):
+        im1 = obj.drawImage(scale=0.3, dtype=float, method='no_pixel')
+        assert im2.bounds == im1.bounds
+        assert im2.wcs == im1.wcs
+        np.testing.assert_allclose(im2.array, im1.array, rtol=1.e-6, atol=1.e-10)
+
+    # With photon shooting or add_to_image, this is just a loop over drawImage.
+    images = galsim.drawImages(objs[4:8], [ galsim.ImageF(32,32) for i in range(4) ],
+                               wcs=[ galsim.PixelScale(0.2) ] * 4, method='phot',
+                               rng=galsim.BaseDeviate(1234))
+    rng1 = galsim.BaseDeviate(1234)
+    for obj, im2 in zip(objs[4:8], images):
+        im1 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', rng=rng1)
+        np.testing.assert_array_equal(im2.array, im1.array)
+    for im in images:
+        im.setZero()
+        im += 1.
+    galsim.drawImages(objs[4:8], images, method='no_pixel', add_to_image=True)
+    for obj, im2 in zip(objs[4:8], images):
+        im1 = galsim.ImageF(32,32, init_value=1., scale=0.2)
+        obj.drawImage(im1, method='no_pixel', add_to_image=True)
+        np.testing.assert_allclose(im2.array, im1.array, rtol=1.e-6)
+
+    # Check invalid arguments
+    with assert_raises(galsim.GalSimIncompatibleValuesError):
+        galsim.drawImages(objs, images)
+    with assert_raises(galsim.GalSimIncompatibleValuesError):
+        galsim.drawImages(objs[4:8], images, offsets=offsets)
+    with assert_raises(galsim.GalSimIncompatibleValuesError):
+        galsim.drawImages(objs[4:8], images, wcs=[ galsim.PixelScale(0.2) ])
+    with assert_raises(TypeError):
+        galsim.drawImages(objs[4:8], images, nx=32)
+    with assert_raises(TypeError):
+        galsim.drawImages(objs[4:8], [ np.zeros((32,32)) ] * 4)
+    with assert_raises(galsim.GalSimValueError):
+        galsim.drawImages(objs[4:8], images, method='invalid')
+
+@timer
+def test_value_arrays():
+    """Test xValueArray and kValueArray for various kinds of profiles.
+    """
+    gal = galsim.Sersic(n=1.5, half_light_radius=2.3, flux=1.e5).shear(g1=0.2, g2=-0.1)
+    psf = galsim.Moffat(beta=3, fwhm=0.9)
+    im_obj = galsim.InterpolatedImage(galsim.Gaussian(sigma=1.).drawImage(scale=0.3))
+    objs = [ gal,
+             gal.shift(0.3, -0.2) * 3.,
+             galsim.Add(gal, psf.shift(0.3,0.1), galsim.Exponential(scale_radius=1.3)),
+             galsim.Convolve(psf, galsim.Pixel(0.2), real_space=True),
+             galsim.Gaussian(sigma=1.7).rotate(23 * galsim.degrees),
+             galsim.Box(0.4, 0.6).shift(0.1, 0.),
+             galsim.TopHat(0.7),
+             im_obj.shear(g1=0.3, g2=0.1) ]
+    rng = np.random.RandomState(1234)
+    x = rng.uniform(-3, 3, size=(7,9))
+    y = rng.uniform(-3, 3, size=(7,9))
+    for obj in objs:
+        xv = obj.xValueArray(x, y)
+        assert xv.shape == x.shape
+        assert xv.dtype == float
+        np.testing.assert_allclose(
+            xv, [[ obj.xValue(x[i,j], y[i,j]) for j in range(9) ] for i in range(7)],
+            rtol=1.e-10, atol=1.e-14 * obj.max_sb)
+
+        kv = obj.kValueArray(x, y)
+        assert kv.shape == x.shape
+        assert kv.dtype == complex
+        np.testing.assert_allclose(
+            kv, [[ obj.kValue(x[i,j], y[i,j]) for j in range(9) ] for i in range(7)],
+            rtol=1.e-10, atol=1.e-14 * obj.flux)
+
+        # Lists work too, and the inputs are not changed.
+        x1 = list(x[0])
+        y1 = list(y[0])
+        np.testing.assert_allclose(obj.xValueArray(x1, y1), xv[0], rtol=1.e-10)
+        np.testing.assert_allclose(obj.kValueArray(x1, y1), kv[0], rtol=1.e-10)
+        assert x1 == list(x[0])
+        assert y1 == list(y[0])
+
+    # Deconvolution and FourierSqrt only have kValues.
+    for obj in [ galsim.Deconvolve(psf), galsim.FourierSqrt(psf) ]:
+        kv = obj.kValueArray(x, y)
+        np.testing.assert_allclose(
+            kv, [[ obj.kValue(x[i,j], y[i,j]) for j in range(9) ] for i in range(7)],
+            rtol=1.e-10)
+
+    assert_raises(galsim.GalSimIncompatibleValuesError, gal.xValueArray, x, y[0])
+    assert_raises(galsim.GalSimIncompatibleValuesError, gal.kValueArray, x[0], y)
+    assert_raises(galsim.GalSimError, galsim.Convolve(gal, psf).xValueArray, x, y)
+
+
+@timer
+def test_fastest():
+    """Test drawImage with method='fastest'.
+    """
+    # A bright, compact profile drawn without any extra noise allowed uses an FFT.
+    gal = galsim.Convolve(galsim.Sersic(n=2.5, half_light_radius=0.6, flux=1.e6),
+                          galsim.Moffat(beta=3, fwhm=0.7))
+    im1 = gal.drawImage(nx=48, ny=48, scale=0.2)
+    assert im1.draw_method == 'fft'
+    im2 = gal.drawImage(nx=48, ny=48, scale=0.2, method='fastest')
+    print('bright: ',im2.draw_method)
+    assert im2.draw_method == 'fft'
+    np.testing.assert_array_equal(im2.array, im1.array)
+    assert im2.added_flux == im1.added_flux
+
+    # It still does if the allowed extra noise is small, since that needs a lot of photons.
+    im2 = gal.drawImage(nx=48, ny=48, scale=0.2, method='fastest', max_extra_noise=0.1,
+                        rng=galsim.BaseDeviate(1234))
+    assert im2.draw_method == 'fft'
+    np.testing.assert_array_equal(im2.array, im1.array)
+
+    # A faint one where a lot of extra noise is ok uses photon shooting.
+    faint = gal.withFlux(100.)
+    im1 = faint.drawImage(nx=48, ny=48, scale=0.2, method='phot', max_extra_noise=10.,
+                          rng=galsim.BaseDeviate(1234))
+    im2 = faint.drawImage(nx=48, ny=48, scale=0.2, method='fastest', max_extra_noise=10.,
+                          rng=galsim.BaseDeviate(1234))
+    print('faint: ',im2.draw_method)
+    assert im1.draw_method == 'phot'
+    assert im2.draw_method == 'phot'
+    np.testing.assert_array_equal(im2.array, im1.array)
+    # Likewise if a small number of photons is given explicitly.
+    im2 = gal.drawImage(nx=48, ny=48, scale=0.2, method='fastest', n_photons=100,
+                        rng=galsim.BaseDeviate(1234))
+    assert im2.draw_method == 'phot'
+    # But not if the user didn't say how much noise is ok.
+    im2 = faint.drawImage(nx=48, ny=48, scale=0.2, method='fastest')
+    assert im2.draw_method == 'fft'
+    # The gain is applied the same way as for the chosen method.
+    im1 = faint.drawImage(nx=48, ny=48, scale=0.2, gain=3.)
+    im2 = faint.drawImage(nx=48, ny=48, scale=0.2, method='fastest', gain=3.)
+    np.testing.assert_array_equal(im2.array, im1.array)
+    im1 = faint.drawImage(nx=48, ny=48, scale=0.2, method='phot', max_extra_noise=10.,
+                          rng=galsim.BaseDeviate(1234), gain=3.)
+    im2 = faint.drawImage(nx=48, ny=48, scale=0.2, method='fastest', max_extra_noise=10.,
+                          rng=galsim.BaseDeviate(1234), gain=3.)
+    assert im2.draw_method == 'phot'
+    np.testing.assert_array_equal(im2.array, im1.array)
+
+    # Profiles that can't be shot use the next best method.
+    deconv = galsim.Convolve(galsim.Gaussian(sigma=1.5, flux=100.),
+                             galsim.Deconvolve(galsim.Gaussian(sigma=0.3)))
+    im2 = deconv.drawImage(nx=32, ny=32, scale=0.3, method='fastest', max_extra_noise=10.)
+    assert im2.draw_method == 'fft'
+
+    # This is checked from the structure of the profile, without shooting any photons, since
+    # that may need an expensive setup.
+    from galsim.gsobject import _can_shoot
+    assert not _can_shoot(deconv)
+    assert not _can_shoot(galsim.FourierSqrt(galsim.Gaussian(sigma=0.3)).shift(0.1,0.2))
+    assert not _can_shoot(galsim.Sum(galsim.Gaussian(sigma=1.), deconv))
+    assert _can_shoot(galsim.Convolve(galsim.Sersic(n=2.3, half_light_radius=1.),
+                                      galsim.Moffat(beta=3., fwhm=0.7)).rotate(galsim.degrees))
+    assert _can_shoot(galsim.AutoConvolve(galsim.Exponential(scale_radius=1.)))
+    ii = galsim.InterpolatedImage(galsim.Gaussian(sigma=1.).drawImage(nx=16, ny=16, scale=0.3))
+    assert _can_shoot(ii)
+    ii_sinc = galsim.InterpolatedImage(ii.image, x_interpolant='sinc')
+    assert not _can_shoot(ii_sinc)
+    assert_raises(galsim.GalSimError, ii_sinc.shoot, 1, galsim.BaseDeviate(1))
+
+    # A simple profile with hard edges is drawn in real space, as with method='auto'.
+    box = galsim.Box(width=1.3, height=0.9, flux=1.e4).rotate(17*galsim.degrees)
+    im1 = box.drawImage(nx=16, ny=16, scale=0.3)
+    im2 = box.drawImage(nx=16, ny=16, scale=0.3, method='fastest')
+    print('box: ',im1.draw_method, im2.draw_method)
+    assert im1.draw_method == 'real_space'
+    assert im2.draw_method == 'real_space'
+    np.testing.assert_array_equal(im2.array, im1.array)
+
+    # The choice can also be checked directly, with the profile in image coordinates.
+    gauss = galsim.Gaussian(sigma=3.)
+    assert gauss._fastest_method(galsim.BoundsI(1,64,1,64)) == 'fft'
+    assert gauss._fastest_method(galsim.BoundsI(1,64,1,64), max_extra_noise=1.e-3) == 'phot'
+    assert gauss.withFlux(1.e9)._fastest_method(galsim.BoundsI(1,64,1,64),
+                                                max_extra_noise=1.e-3) == 'fft'
+    assert gauss._fastest_method(galsim.BoundsI(1,2,1,2)) == 'real_space'
+    assert gauss._fastest_method(galsim.BoundsI()) == 'fft'
+
+    # The other methods record themselves.
+    for method in ['fft', 'real_space', 'no_pixel', 'sb']:
+        im = gauss.drawImage(nx=16, ny=16, scale=1., method=method)
+        assert im.draw_method == method
+
+    # drawImages picks the method for each one.  With this much noise allowed, the box is
+    # faster to draw with photon shooting.
+    images = galsim.drawImages([gal, faint, box], [galsim.ImageF(48,48,scale=0.2)
+                                                   for i in range(3)],
+                               method='fastest', max_extra_noise=10.,
+                               rng=galsim.BaseDeviate(1234))
+    assert [im.draw_method for im in images] == ['fft', 'phot', 'phot']
+
+    # Some photon shooting options don't make sense with 'fastest'.
+    with assert_raises(galsim.GalSimIncompatibleValuesError):
+        gal.drawImage(nx=48, ny=48, scale=0.2, method='fastest', save_photons=True)
+    with assert_raises(galsim.GalSimIncompatibleValuesError):
+        gal.drawImage(nx=48, ny=48, scale=0.2, method='fastest',
+                      surface_ops=[galsim.FRatioAngles(1.2, 0.4)])
+
+
 if __name__ == "__main__":
     test_drawImage()
     test_draw_methods()
@@ -1568,3 +2097,9 @@ if __name__ == "__main__":
     test_shoot()
     test_types()
     test_direct_scale()
+    test_num_threads()
+    test_fft_wisdom()
+    test_threaded_phot()
+    test_drawImages()
+    test_value_arrays()
+    test_fastest()
@@ -862,6 +862,201 @@ def test_dcr_moments():
     assert moments['Mxy'] > 0  # e2 > 0
 
 
+@timer
+def test_single_precision():
+    """Test PhotonArrays with dtype=np.float32
+    """
+    rng = galsim.BaseDeviate(1234)
+    obj = galsim.Convolve(galsim.Exponential(half_light_radius=0.8),
+                          galsim.Moffat(fwhm=0.7, beta=3)).shear(g1=0.1, g2=0.2)
+    obj = obj.withFlux(1.e4)
+
+    photons64 = obj.shoot(10000, galsim.BaseDeviate(1234))
+    photons32 = obj.shoot(10000, galsim.BaseDeviate(1234), dtype=np.float32)
+    assert photons64.dtype == np.float64
+    assert photons32.dtype == np.float32
+    assert photons32.x.dtype == np.float32
+    assert photons32.flux.dtype == np.float32
+    assert photons32.dxdz.dtype == np.float32
+    assert photons32.wavelength.dtype == np.float32
+    np.testing.assert_allclose(photons32.x, photons64.x, rtol=1.e-5, atol=1.e-5)
+    np.testing.assert_allclose(photons32.y, photons64.y, rtol=1.e-5, atol=1.e-5)
+    np.testing.assert_allclose(photons32.flux, photons64.flux, rtol=1.e-5)
+    assert photons32 != photons64
+    do_pickle(photons32)
+
+    assert_raises(ValueError, galsim.PhotonArray, 10, dtype=np.int32)
+
+    # Drawing with single precision photons gives the same image up to rounding.
+    im64 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', n_photons=10000,
+                         rng=galsim.BaseDeviate(1234), save_photons=True)
+    im32 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', n_photons=10000,
+                         rng=galsim.BaseDeviate(1234), save_photons=True,
+                         photon_dtype=np.float32)
+    assert im32.photons.dtype == np.float32
+    np.testing.assert_allclose(im32.array, im64.array, rtol=1.e-4, atol=1.e-2)
+
+    # Likewise with a SiliconSensor and surface_ops.
+    sensor = galsim.SiliconSensor(rng=galsim.BaseDeviate(5678))
+    surface_ops = [ galsim.FRatioAngles(1.2, 0.4, rng) ]
+    im32 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', n_photons=10000,
+                         rng=galsim.BaseDeviate(1234), sensor=sensor, surface_ops=surface_ops,
+                         photon_dtype=np.float32, save_photons=True)
+    assert im32.photons.dtype == np.float32
+    np.testing.assert_allclose(im32.array.sum(), im32.added_flux, rtol=1.e-5)
+
+    # Convolving and assigning between the two types works.
+    p1 = galsim.PhotonArray(3, x=[1,2,3], y=[4,5,6], flux=[1,1,1], dtype=np.float32)
+    p2 = galsim.PhotonArray(3, x=[0.5,0.5,0.5], y=[1,2,3], flux=[2,2,2])
+    p1.convolve(p2)
+    np.testing.assert_array_equal(p1.x, [1.5,2.5,3.5])
+    np.testing.assert_array_equal(p1.y, [5,7,9])
+    np.testing.assert_array_equal(p1.flux, [6,6,6])
+
+    # And the types are preserved through I/O.
+    file_name = 'output/photons_float32.fits'
+    photons32.write(file_name)
+    photons2 = galsim.PhotonArray.read(file_name)
+    assert photons2 == photons32
+
+
+@timer
+def test_shoot_batches():
+    """Test shooting photons in batches with shootBatches
+    """
+    obj = galsim.Gaussian(sigma=1.3, flux=5000.)
+    sed = galsim.SED(os.path.join(sedpath, 'CWW_E_ext.sed'), 'A', 'flambda').thin()
+    bandpass = galsim.Bandpass(os.path.join(bppath, 'LSST_r.dat'), 'nm').thin()
+    surface_ops = [ galsim.WavelengthSampler(sed, bandpass, galsim.BaseDeviate(11)) ]
+    batches = list(obj.shootBatches(2500, 1000, rng=galsim.BaseDeviate(1234),
+                                    surface_ops=surface_ops, dtype=np.float32))
+    assert [len(p) for p in batches] == [1000, 1000, 500]
+    for p in batches:
+        assert p.dtype == np.float32
+        assert p.hasAllocatedWavelengths()
+        assert np.all(p.wavelength > 500.)
+    np.testing.assert_allclose(sum(p.getTotalFlux() for p in batches), 5000., rtol=1.e-5)
+
+    # The batches are the same as shooting each one separately with the same rng.
+    rng = galsim.BaseDeviate(1234)
+    p1 = obj.shoot(1000, rng)
+    np.testing.assert_allclose(batches[0].x, p1.x, rtol=1.e-6)
+    np.testing.assert_allclose(batches[0].flux, p1.flux * 1000./2500, rtol=1.e-6)
+
+    assert list(obj.shootBatches(0, 10)) == []
+    assert_raises(ValueError, obj.shootBatches, -1, 10)
+    assert_raises(ValueError, obj.shootBatches, 10, 0)
+
+
+@timer
+def test_photon_op_list():
+    """Test applying several surface ops in a single pass with PhotonOpList
+    """
+    sed = galsim.SED(os.path.join(sedpath, 'CWW_E_ext.sed'), 'A', 'flambda').thin()
+    bandpass = galsim.Bandpass(os.path.join(bppath, 'LSST_r.dat'), 'nm').thin()
+    local_wcs = galsim.JacobianWCS(0.21, 0.01, -0.02, 0.19).withOrigin(galsim.PositionD(3,4))
+    obj = galsim.Gaussian(sigma=2.3, flux=1.e4)
+
+    def make_ops(seed):
+        return [ galsim.WavelengthSampler(sed, bandpass, galsim.BaseDeviate(seed)),
+                 galsim.FRatioAngles(1.2, 0.4, galsim.BaseDeviate(seed+1)),
+                 galsim.PhotonDCR(base_wavelength=bandpass.effective_wavelength,
+                                  zenith_angle=50*galsim.degrees,
+                                  parallactic_angle=30*galsim.degrees, alpha=-0.2) ]
+
+    # The reference versions of the ops, applied one at a time with numpy.
+    def apply_ref_ops(photons, seed):
+        photons.wavelength = sed.sampleWavelength(len(photons), bandpass,
+                                                  rng=galsim.BaseDeviate(seed))
+
+        ud = galsim.UniformDeviate(seed+1)
+        pupil_angle = np.arctan(0.5 / 1.2)
+        obscuration_angle = np.arctan(0.5 * 0.4 / 1.2)
+        phi = np.empty(len(photons))
+        ud.generate(phi)
+        phi *= 2 * np.pi
+        u = np.empty(len(photons))
+        ud.generate(u)
+        sintheta = np.sin(obscuration_angle) + (np.sin(pupil_angle) -
+                                                np.sin(obscuration_angle)) * u
+        tantheta = np.sqrt(sintheta**2 / (1. - sintheta**2))
+        photons.dxdz = tantheta * np.sin(phi)
+        photons.dydz = tantheta * np.cos(phi)
+
+        w = photons.wavelength
+        base_wavelength = bandpass.effective_wavelength
+        zenith_angle = 50*galsim.degrees
+        cenx = local_wcs.origin.x
+        ceny = local_wcs.origin.y
+        dilation = (w/base_wavelength)**(-0.2)
+        photons.x = dilation * (photons.x - cenx) + cenx
+        photons.y = dilation * (photons.y - ceny) + ceny
+        shift = (galsim.dcr.get_refraction(w, zenith_angle) -
+                 galsim.dcr.get_refraction(base_wavelength, zenith_angle))
+        shift *= galsim.radians / galsim.arcsec
+        sinp, cosp = (30*galsim.degrees).sincos()
+        photons.x += local_wcs._x(-shift * sinp, shift * cosp)
+        photons.y += local_wcs._y(-shift * sinp, shift * cosp)
+
+    photons1 = obj.shoot(10000, galsim.BaseDeviate(1234))
+    apply_ref_ops(photons1, 5678)
+
+    # The PhotonOpList gives the same results for any chunk size, and so do the ops applied
+    # one at a time.
+    for chunk_size in [10000, 1000, 7]:
+        photons2 = obj.shoot(10000, galsim.BaseDeviate(1234))
+        op_list = galsim.PhotonOpList(make_ops(5678), chunk_size=chunk_size)
+        op_list.applyTo(photons2, local_wcs)
+        np.testing.assert_allclose(photons2.wavelength, photons1.wavelength, rtol=1.e-12)
+        np.testing.assert_allclose(photons2.dxdz, photons1.dxdz, rtol=1.e-12, atol=1.e-14)
+        np.testing.assert_allclose(photons2.dydz, photons1.dydz, rtol=1.e-12, atol=1.e-14)
+        np.testing.assert_allclose(photons2.x, photons1.x, rtol=1.e-12, atol=1.e-12)
+        np.testing.assert_allclose(photons2.y, photons1.y, rtol=1.e-12, atol=1.e-12)
+
+    photons3 = obj.shoot(10000, galsim.BaseDeviate(1234))
+    for op in make_ops(5678):
+        op.applyTo(photons3, local_wcs)
+    np.testing.assert_allclose(photons3.wavelength, photons1.wavelength, rtol=1.e-12)
+    np.testing.assert_allclose(photons3.dxdz, photons1.dxdz, rtol=1.e-12, atol=1.e-14)
+    np.testing.assert_allclose(photons3.dydz, photons1.dydz, rtol=1.e-12, atol=1.e-14)
+    np.testing.assert_allclose(photons3.x, photons1.x, rtol=1.e-12, atol=1.e-12)
+    np.testing.assert_allclose(photons3.y, photons1.y, rtol=1.e-12, atol=1.e-12)
+
+    # Other operators that aren't implemented natively are applied to all the photons at once.
+    class SetWavelength(object):
+        def __init__(self, wave):
+            self.wave = wave
+            self.sizes = []
+        def applyTo(self, photon_array, local_wcs=None):
+            self.sizes.append(len(photon_array))
+            photon_array.wavelength = self.wave
+
+    set_wave = SetWavelength(650.)
+    dcr = make_ops(5678)[2]
+    photons4 = obj.shoot(2500, galsim.BaseDeviate(1234))
+    galsim.PhotonOpList([set_wave, dcr], chunk_size=1000).applyTo(photons4, local_wcs)
+    assert set_wave.sizes == [2500]
+    np.testing.assert_array_equal(photons4.wavelength, 650.)
+    photons5 = obj.shoot(2500, galsim.BaseDeviate(1234))
+    photons5.wavelength = 650.
+    dcr.applyTo(photons5, local_wcs)
+    np.testing.assert_allclose(photons4.x, photons5.x, rtol=1.e-12, atol=1.e-12)
+    np.testing.assert_allclose(photons4.y, photons5.y, rtol=1.e-12, atol=1.e-12)
+
+    # PhotonDCR still needs wavelengths.
+    photons6 = obj.shoot(100, galsim.BaseDeviate(1234))
+    assert_raises(galsim.GalSimError, galsim.PhotonOpList([dcr]).applyTo, photons6, local_wcs)
+    assert_raises(ValueError, galsim.PhotonOpList, [dcr], chunk_size=0)
+
+    # PhotonOpLists can be nested, and used as a surface op in drawImage.
+    op_list2 = galsim.PhotonOpList([op_list])
+    assert op_list2.ops == op_list.ops
+    im = obj.drawImage(nx=64, ny=64, scale=0.2, method='phot', n_photons=10000,
+                       rng=galsim.BaseDeviate(1234), surface_ops=[op_list2], save_photons=True)
+    assert im.photons.hasAllocatedWavelengths()
+    assert im.photons.hasAllocatedAngles()
+
+
 if __name__ == '__main__':
     test_photon_array()
     test_convolve()
@@ -872,3 +1067,6 @@ if __name__ == '__main__':
     if not no_astroplan:
         test_dcr_angles()
     test_dcr_moments()
+    test_single_precision()
+    test_shoot_batches()
+    test_photon_op_list()
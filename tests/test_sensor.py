@@ -989,6 +989,209 @@ def test_flat():
     np.testing.assert_allclose(cov20 / counts_total, 0., atol=2*toler)
     np.testing.assert_allclose(cov02 / counts_total, 0., atol=2*toler)
 
+@timer
+def test_silicon_tiles():
+    """Test accumulating the photons in parallel over tiles of the image.
+    """
+    obj = galsim.Gaussian(flux=1.e6, sigma=0.3)
+
+    im1 = galsim.ImageD(64, 64, scale=0.3)  # Will use the serial accumulate
+    im2 = galsim.ImageD(64, 64, scale=0.3)  # Will use tiles
+    im3 = galsim.ImageD(64, 64, scale=0.3)  # Will use sensor=None
+
+    # The object straddles the corners of 4 tiles, which is the hardest case for the tiles
+    # to get right.
+    silicon1 = galsim.SiliconSensor(rng=galsim.BaseDeviate(1234), diffusion_factor=0.0)
+    silicon2 = galsim.SiliconSensor(rng=galsim.BaseDeviate(1234), diffusion_factor=0.0,
+                                    tile_size=16)
+    obj.drawImage(im1, method='phot', poisson_flux=False, sensor=silicon1,
+                  rng=galsim.BaseDeviate(5678))
+    obj.drawImage(im2, method='phot', poisson_flux=False, sensor=silicon2,
+                  rng=galsim.BaseDeviate(5678))
+    obj.drawImage(im3, method='phot', poisson_flux=False, rng=galsim.BaseDeviate(5678))
+
+    np.testing.assert_almost_equal(im2.array.sum(), obj.flux, decimal=6)
+    np.testing.assert_almost_equal(im2.added_flux, obj.flux, decimal=6)
+
+    # Without diffusion, the photons land in the same places, so the only difference is from
+    # the tiles seeing each other's charge a bit later.  The brighter-fatter effect should be
+    # nearly the same.
+    r1 = im1.calculateMomentRadius(flux=obj.flux)
+    r2 = im2.calculateMomentRadius(flux=obj.flux)
+    r3 = im3.calculateMomentRadius(flux=obj.flux)
+    print('radii: serial = %f, tiles = %f, no sensor = %f'%(r1,r2,r3))
+    assert r1 > r3
+    np.testing.assert_allclose(r2-r3, r1-r3, rtol=0.1)
+
+    # The tiles share the nrecalc electrons between updates of the pixel shapes, so this is
+    # true for any tile size, not just when there are only a few active tiles.
+    for tile_size in [8, 32]:
+        silicon = galsim.SiliconSensor(rng=galsim.BaseDeviate(1234), diffusion_factor=0.0,
+                                       tile_size=tile_size)
+        im = galsim.ImageD(64, 64, scale=0.3)
+        obj.drawImage(im, method='phot', poisson_flux=False, sensor=silicon,
+                      rng=galsim.BaseDeviate(5678))
+        np.testing.assert_almost_equal(im.array.sum(), obj.flux, decimal=6)
+        r = im.calculateMomentRadius(flux=obj.flux)
+        print('tile_size = %d: radius = %f'%(tile_size, r))
+        np.testing.assert_allclose(r-r3, r1-r3, rtol=0.1)
+
+    # The results don't depend on the number of threads.
+    orig_num_threads = galsim.get_num_threads()
+    obj /= 10
+    images = []
+    for num_threads in [1, 4]:
+        galsim.set_num_threads(num_threads)
+        silicon = galsim.SiliconSensor(rng=galsim.BaseDeviate(1234), tile_size=16)
+        im = obj.drawImage(nx=64, ny=64, scale=0.3, method='phot', sensor=silicon,
+                           rng=galsim.BaseDeviate(5678))
+        images.append(im)
+    galsim.set_num_threads(orig_num_threads)
+    np.testing.assert_array_equal(images[0].array, images[1].array)
+
+    # Resuming works with tiles too.
+    silicon = galsim.SiliconSensor(rng=galsim.BaseDeviate(1234), tile_size=16)
+    photons = obj.shoot(int(obj.flux), galsim.BaseDeviate(5678))
+    im4 = galsim.ImageD(64, 64, xmin=-31, ymin=-31)
+    half = len(photons) // 2
+    photons1 = galsim.PhotonArray(half, x=photons.x[:half], y=photons.y[:half],
+                                  flux=photons.flux[:half])
+    photons2 = galsim.PhotonArray(len(photons) - half, x=photons.x[half:],
+                                  y=photons.y[half:], flux=photons.flux[half:])
+    flux1 = silicon.accumulate(photons1, im4)
+    flux2 = silicon.accumulate(photons2, im4, resume=True)
+    np.testing.assert_allclose(flux1 + flux2, obj.flux, rtol=1.e-6)
+    np.testing.assert_allclose(im4.array.sum(), obj.flux, rtol=1.e-6)
+
+    do_pickle(silicon2)
+    assert silicon2 != silicon1
+    assert_raises(ValueError, galsim.SiliconSensor, tile_size=0)
+
+
+@timer
+def test_silicon_dirty_region():
+    """Test that the pixel distortions are only updated near where charge was added.
+    """
+    obj = galsim.Gaussian(flux=1.e5, sigma=0.3)
+    silicon = galsim.SiliconSensor(rng=galsim.BaseDeviate(1234), nrecalc=1.e4)
+
+    # A small star on a large, otherwise empty image.
+    im = galsim.ImageD(512, 512, scale=0.3)
+    obj.drawImage(im, method='phot', poisson_flux=False, sensor=silicon, center=(100,400),
+                  rng=galsim.BaseDeviate(5678))
+    np.testing.assert_almost_equal(im.array.sum(), obj.flux, decimal=6)
+
+    dirty = silicon._silicon.getDirtyRegion()
+    block_size = dirty.getBlockSize()
+    nclears = dirty.getNumClears()
+    print('block_size = ',block_size)
+    print('nclears = ',nclears)
+    print('mean area = ',dirty.getTotalArea() / nclears)
+    # The distortions were updated about every nrecalc electrons.
+    assert nclears >= obj.flux / silicon.nrecalc - 1
+    # But each update only needed to look at the few blocks around the star.
+    assert dirty.getTotalArea() <= 4 * block_size**2 * nclears
+    # The charge added since the last update is all near the star.
+    assert dirty.getNBlocks() > 0
+    for m in range(dirty.getNBlocks()):
+        b = dirty.getBlock(m)
+        assert b.xmin <= 100 + block_size and b.xmax >= 100 - block_size
+        assert b.ymin <= 400 + block_size and b.ymax >= 400 - block_size
+
+    # The result is the same as drawing the star on a small image.
+    silicon2 = galsim.SiliconSensor(rng=galsim.BaseDeviate(1234), nrecalc=1.e4)
+    im2 = galsim.ImageD(galsim.BoundsI(69,132,369,432), scale=0.3)
+    obj.drawImage(im2, method='phot', poisson_flux=False, sensor=silicon2, center=(100,400),
+                  rng=galsim.BaseDeviate(5678))
+    np.testing.assert_allclose(im[im2.bounds].array, im2.array, atol=1.e-8)
+
+
+@timer
+def test_silicon_state():
+    """Test saving and restoring the state of a SiliconSensor to resume accumulating.
+    """
+    obj = galsim.Gaussian(flux=2.e4, sigma=0.4)
+    treering_func = galsim.SiliconSensor.simple_treerings(0.5, 250.)
+    treering_center = galsim.PositionD(-1000,0)
+    rng = galsim.BaseDeviate(1234)
+    photons1 = obj.shoot(int(obj.flux), galsim.BaseDeviate(5678))
+    photons2 = obj.shoot(int(obj.flux), galsim.BaseDeviate(8765))
+    for p in (photons1, photons2):
+        p.x /= 0.3
+        p.y /= 0.3
+    file_name = os.path.join('output', 'silicon_state.fits')
+
+    # Accumulate everything with a single sensor.
+    sensor1 = galsim.SiliconSensor(rng=rng.duplicate(), nrecalc=5000,
+                                   treering_func=treering_func, treering_center=treering_center)
+    im1 = galsim.ImageD(galsim.BoundsI(-20,19,-15,24), scale=0.3)
+    sensor1.accumulate(photons1, im1)
+    sensor1.accumulate(photons2, im1, resume=True)
+
+    # Do the first half with another sensor, and save the state.
+    sensor2 = galsim.SiliconSensor(rng=rng.duplicate(), nrecalc=5000,
+                                   treering_func=treering_func, treering_center=treering_center)
+    assert_raises(RuntimeError, sensor2.save_state, file_name)
+    im2 = galsim.ImageD(galsim.BoundsI(-20,19,-15,24), scale=0.3)
+    sensor2.accumulate(photons1, im2)
+    assert_raises(RuntimeError, sensor2.save_state, file_name, im2.copy())
+    sensor2.save_state(file_name, im2)
+
+    # Continue in a new sensor using the saved state.  This is the same as the single sensor,
+    # since we also continue the same random number sequence.
+    sensor3 = galsim.SiliconSensor(rng=sensor2.rng.duplicate(), nrecalc=5000,
+                                   treering_func=treering_func, treering_center=treering_center)
+    im3 = sensor3.load_state(file_name)
+    assert im3.bounds == im2.bounds
+    assert im3.wcs == im2.wcs
+    np.testing.assert_array_equal(im3.array, im2.array)
+    sensor3.accumulate(photons2, im3, resume=True)
+    np.testing.assert_allclose(im3.array, im1.array, atol=1.e-8)
+    np.testing.assert_almost_equal(im3.array.sum(), 2*obj.flux, decimal=6)
+
+    # The tiled version can also be continued from a saved state.
+    sensor4 = galsim.SiliconSensor(rng=rng.duplicate(), nrecalc=5000, tile_size=16,
+                                   treering_func=treering_func, treering_center=treering_center)
+    im4 = galsim.ImageD(galsim.BoundsI(-20,19,-15,24), scale=0.3)
+    sensor4.accumulate(photons1, im4)
+    sensor4.accumulate(photons2, im4, resume=True)
+    sensor5 = galsim.SiliconSensor(rng=rng.duplicate(), nrecalc=5000, tile_size=16,
+                                   treering_func=treering_func, treering_center=treering_center)
+    im5 = galsim.ImageD(galsim.BoundsI(-20,19,-15,24), scale=0.3)
+    sensor5.accumulate(photons1, im5)
+    sensor5.save_state(file_name)
+    sensor6 = galsim.SiliconSensor(rng=sensor5.rng.duplicate(), nrecalc=5000, tile_size=16,
+                                   treering_func=treering_func, treering_center=treering_center)
+    im6 = sensor6.load_state(file_name)
+    sensor6.accumulate(photons2, im6, resume=True)
+    np.testing.assert_allclose(im6.array, im4.array, atol=1.e-8)
+
+    # The state can't be loaded into a sensor with a different number of vertices.
+    sensor7 = galsim.SiliconSensor('lsst_itl_32')
+    assert_raises(OSError, sensor7.load_state, file_name)
+
+    # Nor into a sensor with other parameters that affect the pixel boundaries.
+    for kwargs in [ dict(nrecalc=1000),
+                    dict(qdist=2),
+                    dict(transpose=True),
+                    dict(treering_center=treering_center),
+                    dict(treering_func=galsim.SiliconSensor.simple_treerings(0.5, 200.),
+                         treering_center=treering_center),
+                    dict(treering_func=treering_func, treering_center=galsim.PositionD(0,0)) ]:
+        sensor8 = galsim.SiliconSensor(nrecalc=kwargs.pop('nrecalc', 5000), **kwargs)
+        assert_raises(OSError, sensor8.load_state, file_name)
+
+    # A compressed file is written all at once, but reads the same way.
+    gz_file_name = os.path.join('output', 'silicon_state.fits.gz')
+    sensor2.save_state(gz_file_name, im2)
+    sensor9 = galsim.SiliconSensor(rng=sensor2.rng.duplicate(), nrecalc=5000,
+                                   treering_func=treering_func, treering_center=treering_center)
+    im9 = sensor9.load_state(gz_file_name)
+    np.testing.assert_array_equal(im9.array, im2.array)
+    sensor9.accumulate(photons2, im9, resume=True)
+    np.testing.assert_allclose(im9.array, im1.array, atol=1.e-8)
+
+
 if __name__ == "__main__":
     test_simple()
     test_silicon()
@@ -999,3 +1202,6 @@ if __name__ == "__main__":
     test_treerings()
     test_resume()
     test_flat()
+    test_silicon_tiles()
+    test_silicon_dirty_region()
+    test_silicon_state()
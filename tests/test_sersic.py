@@ -511,6 +511,77 @@ def test_ne():
             galsim.DeVaucouleurs(half_light_radius=1.0, gsparams=gsp)]
     all_obj_diff(gals)
 
+@timer
+def test_table_cache():
+    """Test saving the lookup tables of some profiles in the table cache directory.
+    """
+    import tempfile
+    import shutil
+    tmp_dir = tempfile.mkdtemp()
+    cache_dir = os.path.join(tmp_dir, 'sub')
+    save_cache_dir = galsim.get_table_cache_dir()
+    try:
+        # The directory is made if necessary.
+        galsim.set_table_cache_dir(cache_dir)
+        assert galsim.get_table_cache_dir() == cache_dir
+        assert os.path.isdir(cache_dir)
+        assert os.listdir(cache_dir) == []
+
+        # Use values that aren't used elsewhere, so the tables aren't in memory yet.
+        gsp = galsim.GSParams(kvalue_accuracy=1.234e-5)
+        sersic = galsim.Sersic(n=2.718, half_light_radius=1.3, gsparams=gsp)
+        maxk = sersic.maxk
+        kx = np.linspace(0, maxk, 40)
+        kv = sersic.kValueArray(kx, 0.7*kx)
+        files = os.listdir(cache_dir)
+        print('files = ',files)
+        assert len(files) == 1
+        assert files[0].startswith('SersicInfo_')
+        file_name = os.path.join(cache_dir, files[0])
+
+        def check_sersic():
+            # Push the table out of the in-memory cache (which keeps 100 of them), so the next
+            # Sersic needs to read it from the file.  These don't need their own tables.
+            for i in range(110):
+                galsim.Sersic(n=1.+i/50., half_light_radius=1.3, gsparams=gsp)._sbp
+            sersic2 = galsim.Sersic(n=2.718, half_light_radius=1.3, gsparams=gsp)
+            assert sersic2.maxk == maxk
+            np.testing.assert_array_equal(sersic2.kValueArray(kx, 0.7*kx), kv)
+            assert len(os.listdir(cache_dir)) == 1
+        check_sersic()
+
+        # If the file is not valid, the table is built again and the file replaced.
+        with open(file_name, 'wb') as fout:
+            fout.write(b'not a table')
+        check_sersic()
+        assert os.path.getsize(file_name) > 1000
+
+        # Likewise if it was written with a different byte order.
+        with open(file_name, 'rb') as fin:
+            data = fin.read()
+        with open(file_name, 'wb') as fout:
+            fout.write(data[:8] + data[8:12][::-1] + data[12:])
+        check_sersic()
+        with open(file_name, 'rb') as fin:
+            assert fin.read() == data
+
+        # Kolmogorov, VonKarman and SecondKick each save their tables too.
+        galsim.Kolmogorov(fwhm=0.7, gsparams=gsp).maxk
+        galsim.VonKarman(lam=700, r0=0.15, L0=23.4, gsparams=gsp).maxk
+        galsim.SecondKick(lam=700, r0=0.15, diam=4., gsparams=gsp).maxk
+        files = sorted(f.split('_')[0] for f in os.listdir(cache_dir))
+        print('files = ',files)
+        assert files == ['KolmogorovInfo', 'SKInfo', 'SersicInfo', 'VonKarmanInfo']
+
+        # With no directory, nothing is saved.
+        galsim.set_table_cache_dir(None)
+        assert galsim.get_table_cache_dir() is None
+        galsim.Sersic(n=2.817, half_light_radius=1.3, gsparams=gsp).maxk
+        assert len(os.listdir(cache_dir)) == 4
+    finally:
+        galsim.set_table_cache_dir(save_cache_dir)
+        shutil.rmtree(tmp_dir)
+
 
 if __name__ == "__main__":
     test_sersic()
@@ -519,3 +590,4 @@ if __name__ == "__main__":
     test_sersic_05()
     test_sersic_1()
     test_ne()
+    test_table_cache()